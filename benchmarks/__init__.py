@@ -0,0 +1,4 @@
+"""
+Performance benchmarks - seeded synthetic university data and timed scenarios
+Run with: python benchmarks/run_benchmarks.py --help
+"""
@@ -0,0 +1,89 @@
+"""
+Compare Benchmark Results
+Prints median timings and statement counts of two run_benchmarks.py JSON
+files side by side and flags regressions.
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json
+    python benchmarks/compare.py baseline.json current.json --threshold 0.2 --fail-on-regression
+"""
+import sys
+import json
+import argparse
+
+
+def load(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    Pair up scenarios present in both reports
+
+    Returns:
+        List of dicts with scenario, baseline/current median and queries,
+        ratio (current / baseline) and regression flag
+    """
+    rows = []
+    for name, new in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if not old or old.get('status') != 'ok' or new.get('status') != 'ok':
+            rows.append({'scenario': name, 'status': f"{(old or {}).get('status', 'missing')} → {new.get('status')}"})
+            continue
+        ratio = new['median'] / old['median'] if old['median'] else None
+        rows.append({
+            'scenario': name,
+            'status': 'ok',
+            'baseline': old['median'],
+            'current': new['median'],
+            'ratio': ratio,
+            'baseline_queries': old['queries'],
+            'current_queries': new['queries'],
+            'regression': ratio is not None and ratio > 1 + threshold,
+        })
+    return rows
+
+
+def describe(report: dict) -> str:
+    meta = report['meta']
+    commit = (meta.get('commit') or 'unknown')[:10] + (' (dirty)' if meta.get('dirty') else '')
+    return f"{commit} {meta.get('backend')} {meta.get('timestamp')}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('baseline', help="Earlier results JSON")
+    parser.add_argument('current', help="Later results JSON")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Slowdown ratio counted as a regression (default: 0.1 = 10%%)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on any regression")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    print(f"Baseline: {describe(baseline)}")
+    print(f"Current:  {describe(current)}")
+    if (baseline['dataset']['seed'], baseline['dataset']['scale']) != (current['dataset']['seed'], current['dataset']['scale']):
+        print("⚠ Datasets differ (seed or scale) - timings are not directly comparable")
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"\n{'Scenario':<20}{'base s':>10}{'curr s':>10}{'ratio':>8}{'queries':>16}")
+    for row in rows:
+        if row['status'] != 'ok':
+            print(f"{row['scenario']:<20}  {row['status']}")
+            continue
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else '-'
+        queries = f"{row['baseline_queries']} → {row['current_queries']}"
+        flag = '  ⚠ slower' if row['regression'] else ''
+        print(f"{row['scenario']:<20}{row['baseline']:>10.3f}{row['current']:>10.3f}{ratio:>8}{queries:>16}{flag}")
+
+    regressions = [row for row in rows if row.get('regression')]
+    if regressions:
+        print(f"\n⚠ {len(regressions)} scenario(s) slower by more than {args.threshold:.0%}")
+    else:
+        print("\n✓ No regressions")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+Synthetic University Generator - Seeded, reproducible benchmark datasets
+Fills an empty database with departments, teachers, courses, students, marks,
+a teaching year of attendance and audit logs, then rebuilds the derived
+tables (GPA ledger, attendance rollup, search index).
+
+Import only after config.DATABASE_PATH / config.USE_MYSQL point at the
+benchmark database - see run_benchmarks.py.
+"""
+import os
+import re
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from database.db_manager import db
+from controllers.marks_controller import marks_controller
+import config
+
+
+# Preset sizes; any field can be overridden from the command line
+SCALES = {
+    'tiny': {'departments': 2, 'students': 200, 'courses_per_semester': 4,
+             'attendance_days': 20, 'audit_logs': 1000},
+    'small': {'departments': 4, 'students': 2000, 'courses_per_semester': 5,
+              'attendance_days': 40, 'audit_logs': 5000},
+    'medium': {'departments': 8, 'students': 20000, 'courses_per_semester': 6,
+               'attendance_days': 120, 'audit_logs': 50000},
+    'large': {'departments': 12, 'students': 100000, 'courses_per_semester': 6,
+              'attendance_days': 200, 'audit_logs': 250000},
+}
+
+SEMESTERS = 8
+
+# Last day of the synthetic teaching year; fixed so datasets are reproducible
+DEFAULT_AS_OF = date(2025, 12, 31)
+
+# Rows per executemany() call
+BATCH_SIZE = 5000
+
+# Marker table identifying a generated database; the runner refuses to
+# touch databases without it
+META_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS benchmark_meta (
+        meta_key VARCHAR(50) PRIMARY KEY,
+        meta_value TEXT
+    )
+"""
+
+# Tables whose SQLite schema is owned by a controller's ensure_table()
+CONTROLLER_TABLES = {'gpa_ledger', 'attendance_rollup', 'attendance_archive'}
+
+# Tables from migration v2 the generator writes to, for MySQL databases
+# that were created from schema.sql only
+MYSQL_SUPPLEMENT = """
+    CREATE TABLE IF NOT EXISTS student_attendance (
+        attendance_id INT PRIMARY KEY AUTO_INCREMENT,
+        student_id INT NOT NULL,
+        course_id INT,
+        attendance_date DATE NOT NULL,
+        status VARCHAR(20) DEFAULT 'Present',
+        marked_by INT NOT NULL,
+        remarks TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+        FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE SET NULL,
+        UNIQUE KEY unique_student_course_date (student_id, course_id, attendance_date),
+        INDEX idx_attendance_date (attendance_date),
+        INDEX idx_attendance_student (student_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    CREATE TABLE IF NOT EXISTS audit_logs (
+        log_id INT PRIMARY KEY AUTO_INCREMENT,
+        user_id INT,
+        username VARCHAR(50),
+        action_type VARCHAR(50) NOT NULL,
+        table_name VARCHAR(50),
+        record_id INT,
+        action_description TEXT,
+        old_value TEXT,
+        new_value TEXT,
+        ip_address VARCHAR(45),
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_audit_logs_user (user_id),
+        INDEX idx_audit_logs_timestamp (timestamp)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+DEPARTMENT_NAMES = [
+    ('Computer Science', 'CS'), ('Electrical Engineering', 'EE'),
+    ('Mechanical Engineering', 'ME'), ('Business Administration', 'BBA'),
+    ('Civil Engineering', 'CE'), ('Mathematics', 'MTH'), ('Physics', 'PHY'),
+    ('Chemistry', 'CHM'), ('English', 'ENG'), ('Economics', 'ECO'),
+    ('Software Engineering', 'SE'), ('Biotechnology', 'BT'),
+]
+
+FIRST_NAMES = [
+    'Ali', 'Ahmed', 'Hassan', 'Usman', 'Bilal', 'Hamza', 'Zain', 'Omar', 'Saad', 'Fahad',
+    'Ayesha', 'Fatima', 'Zainab', 'Maryam', 'Hira', 'Sana', 'Amna', 'Iqra', 'Noor', 'Rabia',
+]
+LAST_NAMES = [
+    'Khan', 'Ahmed', 'Malik', 'Hussain', 'Raza', 'Iqbal', 'Shah', 'Butt', 'Chaudhry', 'Qureshi',
+    'Siddiqui', 'Javed', 'Akhtar', 'Aslam', 'Nawaz', 'Rehman', 'Sheikh', 'Mirza', 'Abbasi', 'Anwar',
+]
+COURSE_TOPICS = [
+    'Fundamentals', 'Methods', 'Systems', 'Analysis', 'Design', 'Theory',
+    'Applications', 'Laboratory', 'Seminar', 'Workshop',
+]
+AUDIT_ACTIONS = [
+    ('LOGIN', None), ('LOGOUT', None), ('CREATE', 'students'), ('UPDATE', 'students'),
+    ('UPDATE', 'marks'), ('CREATE', 'marks'), ('DELETE', 'marks'), ('CREATE', 'results'),
+]
+
+
+def sqlite_schema_statements() -> List[str]:
+    """
+    Translate database/schema.sql (MySQL) into SQLite statements
+
+    Inline INDEX clauses become CREATE INDEX statements so the benchmark
+    database carries the same indexes as a production one.
+    """
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_dir, 'database', 'schema.sql'), encoding='utf-8') as f:
+        mysql_sql = re.sub(r'--[^\n]*', '', f.read())
+
+    statements = []
+    indexes = []
+    for statement in [s.strip() for s in mysql_sql.split(';') if s.strip()]:
+        match = re.match(r'CREATE TABLE IF NOT EXISTS (\w+)', statement)
+        if not match or match.group(1) in CONTROLLER_TABLES:
+            continue
+        table = match.group(1)
+        for name, columns in re.findall(r'^\s*INDEX (\w+) \(([^)]*)\),?\s*$', statement, flags=re.M):
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        statement = re.sub(r'^\s*INDEX [^\n]*\n', '', statement, flags=re.M)
+        statement = re.sub(r'\)\s*ENGINE=.*$', ')', statement, flags=re.S)
+        statement = re.sub(r',\s*\)$', '\n)', statement)
+        statement = statement.replace('INT PRIMARY KEY AUTO_INCREMENT', 'INTEGER PRIMARY KEY AUTOINCREMENT')
+        statement = re.sub(r'UNIQUE KEY \w+ \(', 'UNIQUE (', statement)
+        statement = statement.replace(' ON UPDATE CURRENT_TIMESTAMP', '').replace('`rank`', 'rank')
+        statements.append(statement)
+    return statements + indexes
+
+
+def migration_statements() -> List[str]:
+    """Statements of database/migrations/database_migration_v2.sql (SQLite syntax)"""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_dir, 'database', 'migrations', 'database_migration_v2.sql'),
+              encoding='utf-8') as f:
+        migration_sql = re.sub(r'--[^\n]*', '', f.read())
+    return [s.strip() for s in migration_sql.split(';') if s.strip()]
+
+
+def load_dataset_info() -> Optional[Dict]:
+    """The generator report stored in a benchmark database, or None if it is not one"""
+    if not db.table_exists('benchmark_meta'):
+        return None
+    rows = db.execute_query("SELECT meta_value FROM benchmark_meta WHERE meta_key = 'dataset'")
+    return json.loads(rows[0]['meta_value']) if rows else None
+
+
+class UniversityGenerator:
+    """Deterministic synthetic university: the same seed and scale give the same rows"""
+
+    def __init__(self, seed: int = 42, scale: Optional[Dict] = None, as_of: date = DEFAULT_AS_OF):
+        self.seed = seed
+        self.scale = dict(SCALES['small'], **(scale or {}))
+        self.as_of = as_of
+        self.rng = random.Random(seed)
+        self.counts: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+
+    def generate(self, progress=print) -> Dict:
+        """
+        Create the schema and fill it
+
+        Returns:
+            Dict with scale, seed, per-table row counts and per-step seconds
+        """
+        steps = [
+            ('schema', self.create_schema),
+            ('departments', self.insert_departments),
+            ('users', self.insert_users),
+            ('courses', self.insert_courses),
+            ('students', self.insert_students),
+            ('marks', self.insert_marks),
+            ('attendance', self.insert_attendance),
+            ('audit_logs', self.insert_audit_logs),
+            ('derived_tables', self.rebuild_derived_tables),
+        ]
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            self.timings[name] = round(time.perf_counter() - started, 3)
+            progress(f"  {name:<16} {self.counts.get(name, ''):>10}  {self.timings[name]:.2f}s")
+
+        dataset = {
+            'seed': self.seed,
+            'scale': self.scale,
+            'as_of': self.as_of.isoformat(),
+            'rows': dict(self.counts),
+            'seconds': dict(self.timings),
+        }
+        db.execute_update("INSERT INTO benchmark_meta (meta_key, meta_value) VALUES (?, ?)",
+                          ('dataset', json.dumps(dataset)))
+        return dataset
+
+    def create_schema(self):
+        """Create every table the scenarios touch; the database must be empty"""
+        if db.table_exists('students'):
+            existing = db.execute_query("SELECT COUNT(*) AS n FROM students")
+            if existing is None or existing[0]['n']:
+                raise RuntimeError("Benchmark database must be empty - use a new file or an empty MySQL database")
+
+        if config.USE_MYSQL:
+            if not db.initialize_schema():
+                raise RuntimeError("Could not create the MySQL schema from database/schema.sql")
+            if not db.ensure_schema('benchmark_supplement', '', MYSQL_SUPPLEMENT):
+                raise RuntimeError("Could not create the attendance and audit log tables")
+        else:
+            conn = db.get_connection()
+            for statement in sqlite_schema_statements():
+                conn.execute(statement)
+            # Like run_migration_v2.py: tables schema.sql already defines are skipped
+            for statement in migration_statements():
+                try:
+                    conn.execute(statement)
+                except Exception as e:
+                    if "already exists" not in str(e).lower():
+                        print(f"  Warning: migration statement skipped: {e}")
+            conn.commit()
+
+        db.ensure_schema('benchmark_meta', META_SCHEMA, META_SCHEMA)
+
+    def insert_departments(self):
+        rows = []
+        for index in range(self.scale['departments']):
+            name, code = DEPARTMENT_NAMES[index % len(DEPARTMENT_NAMES)]
+            if index >= len(DEPARTMENT_NAMES):
+                name, code = f"{name} {index // len(DEPARTMENT_NAMES) + 1}", f"{code}{index // len(DEPARTMENT_NAMES) + 1}"
+            rows.append((name, code))
+        self._insert("INSERT INTO departments (department_name, department_code) VALUES (?, ?)", rows)
+        self.department_ids = [row['department_id'] for row in
+                               db.execute_query("SELECT department_id FROM departments ORDER BY department_id")]
+        self.counts['departments'] = len(rows)
+
+    def insert_users(self):
+        """One admin plus two teachers per department (unusable password hashes)"""
+        rows = [('admin', '!benchmark', 'Benchmark Admin', 'Admin', None)]
+        for department_id in self.department_ids:
+            for n in (1, 2):
+                rows.append((f"teacher{department_id}_{n}", '!benchmark',
+                             self._person_name(), 'Teacher', department_id))
+        self._insert("""INSERT INTO users (username, password_hash, full_name, role, department_id)
+                        VALUES (?, ?, ?, ?, ?)""", rows)
+        users = db.execute_query("SELECT user_id, username FROM users ORDER BY user_id")
+        self.users = [(row['user_id'], row['username']) for row in users]
+        self.admin_id = self.users[0][0]
+        self.counts['users'] = len(rows)
+
+    def insert_courses(self):
+        rows = []
+        for department_id in self.department_ids:
+            for semester in range(1, SEMESTERS + 1):
+                for n in range(1, self.scale['courses_per_semester'] + 1):
+                    code = f"D{department_id}-{semester}{n:02d}"
+                    name = f"{self.rng.choice(COURSE_TOPICS)} {semester}{n:02d}"
+                    credits = self.rng.choice((2, 3, 3, 4))
+                    rows.append((code, name, department_id, semester, 100,
+                                 self.rng.choice((40, 40, 50)), credits))
+        self._insert("""INSERT INTO courses (course_code, course_name, department_id, semester,
+                                             max_marks, pass_marks, credits)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+
+        self.courses: Dict[tuple, List[dict]] = {}
+        for row in db.execute_query("""SELECT course_id, department_id, semester, pass_marks
+                                       FROM courses ORDER BY course_id"""):
+            self.courses.setdefault((row['department_id'], row['semester']), []).append(row)
+        self.counts['courses'] = len(rows)
+
+    def insert_students(self):
+        """Students spread evenly over departments and semesters"""
+        year = self.as_of.year
+
+        def rows():
+            for n in range(1, self.scale['students'] + 1):
+                department_id = self.department_ids[n % len(self.department_ids)]
+                semester = self.rng.randint(1, SEMESTERS)
+                gender = self.rng.choice(('Male', 'Female'))
+                name = self._person_name()
+                roll = f"B{year - (semester - 1) // 2}-{department_id:02d}-{n:06d}"
+                birth = date(year - 18 - (semester - 1) // 2, 1, 1) + timedelta(days=self.rng.randint(0, 364))
+                cnic = f"{self.rng.randint(10000, 99999)}-{self.rng.randint(1000000, 9999999)}-{self.rng.randint(1, 9)}"
+                email = f"{name.lower().replace(' ', '.')}.{n}@students.example.edu"
+                phone = f"03{self.rng.randint(0, 49):02d}{self.rng.randint(1000000, 9999999)}"
+                yield (roll, name, department_id, semester, gender, birth.isoformat(), email, phone, cnic)
+
+        self.counts['students'] = self._insert(
+            """INSERT INTO students (roll_number, name, department_id, semester, gender,
+                                     date_of_birth, email, phone, cnic)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows())
+
+    def insert_marks(self):
+        """Marks for every course up to each student's current semester"""
+        self.ability: Dict[int, float] = {}
+
+        def rows():
+            for student in self._students():
+                ability = self.ability[student['student_id']] = self.rng.gauss(66, 12)
+                for semester in range(1, student['semester'] + 1):
+                    for course in self.courses[(student['department_id'], semester)]:
+                        obtained = max(0, min(100, round(self.rng.gauss(ability, 10))))
+                        yield (student['student_id'], course['course_id'], obtained,
+                               marks_controller.calculate_grade(obtained, 100),
+                               marks_controller.calculate_status(obtained, course['pass_marks']),
+                               self.admin_id)
+
+        self.counts['marks'] = self._insert(
+            """INSERT INTO marks (student_id, course_id, marks_obtained, grade, status, entered_by)
+               VALUES (?, ?, ?, ?, ?, ?)""", rows())
+
+    def class_days(self) -> List[date]:
+        """The last attendance_days weekdays up to as_of, oldest first"""
+        days = []
+        day = self.as_of
+        while len(days) < self.scale['attendance_days']:
+            if day.weekday() < 5:
+                days.append(day)
+            day -= timedelta(days=1)
+        return days[::-1]
+
+    def insert_attendance(self):
+        """
+        One class per student per teaching day, rotating through current-semester courses
+
+        Weaker students attend less often, so risk scoring has something to find.
+        """
+        days = self.class_days()
+
+        def rows():
+            for student in self._students():
+                courses = self.courses[(student['department_id'], student['semester'])]
+                ability = self.ability.get(student['student_id'], 66)
+                regularity = min(0.99, max(0.45, self.rng.gauss(0.85 + (ability - 66) / 300, 0.08)))
+                for index, day in enumerate(days):
+                    roll = self.rng.random()
+                    if roll < regularity:
+                        status = 'Late' if self.rng.random() < 0.05 else 'Present'
+                    else:
+                        status = 'Leave' if self.rng.random() < 0.25 else 'Absent'
+                    course = courses[(student['student_id'] + index) % len(courses)]
+                    yield (student['student_id'], course['course_id'], day.isoformat(),
+                           status, self.admin_id)
+
+        self.counts['attendance'] = self._insert(
+            """INSERT INTO student_attendance (student_id, course_id, attendance_date, status, marked_by)
+               VALUES (?, ?, ?, ?, ?)""", rows())
+
+    def insert_audit_logs(self):
+        start = datetime.combine(self.as_of - timedelta(days=364), datetime.min.time())
+        span = 365 * 24 * 3600
+
+        def rows():
+            for _ in range(self.scale['audit_logs']):
+                user_id, username = self.rng.choice(self.users)
+                action, table = self.rng.choice(AUDIT_ACTIONS)
+                record_id = self.rng.randint(1, self.scale['students']) if table else None
+                stamp = start + timedelta(seconds=self.rng.randrange(span))
+                yield (user_id, username, action, table, record_id,
+                       f"{action.title()} {table or 'session'}",
+                       f"192.168.{self.rng.randint(0, 9)}.{self.rng.randint(2, 254)}",
+                       stamp.strftime('%Y-%m-%d %H:%M:%S'))
+
+        self.counts['audit_logs'] = self._insert(
+            """INSERT INTO audit_logs (user_id, username, action_type, table_name, record_id,
+                                       action_description, ip_address, timestamp)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", rows())
+
+    def rebuild_derived_tables(self):
+        """Bring the ledger, rollup and search index in line with the bulk-loaded rows"""
+        from controllers.gpa_ledger_controller import gpa_ledger_controller
+        from controllers.attendance_rollup_controller import attendance_rollup_controller
+        from controllers.student_search_controller import student_search_controller
+
+        gpa_ledger_controller.rebuild_ledger()
+        attendance_rollup_controller.rebuild_rollup()
+        student_search_controller.rebuild_index()
+        if not config.USE_MYSQL:
+            db.execute_update("ANALYZE")
+
+    def _students(self) -> Iterator[dict]:
+        """Students in id order, read a batch at a time"""
+        last_id = 0
+        while True:
+            batch = db.execute_query(
+                """SELECT student_id, department_id, semester FROM students
+                   WHERE student_id > ? ORDER BY student_id LIMIT ?""",
+                (last_id, BATCH_SIZE)
+            )
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1]['student_id']
+
+    def _person_name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _insert(self, query: str, rows) -> int:
+        """executemany() in BATCH_SIZE chunks, one transaction per chunk"""
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                total += self._flush(query, batch)
+                batch = []
+        if batch:
+            total += self._flush(query, batch)
+        return total
+
+    def _flush(self, query: str, batch: List[tuple]) -> int:
+        with db.transaction():
+            db.execute_many(query, batch)
+        return len(batch)
@@ -0,0 +1,148 @@
+"""
+Import-Time Profile
+Imports the startup modules in a fresh interpreter with `python -X importtime`
+and reports where cold-start time goes, so startup can be kept under a target.
+
+Usage:
+    python benchmarks/import_profile.py                          # modules loaded before the login window
+    python benchmarks/import_profile.py --target-ms 800          # exit 1 when slower
+    python benchmarks/import_profile.py --modules ui.main_window --top 25
+    python benchmarks/import_profile.py --repeat 5 --output startup.json
+"""
+import sys
+import os
+import re
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Everything main.py imports before the login window is shown
+STARTUP_MODULES = ['main', 'ui.login_window']
+
+# Libraries that belong on the pages that use them, never on the startup path
+HEAVY_PACKAGES = ('pandas', 'numpy', 'matplotlib', 'reportlab', 'openpyxl', 'qrcode', 'sklearn', 'plotly')
+
+DEFAULT_TARGET_MS = 1000.0
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Profile module import time at application startup")
+    parser.add_argument('--modules', help="Comma-separated modules to import (default: the pre-login startup path)")
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS,
+                        help=f"Fail when total import time exceeds this (default: {DEFAULT_TARGET_MS:.0f})")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters to run; the fastest is reported")
+    parser.add_argument('--top', type=int, default=15, help="Packages and modules to list (default: 15)")
+    parser.add_argument('--allow-heavy', action='store_true',
+                        help="Do not fail when a heavy library is imported")
+    parser.add_argument('--output', help="Also write the profile as JSON")
+    return parser.parse_args(argv)
+
+
+def run_importtime(modules):
+    """Import the modules in a new interpreter; returns (entries, error)"""
+    code = "; ".join(f"import {name}" for name in modules)
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=BASE_DIR, env=env, capture_output=True, text=True)
+
+    entries = []
+    other = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            entries.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000.0,
+                'cumulative_ms': int(cumulative_us) / 1000.0,
+            })
+        elif not line.startswith('import time:'):
+            other.append(line)
+
+    error = "\n".join(other[-5:]) if proc.returncode != 0 else None
+    return entries, error
+
+
+def summarize(entries):
+    """Total time plus self time grouped by top-level package"""
+    packages = defaultdict(float)
+    for entry in entries:
+        packages[entry['module'].split('.')[0]] += entry['self_ms']
+
+    return {
+        'total_ms': round(sum(entry['self_ms'] for entry in entries), 1),
+        'modules_imported': len(entries),
+        'packages': sorted(((name, round(ms, 1)) for name, ms in packages.items()),
+                           key=lambda item: item[1], reverse=True),
+        'slowest_modules': [
+            (entry['module'], round(entry['cumulative_ms'], 1))
+            for entry in sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)
+        ],
+        'heavy_packages': sorted(name for name in packages if name in HEAVY_PACKAGES),
+    }
+
+
+def print_report(modules, summary, runs, target_ms, top):
+    print("=" * 60)
+    print(f"Import profile: {', '.join(modules)}")
+    print("=" * 60)
+    print(f"Total:   {summary['total_ms']:.1f} ms  (fastest of {len(runs)}: "
+          f"{', '.join(f'{ms:.0f}' for ms in runs)} ms)")
+    print(f"Modules: {summary['modules_imported']}")
+    print(f"Target:  {target_ms:.0f} ms")
+
+    print("\nBy package (self time):")
+    for name, ms in summary['packages'][:top]:
+        print(f"  {ms:9.1f} ms  {name}")
+
+    print("\nSlowest imports (cumulative):")
+    for name, ms in summary['slowest_modules'][:top]:
+        print(f"  {ms:9.1f} ms  {name}")
+
+    if summary['heavy_packages']:
+        print(f"\n⚠ Heavy libraries on this path: {', '.join(summary['heavy_packages'])}")
+        print("  Import them inside the functions or pages that use them.")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    modules = [name.strip() for name in args.modules.split(',')] if args.modules else STARTUP_MODULES
+
+    best = None
+    runs = []
+    for _ in range(max(1, args.repeat)):
+        entries, error = run_importtime(modules)
+        if error:
+            print(f"✗ Import failed:\n{error}")
+            return 2
+        summary = summarize(entries)
+        runs.append(summary['total_ms'])
+        if best is None or summary['total_ms'] < best['total_ms']:
+            best = summary
+
+    print_report(modules, best, runs, args.target_ms, args.top)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'modules': modules, 'target_ms': args.target_ms, 'runs_ms': runs, **best}, f, indent=2)
+        print(f"\nProfile written to {args.output}")
+
+    failed = False
+    if best['total_ms'] > args.target_ms:
+        print(f"\n✗ Startup imports take {best['total_ms']:.0f} ms, over the {args.target_ms:.0f} ms target")
+        failed = True
+    if best['heavy_packages'] and not args.allow_heavy:
+        print("\n✗ Heavy libraries are imported at startup")
+        failed = True
+    if not failed:
+        print(f"\n✓ Within the {args.target_ms:.0f} ms target")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Run Performance Benchmarks
+Generates (or reuses) a seeded synthetic university, times each scenario and
+writes the results as JSON for comparison across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py                         # small SQLite dataset in the temp dir
+    python benchmarks/run_benchmarks.py --scale large           # 100k students
+    python benchmarks/run_benchmarks.py --students 50000 --attendance-days 120
+    python benchmarks/run_benchmarks.py --scenarios search,ranking --repeat 5
+    python benchmarks/run_benchmarks.py --mysql                 # empty MySQL database from config.json
+    python benchmarks/compare.py baseline.json current.json
+"""
+import sys
+import os
+import io
+import json
+import shutil
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+
+# Add parent directory to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import config
+
+FORMAT_VERSION = 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the exam system against a synthetic university")
+    parser.add_argument('--scale', default='small', choices=['tiny', 'small', 'medium', 'large'],
+                        help="Dataset preset (default: small)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for data and samples")
+    parser.add_argument('--departments', type=int, help="Override the preset's department count")
+    parser.add_argument('--students', type=int, help="Override the preset's student count")
+    parser.add_argument('--courses-per-semester', type=int, help="Override courses per department semester")
+    parser.add_argument('--attendance-days', type=int, help="Override the number of teaching days")
+    parser.add_argument('--audit-logs', type=int, help="Override the audit log row count")
+    parser.add_argument('--db', help="SQLite file to generate or reuse (default: temp dir, named by scale and seed)")
+    parser.add_argument('--mysql', action='store_true',
+                        help="Use the MySQL server from config.json; the database must be empty or a benchmark database")
+    parser.add_argument('--regenerate', action='store_true', help="Rebuild the SQLite dataset even if it matches")
+    parser.add_argument('--scenarios', help="Comma-separated scenario names (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per scenario (default: 3)")
+    parser.add_argument('--sample', type=int, default=50, help="Students sampled for per-student scenarios")
+    parser.add_argument('--output', help="JSON file to write (default: benchmarks/results/<time>_<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def git_info() -> dict:
+    """Commit being measured, so result files can be matched to the code"""
+    def git(*args):
+        try:
+            out = subprocess.run(['git', *args], cwd=BASE_DIR, capture_output=True, text=True, timeout=30)
+            return out.stdout.strip() if out.returncode == 0 else None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+    }
+
+
+def configure(args) -> str:
+    """Point the app configuration at the benchmark database before db_manager is imported"""
+    config.USE_MYSQL = args.mysql
+    config.DB_QUERY_STATS_ENABLED = True
+    if args.mysql:
+        return f"{config.MYSQL_USER}@{config.MYSQL_HOST}/{config.MYSQL_DATABASE}"
+
+    path = os.path.abspath(args.db or os.path.join(
+        tempfile.gettempdir(), f"exam_benchmark_{args.scale}_{args.seed}.db"))
+    if os.path.normcase(path) == os.path.normcase(os.path.abspath(config.DATABASE_PATH)):
+        raise SystemExit("✗ Refusing to benchmark the application database - choose another --db path")
+    if os.path.exists(path) and not _is_benchmark_file(path):
+        raise SystemExit(f"✗ {path} exists and is not a benchmark database")
+    if args.regenerate:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    config.DATABASE_PATH = path
+    return path
+
+
+def _is_benchmark_file(path: str) -> bool:
+    import sqlite3
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return bool(conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'benchmark_meta'").fetchone())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+
+def prepare_dataset(args) -> dict:
+    """Reuse a matching generated dataset or generate a new one"""
+    from benchmarks.generator import UniversityGenerator, SCALES, load_dataset_info
+
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        override = getattr(args, key)
+        if override is not None:
+            scale[key] = override
+
+    dataset = load_dataset_info()
+    if dataset is not None:
+        if dataset['seed'] == args.seed and dataset['scale'] == scale:
+            print("✓ Reusing generated dataset")
+            return dataset
+        raise SystemExit("✗ Database holds a dataset with a different seed/scale - "
+                         "use --regenerate (SQLite) or an empty database")
+
+    print(f"Generating dataset (seed {args.seed}): {scale}")
+    return UniversityGenerator(seed=args.seed, scale=scale).generate()
+
+
+def run_scenario(name, scenario, ctx, repeat: int) -> dict:
+    """
+    Time one scenario repeat times; statement counts come from the last run
+
+    Controller console output is captured so printing is not part of the timing.
+    """
+    from database.db_manager import db
+    from benchmarks.scenarios import ScenarioSkipped
+
+    db.reset_query_stats()
+    runs = []
+    summary = None
+    counter = None
+    try:
+        for _ in range(repeat):
+            with db.count_queries(raise_on_exceed=False) as counter, redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                summary = scenario(ctx)
+                runs.append(round(time.perf_counter() - started, 4))
+    except ScenarioSkipped as e:
+        return {'status': 'skipped', 'reason': str(e)}
+    except Exception as e:
+        return {'status': 'error', 'error': f"{type(e).__name__}: {e}", 'runs': runs}
+
+    top = db.get_query_stats(sort_by='total_ms', limit=5)
+    return {
+        'status': 'ok',
+        'runs': runs,
+        'min': min(runs),
+        'median': round(statistics.median(runs), 4),
+        'mean': round(statistics.mean(runs), 4),
+        'max': max(runs),
+        'queries': counter.count,
+        'distinct_statements': len(counter.shapes()),
+        'summary': summary,
+        'top_statements': [
+            {key: row[key] for key in ('sql', 'calls', 'total_ms', 'p95_ms')} for row in top
+        ],
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    target = configure(args)
+
+    print("=" * 70)
+    print("  Performance Benchmarks")
+    print("=" * 70)
+    print(f"Database: {'MySQL ' if args.mysql else 'SQLite '}{target}")
+
+    dataset = prepare_dataset(args)
+
+    from benchmarks.scenarios import SCENARIOS, BenchmarkContext
+
+    selected = SCENARIOS
+    if args.scenarios:
+        wanted = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+        unknown = set(wanted) - {name for name, _ in SCENARIOS}
+        if unknown:
+            raise SystemExit(f"✗ Unknown scenarios: {', '.join(sorted(unknown))}")
+        selected = [(name, fn) for name, fn in SCENARIOS if name in wanted]
+
+    output_dir = tempfile.mkdtemp(prefix='exam_benchmark_out_')
+    ctx = BenchmarkContext(output_dir, seed=args.seed, sample_size=args.sample)
+
+    results = {}
+    print(f"\n{'Scenario':<20}{'median s':>10}{'min s':>10}{'queries':>10}  status")
+    try:
+        for name, scenario in selected:
+            result = results[name] = run_scenario(name, scenario, ctx, args.repeat)
+            if result['status'] == 'ok':
+                print(f"{name:<20}{result['median']:>10.3f}{result['min']:>10.3f}{result['queries']:>10}  ok")
+            else:
+                print(f"{name:<20}{'':>30}  {result['status']}: {result.get('reason') or result.get('error')}")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    report = {
+        'format': FORMAT_VERSION,
+        'meta': dict(git_info(), **{
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': 'mysql' if args.mysql else 'sqlite',
+            'repeat': args.repeat,
+            'sample': args.sample,
+        }),
+        'dataset': dataset,
+        'scenarios': results,
+    }
+
+    output = args.output
+    if output is None:
+        commit = (report['meta']['commit'] or 'nocommit')[:10]
+        output = os.path.join(BASE_DIR, 'benchmarks', 'results',
+                              f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+
+    print(f"\n✓ Results written to {output}")
+    return 1 if any(r['status'] == 'error' for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
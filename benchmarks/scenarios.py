@@ -0,0 +1,159 @@
+"""
+Benchmark Scenarios - Timed end-to-end operations against a generated dataset
+Each scenario is a function taking the run context and returning a short
+summary of what it did. A scenario whose optional dependency is missing
+raises ScenarioSkipped and is reported as skipped instead of failing the run.
+"""
+import os
+import random
+from typing import Callable, Dict, List, Tuple
+from database.db_manager import db
+import config
+
+
+class ScenarioSkipped(Exception):
+    """Raised when a scenario cannot run in this environment"""
+
+
+class BenchmarkContext:
+    """Dataset facts the scenarios share, read once before timing starts"""
+
+    def __init__(self, output_dir: str, seed: int = 42, sample_size: int = 50):
+        self.output_dir = output_dir
+        self.rng = random.Random(seed)
+        self.sample_size = sample_size
+
+        self.department_ids = [row['department_id'] for row in
+                               db.execute_query("SELECT department_id FROM departments ORDER BY department_id")]
+        self.cohorts = [(row['department_id'], row['semester']) for row in db.execute_query(
+            "SELECT DISTINCT department_id, semester FROM students ORDER BY department_id, semester"
+        )]
+        students = db.execute_query("SELECT student_id, semester, name, roll_number FROM students ORDER BY student_id")
+        sample = self.rng.sample(students, min(sample_size, len(students)))
+        self.sample_students = [(row['student_id'], row['semester']) for row in sample]
+        self.search_terms = []
+        for row in sample[:10]:
+            first, _, last = row['name'].partition(' ')
+            self.search_terms.extend([first, last, row['roll_number'], f"{first} {last[:3]}"])
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
+
+
+def _require(module: str):
+    """Import an optional dependency or skip the scenario"""
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ScenarioSkipped(f"{module} not installed ({e})")
+
+
+def result_generation(ctx: BenchmarkContext) -> Dict:
+    """Generate results for every department/semester cohort"""
+    from controllers.result_controller import result_controller
+    generated = 0
+    for department_id, semester in ctx.cohorts:
+        success, message, summary = result_controller.generate_results_batch(department_id, semester)
+        if not success:
+            raise RuntimeError(message)
+        generated += summary.get('generated', 0)
+    return {'cohorts': len(ctx.cohorts), 'results': generated}
+
+
+def ranking(ctx: BenchmarkContext) -> Dict:
+    """Rank every department/semester in one pass"""
+    from controllers.result_controller import result_controller
+    success, updated = result_controller.calculate_ranks()
+    if not success:
+        raise RuntimeError("Ranking failed")
+    return {'ranked': updated}
+
+
+def risk_scoring(ctx: BenchmarkContext) -> Dict:
+    """Score every active student for academic risk"""
+    _require('numpy')
+    from controllers.ai_insights_controller import ai_insights_controller
+    scores = ai_insights_controller.calculate_risk_scores()
+    return {'scored': len(scores), 'high_risk': sum(1 for s in scores if s['risk_level'] in ('High', 'Critical'))}
+
+
+def search(ctx: BenchmarkContext) -> Dict:
+    """Run a fixed set of name / roll number searches"""
+    from controllers.student_controller import student_controller
+    hits = 0
+    for term in ctx.search_terms:
+        hits += len(student_controller.search_students(term, limit=50))
+    return {'searches': len(ctx.search_terms), 'hits': hits}
+
+
+def dashboard_stats(ctx: BenchmarkContext) -> Dict:
+    """Admin dashboard tiles, analytics summary and per-department statistics"""
+    from controllers.dashboard_controller import dashboard_controller
+    from controllers.analytics_controller import analytics_controller
+    dashboard_controller.get_overview_statistics(use_cache=False)
+    for department_id in ctx.department_ids:
+        dashboard_controller.get_department_statistics(department_id, use_cache=False)
+    analytics_controller.get_dashboard_summary()
+    analytics_controller.get_attendance_statistics()
+    return {'departments': len(ctx.department_ids)}
+
+
+def pdf_marksheets(ctx: BenchmarkContext) -> Dict:
+    """Build the result and render a marksheet PDF for each sampled student"""
+    _require('reportlab')
+    from controllers.result_controller import result_controller
+    from utils.pdf_generator import pdf_generator
+    written = 0
+    for student_id, semester in ctx.sample_students:
+        success, result_data, _ = result_controller.generate_result(student_id, semester)
+        if success and pdf_generator.generate_marksheet(result_data, ctx.path(f"marksheet_{student_id}.pdf")):
+            written += 1
+    return {'marksheets': written}
+
+
+def excel_exports(ctx: BenchmarkContext) -> Dict:
+    """Export the full student list and the full results report, streamed from the database"""
+    _require('openpyxl')
+    from controllers.student_controller import student_controller
+    from utils.excel_exporter import excel_exporter
+    counts = {'students': 0, 'results': 0}
+
+    def counted(rows, key):
+        for row in rows:
+            counts[key] += 1
+            yield row
+
+    results = db.iter_query("""
+        SELECT r.*, s.roll_number, s.name AS student_name, d.department_name
+        FROM results r
+        JOIN students s ON r.student_id = s.student_id
+        LEFT JOIN departments d ON s.department_id = d.department_id
+        ORDER BY r.semester, s.roll_number
+    """)
+    if not excel_exporter.export_student_list(counted(student_controller.iter_all_students(), 'students'),
+                                              ctx.path('students.xlsx')):
+        raise RuntimeError("Student list export failed")
+    if not excel_exporter.export_results_report(counted(results, 'results'), ctx.path('results.xlsx')):
+        raise RuntimeError("Results report export failed")
+    return counts
+
+
+def backup(ctx: BenchmarkContext) -> Dict:
+    """Online backup of the whole database"""
+    success, path = db.backup_database(ctx.path('backup.sql' if config.USE_MYSQL else 'backup.db'))
+    if not success:
+        raise ScenarioSkipped(path) if 'mysqldump' in path else RuntimeError(path)
+    return {'bytes': os.path.getsize(path)}
+
+
+# Run order matters: ranking, PDFs and exports read the generated results
+SCENARIOS: List[Tuple[str, Callable[[BenchmarkContext], Dict]]] = [
+    ('result_generation', result_generation),
+    ('ranking', ranking),
+    ('risk_scoring', risk_scoring),
+    ('search', search),
+    ('dashboard_stats', dashboard_stats),
+    ('pdf_marksheets', pdf_marksheets),
+    ('excel_exports', excel_exports),
+    ('backup', backup),
+]
@@ -35,6 +35,31 @@ if USE_MYSQL:
     MYSQL_DATABASE = DB_CONFIG.get('mysql_database', 'exam_management')
     MYSQL_PORT = DB_CONFIG.get('mysql_port', 3306)
 
+# Connection Pool Settings (override with pool_size / pool_reserve / pool_timeout / pool_ping_interval / stream_chunk_size in config.json)
+DB_POOL_SIZE = int((DB_CONFIG or {}).get('pool_size', 5))  # Max open connections
+DB_POOL_RESERVE = int((DB_CONFIG or {}).get('pool_reserve', 2))  # Kept free of background tasks (GUI thread, backup scheduler, warm-up)
+DB_POOL_TIMEOUT = float((DB_CONFIG or {}).get('pool_timeout', 30))  # Seconds to wait for a free connection
+DB_POOL_PING_INTERVAL = float((DB_CONFIG or {}).get('pool_ping_interval', 60))  # Health-check connections idle this long
+DB_STREAM_CHUNK_SIZE = int((DB_CONFIG or {}).get('stream_chunk_size', 1000))  # Rows per fetch for db.stream_query / iter_query
+
+# Startup (override with connect_mode in config.json)
+# 'eager': connect when database.db_manager is imported
+# 'lazy': connect on the first query
+# 'background': main.py connects in a thread while the login window paints
+DB_CONNECT_MODE = str((DB_CONFIG or {}).get('connect_mode', 'background')).lower()
+
+# Query Instrumentation (override with query_stats / slow_query_ms / query_history_size in config.json)
+DB_QUERY_STATS_ENABLED = bool((DB_CONFIG or {}).get('query_stats', True))  # Time every statement
+DB_SLOW_QUERY_MS = float((DB_CONFIG or {}).get('slow_query_ms', 250))  # Log statements at least this slow (0 = off)
+DB_QUERY_HISTORY_SIZE = int((DB_CONFIG or {}).get('query_history_size', 1000))  # Recent statements kept in memory
+
+# Reference Data Cache (override with reference_cache_ttl / reference_cache_size in config.json)
+REFERENCE_CACHE_TTL = float((DB_CONFIG or {}).get('reference_cache_ttl', 300))  # Seconds before a cached lookup is re-read (0 = off)
+REFERENCE_CACHE_SIZE = int((DB_CONFIG or {}).get('reference_cache_size', 512))  # Lookups kept per controller
+
+# Cross-PC Change Notification (override with change_poll_interval in config.json)
+CHANGE_POLL_INTERVAL = float((DB_CONFIG or {}).get('change_poll_interval', 15))  # Seconds between change_versions polls (0 = off)
+
 # University Information (CUSTOMIZE THIS FOR YOUR UNIVERSITY)
 UNIVERSITY_NAME = "ABC University"  # ← Change this to your university name
 UNIVERSITY_ADDRESS = "123 University Street, City, State - 12345"
@@ -5,8 +5,13 @@ Note: This is a simplified version using basic heuristics.
 For production, integrate scikit-learn for ML models.
 """
 from database.db_manager import db
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.attendance_rollup_controller import attendance_rollup_controller
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np  # Imported on first use, it is slow to load
 
 class AIInsightsController:
     """Controller for AI-powered student insights"""
@@ -14,140 +19,160 @@ class AIInsightsController:
     def calculate_risk_score(self, student_id: int) -> Tuple[float, Dict]:
         """Calculate risk score for a student (0-100, higher = more at risk)"""
         try:
-            risk_score = 0.0
-            factors = {}
-            
-            # Factor 1: CGPA (40% weight)
-            cgpa_query = """
-                SELECT cgpa FROM results
-                WHERE student_id = ?
-                ORDER BY generated_at DESC LIMIT 1
-            """
-            cgpa_result = db.execute_query(cgpa_query, (student_id,))
-            cgpa = cgpa_result[0]['cgpa'] if cgpa_result and cgpa_result[0]['cgpa'] else 0.0
-            
-            if cgpa < 2.0:
-                cgpa_risk = 40.0
-            elif cgpa < 2.5:
-                cgpa_risk = 30.0
-            elif cgpa < 3.0:
-                cgpa_risk = 15.0
-            else:
-                cgpa_risk = 0.0
-            
-            risk_score += cgpa_risk
-            factors['cgpa'] = {'value': cgpa, 'risk': cgpa_risk, 'weight': 40}
-            
-            # Factor 2: Attendance (30% weight)
-            att_query = """
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present
-                FROM student_attendance
-                WHERE student_id = ?
-            """
-            att_result = db.execute_query(att_query, (student_id,))
-            attendance_pct = 0.0
-            if att_result and att_result[0]['total'] > 0:
-                attendance_pct = (att_result[0]['present'] / att_result[0]['total']) * 100
-            
-            if attendance_pct < 60:
-                att_risk = 30.0
-            elif attendance_pct < 75:
-                att_risk = 20.0
-            elif attendance_pct < 85:
-                att_risk = 10.0
-            else:
-                att_risk = 0.0
-            
-            risk_score += att_risk
-            factors['attendance'] = {'value': attendance_pct, 'risk': att_risk, 'weight': 30}
-            
-            # Factor 3: Failing grades (20% weight)
-            fail_query = """
-                SELECT COUNT(*) as f_count
-                FROM marks
-                WHERE student_id = ? AND grade = 'F'
-            """
-            fail_result = db.execute_query(fail_query, (student_id,))
-            f_count = fail_result[0]['f_count'] if fail_result else 0
-            
-            if f_count >= 3:
-                fail_risk = 20.0
-            elif f_count >= 2:
-                fail_risk = 15.0
-            elif f_count >= 1:
-                fail_risk = 10.0
-            else:
-                fail_risk = 0.0
-            
-            risk_score += fail_risk
-            factors['failing_grades'] = {'value': f_count, 'risk': fail_risk, 'weight': 20}
-            
-            # Factor 4: Assignment submission rate (10% weight)
-            assign_query = """
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status IN ('Submitted', 'Graded') THEN 1 ELSE 0 END) as submitted
-                FROM assignment_submissions
-                WHERE student_id = ?
-            """
-            assign_result = db.execute_query(assign_query, (student_id,))
-            submission_rate = 0.0
-            if assign_result and assign_result[0]['total'] > 0:
-                submission_rate = (assign_result[0]['submitted'] / assign_result[0]['total']) * 100
-            
-            if submission_rate < 50:
-                assign_risk = 10.0
-            elif submission_rate < 75:
-                assign_risk = 5.0
-            else:
-                assign_risk = 0.0
-            
-            risk_score += assign_risk
-            factors['assignment_submission'] = {'value': submission_rate, 'risk': assign_risk, 'weight': 10}
-            
-            return risk_score, factors
+            scored = self._score_cohort("s.student_id = ?", (student_id,), active_only=False)
+            if not scored:
+                return 0.0, {}
+            return scored[0]['risk_score'], scored[0]['factors']
             
         except Exception as e:
             print(f"Error calculating risk score: {e}")
             return 0.0, {}
     
-    def get_at_risk_students(self, department_id: int = None, 
-                            risk_threshold: float = 40.0) -> List[Dict]:
-        """Get list of at-risk students"""
+    def calculate_risk_scores(self, department_id: int = None) -> List[Dict]:
+        """
+        Score every active student of a department (or all departments) in one pass
+        
+        Returns:
+            List of student dicts with risk_score, risk_level and factors
+            (same factors structure as calculate_risk_score)
+        """
         try:
-            # Get all active students
-            query = """
-                SELECT s.student_id, s.roll_number, s.name, s.semester,
-                       d.department_name
-                FROM students s
-                JOIN departments d ON s.department_id = d.department_id
-                WHERE s.is_active = 1
-            """
+            where = "1=1"
             params = []
             
             if department_id:
-                query += " AND s.department_id = ?"
+                where = "s.department_id = ?"
                 params.append(department_id)
             
-            students = db.execute_query(query, tuple(params))
+            return self._score_cohort(where, tuple(params))
             
-            at_risk = []
-            for student in students:
-                risk_score, factors = self.calculate_risk_score(student['student_id'])
-                
-                if risk_score >= risk_threshold:
-                    at_risk.append({
-                        'student_id': student['student_id'],
-                        'roll_number': student['roll_number'],
-                        'name': student['name'],
-                        'semester': student['semester'],
-                        'department': student['department_name'],
-                        'risk_score': round(risk_score, 2),
-                        'risk_level': self._get_risk_level(risk_score),
-                        'factors': factors
-                    })
+        except Exception as e:
+            print(f"Error calculating risk scores: {e}")
+            return []
+    
+    def _score_cohort(self, where: str, params: tuple, active_only: bool = True) -> List[Dict]:
+        """Fetch the four risk factors for a cohort with grouped queries and score them together"""
+        import numpy as np
+        
+        cohort = f"{where} AND s.is_active = 1" if active_only else where
+        
+        students = db.execute_query(f"""
+            SELECT s.student_id, s.roll_number, s.name, s.semester,
+                   d.department_name
+            FROM students s
+            JOIN departments d ON s.department_id = d.department_id
+            WHERE {cohort}
+        """, params) or []
+        if not students:
+            return []
+        
+        student_ids = [student['student_id'] for student in students]
+        
+        # Factor 1: CGPA - GPA ledger first, latest generated result as fallback
+        cgpa_map = gpa_ledger_controller.get_latest_cgpas(student_ids)
+        if len(cgpa_map) < len(student_ids):
+            rows = db.execute_query(f"""
+                SELECT r.student_id, r.cgpa
+                FROM results r
+                JOIN students s ON r.student_id = s.student_id
+                WHERE {cohort}
+                ORDER BY r.generated_at, r.semester
+            """, params) or []
+            latest_results = {row['student_id']: row['cgpa'] for row in rows}
+            for student_id in student_ids:
+                if student_id not in cgpa_map:
+                    cgpa_map[student_id] = float(latest_results.get(student_id) or 0.0)
+        
+        # Factor 2: Attendance (from the monthly rollup)
+        source, source_params = attendance_rollup_controller.counts_source()
+        attendance = self._group_counts(f"""
+            SELECT a.student_id,
+                   SUM(a.total_count) as total,
+                   SUM(a.present_count + a.late_count) as hits
+            FROM ({source}) a
+            JOIN students s ON a.student_id = s.student_id
+            WHERE {cohort}
+            GROUP BY a.student_id
+        """, tuple(source_params) + tuple(params))
+        
+        # Factor 3: Failing grades
+        failing = self._group_counts(f"""
+            SELECT m.student_id, COUNT(*) as total, 0 as hits
+            FROM marks m
+            JOIN students s ON m.student_id = s.student_id
+            WHERE {cohort} AND m.grade = 'F'
+            GROUP BY m.student_id
+        """, params)
+        
+        # Factor 4: Assignment submission rate
+        submissions = self._group_counts(f"""
+            SELECT a.student_id,
+                   COUNT(*) as total,
+                   SUM(CASE WHEN a.status IN ('Submitted', 'Graded') THEN 1 ELSE 0 END) as hits
+            FROM assignment_submissions a
+            JOIN students s ON a.student_id = s.student_id
+            WHERE {cohort}
+            GROUP BY a.student_id
+        """, params)
+        
+        cgpa = np.array([cgpa_map.get(sid, 0.0) for sid in student_ids], dtype=float)
+        att_total, att_present = self._count_arrays(attendance, student_ids)
+        f_count, _ = self._count_arrays(failing, student_ids)
+        sub_total, sub_done = self._count_arrays(submissions, student_ids)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            attendance_pct = np.where(att_total > 0, att_present / att_total * 100, 0.0)
+            submission_rate = np.where(sub_total > 0, sub_done / sub_total * 100, 0.0)
+        
+        cgpa_risk = np.select([cgpa < 2.0, cgpa < 2.5, cgpa < 3.0], [40.0, 30.0, 15.0], 0.0)
+        att_risk = np.select([attendance_pct < 60, attendance_pct < 75, attendance_pct < 85],
+                             [30.0, 20.0, 10.0], 0.0)
+        fail_risk = np.select([f_count >= 3, f_count >= 2, f_count >= 1], [20.0, 15.0, 10.0], 0.0)
+        assign_risk = np.select([submission_rate < 50, submission_rate < 75], [10.0, 5.0], 0.0)
+        risk_scores = cgpa_risk + att_risk + fail_risk + assign_risk
+        
+        scored = []
+        for i, student in enumerate(students):
+            risk_score = float(risk_scores[i])
+            scored.append({
+                'student_id': student['student_id'],
+                'roll_number': student['roll_number'],
+                'name': student['name'],
+                'semester': student['semester'],
+                'department': student['department_name'],
+                'risk_score': risk_score,
+                'risk_level': self._get_risk_level(risk_score),
+                'factors': {
+                    'cgpa': {'value': float(cgpa[i]), 'risk': float(cgpa_risk[i]), 'weight': 40},
+                    'attendance': {'value': float(attendance_pct[i]), 'risk': float(att_risk[i]), 'weight': 30},
+                    'failing_grades': {'value': int(f_count[i]), 'risk': float(fail_risk[i]), 'weight': 20},
+                    'assignment_submission': {'value': float(submission_rate[i]), 'risk': float(assign_risk[i]),
+                                              'weight': 10}
+                }
+            })
+        return scored
+    
+    def _group_counts(self, query: str, params: tuple) -> Dict[int, Tuple[int, int]]:
+        """Run a per-student (total, hits) aggregate query"""
+        rows = db.execute_query(query, params) or []
+        return {row['student_id']: (int(row['total'] or 0), int(row['hits'] or 0)) for row in rows}
+    
+    def _count_arrays(self, counts: Dict[int, Tuple[int, int]], student_ids: List[int]) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Align (total, hits) counts with the cohort order as two arrays"""
+        import numpy as np
+        
+        pairs = np.array([counts.get(sid, (0, 0)) for sid in student_ids], dtype=float).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+    
+    def get_at_risk_students(self, department_id: int = None, 
+                            risk_threshold: float = 40.0) -> List[Dict]:
+        """Get list of at-risk students"""
+        try:
+            at_risk = [
+                dict(student, risk_score=round(student['risk_score'], 2))
+                for student in self.calculate_risk_scores(department_id)
+                if student['risk_score'] >= risk_threshold
+            ]
             
             # Sort by risk score descending
             at_risk.sort(key=lambda x: x['risk_score'], reverse=True)
@@ -169,10 +194,11 @@ class AIInsightsController:
         else:
             return 'Low'
     
-    def get_intervention_recommendations(self, student_id: int) -> List[str]:
-        """Get recommended interventions for a student"""
+    def get_intervention_recommendations(self, student_id: int,
+                                         risk: Optional[Tuple[float, Dict]] = None) -> List[str]:
+        """Get recommended interventions for a student (risk: precomputed (score, factors))"""
         try:
-            risk_score, factors = self.calculate_risk_score(student_id)
+            risk_score, factors = risk or self.calculate_risk_score(student_id)
             recommendations = []
             
             # CGPA-based recommendations
@@ -208,10 +234,11 @@ class AIInsightsController:
             print(f"Error getting recommendations: {e}")
             return []
     
-    def get_performance_prediction(self, student_id: int) -> Dict:
-        """Predict student's likely performance in next semester"""
+    def get_performance_prediction(self, student_id: int,
+                                   risk: Optional[Tuple[float, Dict]] = None) -> Dict:
+        """Predict student's likely performance in next semester (risk: precomputed (score, factors))"""
         try:
-            risk_score, factors = self.calculate_risk_score(student_id)
+            risk_score, factors = risk or self.calculate_risk_score(student_id)
             
             # Simple prediction based on current performance
             current_cgpa = factors.get('cgpa', {}).get('value', 0.0)
@@ -243,7 +270,8 @@ class AIInsightsController:
     def get_insights_summary(self, department_id: int = None) -> Dict:
         """Get overall insights summary"""
         try:
-            at_risk = self.get_at_risk_students(department_id, risk_threshold=30.0)
+            scored = self.calculate_risk_scores(department_id)
+            at_risk = [s for s in scored if s['risk_score'] >= 30.0]
             
             critical = len([s for s in at_risk if s['risk_level'] == 'Critical'])
             high = len([s for s in at_risk if s['risk_level'] == 'High'])
@@ -254,7 +282,7 @@ class AIInsightsController:
                 'critical_risk': critical,
                 'high_risk': high,
                 'medium_risk': medium,
-                'students_analyzed': len(at_risk),
+                'students_analyzed': len(scored),
                 'top_risk_factors': self._get_top_risk_factors(at_risk)
             }
             
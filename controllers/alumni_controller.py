@@ -3,6 +3,7 @@ Alumni Controller
 Manages alumni database and employment tracking
 """
 from database.db_manager import db
+from controllers.change_version_controller import change_version_controller
 from datetime import datetime, date
 from typing import List, Dict, Optional, Tuple
 
@@ -45,7 +46,9 @@ class AlumniController:
             
             if success:
                 # Optionally deactivate student record
-                db.execute_update("UPDATE students SET is_active = 0 WHERE student_id = ?", (student_id,))
+                change_version_controller.execute_update(
+                    ('students',), "UPDATE students SET is_active = 0 WHERE student_id = ?", (student_id,)
+                )
                 return True, f"Student moved to alumni database (Alumni ID: {alumni_id})"
             
             return False, "Failed to move student to alumni"
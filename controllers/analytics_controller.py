@@ -3,6 +3,7 @@ Analytics Controller
 Generates analytics data and statistics for visualization
 """
 from database.db_manager import db
+from controllers.attendance_rollup_controller import attendance_rollup_controller
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Tuple
 
@@ -106,20 +107,20 @@ class AnalyticsController:
     def get_attendance_statistics(self, department_id: int = None) -> List[Dict]:
         """Get attendance statistics by department"""
         try:
-            query = """
+            source, params = attendance_rollup_controller.counts_source()
+            query = f"""
                 SELECT 
                     d.department_name,
                     COUNT(DISTINCT sa.student_id) as students_tracked,
-                    COUNT(sa.attendance_id) as total_records,
-                    SUM(CASE WHEN sa.status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present_count,
-                    ROUND(CAST(SUM(CASE WHEN sa.status IN ('Present', 'Late') THEN 1 ELSE 0 END) AS FLOAT) / 
-                          COUNT(sa.attendance_id) * 100, 2) as avg_attendance_rate
+                    SUM(sa.total_count) as total_records,
+                    SUM(sa.present_count + sa.late_count) as present_count,
+                    ROUND(CAST(SUM(sa.present_count + sa.late_count) AS FLOAT) / 
+                          SUM(sa.total_count) * 100, 2) as avg_attendance_rate
                 FROM departments d
                 LEFT JOIN students s ON d.department_id = s.department_id
-                LEFT JOIN student_attendance sa ON s.student_id = sa.student_id
+                LEFT JOIN ({source}) sa ON s.student_id = sa.student_id
                 WHERE s.is_active = 1
             """
-            params = []
             
             if department_id:
                 query += " AND d.department_id = ?"
@@ -243,15 +244,16 @@ class AnalyticsController:
             summary['performance'] = perf_data[0] if perf_data else {}
             
             # Attendance summary
-            att_query = """
+            source, source_params = attendance_rollup_controller.counts_source()
+            att_query = f"""
                 SELECT 
-                    COUNT(*) as total_records,
-                    SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present,
-                    ROUND(CAST(SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) AS FLOAT) / 
-                          COUNT(*) * 100, 2) as attendance_rate
-                FROM student_attendance
+                    COALESCE(SUM(total_count), 0) as total_records,
+                    SUM(present_count + late_count) as present,
+                    ROUND(CAST(SUM(present_count + late_count) AS FLOAT) / 
+                          SUM(total_count) * 100, 2) as attendance_rate
+                FROM ({source}) a
             """
-            att_data = db.execute_query(att_query)
+            att_data = db.execute_query(att_query, tuple(source_params))
             summary['attendance'] = att_data[0] if att_data else {}
             
             return summary
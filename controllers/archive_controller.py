@@ -3,6 +3,7 @@ Archive Controller
 Manages database archiving for old academic year data
 """
 from database.db_manager import db
+from utils.reference_cache import invalidate_all
 from datetime import datetime, date
 from typing import List, Dict, Optional, Tuple
 import json
@@ -100,6 +101,7 @@ class ArchiveController:
             
             # Note: Restoration is complex and should be done carefully
             # This is a simplified version
+            invalidate_all()
             return True, f"Restoration of {academic_year} initiated (manual verification recommended)"
             
         except Exception as e:
@@ -133,6 +135,68 @@ class ArchiveController:
             print(f"Error getting archived students: {e}")
             return []
     
+    def get_archived_students_page(self, academic_year: str = None, department_id: int = None,
+                                   after: Optional[tuple] = None, offset: int = 0,
+                                   limit: Optional[int] = 200) -> Dict:
+        """
+        Get one page of archived students, newest first, keyed on (archived_date, archive_id)
+        
+        Returns:
+            Dict with rows, next_cursor (None on the last page) and has_more
+        """
+        where, params = self._archived_filters(academic_year, department_id)
+        if after is not None:
+            where += " AND (ars.archived_date < ? OR (ars.archived_date = ? AND ars.archive_id < ?))"
+            params.extend([after[0], after[0], after[1]])
+        
+        query = f"""
+            SELECT ars.archive_id, ars.original_student_id, ars.roll_number, ars.name,
+                   ars.department_id, ars.semester, ars.gender, ars.archived_date,
+                   ars.archive_reason, d.department_name
+            FROM archived_students ars
+            LEFT JOIN departments d ON ars.department_id = d.department_id
+            WHERE {where}
+            ORDER BY ars.archived_date DESC, ars.archive_id DESC
+        """
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit + 1, offset if after is None else 0])
+        
+        rows = [dict(row) for row in db.execute_query(query, tuple(params)) or []]
+        has_more = limit is not None and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+        
+        next_cursor = (rows[-1]['archived_date'], rows[-1]['archive_id']) if has_more else None
+        return {'rows': rows, 'next_cursor': next_cursor, 'has_more': has_more}
+    
+    def count_archived_students(self, academic_year: str = None,
+                                department_id: int = None) -> Tuple[int, bool]:
+        """Count archived students matching the filters; returns (count, exact)"""
+        where, params = self._archived_filters(academic_year, department_id)
+        result = db.execute_query(
+            f"SELECT COUNT(*) as total FROM archived_students ars WHERE {where}", tuple(params)
+        )
+        return (int(result[0]['total']) if result else 0), True
+    
+    def _archived_filters(self, academic_year, department_id) -> Tuple[str, list]:
+        """WHERE clause for archived student queries (EXISTS keeps one row per student)"""
+        where = "1=1"
+        params = []
+        
+        if academic_year:
+            where += """ AND EXISTS (
+                SELECT 1 FROM archive_metadata am
+                WHERE date(am.archive_date) = date(ars.archived_date) AND am.academic_year = ?
+            )"""
+            params.append(academic_year)
+        
+        if department_id:
+            where += " AND ars.department_id = ?"
+            params.append(department_id)
+        
+        return where, params
+    
     def get_archive_metadata(self) -> List[Dict]:
         """Get all archive metadata records"""
         try:
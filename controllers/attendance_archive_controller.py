@@ -0,0 +1,379 @@
+"""
+Attendance Archive Controller - Compact storage for attendance of closed months
+Each (student, course, month) is stored as one row with a 31-character day
+string (one status code per day) instead of one student_attendance row per class.
+"""
+import calendar
+import json
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from database.db_manager import db, in_chunks
+
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS attendance_archive (
+        student_id INTEGER NOT NULL,
+        course_id INTEGER NOT NULL DEFAULT 0,
+        month CHAR(7) NOT NULL,
+        days CHAR(31) NOT NULL,
+        present_count INTEGER NOT NULL DEFAULT 0,
+        absent_count INTEGER NOT NULL DEFAULT 0,
+        leave_count INTEGER NOT NULL DEFAULT 0,
+        late_count INTEGER NOT NULL DEFAULT 0,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        remarks TEXT,
+        PRIMARY KEY (student_id, course_id, month),
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_attendance_archive_month ON attendance_archive(month)
+"""
+
+MYSQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS attendance_archive (
+        student_id INT NOT NULL,
+        course_id INT NOT NULL DEFAULT 0,
+        month CHAR(7) NOT NULL,
+        days CHAR(31) NOT NULL,
+        present_count SMALLINT NOT NULL DEFAULT 0,
+        absent_count SMALLINT NOT NULL DEFAULT 0,
+        leave_count SMALLINT NOT NULL DEFAULT 0,
+        late_count SMALLINT NOT NULL DEFAULT 0,
+        total_count SMALLINT NOT NULL DEFAULT 0,
+        remarks TEXT,
+        PRIMARY KEY (student_id, course_id, month),
+        INDEX idx_attendance_archive_month (month),
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# One character per day of the month; NO_CLASS marks days without a record
+STATUS_CODES = {'Present': 'P', 'Absent': 'A', 'Leave': 'L', 'Late': 'T'}
+CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+NO_CLASS = '-'
+
+# Count column for each status code (same names as attendance_rollup)
+CODE_COLUMNS = {'P': 'present_count', 'A': 'absent_count', 'L': 'leave_count', 'T': 'late_count'}
+COUNT_COLUMNS = ['present_count', 'absent_count', 'leave_count', 'late_count', 'total_count']
+
+
+class AttendanceArchiveController:
+    """Moves attendance of closed months into attendance_archive and reads it back"""
+
+    def ensure_table(self) -> bool:
+        """Create the archive table if needed (call outside of db.transaction())"""
+        return db.ensure_schema('attendance_archive', SQLITE_SCHEMA, MYSQL_SCHEMA)
+
+    def archive_months(self, through_month: str) -> Tuple[bool, str, Dict]:
+        """
+        Compact all live attendance up to and including a month
+
+        Every month is packed and its live rows deleted in its own transaction.
+        Marked-by and created-at details are not kept; remarks are kept per day.
+        Rows that cannot share a day slot (duplicate records for one day) stay live.
+
+        Args:
+            through_month: Last closed month as 'YYYY-MM' (before the current month)
+
+        Returns:
+            Tuple of (success: bool, message: str, stats: dict with months,
+            records_archived, archive_rows and records_kept)
+        """
+        stats = {'months': 0, 'records_archived': 0, 'archive_rows': 0, 'records_kept': 0}
+        try:
+            next_month = self._next_month(through_month)
+        except (TypeError, ValueError):
+            return False, f"Invalid month '{through_month}', expected YYYY-MM", stats
+        # Attendance is still being marked in the current month
+        if next_month > date.today().replace(day=1):
+            return False, f"Month {through_month} is not closed yet; archive up to last month at most", stats
+
+        if not self.ensure_table():
+            return False, "Could not create attendance_archive table", stats
+
+        months = db.execute_query("""
+            SELECT DISTINCT SUBSTR(CAST(attendance_date AS CHAR), 1, 7) AS month
+            FROM student_attendance
+            WHERE attendance_date < ?
+            ORDER BY month
+        """, (next_month.isoformat(),))
+        if months is None:
+            return False, "Could not read attendance months", stats
+
+        try:
+            for row in months:
+                archived, packed, kept = self._archive_month(row['month'])
+                stats['months'] += 1
+                stats['records_archived'] += archived
+                stats['archive_rows'] += packed
+                stats['records_kept'] += kept
+        except Exception as e:
+            return False, f"Error archiving attendance: {str(e)}", stats
+
+        message = (f"Archived {stats['records_archived']} attendance records from "
+                   f"{stats['months']} months into {stats['archive_rows']} rows")
+        return True, message, stats
+
+    def restore_months(self, from_month: str, through_month: str, restored_by: int) -> Tuple[bool, str, int]:
+        """
+        Expand archived months back into student_attendance rows
+
+        Args:
+            from_month: First month to restore ('YYYY-MM')
+            through_month: Last month to restore ('YYYY-MM')
+            restored_by: User ID recorded as marked_by on the restored rows
+
+        Returns:
+            Tuple of (success: bool, message: str, restored record count)
+        """
+        if not self.ensure_table():
+            return False, "Could not create attendance_archive table", 0
+
+        rows = db.execute_query(
+            "SELECT * FROM attendance_archive WHERE month BETWEEN ? AND ?", (from_month, through_month)
+        )
+        if rows is None:
+            return False, "Could not read the attendance archive", 0
+
+        records = []
+        for row in rows:
+            for record in self._expand(row):
+                records.append((record['student_id'], record['course_id'], record['attendance_date'],
+                                record['status'], restored_by, record['remarks']))
+
+        try:
+            with db.transaction():
+                if records:
+                    db.execute_many("""
+                        INSERT INTO student_attendance
+                        (student_id, course_id, attendance_date, status, marked_by, remarks)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, records)
+                db.execute_update(
+                    "DELETE FROM attendance_archive WHERE month BETWEEN ? AND ?", (from_month, through_month)
+                )
+        except Exception as e:
+            return False, f"Error restoring attendance: {str(e)}", 0
+
+        return True, f"Restored {len(records)} attendance records", len(records)
+
+    def is_archived(self, attendance_date) -> bool:
+        """True if the month of a date has been archived (closed for marking)"""
+        if not self.ensure_table():
+            return False
+        result = db.execute_query(
+            "SELECT 1 AS found FROM attendance_archive WHERE month = ? LIMIT 1", (str(attendance_date)[:7],)
+        )
+        return bool(result)
+
+    def get_records(self, student_id: int, start_date=None, end_date=None,
+                    course_id: int = None) -> List[Dict]:
+        """
+        Archived attendance of a student as per-day records
+
+        Returns:
+            List of dicts shaped like student_attendance rows (attendance_id,
+            marked_by and created_at are None) with course_name and course_code
+        """
+        if not self.ensure_table():
+            return []
+
+        query = """
+            SELECT aa.*, c.course_name, c.course_code
+            FROM attendance_archive aa
+            LEFT JOIN courses c ON aa.course_id = c.course_id
+            WHERE aa.student_id = ?
+        """
+        params = [student_id]
+        if start_date:
+            query += " AND aa.month >= ?"
+            params.append(str(start_date)[:7])
+        if end_date:
+            query += " AND aa.month <= ?"
+            params.append(str(end_date)[:7])
+        if course_id:
+            query += " AND aa.course_id = ?"
+            params.append(course_id)
+
+        records = []
+        for row in db.execute_query(query, tuple(params)) or []:
+            for record in self._expand(row):
+                if start_date and record['attendance_date'] < str(start_date)[:10]:
+                    continue
+                if end_date and record['attendance_date'] > str(end_date)[:10]:
+                    continue
+                record.update(course_name=row['course_name'], course_code=row['course_code'],
+                              marked_by_name=None)
+                records.append(record)
+        return records
+
+    def counts_sql(self, start: Optional[date], end: Optional[date], student_id: Optional[int] = None,
+                   course_id: Optional[int] = None) -> Optional[Tuple[str, list]]:
+        """
+        Archived attendance counts for an inclusive date range
+
+        Whole months use the stored counts; partial months count status codes
+        in the matching slice of the day string.
+
+        Returns:
+            Tuple of (sql, params) with the attendance_rollup count columns, or
+            None if there is no archive table
+        """
+        if not self.ensure_table():
+            return None
+
+        filters = []
+        filter_params = []
+        if student_id is not None:
+            filters.append("student_id = ?")
+            filter_params.append(student_id)
+        if course_id is not None:
+            filters.append("course_id = ?")
+            filter_params.append(course_id)
+
+        selects = []
+        params = []
+
+        # Partial months at either end of the range
+        same_month = start is not None and end is not None and (start.year, start.month) == (end.year, end.month)
+        end_is_month_end = end is not None and end.day == calendar.monthrange(end.year, end.month)[1]
+        if start is not None and start.day != 1:
+            last_day = end.day if same_month else calendar.monthrange(start.year, start.month)[1]
+            selects.append(self._slice_counts(start, last_day))
+            params += [start.strftime('%Y-%m')] + filter_params
+        if end is not None and not end_is_month_end and not (same_month and start.day != 1):
+            first_day = start.day if same_month else 1
+            selects.append(self._slice_counts(end.replace(day=first_day), end.day))
+            params += [end.strftime('%Y-%m')] + filter_params
+
+        # Whole months in between
+        first_full = None
+        if start is not None:
+            first_full = start if start.day == 1 else (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        after_full = None
+        if end is not None:
+            after_full = (end + timedelta(days=1)).replace(day=1)
+        if first_full is None or after_full is None or first_full < after_full:
+            conditions = []
+            if first_full is not None:
+                conditions.append("month >= ?")
+                params.append(first_full.strftime('%Y-%m'))
+            if after_full is not None:
+                conditions.append("month < ?")
+                params.append(after_full.strftime('%Y-%m'))
+            conditions += filters
+            params += filter_params
+            sql = f"SELECT student_id, course_id, {', '.join(COUNT_COLUMNS)} FROM attendance_archive"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            selects.append(sql)
+
+        where = (" AND " + " AND ".join(filters)) if filters else ""
+        selects = [sql.replace("{filters}", where) for sql in selects]
+        return " UNION ALL ".join(selects), params
+
+    def _slice_counts(self, first_day: date, last_day: int) -> str:
+        """Count status codes between two days of one month ({filters} is filled in by the caller)"""
+        start = first_day.day
+        piece = f"SUBSTR(days, {start}, {last_day - start + 1})"
+        counts = [f"LENGTH({piece}) - LENGTH(REPLACE({piece}, '{code}', '')) AS {column}"
+                  for code, column in CODE_COLUMNS.items()]
+        total = f"LENGTH(REPLACE({piece}, '{NO_CLASS}', '')) AS total_count"
+        sql = (f"SELECT student_id, course_id, {', '.join(counts)}, {total} "
+               f"FROM attendance_archive WHERE month = ?{{filters}}")
+        return sql
+
+    def _archive_month(self, month: str) -> Tuple[int, int, int]:
+        """Pack one month and delete its live rows; returns (archived, archive rows, kept)"""
+        # Streamed: only the packed month is held in memory, not every raw row
+        rows = db.iter_query("""
+            SELECT attendance_id, student_id, COALESCE(course_id, 0) AS course_id,
+                   attendance_date, status, remarks
+            FROM student_attendance
+            WHERE attendance_date >= ? AND attendance_date < ?
+            ORDER BY attendance_id
+        """, (f"{month}-01", self._next_month(month).isoformat()))
+
+        packed: Dict[Tuple[int, int], Dict] = {}
+        archived_ids = []
+        kept = 0
+        for row in rows:
+            key = (row['student_id'], row['course_id'])
+            entry = packed.setdefault(key, {'days': [NO_CLASS] * 31, 'remarks': {}})
+            day = int(str(row['attendance_date'])[8:10])
+            if entry['days'][day - 1] != NO_CLASS or row['status'] not in STATUS_CODES:
+                kept += 1
+                continue
+            entry['days'][day - 1] = STATUS_CODES[row['status']]
+            if row['remarks']:
+                entry['remarks'][str(day)] = row['remarks']
+            archived_ids.append(row['attendance_id'])
+
+        with db.transaction():
+            existing = self._load_month(month, [key[0] for key in packed])
+            archive_rows = []
+            for (student_id, course_id), entry in packed.items():
+                days = entry['days']
+                remarks = entry['remarks']
+                previous = existing.get((student_id, course_id))
+                if previous:
+                    # Merge into days archived earlier
+                    days = [old if new == NO_CLASS else new for old, new in zip(previous['days'], days)]
+                    remarks = dict(json.loads(previous['remarks'] or '{}'), **remarks)
+                archive_rows.append(self._archive_row(student_id, course_id, month, ''.join(days), remarks))
+
+            if archive_rows:
+                query = db.build_upsert(
+                    'attendance_archive',
+                    ['student_id', 'course_id', 'month', 'days'] + COUNT_COLUMNS + ['remarks'],
+                    key_columns=['student_id', 'course_id', 'month']
+                )
+                db.execute_many(query, archive_rows)
+            for chunk, placeholders in in_chunks(archived_ids):
+                db.execute_update(f"DELETE FROM student_attendance WHERE attendance_id IN ({placeholders})", chunk)
+
+        return len(archived_ids), len(archive_rows), kept
+
+    def _next_month(self, month: str) -> date:
+        """First day of the month after a 'YYYY-MM' month"""
+        first = date.fromisoformat(f"{month}-01")
+        return (first + timedelta(days=32)).replace(day=1)
+
+    def _load_month(self, month: str, student_ids: List[int]) -> Dict[Tuple[int, int], Dict]:
+        """Archive rows already stored for a month, keyed by (student_id, course_id)"""
+        existing = {}
+        for chunk, placeholders in in_chunks(sorted(set(student_ids))):
+            for row in db.execute_query(f"""
+                SELECT student_id, course_id, days, remarks FROM attendance_archive
+                WHERE month = ? AND student_id IN ({placeholders})
+            """, (month,) + chunk) or []:
+                existing[(row['student_id'], row['course_id'])] = row
+        return existing
+
+    def _archive_row(self, student_id: int, course_id: int, month: str, days: str, remarks: Dict) -> tuple:
+        """Build an archive row with its per-status counts"""
+        counts = [days.count(code) for code in CODE_COLUMNS]
+        return ((student_id, course_id, month, days) + tuple(counts) + (sum(counts),)
+                + (json.dumps(remarks) if remarks else None,))
+
+    def _expand(self, row: Dict) -> List[Dict]:
+        """Turn one archive row back into per-day records"""
+        remarks = json.loads(row['remarks'] or '{}')
+        records = []
+        for day, code in enumerate(row['days'], start=1):
+            if code == NO_CLASS:
+                continue
+            records.append({
+                'attendance_id': None,
+                'student_id': row['student_id'],
+                'course_id': row['course_id'] or None,
+                'attendance_date': f"{row['month']}-{day:02d}",
+                'status': CODE_STATUSES[code],
+                'marked_by': None,
+                'remarks': remarks.get(str(day)),
+                'created_at': None
+            })
+        return records
+
+
+# Global attendance archive controller instance
+attendance_archive_controller = AttendanceArchiveController()
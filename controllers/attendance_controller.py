@@ -2,10 +2,15 @@
 Attendance Controller
 Manages student and teacher attendance tracking
 """
-from database.db_manager import db
+from database.db_manager import db, in_chunks
+from controllers.attendance_rollup_controller import attendance_rollup_controller
+from controllers.attendance_archive_controller import attendance_archive_controller
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Tuple
 
+ATTENDANCE_STATUSES = ('Present', 'Absent', 'Leave', 'Late')
+
+
 class AttendanceController:
     """Controller for attendance management"""
     
@@ -14,32 +19,42 @@ class AttendanceController:
                                remarks: str = None) -> Tuple[bool, str]:
         """Mark attendance for a student"""
         try:
-            # Check if attendance already marked
-            check_query = """
-                SELECT attendance_id FROM student_attendance
-                WHERE student_id = ? AND course_id = ? AND attendance_date = ?
-            """
-            existing = db.execute_query(check_query, (student_id, course_id, attendance_date))
+            if attendance_archive_controller.is_archived(attendance_date):
+                return False, "Attendance for this month has been archived"
             
-            if existing:
-                # Update existing
-                query = """
-                    UPDATE student_attendance
-                    SET status = ?, marked_by = ?, remarks = ?
+            attendance_rollup_controller.ensure_table()
+            with db.transaction():
+                # Check if attendance already marked
+                check_query = """
+                    SELECT status FROM student_attendance
                     WHERE student_id = ? AND course_id = ? AND attendance_date = ?
                 """
-                success, _ = db.execute_update(
-                    query, (status, marked_by, remarks, student_id, course_id, attendance_date)
-                )
-            else:
-                # Insert new
-                query = """
-                    INSERT INTO student_attendance 
-                    (student_id, course_id, attendance_date, status, marked_by, remarks)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """
-                success, _ = db.execute_update(
-                    query, (student_id, course_id, attendance_date, status, marked_by, remarks)
+                existing = db.execute_query(check_query, (student_id, course_id, attendance_date))
+                
+                if existing:
+                    # Update existing
+                    query = """
+                        UPDATE student_attendance
+                        SET status = ?, marked_by = ?, remarks = ?
+                        WHERE student_id = ? AND course_id = ? AND attendance_date = ?
+                    """
+                    success, _ = db.execute_update(
+                        query, (status, marked_by, remarks, student_id, course_id, attendance_date)
+                    )
+                else:
+                    # Insert new
+                    query = """
+                        INSERT INTO student_attendance 
+                        (student_id, course_id, attendance_date, status, marked_by, remarks)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """
+                    success, _ = db.execute_update(
+                        query, (student_id, course_id, attendance_date, status, marked_by, remarks)
+                    )
+                
+                old_status = existing[0]['status'] if existing else None
+                attendance_rollup_controller.record_changes(
+                    [(student_id, course_id, attendance_date, old_status, status)]
                 )
             
             if success:
@@ -52,18 +67,106 @@ class AttendanceController:
     def mark_bulk_attendance(self, student_ids: List[int], course_id: Optional[int],
                             attendance_date: date, status: str, marked_by: int) -> Tuple[bool, str]:
         """Mark attendance for multiple students at once"""
-        try:
-            success_count = 0
-            for student_id in student_ids:
-                success, _ = self.mark_student_attendance(
-                    student_id, course_id, attendance_date, status, marked_by
-                )
-                if success:
-                    success_count += 1
-            
-            return True, f"Marked attendance for {success_count}/{len(student_ids)} students"
-        except Exception as e:
-            return False, f"Error: {str(e)}"
+        success, message, _ = self.mark_attendance_batch(
+            course_id, attendance_date,
+            [{'student_id': student_id, 'status': status} for student_id in student_ids],
+            marked_by
+        )
+        return success, message
+    
+    def mark_attendance_batch(self, course_id: Optional[int], attendance_date: date,
+                              entries: List[Dict], marked_by: int) -> Tuple[bool, str, List[Dict]]:
+        """
+        Mark a whole class in one transaction
+        
+        Rows are upserted on the (student_id, course_id, attendance_date) unique key
+        with a single executemany; later entries for the same student win. The
+        attendance rollup is updated in the same transaction.
+        
+        Args:
+            course_id: Course ID
+            attendance_date: Date of the class
+            entries: List of dicts with student_id, status and optional remarks
+            marked_by: User ID marking the attendance
+        
+        Returns:
+            Tuple of (success: bool, message: str, outcomes: list of dicts with
+            student_id, outcome ('inserted', 'updated' or 'error') and message)
+        """
+        outcomes = {}
+        rows = {}
+        
+        if attendance_archive_controller.is_archived(attendance_date):
+            ordered = [{'student_id': student_id, 'outcome': 'error',
+                        'message': "Attendance for this month has been archived"}
+                       for student_id in dict.fromkeys(e['student_id'] for e in entries)]
+            return False, "Attendance for this month has been archived", ordered
+        
+        # Validate statuses and students in memory against one lookup
+        student_ids = sorted({entry['student_id'] for entry in entries})
+        known = set()
+        for chunk, placeholders in in_chunks(student_ids):
+            result = db.execute_query(
+                f"SELECT student_id FROM students WHERE student_id IN ({placeholders})", chunk
+            ) or []
+            known.update(row['student_id'] for row in result)
+        
+        for entry in entries:
+            student_id = entry['student_id']
+            status = entry.get('status')
+            rows.pop(student_id, None)
+            if status not in ATTENDANCE_STATUSES:
+                outcomes[student_id] = {'student_id': student_id, 'outcome': 'error',
+                                        'message': f"Invalid status: {status}"}
+                continue
+            if student_id not in known:
+                outcomes[student_id] = {'student_id': student_id, 'outcome': 'error',
+                                        'message': "Student not found"}
+                continue
+            rows[student_id] = (student_id, course_id, attendance_date, status, marked_by, entry.get('remarks'))
+        
+        if rows:
+            query = db.build_upsert(
+                'student_attendance',
+                ['student_id', 'course_id', 'attendance_date', 'status', 'marked_by', 'remarks'],
+                ['student_id', 'course_id', 'attendance_date']
+            )
+            try:
+                attendance_rollup_controller.ensure_table()
+                with db.transaction():
+                    existing = self._existing_attendance(course_id, attendance_date, list(rows))
+                    db.execute_many(query, list(rows.values()))
+                    attendance_rollup_controller.record_changes(
+                        (student_id, course_id, attendance_date, existing.get(student_id), row[3])
+                        for student_id, row in rows.items()
+                    )
+                
+                for student_id in rows:
+                    outcome = 'updated' if student_id in existing else 'inserted'
+                    outcomes[student_id] = {'student_id': student_id, 'outcome': outcome,
+                                            'message': "Attendance marked successfully"}
+            except Exception as e:
+                for student_id in rows:
+                    outcomes[student_id] = {'student_id': student_id, 'outcome': 'error',
+                                            'message': f"Error: {str(e)}"}
+        
+        # Report in the order the students were given
+        ordered = [outcomes[student_id] for student_id in dict.fromkeys(e['student_id'] for e in entries)]
+        success_count = sum(1 for outcome in ordered if outcome['outcome'] != 'error')
+        message = f"Marked attendance for {success_count}/{len(ordered)} students"
+        return success_count > 0 or not ordered, message, ordered
+    
+    def _existing_attendance(self, course_id: Optional[int], attendance_date: date,
+                             student_ids: List[int]) -> Dict[int, str]:
+        """Current status of the students that already have a row for this course and date"""
+        existing = {}
+        for chunk, placeholders in in_chunks(student_ids):
+            result = db.execute_query(f"""
+                SELECT student_id, status FROM student_attendance
+                WHERE course_id = ? AND attendance_date = ? AND student_id IN ({placeholders})
+            """, (course_id, attendance_date) + chunk) or []
+            existing.update((row['student_id'], row['status']) for row in result)
+        return existing
     
     def get_student_attendance(self, student_id: int, start_date: date = None,
                               end_date: date = None, course_id: int = None) -> List[Dict]:
@@ -90,7 +193,12 @@ class AttendanceController:
             
             query += " ORDER BY sa.attendance_date DESC"
             
-            return db.execute_query(query, tuple(params))
+            records = db.execute_query(query, tuple(params))
+            archived = attendance_archive_controller.get_records(student_id, start_date, end_date, course_id)
+            if archived and records is not None:
+                records = records + archived
+                records.sort(key=lambda record: str(record['attendance_date']), reverse=True)
+            return records
         except Exception as e:
             print(f"Error getting student attendance: {e}")
             return []
@@ -99,27 +207,18 @@ class AttendanceController:
                                        start_date: date = None, end_date: date = None) -> float:
         """Calculate attendance percentage for a student"""
         try:
-            query = """
+            source, params = attendance_rollup_controller.counts_source(
+                start_date, end_date, student_id=student_id, course_id=course_id or None
+            )
+            query = f"""
                 SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present
-                FROM student_attendance
-                WHERE student_id = ?
+                    SUM(a.total_count) as total,
+                    SUM(a.present_count + a.late_count) as present
+                FROM ({source}) a
             """
-            params = [student_id]
-            
-            if course_id:
-                query += " AND course_id = ?"
-                params.append(course_id)
-            if start_date:
-                query += " AND attendance_date >= ?"
-                params.append(start_date)
-            if end_date:
-                query += " AND attendance_date <= ?"
-                params.append(end_date)
             
             result = db.execute_query(query, tuple(params))
-            if result and result[0]['total'] > 0:
+            if result and (result[0]['total'] or 0) > 0:
                 return (result[0]['present'] / result[0]['total']) * 100
             return 0.0
         except Exception as e:
@@ -131,20 +230,20 @@ class AttendanceController:
                                    semester: int = None) -> List[Dict]:
         """Get students with attendance below threshold"""
         try:
-            query = """
+            source, params = attendance_rollup_controller.counts_source()
+            query = f"""
                 SELECT 
                     s.student_id, s.roll_number, s.name,
                     d.department_name, s.semester,
-                    COUNT(sa.attendance_id) as total_days,
-                    SUM(CASE WHEN sa.status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present_days,
-                    ROUND(CAST(SUM(CASE WHEN sa.status IN ('Present', 'Late') THEN 1 ELSE 0 END) AS FLOAT) / 
-                          COUNT(sa.attendance_id) * 100, 2) as attendance_percentage
+                    SUM(sa.total_count) as total_days,
+                    SUM(sa.present_count + sa.late_count) as present_days,
+                    ROUND(CAST(SUM(sa.present_count + sa.late_count) AS FLOAT) / 
+                          SUM(sa.total_count) * 100, 2) as attendance_percentage
                 FROM students s
-                LEFT JOIN student_attendance sa ON s.student_id = sa.student_id
+                JOIN ({source}) sa ON s.student_id = sa.student_id
                 LEFT JOIN departments d ON s.department_id = d.department_id
                 WHERE s.is_active = 1
             """
-            params = []
             
             if department_id:
                 query += " AND s.department_id = ?"
@@ -174,24 +273,23 @@ class AttendanceController:
             if not end_date:
                 end_date = date.today()
             
-            query = """
+            source, params = attendance_rollup_controller.counts_source(start_date, end_date)
+            query = f"""
                 SELECT 
                     s.student_id, s.roll_number, s.name,
                     d.department_name, s.semester,
-                    COUNT(sa.attendance_id) as total_days,
-                    SUM(CASE WHEN sa.status = 'Present' THEN 1 ELSE 0 END) as present,
-                    SUM(CASE WHEN sa.status = 'Absent' THEN 1 ELSE 0 END) as absent,
-                    SUM(CASE WHEN sa.status = 'Leave' THEN 1 ELSE 0 END) as leave,
-                    SUM(CASE WHEN sa.status = 'Late' THEN 1 ELSE 0 END) as late,
-                    ROUND(CAST(SUM(CASE WHEN sa.status IN ('Present', 'Late') THEN 1 ELSE 0 END) AS FLOAT) / 
-                          COUNT(sa.attendance_id) * 100, 2) as percentage
+                    SUM(sa.total_count) as total_days,
+                    SUM(sa.present_count) as present,
+                    SUM(sa.absent_count) as absent,
+                    SUM(sa.leave_count) as leave,
+                    SUM(sa.late_count) as late,
+                    ROUND(CAST(SUM(sa.present_count + sa.late_count) AS FLOAT) / 
+                          SUM(sa.total_count) * 100, 2) as percentage
                 FROM students s
-                LEFT JOIN student_attendance sa ON s.student_id = sa.student_id
+                JOIN ({source}) sa ON s.student_id = sa.student_id
                 LEFT JOIN departments d ON s.department_id = d.department_id
                 WHERE s.is_active = 1
-                    AND sa.attendance_date BETWEEN ? AND ?
             """
-            params = [start_date, end_date]
             
             if department_id:
                 query += " AND s.department_id = ?"
@@ -200,7 +298,7 @@ class AttendanceController:
                 query += " AND s.semester = ?"
                 params.append(semester)
             
-            query += " GROUP BY s.student_id ORDER BY s.roll_number"
+            query += " GROUP BY s.student_id HAVING total_days > 0 ORDER BY s.roll_number"
             
             return db.execute_query(query, tuple(params))
         except Exception as e:
@@ -277,18 +375,18 @@ class AttendanceController:
     def get_attendance_statistics(self, department_id: int = None, semester: int = None) -> Dict:
         """Get overall attendance statistics"""
         try:
-            query = """
+            source, params = attendance_rollup_controller.counts_source()
+            query = f"""
                 SELECT 
-                    COUNT(sa.attendance_id) as total_records,
-                    SUM(CASE WHEN sa.status = 'Present' THEN 1 ELSE 0 END) as present_count,
-                    SUM(CASE WHEN sa.status = 'Absent' THEN 1 ELSE 0 END) as absent_count,
-                    SUM(CASE WHEN sa.status = 'Leave' THEN 1 ELSE 0 END) as leave_count,
-                    SUM(CASE WHEN sa.status = 'Late' THEN 1 ELSE 0 END) as late_count
-                FROM student_attendance sa
+                    SUM(sa.total_count) as total_records,
+                    SUM(sa.present_count) as present_count,
+                    SUM(sa.absent_count) as absent_count,
+                    SUM(sa.leave_count) as leave_count,
+                    SUM(sa.late_count) as late_count
+                FROM ({source}) sa
                 LEFT JOIN students s ON sa.student_id = s.student_id
                 WHERE 1=1
             """
-            params = []
             
             if department_id:
                 query += " AND s.department_id = ?"
@@ -299,7 +397,7 @@ class AttendanceController:
             
             result = db.execute_query(query, tuple(params))
             
-            if result and result[0]['total_records'] > 0:
+            if result and (result[0]['total_records'] or 0) > 0:
                 stats = result[0]
                 present_plus_late = stats['present_count'] + stats['late_count']
                 stats['average_percentage'] = (present_plus_late / stats['total_records']) * 100
@@ -0,0 +1,348 @@
+"""
+Attendance Rollup Controller - Materialized per-student, per-course, per-month attendance counts
+Kept in step with student_attendance by the attendance write paths so reports
+and percentages sum a handful of monthly rows instead of every daily record.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from database.db_manager import db, in_chunks
+from controllers.attendance_archive_controller import attendance_archive_controller
+import config
+
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS attendance_rollup (
+        student_id INTEGER NOT NULL,
+        course_id INTEGER NOT NULL DEFAULT 0,
+        month CHAR(7) NOT NULL,
+        present_count INTEGER NOT NULL DEFAULT 0,
+        absent_count INTEGER NOT NULL DEFAULT 0,
+        leave_count INTEGER NOT NULL DEFAULT 0,
+        late_count INTEGER NOT NULL DEFAULT 0,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (student_id, course_id, month),
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_attendance_rollup_course ON attendance_rollup(course_id, month)
+"""
+
+MYSQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS attendance_rollup (
+        student_id INT NOT NULL,
+        course_id INT NOT NULL DEFAULT 0,
+        month CHAR(7) NOT NULL,
+        present_count INT NOT NULL DEFAULT 0,
+        absent_count INT NOT NULL DEFAULT 0,
+        leave_count INT NOT NULL DEFAULT 0,
+        late_count INT NOT NULL DEFAULT 0,
+        total_count INT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (student_id, course_id, month),
+        INDEX idx_attendance_rollup_course (course_id, month),
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# Count column for each attendance status
+STATUS_COLUMNS = {
+    'Present': 'present_count',
+    'Absent': 'absent_count',
+    'Leave': 'leave_count',
+    'Late': 'late_count',
+}
+COUNT_COLUMNS = ['present_count', 'absent_count', 'leave_count', 'late_count', 'total_count']
+
+
+class AttendanceRollupController:
+    """Maintains and reads the attendance_rollup table"""
+
+    def __init__(self):
+        self._checked = False
+
+    def ensure_table(self) -> bool:
+        """
+        Create the rollup table if needed and backfill it on first use
+        (call outside of db.transaction())
+        """
+        if not db.ensure_schema('attendance_rollup', SQLITE_SCHEMA, MYSQL_SCHEMA):
+            return False
+
+        if not self._checked:
+            self._checked = True
+            rolled = db.execute_query("SELECT COALESCE(SUM(total_count), 0) as total FROM attendance_rollup")
+            raw = db.execute_query("SELECT COUNT(*) as total FROM student_attendance")
+            archived = [{'total': 0}]
+            if attendance_archive_controller.ensure_table():
+                archived = db.execute_query(
+                    "SELECT COALESCE(SUM(total_count), 0) as total FROM attendance_archive"
+                )
+            if rolled and raw and archived and \
+                    int(rolled[0]['total']) != int(raw[0]['total']) + int(archived[0]['total']):
+                self.rebuild_rollup()
+        return True
+
+    def month_key(self, attendance_date) -> str:
+        """'YYYY-MM' bucket of a date, datetime or ISO date string"""
+        return str(attendance_date)[:7]
+
+    def record_changes(self, changes: Iterable[Tuple[int, Optional[int], object, Optional[str], Optional[str]]]):
+        """
+        Apply attendance writes to the rollup
+
+        Deltas are summed per (student, course, month) and added to the stored
+        counts with one executemany upsert. Joins the caller's transaction when
+        called inside db.transaction(); call ensure_table() before opening it,
+        otherwise the changes are skipped (the first-use backfill picks them up).
+
+        Args:
+            changes: (student_id, course_id, attendance_date, old_status, new_status)
+                tuples; old_status is None for a new row, new_status None for a delete
+        """
+        deltas: Dict[Tuple[int, int, str], List[int]] = {}
+        for student_id, course_id, attendance_date, old_status, new_status in changes:
+            if old_status == new_status:
+                continue
+            key = (student_id, course_id or 0, self.month_key(attendance_date))
+            delta = deltas.setdefault(key, [0] * len(COUNT_COLUMNS))
+            if old_status is not None:
+                delta[COUNT_COLUMNS.index(STATUS_COLUMNS[old_status])] -= 1
+                delta[-1] -= 1
+            if new_status is not None:
+                delta[COUNT_COLUMNS.index(STATUS_COLUMNS[new_status])] += 1
+                delta[-1] += 1
+
+        rows = [key + tuple(delta) for key, delta in deltas.items() if any(delta)]
+        if not rows or not self._checked:
+            return
+
+        if config.USE_MYSQL:
+            increments = [f"{col} = {col} + VALUES({col})" for col in COUNT_COLUMNS]
+        else:
+            increments = [f"{col} = {col} + excluded.{col}" for col in COUNT_COLUMNS]
+        query = db.build_upsert(
+            'attendance_rollup',
+            ['student_id', 'course_id', 'month'] + COUNT_COLUMNS,
+            key_columns=['student_id', 'course_id', 'month'],
+            update_columns=[],
+            extra_updates=increments + ['updated_at = CURRENT_TIMESTAMP']
+        )
+        db.execute_many(query, rows)
+
+    def counts_source(self, start_date=None, end_date=None, student_id: Optional[int] = None,
+                      course_id: Optional[int] = None) -> Tuple[str, list]:
+        """
+        Derived table of attendance counts for a date range
+
+        Whole months inside the range come from the rollup; the partial months at
+        either end are aggregated from student_attendance and the attendance
+        archive. Without the rollup table everything is aggregated from those two.
+
+        Returns:
+            Tuple of (sql, params) for use as "JOIN (sql) alias"; rows carry student_id,
+            course_id (0 when none), present_count, absent_count, leave_count,
+            late_count and total_count (several rows per student/course possible)
+        """
+        start = self._as_date(start_date)
+        end = self._as_date(end_date)
+
+        if not self.ensure_table():
+            return self._raw_counts([(start, end)], student_id, course_id)
+
+        # First day of the first whole month, and of the month after the last whole month
+        first_full = None
+        if start is not None:
+            first_full = start if start.day == 1 else (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        after_full = None
+        if end is not None:
+            after_full = (end + timedelta(days=1)).replace(day=1)
+
+        if first_full is not None and after_full is not None and first_full >= after_full:
+            return self._raw_counts([(start, end)], student_id, course_id)
+
+        conditions = []
+        params = []
+        if first_full is not None:
+            conditions.append("month >= ?")
+            params.append(first_full.strftime('%Y-%m'))
+        if after_full is not None:
+            conditions.append("month < ?")
+            params.append(after_full.strftime('%Y-%m'))
+        if student_id is not None:
+            conditions.append("student_id = ?")
+            params.append(student_id)
+        if course_id is not None:
+            conditions.append("course_id = ?")
+            params.append(course_id)
+
+        sql = f"SELECT student_id, course_id, {', '.join(COUNT_COLUMNS)} FROM attendance_rollup"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        edges = []
+        if start is not None and start < first_full:
+            edges.append((start, first_full - timedelta(days=1)))
+        if end is not None and after_full <= end:
+            edges.append((after_full, end))
+        if edges:
+            raw_sql, raw_params = self._raw_counts(edges, student_id, course_id)
+            sql = f"{sql} UNION ALL {raw_sql}"
+            params += raw_params
+        return sql, params
+
+    def rebuild_students(self, student_ids: List[int]):
+        """Recompute rollup rows for specific students straight from student_attendance"""
+        if not student_ids or not self.ensure_table():
+            return
+
+        student_ids = sorted(set(student_ids))
+        with db.transaction():
+            for chunk, placeholders in in_chunks(student_ids):
+                expected = self._compute_from_attendance(f"student_id IN ({placeholders})", chunk)
+
+                db.execute_update(f"DELETE FROM attendance_rollup WHERE student_id IN ({placeholders})", chunk)
+                self._write_rows(list(expected.values()))
+
+    def rebuild_rollup(self, verify_only: bool = False) -> Dict:
+        """
+        Recompute the whole rollup from student_attendance and the archive and report drift
+
+        Args:
+            verify_only: Only compare and report, do not rewrite the rollup
+
+        Returns:
+            Summary dict with records, rows, drift_count and drift (list of differences)
+        """
+        if not db.ensure_schema('attendance_rollup', SQLITE_SCHEMA, MYSQL_SCHEMA):
+            return {'success': False, 'message': "Could not create attendance_rollup table"}
+
+        expected = self._compute_from_attendance("1=1", ())
+        actual = {
+            (row['student_id'], row['course_id'], row['month']): tuple(int(row[col]) for col in COUNT_COLUMNS)
+            for row in db.execute_query(f"""
+                SELECT student_id, course_id, month, {', '.join(COUNT_COLUMNS)} FROM attendance_rollup
+            """) or []
+        }
+
+        drift = []
+        for key in sorted(set(expected) | set(actual)):
+            want = expected[key][3:] if key in expected else None
+            have = actual.get(key)
+
+            if want is None:
+                if any(have):
+                    drift.append({'student_id': key[0], 'course_id': key[1], 'month': key[2],
+                                  'issue': 'stale row'})
+            elif have is None:
+                drift.append({'student_id': key[0], 'course_id': key[1], 'month': key[2],
+                              'issue': 'missing row'})
+            elif want != have:
+                drift.append({'student_id': key[0], 'course_id': key[1], 'month': key[2],
+                              'issue': 'mismatch', 'expected_total': want[-1], 'rollup_total': have[-1]})
+
+        if not verify_only:
+            with db.transaction():
+                db.execute_update("DELETE FROM attendance_rollup")
+                self._write_rows(list(expected.values()))
+
+        return {
+            'success': True,
+            'records': sum(row[-1] for row in expected.values()),
+            'rows': len(expected),
+            'drift_count': len(drift),
+            'drift': drift,
+            'rebuilt': not verify_only
+        }
+
+    def _as_date(self, value) -> Optional[date]:
+        """Normalize a date, datetime or ISO string"""
+        if value is None or value == '':
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value)[:10])
+
+    def _status_sums(self) -> str:
+        """SUM(CASE ...) columns counting each status of student_attendance"""
+        sums = [f"SUM(CASE WHEN status = '{status}' THEN 1 ELSE 0 END) AS {column}"
+                for status, column in STATUS_COLUMNS.items()]
+        return ", ".join(sums + ["COUNT(*) AS total_count"])
+
+    def _raw_counts(self, ranges: List[Tuple[Optional[date], Optional[date]]],
+                    student_id: Optional[int], course_id: Optional[int]) -> Tuple[str, list]:
+        """Aggregate student_attendance and the archive over inclusive date ranges"""
+        range_sql = []
+        params = []
+        for low, high in ranges:
+            bounds = []
+            if low is not None:
+                bounds.append("attendance_date >= ?")
+                params.append(low.isoformat())
+            if high is not None:
+                bounds.append("attendance_date <= ?")
+                params.append(high.isoformat())
+            range_sql.append("(" + " AND ".join(bounds or ["1=1"]) + ")")
+
+        conditions = ["(" + " OR ".join(range_sql) + ")"]
+        if student_id is not None:
+            conditions.append("student_id = ?")
+            params.append(student_id)
+        if course_id is not None:
+            conditions.append("course_id = ?")
+            params.append(course_id)
+
+        sql = f"""
+            SELECT student_id, COALESCE(course_id, 0) AS course_id, {self._status_sums()}
+            FROM student_attendance
+            WHERE {' AND '.join(conditions)}
+            GROUP BY student_id, COALESCE(course_id, 0)
+        """
+
+        # Closed months live in the compact archive
+        for low, high in ranges:
+            archived = attendance_archive_controller.counts_sql(low, high, student_id, course_id)
+            if archived:
+                sql += f" UNION ALL {archived[0]}"
+                params += archived[1]
+        return sql, params
+
+    def _compute_from_attendance(self, where: str, params: tuple) -> Dict[Tuple[int, int, str], tuple]:
+        """Aggregate student_attendance and the archive into rollup rows keyed by (student_id, course_id, month)"""
+        month = "SUBSTR(CAST(attendance_date AS CHAR), 1, 7)"
+        query = f"""
+            SELECT student_id, COALESCE(course_id, 0) AS course_id, {month} AS month, {self._status_sums()}
+            FROM student_attendance
+            WHERE {where}
+            GROUP BY student_id, COALESCE(course_id, 0), {month}
+        """
+        results = db.execute_query(query, params) or []
+        if attendance_archive_controller.ensure_table():
+            results += db.execute_query(f"""
+                SELECT student_id, course_id, month, {', '.join(COUNT_COLUMNS)}
+                FROM attendance_archive
+                WHERE {where}
+            """, params) or []
+
+        rows = {}
+        for row in results:
+            key = (row['student_id'], row['course_id'], row['month'])
+            counts = tuple(int(row[col] or 0) for col in COUNT_COLUMNS)
+            if key in rows:
+                counts = tuple(a + b for a, b in zip(rows[key][3:], counts))
+            rows[key] = key + counts
+        return rows
+
+    def _write_rows(self, rows: List[tuple]):
+        """Insert full rollup rows (after the affected ones were deleted)"""
+        if rows:
+            db.execute_many(
+                f"""INSERT INTO attendance_rollup (student_id, course_id, month, {', '.join(COUNT_COLUMNS)})
+                    VALUES ({', '.join(['?'] * (3 + len(COUNT_COLUMNS)))})""",
+                rows
+            )
+
+
+# Global attendance rollup controller instance
+attendance_rollup_controller = AttendanceRollupController()
@@ -3,10 +3,19 @@ Audit Controller
 Manages comprehensive audit logging for all system actions
 """
 from database.db_manager import db
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Tuple
 import json
 
+# sort_by values accepted by get_audit_logs_page, mapped to SQL
+AUDIT_SORT_KEYS = {
+    'timestamp': "a.timestamp",
+    'username': "LOWER(COALESCE(a.username, ''))",
+    'action_type': "a.action_type",
+    'table_name': "COALESCE(a.table_name, '')",
+}
+AUDIT_COUNT_CAP = 10000
+
 class AuditController:
     """Controller for audit logging"""
     
@@ -90,33 +99,12 @@ class AuditController:
                       end_date: date = None, limit: int = 1000) -> List[Dict]:
         """Get audit logs with filters"""
         try:
-            query = """
-                SELECT * FROM audit_logs
-                WHERE 1=1
+            where, params = self._audit_filters(user_id, action_type, table_name, start_date, end_date)
+            query = f"""
+                SELECT * FROM audit_logs a
+                WHERE {where}
+                ORDER BY a.timestamp DESC LIMIT ?
             """
-            params = []
-            
-            if user_id:
-                query += " AND user_id = ?"
-                params.append(user_id)
-            
-            if action_type:
-                query += " AND action_type = ?"
-                params.append(action_type)
-            
-            if table_name:
-                query += " AND table_name = ?"
-                params.append(table_name)
-            
-            if start_date:
-                query += " AND date(timestamp) >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND date(timestamp) <= ?"
-                params.append(end_date)
-            
-            query += " ORDER BY timestamp DESC LIMIT ?"
             params.append(limit)
             
             return db.execute_query(query, tuple(params))
@@ -124,6 +112,109 @@ class AuditController:
             print(f"Error getting audit logs: {e}")
             return []
     
+    def get_audit_logs_page(self, user_id: int = None, action_type: str = None,
+                            table_name: str = None, start_date: date = None,
+                            end_date: date = None, sort_by: str = 'timestamp',
+                            descending: bool = True, after: Optional[tuple] = None,
+                            offset: int = 0, limit: Optional[int] = 200) -> Dict:
+        """
+        Get one page of audit logs, addressed by keyset like student_controller.get_students_page
+        
+        Args:
+            user_id, action_type, table_name, start_date, end_date: Optional filters
+            sort_by: One of AUDIT_SORT_KEYS
+            descending: Sort direction (newest first by default)
+            after: (sort_key, log_id) of the last row already shown
+            offset: Rows to skip when no cursor is given
+            limit: Page size (None returns every matching row)
+        
+        Returns:
+            Dict with rows, next_cursor (None on the last page) and has_more
+        """
+        if sort_by not in AUDIT_SORT_KEYS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+        
+        sort_expr = AUDIT_SORT_KEYS[sort_by]
+        where, params = self._audit_filters(user_id, action_type, table_name, start_date, end_date)
+        
+        if after is not None:
+            cmp = '<' if descending else '>'
+            where += f" AND ({sort_expr} {cmp} ? OR ({sort_expr} = ? AND a.log_id {cmp} ?))"
+            params.extend([after[0], after[0], after[1]])
+        
+        direction = 'DESC' if descending else 'ASC'
+        query = f"""
+            SELECT a.*, {sort_expr} as sort_key
+            FROM audit_logs a
+            WHERE {where}
+            ORDER BY sort_key {direction}, a.log_id {direction}
+        """
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit + 1, offset if after is None else 0])
+        
+        rows = [dict(row) for row in db.execute_query(query, tuple(params)) or []]
+        has_more = limit is not None and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+        
+        next_cursor = (rows[-1]['sort_key'], rows[-1]['log_id']) if has_more else None
+        for row in rows:
+            row.pop('sort_key', None)
+        
+        return {'rows': rows, 'next_cursor': next_cursor, 'has_more': has_more}
+    
+    def count_audit_logs(self, user_id: int = None, action_type: str = None,
+                         table_name: str = None, start_date: date = None,
+                         end_date: date = None, cap: int = AUDIT_COUNT_CAP) -> Tuple[int, bool]:
+        """
+        Count audit logs matching the filters, stopping at `cap` rows
+        
+        Returns:
+            Tuple of (count: int, exact: bool) - exact is False when the cap was hit
+        """
+        where, params = self._audit_filters(user_id, action_type, table_name, start_date, end_date)
+        query = f"""
+            SELECT COUNT(*) as total FROM (
+                SELECT 1 FROM audit_logs a WHERE {where} LIMIT ?
+            ) matched
+        """
+        params.append(cap + 1)
+        result = db.execute_query(query, tuple(params))
+        total = int(result[0]['total']) if result else 0
+        if total > cap:
+            return cap, False
+        return total, True
+    
+    def _audit_filters(self, user_id, action_type, table_name, start_date, end_date) -> Tuple[str, list]:
+        """WHERE clause and parameters shared by the audit log queries"""
+        where = "1=1"
+        params = []
+        
+        if user_id:
+            where += " AND a.user_id = ?"
+            params.append(user_id)
+        
+        if action_type:
+            where += " AND a.action_type = ?"
+            params.append(action_type)
+        
+        if table_name:
+            where += " AND a.table_name = ?"
+            params.append(table_name)
+        
+        # Plain range comparisons so idx_audit_timestamp can be used
+        if start_date:
+            where += " AND a.timestamp >= ?"
+            params.append(str(start_date))
+        
+        if end_date:
+            where += " AND a.timestamp < ?"
+            params.append(str(end_date + timedelta(days=1)) if isinstance(end_date, date) else end_date)
+        
+        return where, params
+    
     def get_user_activity(self, user_id: int, days: int = 30) -> List[Dict]:
         """Get recent activity for a specific user"""
         try:
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from database.db_manager import db
 from utils.security import hash_password, verify_password
+from utils.reference_cache import invalidate_tables
+from controllers.change_version_controller import change_version_controller
 import config
 
 
@@ -124,21 +126,24 @@ class AuthController:
         """Record failed login attempt"""
         query = "UPDATE users SET failed_login_attempts = ? WHERE user_id = ?"
         success, _ = db.execute_update(query, (attempts, user_id))
+        invalidate_tables('users')
     
     def _reset_failed_attempts(self, user_id: int):
         """Reset failed login attempts"""
         query = "UPDATE users SET failed_login_attempts = 0, is_locked = 0 WHERE user_id = ?"
-        success, _ = db.execute_update(query, (user_id,))
+        # Versioned so other clients drop their cached user rows and see the unlock
+        success, _ = change_version_controller.execute_update(('users',), query, (user_id,))
     
     def _lock_account(self, user_id: int):
         """Lock user account"""
         query = "UPDATE users SET is_locked = 1 WHERE user_id = ?"
-        success, _ = db.execute_update(query, (user_id,))
+        success, _ = change_version_controller.execute_update(('users',), query, (user_id,))
     
     def _update_last_login(self, user_id: int):
         """Update last login timestamp"""
         query = "UPDATE users SET last_login = ? WHERE user_id = ?"
         success, _ = db.execute_update(query, (datetime.now().isoformat(), user_id))
+        invalidate_tables('users')
     
     def get_current_user(self) -> Optional[dict]:
         """Get current authenticated user"""
@@ -0,0 +1,79 @@
+"""
+Batch Print Controller - Department/semester marksheet and transcript exports
+Data is fetched in bulk, rendering is spread across processes by utils.pdf_batch.
+"""
+from typing import Callable, Dict, Optional, Tuple
+from controllers.result_controller import result_controller
+from controllers.transcript_controller import transcript_controller
+from utils.pdf_batch import PDFBatchExporter, pdf_batch_exporter
+
+
+class BatchPrintController:
+    """Manages end-of-semester bulk PDF exports"""
+
+    def export_marksheets(self, department_id: int, semester: int, output_path: str,
+                          university_data: dict = None,
+                          progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                          cancel_event=None, max_workers: Optional[int] = None) -> Tuple[bool, str, Dict]:
+        """
+        Export a marksheet for every student of a department/semester
+
+        Args:
+            department_id: Department ID
+            semester: Semester
+            output_path: Folder, or a path ending in .zip
+            university_data: Optional university details for the header
+            progress_callback: Called as (done, total, file_name)
+            cancel_event: threading.Event to stop the export
+            max_workers: Worker processes (default: CPU count)
+
+        Returns:
+            Tuple of (success: bool, message: str, summary: dict)
+        """
+        batch = result_controller.get_marksheet_data_batch(department_id, semester)
+        if not batch:
+            return False, "No marks found for this department and semester", {}
+
+        jobs = [(f"marksheet_{data['student']['roll_number']}", data) for data in batch]
+        return self._export('marksheet', jobs, output_path, university_data,
+                            progress_callback, cancel_event, max_workers)
+
+    def export_transcripts(self, department_id: int, semester: Optional[int], output_path: str,
+                           university_data: dict = None,
+                           progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                           cancel_event=None, max_workers: Optional[int] = None) -> Tuple[bool, str, Dict]:
+        """
+        Export a transcript for every student of a department (optionally one semester)
+
+        Arguments and return value as export_marksheets.
+        """
+        batch = transcript_controller.get_transcript_data_batch(department_id, semester)
+        if not batch:
+            return False, "No students with marks found", {}
+
+        jobs = [(f"transcript_{student['roll_number']}", (student, marks)) for student, marks in batch]
+        return self._export('transcript', jobs, output_path, university_data,
+                            progress_callback, cancel_event, max_workers)
+
+    def _export(self, kind, jobs, output_path, university_data, progress_callback,
+                cancel_event, max_workers) -> Tuple[bool, str, Dict]:
+        try:
+            exporter = PDFBatchExporter(max_workers) if max_workers else pdf_batch_exporter
+            summary = exporter.export(
+                kind, jobs, output_path, university_data,
+                progress_callback=progress_callback, cancel_event=cancel_event
+            )
+        except Exception as e:
+            return False, f"Batch export failed: {str(e)}", {}
+
+        if summary['cancelled']:
+            return False, f"Export cancelled after {summary['written']} of {len(jobs)} {kind}s", summary
+
+        message = f"Exported {summary['written']} {kind}s in {summary['seconds']:.1f}s to {output_path}"
+        if summary['failed']:
+            message += f" ({len(summary['failed'])} failed)"
+        return summary['written'] > 0, message, summary
+
+
+# Global instance
+batch_print_controller = BatchPrintController()
@@ -0,0 +1,185 @@
+"""
+Change Version Controller - Per-table change counters shared by every client PC
+Write paths bump a table's version in the same transaction as the change.
+Each client polls the counters with one small query and invalidates only the
+caches and views of the tables another PC changed, instead of refetching
+everything on a timer.
+
+Usage:
+    # One statement plus its version bump, committed together
+    success, dept_id = change_version_controller.execute_update(('departments',), query, params)
+
+    # Inside an existing db.transaction()
+    change_version_controller.bump('students')
+
+    # Listen for changes (local writes and other PCs)
+    change_version_controller.subscribe(lambda tables, remote: ..., tables=('courses',))
+"""
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from database.db_manager import db
+from utils.reference_cache import invalidate_tables
+
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS change_versions (
+        table_name VARCHAR(64) PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+MYSQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS change_versions (
+        table_name VARCHAR(64) NOT NULL PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+class ChangeVersionController:
+    """Maintains and polls the change_versions table"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Optional[Dict[str, int]] = None  # Last polled versions (None before the first poll)
+        self._own: Dict[str, Set[int]] = {}  # Versions produced by this client, not yet polled
+        self._subscribers: List[Tuple[Callable, Optional[FrozenSet[str]]]] = []
+
+    def ensure_table(self) -> bool:
+        """Create the version table if needed (call at startup, outside of db.transaction())"""
+        return db.ensure_schema('change_versions', SQLITE_SCHEMA, MYSQL_SCHEMA)
+
+    # ========== WRITING ==========
+
+    def bump(self, *tables: str):
+        """
+        Increment the version of each table
+
+        Call inside the write's db.transaction() so the bump commits or rolls
+        back with the change. Caches on this client are invalidated and
+        listeners notified once the outermost transaction has committed;
+        nothing happens if it rolls back.
+        """
+        if not tables or not self.ensure_table():
+            return
+
+        upsert = db.build_upsert('change_versions', ['table_name', 'version'], ['table_name'],
+                                 update_columns=[],
+                                 extra_updates=["version = version + 1", "updated_at = CURRENT_TIMESTAMP"])
+        versions = {}
+        with db.transaction():
+            for table in tables:
+                db.execute_update(upsert, (table, 1))
+                result = db.execute_query("SELECT version FROM change_versions WHERE table_name = ?", (table,))
+                if result:
+                    versions[table] = int(result[0]['version'])
+
+            db.after_commit(lambda: self._committed(tables, versions))
+
+    def _committed(self, tables: Tuple[str, ...], versions: Dict[str, int]):
+        """Remember our own versions and tell this client about the committed write"""
+        with self._lock:
+            for table, version in versions.items():
+                self._own.setdefault(table, set()).add(version)
+        self.publish(tables, remote=False)
+
+    def execute_update(self, tables: Iterable[str], query: str, params: tuple = ()) -> Tuple[bool, int]:
+        """
+        db.execute_update plus a version bump of `tables`, committed together
+
+        Returns:
+            Tuple of (success: bool, last_row_id or rows_affected: int), like db.execute_update
+        """
+        tables = tuple(tables)
+        try:
+            with db.transaction():
+                result = db.execute_update(query, params)
+                self.bump(*tables)
+        except Exception as e:
+            if db.in_transaction():
+                # Let the caller's transaction() roll back the whole unit of work
+                raise
+            print(f"✗ Tracked update failed ({', '.join(tables)}): {e}")
+            return False, 0
+        return result
+
+    # ========== READING ==========
+
+    def get_versions(self) -> Dict[str, int]:
+        """Current version of every table that has changed at least once"""
+        if not self.ensure_table():
+            return {}
+        rows = db.execute_query("SELECT table_name, version FROM change_versions") or []
+        return {row['table_name']: int(row['version']) for row in rows}
+
+    def poll(self) -> Set[str]:
+        """
+        Compare the counters with the last poll and publish tables changed by other clients
+
+        Returns:
+            Set of table names changed elsewhere since the previous poll
+        """
+        versions = self.get_versions()
+        changed = set()
+        with self._lock:
+            if self._versions is None:
+                # First poll only records where we start from
+                self._versions = versions
+                self._own.clear()
+                return changed
+
+            for table, version in versions.items():
+                previous = self._versions.get(table, 0)
+                if version == previous:
+                    continue
+                own = {v for v in self._own.get(table, ()) if previous < v <= version}
+                if version - previous > len(own) or version < previous:
+                    changed.add(table)
+                self._own[table] = {v for v in self._own.get(table, ()) if v > version}
+            self._versions = versions
+
+        if changed:
+            self.publish(changed, remote=True)
+        return changed
+
+    # ========== NOTIFICATION ==========
+
+    def subscribe(self, callback: Callable, tables: Optional[Iterable[str]] = None):
+        """
+        Call callback(tables: frozenset, remote: bool) when tables change
+
+        remote is True for changes made by another client (seen by poll) and
+        False for writes made by this one. Callbacks run on the thread that
+        wrote or polled; Qt code should forward them through a signal.
+
+        Args:
+            callback: Listener
+            tables: Only notify for these tables (None = all)
+        """
+        with self._lock:
+            self._subscribers.append((callback, frozenset(tables) if tables else None))
+
+    def unsubscribe(self, callback: Callable):
+        """Stop notifying callback"""
+        with self._lock:
+            self._subscribers = [(cb, tables) for cb, tables in self._subscribers if cb != callback]
+
+    def publish(self, tables: Iterable[str], remote: bool = False):
+        """Invalidate reference caches for tables and notify subscribers"""
+        tables = frozenset(tables)
+        invalidate_tables(*tables)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, wanted in subscribers:
+            if wanted is None or wanted & tables:
+                try:
+                    callback(tables, remote)
+                except Exception as e:
+                    print(f"✗ Change listener failed: {e}")
+
+
+# Global instance
+change_version_controller = ChangeVersionController()
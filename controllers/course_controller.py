@@ -3,14 +3,43 @@ Course Controller - Handles course/subject CRUD operations
 """
 from typing import List, Optional, Tuple
 from database.db_manager import db
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.attendance_rollup_controller import attendance_rollup_controller
 from utils.validators import validate_course_code, validate_semester, validate_credits
+from utils.reference_cache import ReferenceCache, Uncached
+from controllers.change_version_controller import change_version_controller
 
 
 class CourseController:
     """Manages course operations"""
     
+    def __init__(self):
+        # Course rows carry department names, so department changes invalidate them too
+        self._cache = ReferenceCache('courses', tables=('courses', 'departments'))
+    
     def get_all_courses(self, include_inactive: bool = False) -> List[dict]:
         """Get all courses with department information"""
+        return self._cache.get(('all', include_inactive), lambda: self._load_all(include_inactive))
+    
+    def get_courses_by_department(self, department_id: int, semester: Optional[int] = None) -> List[dict]:
+        """Get courses by department and optionally by semester"""
+        return self._cache.get(('department', department_id, semester),
+                               lambda: self._load_by_department(department_id, semester))
+    
+    def get_course_by_id(self, course_id: int) -> Optional[dict]:
+        """Get course by ID"""
+        return self._cache.get(('id', course_id), lambda: self._load_one("c.course_id = ?", course_id))
+    
+    def get_course_by_code(self, course_code: str) -> Optional[dict]:
+        """Get course by code"""
+        code = course_code.upper()
+        return self._cache.get(('code', code), lambda: self._load_one("c.course_code = ?", code))
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss metrics of the course lookup cache"""
+        return self._cache.stats()
+    
+    def _load_all(self, include_inactive: bool) -> List[dict]:
         query = """
             SELECT c.*, d.department_name, d.department_code
             FROM courses c
@@ -20,11 +49,9 @@ class CourseController:
             query += " WHERE c.is_active = 1"
         query += " ORDER BY d.department_name, c.semester, c.course_name"
         
-        result = db.execute_query(query)
-        return [dict(row) for row in result] if result else []
+        return self._rows(db.execute_query(query))
     
-    def get_courses_by_department(self, department_id: int, semester: Optional[int] = None) -> List[dict]:
-        """Get courses by department and optionally by semester"""
+    def _load_by_department(self, department_id: int, semester: Optional[int]) -> List[dict]:
         query = """
             SELECT c.*, d.department_name, d.department_code
             FROM courses c
@@ -39,30 +66,25 @@ class CourseController:
         
         query += " ORDER BY c.semester, c.course_name"
         
-        result = db.execute_query(query, tuple(params))
-        return [dict(row) for row in result] if result else []
+        return self._rows(db.execute_query(query, tuple(params)))
     
-    def get_course_by_id(self, course_id: int) -> Optional[dict]:
-        """Get course by ID"""
-        query = """
+    def _load_one(self, condition: str, value) -> Optional[dict]:
+        query = f"""
             SELECT c.*, d.department_name, d.department_code
             FROM courses c
             LEFT JOIN departments d ON c.department_id = d.department_id
-            WHERE c.course_id = ?
+            WHERE {condition}
         """
-        result = db.execute_query(query, (course_id,))
-        return dict(result[0]) if result and len(result) > 0 else None
+        result = db.execute_query(query, (value,))
+        if result is None:
+            return Uncached(None)
+        return dict(result[0]) if result else None
     
-    def get_course_by_code(self, course_code: str) -> Optional[dict]:
-        """Get course by code"""
-        query = """
-            SELECT c.*, d.department_name, d.department_code
-            FROM courses c
-            LEFT JOIN departments d ON c.department_id = d.department_id
-            WHERE c.course_code = ?
-        """
-        result = db.execute_query(query, (course_code.upper(),))
-        return dict(result[0]) if result and len(result) > 0 else None
+    def _rows(self, result) -> List[dict]:
+        """Rows as dicts; a failed query (None) is not cached"""
+        if result is None:
+            return Uncached([])
+        return [dict(row) for row in result]
     
     def create_course(self, course_code: str, course_name: str, department_id: int,
                      semester: int, max_marks: int, pass_marks: int, credits: int) -> Tuple[bool, str, Optional[int]]:
@@ -122,8 +144,8 @@ class CourseController:
                                max_marks, pass_marks, credits)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """
-        success, course_id = db.execute_update(
-            query,
+        success, course_id = change_version_controller.execute_update(
+            ('courses',), query,
             (course_code.upper(), course_name.strip(), department_id, semester, max_marks, pass_marks, credits)
         )
         
@@ -178,13 +200,16 @@ class CourseController:
                 max_marks = ?, pass_marks = ?, credits = ?
             WHERE course_id = ?
         """
-        success, _ = db.execute_update(
-            query,
+        success, _ = change_version_controller.execute_update(
+            ('courses',), query,
             (course_code.upper(), course_name.strip(), department_id, semester, 
              max_marks, pass_marks, credits, course_id)
         )
         
         if success:
+            # Grade point totals depend on course credits and semester
+            if existing['credits'] != credits or existing['semester'] != semester:
+                gpa_ledger_controller.rebuild_for_course(course_id)
             return True, "Course updated successfully"
         else:
             return False, "Failed to update course"
@@ -199,11 +224,18 @@ class CourseController:
         if marks and marks[0]['count'] > 0:
             return False, "Cannot delete course with existing marks. Deactivate instead."
         
+        # Students whose attendance rollup moves off this course
+        attended = db.execute_query(
+            "SELECT DISTINCT student_id FROM student_attendance WHERE course_id = ?",
+            (course_id,)
+        ) or []
+        
         # Delete course
         query = "DELETE FROM courses WHERE course_id = ?"
-        success, _ = db.execute_update(query, (course_id,))
+        success, _ = change_version_controller.execute_update(('courses',), query, (course_id,))
         
         if success:
+            attendance_rollup_controller.rebuild_students([row['student_id'] for row in attended])
             return True, "Course deleted successfully"
         else:
             return False, "Failed to delete course"
@@ -211,7 +243,7 @@ class CourseController:
     def deactivate_course(self, course_id: int) -> Tuple[bool, str]:
         """Deactivate a course"""
         query = "UPDATE courses SET is_active = 0 WHERE course_id = ?"
-        success, _ = db.execute_update(query, (course_id,))
+        success, _ = change_version_controller.execute_update(('courses',), query, (course_id,))
         
         if success:
             return True, "Course deactivated successfully"
@@ -221,7 +253,7 @@ class CourseController:
     def activate_course(self, course_id: int) -> Tuple[bool, str]:
         """Activate a course"""
         query = "UPDATE courses SET is_active = 1 WHERE course_id = ?"
-        success, _ = db.execute_update(query, (course_id,))
+        success, _ = change_version_controller.execute_update(('courses',), query, (course_id,))
         
         if success:
             return True, "Course activated successfully"
@@ -0,0 +1,163 @@
+"""
+Dashboard Controller
+Aggregate counts for the dashboard tiles, computed in SQL and cached briefly
+"""
+import threading
+import time
+from datetime import date
+from typing import Dict
+from database.db_manager import db
+from controllers.change_version_controller import change_version_controller
+
+# Dashboard numbers may be this many seconds old
+STATS_TTL_SECONDS = 30
+
+# Writes to these tables (on any PC) drop the cached numbers early
+STATS_TABLES = ('students', 'courses', 'departments', 'users', 'marks')
+
+
+class DashboardController:
+    """Controller for dashboard statistics"""
+
+    def __init__(self, ttl: float = STATS_TTL_SECONDS):
+        self._ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+        change_version_controller.subscribe(lambda tables, remote: self.invalidate(), tables=STATS_TABLES)
+
+    def get_overview_statistics(self, use_cache: bool = True) -> Dict:
+        """
+        Get the admin dashboard tiles
+
+        Returns:
+            Dict with total_students, male_students, female_students, active_students,
+            total_courses, total_departments, total_users, active_users and
+            attendance_today (percentage of today's records marked Present/Late)
+        """
+        return self._cached(('overview',), self._load_overview, use_cache)
+
+    def get_department_statistics(self, department_id: int, use_cache: bool = True) -> Dict:
+        """
+        Get the teacher dashboard tiles for one department
+
+        Returns:
+            Dict with department_name, total_students and total_courses
+        """
+        return self._cached(('department', department_id),
+                            lambda: self._load_department(department_id), use_cache)
+
+    def get_student_statistics(self, student_id: int, use_cache: bool = True) -> Dict:
+        """
+        Get the student dashboard data
+
+        Returns:
+            Dict with student (profile dict or None) and total_courses (courses with marks)
+        """
+        return self._cached(('student', student_id),
+                            lambda: self._load_student(student_id), use_cache)
+
+    def invalidate(self):
+        """Drop cached statistics so the next call hits the database"""
+        with self._lock:
+            self._cache.clear()
+
+    def _cached(self, key: tuple, loader, use_cache: bool) -> Dict:
+        """Return a cached value younger than the TTL, loading it otherwise"""
+        now = time.monotonic()
+        if use_cache:
+            with self._lock:
+                entry = self._cache.get(key)
+            if entry and now - entry[0] < self._ttl:
+                return dict(entry[1])
+
+        stats = loader()
+        with self._lock:
+            self._cache[key] = (now, stats)
+        return dict(stats)
+
+    def _load_overview(self) -> Dict:
+        """Compute the admin tiles with three aggregate queries"""
+        # Active students by gender
+        gender_rows = db.execute_query("""
+            SELECT LOWER(gender) as gender, COUNT(*) as count
+            FROM students
+            WHERE is_active = 1
+            GROUP BY LOWER(gender)
+        """) or []
+        by_gender = {row['gender']: int(row['count']) for row in gender_rows}
+        total_students = sum(by_gender.values())
+
+        # Catalogue and user counts in one round-trip
+        counts = db.execute_query("""
+            SELECT
+                (SELECT COUNT(*) FROM courses WHERE is_active = 1) as total_courses,
+                (SELECT COUNT(*) FROM departments WHERE is_active = 1) as total_departments,
+                (SELECT COUNT(*) FROM users) as total_users,
+                (SELECT COUNT(*) FROM users WHERE is_active = 1) as active_users
+        """)
+        counts = counts[0] if counts else {}
+
+        # Today's attendance
+        attendance = db.execute_query("""
+            SELECT COUNT(*) as total,
+                   SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present
+            FROM student_attendance
+            WHERE attendance_date = ?
+        """, (date.today().isoformat(),))
+        attendance_today = 0.0
+        if attendance and attendance[0]['total']:
+            attendance_today = float(attendance[0]['present'] or 0) / attendance[0]['total'] * 100
+
+        return {
+            'total_students': total_students,
+            'male_students': by_gender.get('male', 0),
+            'female_students': by_gender.get('female', 0),
+            'active_students': total_students,
+            'total_courses': int(counts.get('total_courses') or 0),
+            'total_departments': int(counts.get('total_departments') or 0),
+            'total_users': int(counts.get('total_users') or 0),
+            'active_users': int(counts.get('active_users') or 0),
+            'attendance_today': attendance_today
+        }
+
+    def _load_department(self, department_id: int) -> Dict:
+        """Compute the department tiles with one aggregate query"""
+        result = db.execute_query("""
+            SELECT d.department_name,
+                (SELECT COUNT(*) FROM students s
+                 WHERE s.department_id = d.department_id AND s.is_active = 1) as total_students,
+                (SELECT COUNT(*) FROM courses c
+                 WHERE c.department_id = d.department_id AND c.is_active = 1) as total_courses
+            FROM departments d
+            WHERE d.department_id = ?
+        """, (department_id,))
+
+        if not result:
+            return {'department_name': None, 'total_students': 0, 'total_courses': 0}
+
+        row = result[0]
+        return {
+            'department_name': row['department_name'],
+            'total_students': int(row['total_students'] or 0),
+            'total_courses': int(row['total_courses'] or 0)
+        }
+
+    def _load_student(self, student_id: int) -> Dict:
+        """Load one student's profile and course count"""
+        result = db.execute_query("""
+            SELECT s.*, d.department_name, d.department_code,
+                (SELECT COUNT(*) FROM marks m WHERE m.student_id = s.student_id) as total_courses
+            FROM students s
+            LEFT JOIN departments d ON s.department_id = d.department_id
+            WHERE s.student_id = ?
+        """, (student_id,))
+
+        if not result:
+            return {'student': None, 'total_courses': 0}
+
+        student = dict(result[0])
+        return {'student': student, 'total_courses': int(student.pop('total_courses') or 0)}
+
+
+# Global instance
+dashboard_controller = DashboardController()
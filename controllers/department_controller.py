@@ -4,11 +4,18 @@ Department Controller - Handles department CRUD operations
 from typing import List, Optional, Tuple
 from database.db_manager import db
 from utils.validators import validate_department_code
+from controllers.student_search_controller import student_search_controller
+from utils.reference_cache import ReferenceCache, Uncached
+from controllers.change_version_controller import change_version_controller
 
 
 class DepartmentController:
     """Manages department operations"""
     
+    def __init__(self):
+        # Lookups are served from memory until a department changes
+        self._cache = ReferenceCache('departments', tables=('departments',))
+    
     def get_all_departments(self, include_inactive: bool = False) -> List[dict]:
         """
         Get all departments
@@ -19,25 +26,39 @@ class DepartmentController:
         Returns:
             List of department dictionaries
         """
+        return self._cache.get(('all', include_inactive), lambda: self._load_all(include_inactive))
+    
+    def get_department_by_id(self, department_id: int) -> Optional[dict]:
+        """Get department by ID"""
+        return self._cache.get(('id', department_id), lambda: self._load_one(
+            "SELECT * FROM departments WHERE department_id = ?", department_id))
+    
+    def get_department_by_code(self, department_code: str) -> Optional[dict]:
+        """Get department by code"""
+        code = department_code.upper()
+        return self._cache.get(('code', code), lambda: self._load_one(
+            "SELECT * FROM departments WHERE department_code = ?", code))
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss metrics of the department lookup cache"""
+        return self._cache.stats()
+    
+    def _load_all(self, include_inactive: bool) -> List[dict]:
         query = "SELECT * FROM departments"
         if not include_inactive:
             query += " WHERE is_active = 1"
         query += " ORDER BY department_name"
         
         result = db.execute_query(query)
-        return [dict(row) for row in result] if result else []
+        if result is None:
+            return Uncached([])
+        return [dict(row) for row in result]
     
-    def get_department_by_id(self, department_id: int) -> Optional[dict]:
-        """Get department by ID"""
-        query = "SELECT * FROM departments WHERE department_id = ?"
-        result = db.execute_query(query, (department_id,))
-        return dict(result[0]) if result and len(result) > 0 else None
-    
-    def get_department_by_code(self, department_code: str) -> Optional[dict]:
-        """Get department by code"""
-        query = "SELECT * FROM departments WHERE department_code = ?"
-        result = db.execute_query(query, (department_code.upper(),))
-        return dict(result[0]) if result and len(result) > 0 else None
+    def _load_one(self, query: str, value) -> Optional[dict]:
+        result = db.execute_query(query, (value,))
+        if result is None:
+            return Uncached(None)
+        return dict(result[0]) if result else None
     
     def create_department(self, department_name: str, department_code: str, head_of_department: str = None) -> Tuple[bool, str, Optional[int]]:
         """
@@ -79,7 +100,7 @@ class DepartmentController:
             INSERT INTO departments (department_name, department_code, head_of_department)
             VALUES (?, ?, ?)
         """
-        success, dept_id = db.execute_update(query, (department_name.strip(), department_code.upper(), head_of_department))
+        success, dept_id = change_version_controller.execute_update(('departments',), query, (department_name.strip(), department_code.upper(), head_of_department))
         
         if success:
             return True, "Department created successfully", dept_id
@@ -134,9 +155,11 @@ class DepartmentController:
             SET department_name = ?, department_code = ?, head_of_department = ?
             WHERE department_id = ?
         """
-        success, _ = db.execute_update(query, (department_name.strip(), department_code.upper(), head_of_department, department_id))
+        success, _ = change_version_controller.execute_update(('departments',), query, (department_name.strip(), department_code.upper(), head_of_department, department_id))
         
         if success:
+            if department_name.strip() != existing.get('department_name'):
+                student_search_controller.refresh_department(department_id)
             return True, "Department updated successfully"
         else:
             return False, "Failed to update department"
@@ -169,7 +192,7 @@ class DepartmentController:
         
         # Delete department
         query = "DELETE FROM departments WHERE department_id = ?"
-        success, _ = db.execute_update(query, (department_id,))
+        success, _ = change_version_controller.execute_update(('departments',), query, (department_id,))
         
         if success:
             return True, "Department deleted successfully"
@@ -179,7 +202,7 @@ class DepartmentController:
     def deactivate_department(self, department_id: int) -> Tuple[bool, str]:
         """Deactivate a department"""
         query = "UPDATE departments SET is_active = 0 WHERE department_id = ?"
-        success, _ = db.execute_update(query, (department_id,))
+        success, _ = change_version_controller.execute_update(('departments',), query, (department_id,))
         
         if success:
             return True, "Department deactivated successfully"
@@ -189,7 +212,7 @@ class DepartmentController:
     def activate_department(self, department_id: int) -> Tuple[bool, str]:
         """Activate a department"""
         query = "UPDATE departments SET is_active = 1 WHERE department_id = ?"
-        success, _ = db.execute_update(query, (department_id,))
+        success, _ = change_version_controller.execute_update(('departments',), query, (department_id,))
         
         if success:
             return True, "Department activated successfully"
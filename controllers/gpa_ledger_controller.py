@@ -0,0 +1,389 @@
+"""
+GPA Ledger Controller - Materialized per-student, per-semester grade point totals
+Keeps credit and grade-point sums (plus running cumulative totals) in step with
+marks so SGPA/CGPA are single-row lookups instead of full marks scans.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from database.db_manager import db, in_chunks
+import config
+
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS gpa_ledger (
+        student_id INTEGER NOT NULL,
+        semester INTEGER NOT NULL,
+        credits INTEGER NOT NULL DEFAULT 0,
+        grade_points REAL NOT NULL DEFAULT 0,
+        cum_credits INTEGER NOT NULL DEFAULT 0,
+        cum_grade_points REAL NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (student_id, semester),
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    )
+"""
+
+MYSQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS gpa_ledger (
+        student_id INT NOT NULL,
+        semester INT NOT NULL,
+        credits INT NOT NULL DEFAULT 0,
+        grade_points DECIMAL(12,4) NOT NULL DEFAULT 0,
+        cum_credits INT NOT NULL DEFAULT 0,
+        cum_grade_points DECIMAL(12,4) NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (student_id, semester),
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+class GPALedgerController:
+    """Maintains the gpa_ledger table"""
+
+    def __init__(self):
+        self._checked = False
+
+    def ensure_table(self) -> bool:
+        """
+        Create the ledger table if needed and backfill it from marks on first use
+        (call outside of db.transaction())
+        """
+        if not db.ensure_schema('gpa_ledger', SQLITE_SCHEMA, MYSQL_SCHEMA):
+            return False
+
+        if not self._checked:
+            self._checked = True
+            ledger = db.execute_query("""
+                SELECT COUNT(*) as total_rows, COALESCE(SUM(credits), 0) as total_credits,
+                       COALESCE(SUM(grade_points), 0) as total_points
+                FROM gpa_ledger WHERE credits > 0
+            """)
+            marks = db.execute_query(f"""
+                SELECT COUNT(*) as total_rows, COALESCE(SUM(credits), 0) as total_credits,
+                       COALESCE(SUM(grade_points), 0) as total_points
+                FROM (
+                    SELECT SUM(c.credits) AS credits,
+                           SUM({self._grade_points_sql('m.grade')} * c.credits) AS grade_points
+                    FROM marks m
+                    JOIN courses c ON m.course_id = c.course_id
+                    GROUP BY m.student_id, c.semester
+                    HAVING SUM(c.credits) > 0
+                ) per_semester
+            """)
+            # Empty or out of date (upgraded database, marks written by scripts)
+            if ledger and marks and (
+                    int(ledger[0]['total_rows']) != int(marks[0]['total_rows'])
+                    or int(ledger[0]['total_credits']) != int(marks[0]['total_credits'])
+                    or abs(float(ledger[0]['total_points']) - float(marks[0]['total_points'])) > 0.01):
+                self.rebuild_ledger()
+        return True
+
+    def grade_points(self, grade: Optional[str]) -> float:
+        """Get grade points for a letter grade from the grading scale"""
+        return config.GRADING_SCALE.get(grade, {}).get('points', 0)
+
+    def mark_delta(self, credits: int, old_grade: Optional[str], new_grade: Optional[str],
+                   is_new: bool) -> Tuple[float, int]:
+        """
+        Ledger change caused by writing one mark
+
+        Args:
+            credits: Course credits
+            old_grade: Grade before the write (ignored when is_new)
+            new_grade: Grade after the write (None when the mark is deleted)
+            is_new: True if the mark row did not exist before
+
+        Returns:
+            Tuple of (delta_grade_points: float, delta_credits: int)
+        """
+        old_points = 0.0 if is_new else self.grade_points(old_grade) * credits
+        new_points = 0.0 if new_grade is None else self.grade_points(new_grade) * credits
+
+        if new_grade is None:
+            return -old_points, -credits
+        return new_points - old_points, credits if is_new else 0
+
+    def record_mark_changes(self, changes: Iterable[Tuple[int, int, float, int]]):
+        """
+        Apply mark changes to the ledger
+
+        Reads the affected students' ledger rows once, applies the deltas,
+        recomputes cumulative totals from the first changed semester on and
+        writes everything back with one executemany upsert. Joins the
+        caller's transaction when called inside db.transaction(); call
+        ensure_table() before opening it, otherwise the changes are skipped
+        (the first-use backfill picks them up).
+
+        Args:
+            changes: (student_id, semester, delta_grade_points, delta_credits) tuples
+        """
+        deltas: Dict[Tuple[int, int], Tuple[float, int]] = {}
+        for student_id, semester, delta_points, delta_credits in changes:
+            if semester is None:
+                continue
+            points, credits = deltas.get((student_id, semester), (0.0, 0))
+            deltas[(student_id, semester)] = (points + delta_points, credits + delta_credits)
+
+        deltas = {key: value for key, value in deltas.items()
+                  if value[1] != 0 or abs(value[0]) > 1e-9}
+        if not deltas:
+            return
+
+        student_ids = sorted({student_id for student_id, _ in deltas})
+        if not self._checked:
+            return
+
+        with db.transaction():
+            existing = self._load_rows(student_ids, for_update=True)
+            rows, emptied = self._apply_deltas(student_ids, existing, deltas)
+            self._write_rows(rows, emptied)
+
+    def get_cgpa(self, student_id: int, up_to_semester: Optional[int] = None) -> Optional[float]:
+        """
+        Get CGPA from the ledger
+
+        Returns:
+            CGPA rounded to 2 decimals, or None if the ledger has no credits for the student
+        """
+        if not self.ensure_table():
+            return None
+
+        query = """
+            SELECT cum_credits, cum_grade_points FROM gpa_ledger
+            WHERE student_id = ? AND cum_credits > 0
+        """
+        params = [student_id]
+
+        if up_to_semester is not None:
+            query += " AND semester <= ?"
+            params.append(up_to_semester)
+
+        query += " ORDER BY semester DESC LIMIT 1"
+
+        result = db.execute_query(query, tuple(params))
+        if not result:
+            return None
+
+        row = result[0]
+        return round(float(row['cum_grade_points']) / row['cum_credits'], 2)
+
+    def get_sgpa(self, student_id: int, semester: int) -> Optional[float]:
+        """Get SGPA from the ledger, or None if there are no credits for the semester"""
+        if not self.ensure_table():
+            return None
+
+        result = db.execute_query(
+            "SELECT credits, grade_points FROM gpa_ledger WHERE student_id = ? AND semester = ?",
+            (student_id, semester)
+        )
+        if not result or not result[0]['credits']:
+            return None
+
+        row = result[0]
+        return round(float(row['grade_points']) / row['credits'], 2)
+
+    def get_latest_cgpas(self, student_ids: List[int]) -> Dict[int, float]:
+        """Get each student's CGPA as of their latest ledger semester"""
+        if not student_ids or not self.ensure_table():
+            return {}
+
+        cgpas = {}
+        for chunk, placeholders in in_chunks(student_ids):
+            query = f"""
+                SELECT g.student_id, g.cum_credits, g.cum_grade_points
+                FROM gpa_ledger g
+                JOIN (
+                    SELECT student_id, MAX(semester) AS semester
+                    FROM gpa_ledger
+                    WHERE student_id IN ({placeholders}) AND cum_credits > 0
+                    GROUP BY student_id
+                ) latest ON g.student_id = latest.student_id AND g.semester = latest.semester
+            """
+            for row in db.execute_query(query, chunk) or []:
+                cgpas[row['student_id']] = round(float(row['cum_grade_points']) / row['cum_credits'], 2)
+        return cgpas
+
+    def rebuild_students(self, student_ids: List[int]):
+        """Recompute ledger rows for specific students straight from marks"""
+        if not student_ids or not self.ensure_table():
+            return
+
+        student_ids = sorted(set(student_ids))
+        with db.transaction():
+            for chunk, placeholders in in_chunks(student_ids):
+                expected = self._compute_from_marks(f"m.student_id IN ({placeholders})", chunk)
+
+                db.execute_update(f"DELETE FROM gpa_ledger WHERE student_id IN ({placeholders})", chunk)
+                self._write_rows(list(expected.values()), [])
+
+    def rebuild_for_course(self, course_id: int):
+        """Recompute ledger rows of every student with marks in a course (credits/semester changed)"""
+        result = db.execute_query("SELECT DISTINCT student_id FROM marks WHERE course_id = ?", (course_id,))
+        self.rebuild_students([row['student_id'] for row in result or []])
+
+    def rebuild_ledger(self, verify_only: bool = False) -> Dict:
+        """
+        Recompute the whole ledger from marks in bulk and report drift
+
+        Args:
+            verify_only: Only compare and report, do not rewrite the ledger
+
+        Returns:
+            Summary dict with students, rows, drift_count and drift (list of differences)
+        """
+        if not self.ensure_table():
+            return {'success': False, 'message': "Could not create gpa_ledger table"}
+
+        expected = self._compute_from_marks("1=1", ())
+        actual = {
+            (row['student_id'], row['semester']): row
+            for row in db.execute_query("SELECT * FROM gpa_ledger") or []
+        }
+
+        drift = []
+        for key in sorted(set(expected) | set(actual)):
+            want = expected.get(key)
+            have = actual.get(key)
+
+            if want is None:
+                if have['credits']:
+                    drift.append({'student_id': key[0], 'semester': key[1], 'issue': 'stale row'})
+                continue
+            if have is None:
+                drift.append({'student_id': key[0], 'semester': key[1], 'issue': 'missing row'})
+                continue
+
+            if (want[2] != have['credits'] or want[4] != have['cum_credits']
+                    or abs(want[3] - float(have['grade_points'])) > 1e-6
+                    or abs(want[5] - float(have['cum_grade_points'])) > 1e-6):
+                drift.append({
+                    'student_id': key[0], 'semester': key[1], 'issue': 'mismatch',
+                    'expected_credits': want[2], 'ledger_credits': have['credits'],
+                    'expected_grade_points': want[3], 'ledger_grade_points': float(have['grade_points'])
+                })
+
+        if not verify_only:
+            with db.transaction():
+                db.execute_update("DELETE FROM gpa_ledger")
+                self._write_rows(list(expected.values()), [])
+
+        return {
+            'success': True,
+            'students': len({student_id for student_id, _ in expected}),
+            'rows': len(expected),
+            'drift_count': len(drift),
+            'drift': drift,
+            'rebuilt': not verify_only
+        }
+
+    def _grade_points_sql(self, column: str) -> str:
+        """SQL CASE expression mapping a grade column to grade points"""
+        cases = " ".join(
+            f"WHEN '{grade}' THEN {scale['points']}" for grade, scale in config.GRADING_SCALE.items()
+        )
+        return f"(CASE {column} {cases} ELSE 0 END)"
+
+    def _compute_from_marks(self, where: str, params: tuple) -> Dict[Tuple[int, int], tuple]:
+        """Aggregate marks into ledger rows keyed by (student_id, semester)"""
+        query = f"""
+            SELECT m.student_id, c.semester,
+                   SUM(c.credits) AS credits,
+                   SUM({self._grade_points_sql('m.grade')} * c.credits) AS grade_points
+            FROM marks m
+            JOIN courses c ON m.course_id = c.course_id
+            WHERE {where}
+            GROUP BY m.student_id, c.semester
+            ORDER BY m.student_id, c.semester
+        """
+        rows = {}
+        cum_student = None
+        cum_credits = 0
+        cum_points = 0.0
+
+        for row in db.execute_query(query, params) or []:
+            if row['student_id'] != cum_student:
+                cum_student = row['student_id']
+                cum_credits = 0
+                cum_points = 0.0
+
+            credits = int(row['credits'] or 0)
+            points = round(float(row['grade_points'] or 0), 4)
+            cum_credits += credits
+            cum_points += points
+            rows[(row['student_id'], row['semester'])] = (
+                row['student_id'], row['semester'], credits, points, cum_credits, round(cum_points, 4)
+            )
+        return rows
+
+    def _load_rows(self, student_ids: List[int], for_update: bool = False) -> Dict[Tuple[int, int], Tuple[int, float]]:
+        """Load (credits, grade_points) per (student_id, semester)"""
+        existing = {}
+        lock = " FOR UPDATE" if for_update and config.USE_MYSQL else ""
+
+        for chunk, placeholders in in_chunks(student_ids):
+            query = f"""
+                SELECT student_id, semester, credits, grade_points
+                FROM gpa_ledger WHERE student_id IN ({placeholders}){lock}
+            """
+            for row in db.execute_query(query, chunk) or []:
+                existing[(row['student_id'], row['semester'])] = (
+                    int(row['credits']), float(row['grade_points'])
+                )
+        return existing
+
+    def _apply_deltas(self, student_ids: List[int], existing: Dict, deltas: Dict) -> Tuple[List[tuple], List[tuple]]:
+        """Apply deltas and rebuild cumulative totals from the first changed semester on"""
+        rows = []
+        emptied = []
+
+        changed_by_student: Dict[int, set] = {}
+        for student_id, semester in deltas:
+            changed_by_student.setdefault(student_id, set()).add(semester)
+
+        existing_by_student: Dict[int, set] = {}
+        for student_id, semester in existing:
+            existing_by_student.setdefault(student_id, set()).add(semester)
+
+        for student_id in student_ids:
+            changed = changed_by_student[student_id]
+            semesters = sorted(existing_by_student.get(student_id, set()) | changed)
+            first_changed = min(changed)
+
+            cum_credits = 0
+            cum_points = 0.0
+            for semester in semesters:
+                credits, points = existing.get((student_id, semester), (0, 0.0))
+                delta_points, delta_credits = deltas.get((student_id, semester), (0.0, 0))
+                credits += delta_credits
+                points = round(points + delta_points, 4)
+
+                if credits <= 0:
+                    credits, points = 0, 0.0
+                    if (student_id, semester) in existing:
+                        emptied.append((student_id, semester))
+                    continue
+
+                cum_credits += credits
+                cum_points += points
+                if semester >= first_changed:
+                    rows.append((student_id, semester, credits, points, cum_credits, round(cum_points, 4)))
+
+        return rows, emptied
+
+    def _write_rows(self, rows: List[tuple], emptied: List[tuple]):
+        """Upsert ledger rows and drop semesters that no longer have marks"""
+        if rows:
+            query = db.build_upsert(
+                'gpa_ledger',
+                ['student_id', 'semester', 'credits', 'grade_points', 'cum_credits', 'cum_grade_points'],
+                key_columns=['student_id', 'semester'],
+                extra_updates=['updated_at = CURRENT_TIMESTAMP']
+            )
+            db.execute_many(query, rows)
+
+        if emptied:
+            db.execute_many("DELETE FROM gpa_ledger WHERE student_id = ? AND semester = ?", emptied)
+
+
+# Global GPA ledger controller instance
+gpa_ledger_controller = GPALedgerController()
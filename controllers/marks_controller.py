@@ -2,8 +2,11 @@
 Marks Controller - Handles marks entry and management
 """
 from typing import List, Optional, Tuple
-from database.db_manager import db
+from database.db_manager import db, in_chunks
 from utils.security import validate_marks
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.course_controller import course_controller
+from controllers.change_version_controller import change_version_controller
 import config
 
 
@@ -107,14 +110,12 @@ class MarksController:
         Returns:
             Tuple of (success: bool, message: str, mark_id: int)
         """
-        # Get course details
-        course_query = "SELECT max_marks, pass_marks FROM courses WHERE course_id = ?"
-        course_result = db.execute_query(course_query, (course_id,))
+        # Get course details (served from the reference cache)
+        course = course_controller.get_course_by_id(course_id)
         
-        if not course_result or len(course_result) == 0:
+        if not course:
             return False, "Course not found", None
         
-        course = course_result[0]
         max_marks = course['max_marks']
         pass_marks = course['pass_marks']
         
@@ -132,46 +133,63 @@ class MarksController:
         grade = self.calculate_grade(marks_obtained, max_marks)
         status = self.calculate_status(marks_obtained, pass_marks)
         
-        # Check if marks already exist
-        existing = self.get_mark(student_id, course_id)
+        gpa_ledger_controller.ensure_table()
+        lock = " FOR UPDATE" if config.USE_MYSQL else ""
+        existing = None
+        try:
+            with db.transaction():
+                # Read the current grade inside the write so the ledger delta matches what is replaced
+                rows = db.execute_query(
+                    f"SELECT mark_id, grade FROM marks WHERE student_id = ? AND course_id = ?{lock}",
+                    (student_id, course_id)
+                )
+                existing = dict(rows[0]) if rows else None
+                
+                # Keep the GPA ledger in step with the marks write
+                delta_points, delta_credits = gpa_ledger_controller.mark_delta(
+                    course['credits'], existing['grade'] if existing else None, grade, is_new=not existing
+                )
+                
+                if existing:
+                    # Update existing marks
+                    db.execute_update(
+                        """
+                        UPDATE marks 
+                        SET marks_obtained = ?, grade = ?, status = ?, 
+                            entered_by = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE student_id = ? AND course_id = ?
+                        """,
+                        (marks_obtained, grade, status, entered_by, student_id, course_id)
+                    )
+                    mark_id = existing['mark_id']
+                else:
+                    # Insert new marks
+                    _, mark_id = db.execute_update(
+                        """
+                        INSERT INTO marks (student_id, course_id, marks_obtained, grade, status, entered_by)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (student_id, course_id, marks_obtained, grade, status, entered_by)
+                    )
+                gpa_ledger_controller.record_mark_changes(
+                    [(student_id, course['semester'], delta_points, delta_credits)]
+                )
+                change_version_controller.bump('marks')
+        except Exception:
+            return False, "Failed to update marks" if existing else "Failed to enter marks", None
         
         if existing:
-            # Update existing marks
-            query = """
-                UPDATE marks 
-                SET marks_obtained = ?, grade = ?, status = ?, 
-                    entered_by = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE student_id = ? AND course_id = ?
-            """
-            success, _ = db.execute_update(
-                query,
-                (marks_obtained, grade, status, entered_by, student_id, course_id)
-            )
-            
-            if success:
-                return True, "Marks updated successfully", existing['mark_id']
-            else:
-                return False, "Failed to update marks", None
-        else:
-            # Insert new marks
-            query = """
-                INSERT INTO marks (student_id, course_id, marks_obtained, grade, status, entered_by)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
-            success, mark_id = db.execute_update(
-                query,
-                (student_id, course_id, marks_obtained, grade, status, entered_by)
-            )
-            
-            if success:
-                return True, "Marks entered successfully", mark_id
-            else:
-                return False, "Failed to enter marks", None
+            return True, "Marks updated successfully", mark_id
+        return True, "Marks entered successfully", mark_id
     
     def bulk_enter_marks(self, marks_data: List[dict], entered_by: int) -> Tuple[bool, str, int]:
         """
         Bulk enter marks for multiple students
         
+        The whole batch is validated in memory against one fetch of the courses
+        and students it references, then written with a single upsert in one
+        transaction together with the GPA ledger deltas.
+        
         Args:
             marks_data: List of dicts with keys: student_id, course_id, marks_obtained
             entered_by: User ID who entered the marks
@@ -179,21 +197,60 @@ class MarksController:
         Returns:
             Tuple of (success: bool, message: str, count: int)
         """
-        success_count = 0
-        errors = []
+        courses = self._fetch_by_ids(
+            "SELECT course_id, max_marks, pass_marks, credits, semester FROM courses WHERE course_id IN ({})",
+            {data['course_id'] for data in marks_data}, 'course_id'
+        )
+        students = self._fetch_by_ids(
+            "SELECT student_id FROM students WHERE student_id IN ({})",
+            {data['student_id'] for data in marks_data}, 'student_id'
+        )
         
+        # Validate and grade every row; later rows for the same student/course win
+        valid = []
+        errors = []
         for data in marks_data:
-            success, msg, _ = self.enter_marks(
-                student_id=data['student_id'],
-                course_id=data['course_id'],
-                marks_obtained=data['marks_obtained'],
-                entered_by=entered_by
-            )
+            course = courses.get(data['course_id'])
+            if course is None:
+                errors.append(f"Student {data.get('student_id')}: Course not found")
+                continue
             
-            if success:
-                success_count += 1
-            else:
+            marks_obtained = data['marks_obtained']
+            is_valid, msg = validate_marks(marks_obtained, course['max_marks'])
+            if not is_valid:
                 errors.append(f"Student {data.get('student_id')}: {msg}")
+                continue
+            
+            if data['student_id'] not in students:
+                errors.append(f"Student {data.get('student_id')}: Student not found")
+                continue
+            
+            valid.append((
+                data['student_id'], data['course_id'], marks_obtained,
+                self.calculate_grade(marks_obtained, course['max_marks']),
+                self.calculate_status(marks_obtained, course['pass_marks']),
+                entered_by
+            ))
+        
+        success_count = 0
+        if valid:
+            gpa_ledger_controller.ensure_table()
+            query = db.build_upsert(
+                'marks',
+                ['student_id', 'course_id', 'marks_obtained', 'grade', 'status', 'entered_by'],
+                ['student_id', 'course_id'],
+                extra_updates=['updated_at = CURRENT_TIMESTAMP']
+            )
+            try:
+                with db.transaction():
+                    changes = self._bulk_ledger_changes(valid, courses)
+                    final_rows = list({(row[0], row[1]): row for row in valid}.values())
+                    db.execute_many(query, final_rows)
+                    gpa_ledger_controller.record_mark_changes(changes)
+                    change_version_controller.bump('marks')
+                success_count = len(valid)
+            except Exception:
+                errors.extend(f"Student {row[0]}: Failed to enter marks" for row in valid)
         
         if success_count > 0:
             error_msg = f"\n{len(errors)} errors occurred" if errors else ""
@@ -201,14 +258,71 @@ class MarksController:
         else:
             return False, f"Failed to enter marks. Errors:\n" + "\n".join(errors[:5]), 0
     
+    def _fetch_by_ids(self, query: str, ids: set, key: str) -> dict:
+        """Run an IN (...) query over ids in chunks and index the rows by key"""
+        rows = {}
+        for chunk, placeholders in in_chunks(sorted(ids)):
+            for row in db.execute_query(query.format(placeholders), chunk) or []:
+                rows[row[key]] = dict(row)
+        return rows
+    
+    def _bulk_ledger_changes(self, rows: List[tuple], courses: dict) -> List[tuple]:
+        """GPA ledger deltas for a batch of (student_id, course_id, marks, grade, ...) rows"""
+        student_ids = sorted({row[0] for row in rows})
+        course_ids = sorted({row[1] for row in rows})
+        
+        # Current grades of the marks about to be overwritten, locked until the batch commits
+        grades = {}
+        course_placeholders = ', '.join(['?'] * len(course_ids))
+        lock = " FOR UPDATE" if config.USE_MYSQL else ""
+        for chunk, placeholders in in_chunks(student_ids):
+            query = f"""
+                SELECT student_id, course_id, grade FROM marks
+                WHERE student_id IN ({placeholders})
+                AND course_id IN ({course_placeholders}){lock}
+            """
+            for row in db.execute_query(query, chunk + tuple(course_ids)) or []:
+                grades[(row['student_id'], row['course_id'])] = row['grade']
+        
+        changes = []
+        for student_id, course_id, _, grade, _, _ in rows:
+            course = courses[course_id]
+            key = (student_id, course_id)
+            delta_points, delta_credits = gpa_ledger_controller.mark_delta(
+                course['credits'], grades.get(key), grade, is_new=key not in grades
+            )
+            grades[key] = grade
+            changes.append((student_id, course['semester'], delta_points, delta_credits))
+        return changes
+    
     def delete_marks(self, mark_id: int) -> Tuple[bool, str]:
         """Delete marks entry"""
-        query = "DELETE FROM marks WHERE mark_id = ?"
-        success, _ = db.execute_update(query, (mark_id,))
+        mark = db.execute_query(
+            """
+            SELECT m.student_id, m.grade, c.credits, c.semester
+            FROM marks m
+            LEFT JOIN courses c ON m.course_id = c.course_id
+            WHERE m.mark_id = ?
+            """,
+            (mark_id,)
+        )
         
-        if success:
+        changes = []
+        if mark and mark[0]['credits'] is not None:
+            delta_points, delta_credits = gpa_ledger_controller.mark_delta(
+                mark[0]['credits'], mark[0]['grade'], None, is_new=False
+            )
+            changes.append((mark[0]['student_id'], mark[0]['semester'], delta_points, delta_credits))
+        
+        gpa_ledger_controller.ensure_table()
+        query = "DELETE FROM marks WHERE mark_id = ?"
+        try:
+            with db.transaction():
+                db.execute_update(query, (mark_id,))
+                gpa_ledger_controller.record_mark_changes(changes)
+                change_version_controller.bump('marks')
             return True, "Marks deleted successfully"
-        else:
+        except Exception:
             return False, "Failed to delete marks"
     
     def get_marks_by_department_semester(self, department_id: int, semester: int) -> List[dict]:
@@ -3,6 +3,9 @@ Student Promotion Controller
 Manages automated student promotion based on eligibility criteria
 """
 from database.db_manager import db
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.attendance_rollup_controller import attendance_rollup_controller
+from controllers.change_version_controller import change_version_controller
 from datetime import datetime, date
 from typing import List, Dict, Optional, Tuple
 
@@ -21,14 +24,16 @@ class PromotionController:
             
             rule = rules[0]
             
-            # Get student's CGPA
-            cgpa_query = """
-                SELECT cgpa FROM results 
-                WHERE student_id = ? AND semester = ?
-                ORDER BY generated_at DESC LIMIT 1
-            """
-            cgpa_result = db.execute_query(cgpa_query, (student_id, current_semester))
-            cgpa = cgpa_result[0]['cgpa'] if cgpa_result and cgpa_result[0]['cgpa'] else 0.0
+            # Get student's CGPA (GPA ledger first, generated results as fallback)
+            cgpa = gpa_ledger_controller.get_cgpa(student_id, current_semester)
+            if cgpa is None:
+                cgpa_query = """
+                    SELECT cgpa FROM results 
+                    WHERE student_id = ? AND semester = ?
+                    ORDER BY generated_at DESC LIMIT 1
+                """
+                cgpa_result = db.execute_query(cgpa_query, (student_id, current_semester))
+                cgpa = cgpa_result[0]['cgpa'] if cgpa_result and cgpa_result[0]['cgpa'] else 0.0
             
             # Count F grades in current semester
             f_grades_query = """
@@ -41,16 +46,16 @@ class PromotionController:
             f_count = f_result[0]['f_count'] if f_result else 0
             
             # Calculate attendance percentage
-            attendance_query = """
+            source, source_params = attendance_rollup_controller.counts_source(student_id=student_id)
+            attendance_query = f"""
                 SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present
-                FROM student_attendance
-                WHERE student_id = ?
+                    SUM(total_count) as total,
+                    SUM(present_count + late_count) as present
+                FROM ({source}) a
             """
-            att_result = db.execute_query(attendance_query, (student_id,))
+            att_result = db.execute_query(attendance_query, tuple(source_params))
             attendance_pct = 0.0
-            if att_result and att_result[0]['total'] > 0:
+            if att_result and (att_result[0]['total'] or 0) > 0:
                 attendance_pct = (att_result[0]['present'] / att_result[0]['total']) * 100
             
             # Check eligibility
@@ -102,7 +107,7 @@ class PromotionController:
             
             # Update student's semester
             update_query = "UPDATE students SET semester = ? WHERE student_id = ?"
-            success, _ = db.execute_update(update_query, (to_semester, student_id))
+            success, _ = change_version_controller.execute_update(('students',), update_query, (to_semester, student_id))
             
             if not success:
                 return False, "Failed to update student semester"
@@ -3,62 +3,44 @@ Report Controller
 Generates Excel and PDF reports
 """
 from database.db_manager import db
+from controllers.attendance_rollup_controller import attendance_rollup_controller
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Tuple
 import os
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from PyQt5.QtWidgets import QTextEdit
 from PyQt5.QtGui import QTextDocument, QPageSize
 from PyQt5.QtPrintSupport import QPrinter
 
 class ReportController:
     """Controller for generating reports"""
+
+    PERFORMANCE_HEADERS = ["Roll No", "Name", "Department", "Semester", "CGPA", "Percentage", "Grade", "Status"]
+    ATTENDANCE_HEADERS = ["Roll No", "Name", "Department", "Total Days", "Present", "Absent", "Late", "Percentage"]
     
-    def generate_excel_report(self, title: str, headers: List[str], data: List[List], filename: str) -> Tuple[bool, str]:
-        """Generate a generic Excel report"""
+    def generate_excel_report(self, title: str, headers: List[str], data: Iterable[Sequence], filename: str) -> Tuple[bool, str]:
+        """Generate a generic Excel report (rows may be any iterable, e.g. a cursor generator)"""
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Report"
-            
-            # Title
-            ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(headers))
-            title_cell = ws.cell(row=1, column=1, value=title)
-            title_cell.font = Font(size=16, bold=True, color="FFFFFF")
-            title_cell.fill = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
-            title_cell.alignment = Alignment(horizontal="center")
-            
-            # Headers
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=2, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="ECF0F1", end_color="ECF0F1", fill_type="solid")
-                cell.border = Border(bottom=Side(style='thin'))
-            
-            # Data
-            for row_idx, row_data in enumerate(data, 3):
-                for col_idx, value in enumerate(row_data, 1):
-                    ws.cell(row=row_idx, column=col_idx, value=value)
-            
-            # Auto-adjust column widths
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                ws.column_dimensions[column].width = adjusted_width
-            
-            # Save
             save_dir = os.path.join(os.getcwd(), "reports")
             os.makedirs(save_dir, exist_ok=True)
             full_path = os.path.join(save_dir, filename)
-            wb.save(full_path)
+            
+            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+            from utils.excel_exporter import excel_exporter
+            excel_exporter.write_table(
+                full_path, "Report", headers, data,
+                title=title,
+                title_style={
+                    'font': Font(size=16, bold=True, color="FFFFFF"),
+                    'fill': PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid"),
+                    'alignment': Alignment(horizontal="center"),
+                },
+                header_style={
+                    'font': Font(bold=True),
+                    'fill': PatternFill(start_color="ECF0F1", end_color="ECF0F1", fill_type="solid"),
+                    'border': Border(bottom=Side(style='thin')),
+                },
+                max_width=None
+            )
             
             return True, full_path
             
@@ -90,6 +72,15 @@ class ReportController:
 
     def get_student_performance_data(self, department_id: int = None) -> Tuple[List[str], List[List]]:
         """Get data for student performance report"""
+        try:
+            return list(self.PERFORMANCE_HEADERS), list(self.iter_student_performance_data(department_id))
+        except Exception as e:
+            print(f"✗ Error loading student performance data: {e}")
+            return list(self.PERFORMANCE_HEADERS), []
+
+    def iter_student_performance_data(self, department_id: int = None, limit: Optional[int] = None,
+                                      offset: int = 0) -> Iterator[List]:
+        """Rows of the student performance report, streamed from the database (optionally one slice)"""
         query = """
             SELECT s.roll_number, s.name, d.department_name, s.semester,
                    r.cgpa, r.percentage, r.overall_grade, r.status
@@ -103,58 +94,82 @@ class ReportController:
             query += " AND s.department_id = ?"
             params.append(department_id)
             
-        query += " ORDER BY s.roll_number"
+        # Unique order, so LIMIT/OFFSET slices never overlap
+        query += " ORDER BY s.roll_number, s.student_id, r.semester"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
         
-        results = db.execute_query(query, tuple(params))
-        
-        headers = ["Roll No", "Name", "Department", "Semester", "CGPA", "Percentage", "Grade", "Status"]
-        data = []
-        for r in results:
-            data.append([
+        for r in db.iter_query(query, tuple(params)):
+            yield [
                 r['roll_number'], r['name'], r['department_name'], r['semester'],
                 r['cgpa'] or 0.0, r['percentage'] or 0.0, r['overall_grade'] or '-', r['status'] or '-'
-            ])
-            
-        return headers, data
+            ]
 
     def get_attendance_data(self, department_id: int = None) -> Tuple[List[str], List[List]]:
         """Get data for attendance report"""
-        query = """
+        try:
+            return list(self.ATTENDANCE_HEADERS), list(self.iter_attendance_data(department_id))
+        except Exception as e:
+            print(f"✗ Error loading attendance data: {e}")
+            return list(self.ATTENDANCE_HEADERS), []
+
+    def iter_attendance_data(self, department_id: int = None, limit: Optional[int] = None,
+                             offset: int = 0) -> Iterator[List]:
+        """Rows of the attendance report, streamed from the database (optionally one slice)"""
+        source, params = attendance_rollup_controller.counts_source()
+        query = f"""
             SELECT s.roll_number, s.name, d.department_name,
-                   COUNT(sa.attendance_id) as total_days,
-                   SUM(CASE WHEN sa.status = 'Present' THEN 1 ELSE 0 END) as present_days,
-                   SUM(CASE WHEN sa.status = 'Absent' THEN 1 ELSE 0 END) as absent_days,
-                   SUM(CASE WHEN sa.status = 'Late' THEN 1 ELSE 0 END) as late_days
+                   COALESCE(SUM(sa.total_count), 0) as total_days,
+                   COALESCE(SUM(sa.present_count), 0) as present_days,
+                   COALESCE(SUM(sa.absent_count), 0) as absent_days,
+                   COALESCE(SUM(sa.late_count), 0) as late_days
             FROM students s
             JOIN departments d ON s.department_id = d.department_id
-            LEFT JOIN student_attendance sa ON s.student_id = sa.student_id
+            LEFT JOIN ({source}) sa ON s.student_id = sa.student_id
             WHERE s.is_active = 1
         """
-        params = []
         if department_id:
             query += " AND s.department_id = ?"
             params.append(department_id)
             
-        query += " GROUP BY s.student_id, s.roll_number, s.name, d.department_name ORDER BY s.roll_number"
+        query += " GROUP BY s.student_id, s.roll_number, s.name, d.department_name ORDER BY s.roll_number, s.student_id"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
         
-        results = db.execute_query(query, tuple(params))
-        
-        headers = ["Roll No", "Name", "Department", "Total Days", "Present", "Absent", "Late", "Percentage"]
-        data = []
-        if not results:
-            return headers, data
-
-        for r in results:
+        for r in db.iter_query(query, tuple(params)):
             total = r['total_days']
             present = r['present_days'] + r['late_days'] # Late counts as present usually
             pct = (present / total * 100) if total > 0 else 0
             
-            data.append([
+            yield [
                 r['roll_number'], r['name'], r['department_name'],
                 total, r['present_days'], r['absent_days'], r['late_days'], f"{pct:.1f}%"
-            ])
-            
-        return headers, data
+            ]
+
+    def get_report_page(self, report: str, department_id: int = None, after=None,
+                        offset: int = 0, limit: int = 200) -> Dict:
+        """
+        One slice of a report for on-screen preview, in the shape of student_controller.get_students_page
+        
+        Args:
+            report: 'performance' or 'attendance'
+            department_id: Optional department filter
+            after: Unused (reports are paged by offset)
+            offset: Rows to skip
+            limit: Rows to return
+        
+        Returns:
+            Dict with rows (header -> value dictionaries), next_cursor (always None) and has_more
+        """
+        if report == 'performance':
+            headers, source = self.PERFORMANCE_HEADERS, self.iter_student_performance_data
+        else:
+            headers, source = self.ATTENDANCE_HEADERS, self.iter_attendance_data
+        
+        rows = [dict(zip(headers, row)) for row in source(department_id, limit=limit + 1, offset=offset)]
+        return {'rows': rows[:limit], 'next_cursor': None, 'has_more': len(rows) > limit}
 
 # Global instance
 report_controller = ReportController()
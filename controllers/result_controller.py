@@ -4,9 +4,16 @@ Result Controller - Handles result generation and calculation
 from typing import List, Optional, Tuple, Dict
 from database.db_manager import db
 from controllers.marks_controller import marks_controller
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.change_version_controller import change_version_controller
 import config
 
 
+# Supported ranking styles and the result columns that may order a ranking
+RANK_METHODS = ('competition', 'dense')
+RANK_TIE_BREAKERS = ('cgpa', 'percentage', 'sgpa', 'marks_obtained')
+
+
 class ResultController:
     """Manages result generation and calculations"""
     
@@ -78,10 +85,15 @@ class ResultController:
         Returns:
             Tuple of (success: bool, cgpa: float, message: str)
         """
+        # O(1) lookup from the maintained GPA ledger
+        cgpa = gpa_ledger_controller.get_cgpa(student_id, up_to_semester)
+        if cgpa is not None:
+            return True, cgpa, "CGPA calculated successfully"
+        
         total_grade_points = 0.0
         total_credits = 0
         
-        # Get marks for all semesters up to the specified semester
+        # Ledger has no entry yet - get marks for all semesters up to the specified semester
         for sem in range(1, up_to_semester + 1):
             marks = marks_controller.get_student_marks(student_id, sem)
             
@@ -234,9 +246,11 @@ class ResultController:
                     generated_at = CURRENT_TIMESTAMP
                 WHERE student_id = ? AND semester = ?
             """
-            success, _ = db.execute_update(query, (total_marks, marks_obtained, percentage,
-                                     sgpa, cgpa, overall_grade, status,
-                                     student_id, semester))
+            success, _ = change_version_controller.execute_update(
+                ('results',), query,
+                (total_marks, marks_obtained, percentage, sgpa, cgpa, overall_grade, status,
+                 student_id, semester)
+            )
         else:
             # Insert new result
             query = """
@@ -244,30 +258,350 @@ class ResultController:
                                    percentage, sgpa, cgpa, overall_grade, status)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            success, _ = db.execute_update(query, (student_id, semester, total_marks, marks_obtained,
-                                     percentage, sgpa, cgpa, overall_grade, status))
+            success, _ = change_version_controller.execute_update(
+                ('results',), query,
+                (student_id, semester, total_marks, marks_obtained, percentage, sgpa, cgpa,
+                 overall_grade, status)
+            )
     
-    def calculate_ranks(self, department_id: int, semester: int):
-        """Calculate and update ranks for students in a department and semester"""
-        # Get all results for the department and semester
+    def generate_results_batch(self, department_id: int, semester: int) -> Tuple[bool, str, Dict]:
+        """
+        Generate results for a whole department/semester cohort in one pass
+        
+        Marks for semesters 1..semester are read with a single joined query,
+        SGPA, CGPA, percentage, status and grade are computed in memory, and
+        every result row is upserted inside one transaction.
+        
+        Args:
+            department_id: Department ID
+            semester: Semester to generate results for
+        
+        Returns:
+            Tuple of (success: bool, message: str, summary: dict)
+        """
         query = """
-            SELECT r.result_id, r.student_id, r.cgpa
+            SELECT m.student_id, m.marks_obtained, m.grade, m.status,
+                   c.semester, c.credits, c.max_marks
+            FROM marks m
+            JOIN courses c ON m.course_id = c.course_id
+            JOIN students s ON m.student_id = s.student_id
+            WHERE s.department_id = ? AND s.is_active = 1
+              AND c.semester BETWEEN 1 AND ?
+        """
+        rows = db.execute_query(query, (department_id, semester))
+        if rows is None:
+            return False, "Failed to load marks", {}
+        
+        marks_by_student: Dict[int, List[dict]] = {}
+        for row in rows:
+            marks_by_student.setdefault(row['student_id'], []).append(row)
+        
+        records = []
+        results = {}
+        skipped = []
+        
+        for student_id, student_marks in marks_by_student.items():
+            figures, reason = self._compute_result_figures(student_marks, semester)
+            if figures is None:
+                skipped.append({'student_id': student_id, 'reason': reason})
+                continue
+            
+            results[student_id] = figures
+            records.append((
+                student_id, semester, figures['total_marks'], figures['marks_obtained'],
+                figures['percentage'], figures['sgpa'], figures['cgpa'],
+                figures['overall_grade'], figures['status']
+            ))
+        
+        if records:
+            upsert_query = db.build_upsert(
+                'results',
+                ['student_id', 'semester', 'total_marks', 'marks_obtained',
+                 'percentage', 'sgpa', 'cgpa', 'overall_grade', 'status'],
+                key_columns=['student_id', 'semester'],
+                extra_updates=['generated_at = CURRENT_TIMESTAMP']
+            )
+            try:
+                with db.transaction():
+                    db.execute_many(upsert_query, records)
+                    change_version_controller.bump('results')
+            except Exception as e:
+                return False, f"Failed to save results: {str(e)}", {}
+        
+        summary = {
+            'total': len(marks_by_student),
+            'generated': len(records),
+            'skipped': len(skipped),
+            'skipped_list': skipped,
+            'results': results
+        }
+        
+        if not records:
+            return False, "No results generated - no marks found for this semester", summary
+        
+        message = f"Generated results for {len(records)} students."
+        if skipped:
+            message += f" {len(skipped)} skipped."
+        return True, message, summary
+
+    def get_marksheet_data_batch(self, department_id: int, semester: int) -> List[Dict]:
+        """
+        Marksheet data for a whole department/semester cohort in two queries
+
+        Each entry has the same shape as the result_data returned by
+        generate_result; results are computed from the current marks and not saved.
+
+        Returns:
+            List of result_data dicts ordered by roll number (students without
+            marks for the semester are left out)
+        """
+        students = db.execute_query("""
+            SELECT s.*, d.department_name, d.department_code
+            FROM students s
+            LEFT JOIN departments d ON s.department_id = d.department_id
+            WHERE s.department_id = ? AND s.is_active = 1
+            ORDER BY s.roll_number
+        """, (department_id,))
+        if not students:
+            return []
+
+        marks = db.execute_query("""
+            SELECT m.*, c.course_name, c.course_code, c.max_marks, c.pass_marks,
+                   c.credits, c.semester, u.full_name as entered_by_name
+            FROM marks m
+            JOIN courses c ON m.course_id = c.course_id
+            JOIN students s ON m.student_id = s.student_id
+            LEFT JOIN users u ON m.entered_by = u.user_id
+            WHERE s.department_id = ? AND s.is_active = 1
+              AND c.semester BETWEEN 1 AND ?
+            ORDER BY c.semester, c.course_name
+        """, (department_id, semester)) or []
+
+        marks_by_student: Dict[int, List[dict]] = {}
+        for row in marks:
+            marks_by_student.setdefault(row['student_id'], []).append(dict(row))
+
+        batch = []
+        for student in students:
+            student_marks = marks_by_student.get(student['student_id'], [])
+            figures, _ = self._compute_result_figures(student_marks, semester)
+            if figures is None:
+                continue
+            batch.append(dict(
+                figures,
+                student=dict(student),
+                semester=semester,
+                marks=[mark for mark in student_marks if mark['semester'] == semester]
+            ))
+        return batch
+
+    def _compute_result_figures(self, marks: List[dict], semester: int) -> Tuple[Optional[Dict], str]:
+        """
+        Compute result figures from a student's marks for semesters 1..semester
+        
+        Mirrors calculate_sgpa/calculate_cgpa/calculate_percentage/
+        determine_overall_status without going back to the database.
+        
+        Returns:
+            Tuple of (figures: dict or None, message: str)
+        """
+        semester_marks = [mark for mark in marks if mark['semester'] == semester]
+        if not semester_marks:
+            return None, "No marks found for this semester"
+        
+        def grade_point_totals(rows):
+            points = 0.0
+            credits = 0
+            for row in rows:
+                grade_points = config.GRADING_SCALE.get(row['grade'], {}).get('points', 0)
+                points += grade_points * row['credits']
+                credits += row['credits']
+            return points, credits
+        
+        sem_points, sem_credits = grade_point_totals(semester_marks)
+        if sem_credits == 0:
+            return None, "No credits found"
+        sgpa = round(sem_points / sem_credits, 2)
+        
+        cum_points, cum_credits = grade_point_totals(marks)
+        cgpa = round(cum_points / cum_credits, 2) if cum_credits else sgpa
+        
+        total_marks = float(sum(mark['max_marks'] for mark in semester_marks))
+        marks_obtained = float(sum(mark['marks_obtained'] for mark in semester_marks))
+        if total_marks == 0:
+            return None, "Invalid marks data"
+        percentage = round((marks_obtained / total_marks) * 100, 2)
+        
+        status = 'Fail' if any(mark['status'] == 'Fail' for mark in semester_marks) else 'Pass'
+        
+        return {
+            'sgpa': sgpa,
+            'cgpa': cgpa,
+            'percentage': percentage,
+            'total_marks': total_marks,
+            'marks_obtained': marks_obtained,
+            'overall_grade': self.calculate_overall_grade(cgpa),
+            'status': status
+        }, "Result computed successfully"
+    
+    def calculate_ranks(self, department_id: Optional[int] = None, semester: Optional[int] = None,
+                        method: str = 'competition',
+                        tie_breakers: Tuple[str, ...] = ('cgpa', 'percentage')) -> Tuple[bool, int]:
+        """
+        Rank results within each department/semester using one set-based update
+        
+        Students equal on every tie-breaker share a rank. 'competition' ranking
+        leaves gaps after a tie (1, 2, 2, 4), 'dense' ranking does not (1, 2, 2, 3).
+        Leave department_id and/or semester as None to rank every matching
+        department/semester pair in the same pass.
+        
+        Args:
+            department_id: Department ID (None for all departments)
+            semester: Semester number (None for all semesters)
+            method: 'competition' or 'dense'
+            tie_breakers: Result columns to order by, highest first
+        
+        Returns:
+            Tuple of (success: bool, ranked_count: int)
+        """
+        if method not in RANK_METHODS:
+            raise ValueError(f"Invalid rank method '{method}'. Must be one of: {', '.join(RANK_METHODS)}")
+        
+        invalid = [col for col in tie_breakers if col not in RANK_TIE_BREAKERS]
+        if not tie_breakers or invalid:
+            raise ValueError(f"Tie breakers must be chosen from: {', '.join(RANK_TIE_BREAKERS)}")
+        
+        filters = ["1=1"]
+        params = []
+        
+        if department_id is not None:
+            filters.append("s.department_id = ?")
+            params.append(department_id)
+        
+        if semester is not None:
+            filters.append("r.semester = ?")
+            params.append(semester)
+        
+        where = " AND ".join(filters)
+        
+        try:
+            if db.supports_window_updates():
+                return self._rank_with_window(where, tuple(params), method, tie_breakers)
+            return self._rank_with_temp_tables(where, tuple(params), method, tie_breakers)
+        except Exception as e:
+            print(f"Error calculating ranks: {e}")
+            return False, 0
+    
+    def _rank_with_window(self, where: str, params: tuple, method: str,
+                          tie_breakers: Tuple[str, ...]) -> Tuple[bool, int]:
+        """Assign ranks with RANK()/DENSE_RANK() in a single UPDATE"""
+        rank_function = 'DENSE_RANK' if method == 'dense' else 'RANK'
+        order_by = ", ".join(f"COALESCE(r.{col}, 0) DESC" for col in tie_breakers)
+        
+        ranked = f"""
+            SELECT r.result_id,
+                   {rank_function}() OVER (
+                       PARTITION BY s.department_id, r.semester
+                       ORDER BY {order_by}
+                   ) AS rank_value
             FROM results r
-            LEFT JOIN students s ON r.student_id = s.student_id
-            WHERE s.department_id = ? AND r.semester = ?
-            ORDER BY r.cgpa DESC
+            JOIN students s ON r.student_id = s.student_id
+            WHERE {where}
         """
-        results = db.execute_query(query, (department_id, semester))
         
-        if not results:
-            return
+        if config.USE_MYSQL:
+            query = f"""
+                UPDATE results target
+                JOIN ({ranked}) ranked ON target.result_id = ranked.result_id
+                SET target.`rank` = ranked.rank_value
+            """
+        else:
+            query = f"""
+                UPDATE results
+                SET `rank` = ranked.rank_value
+                FROM ({ranked}) AS ranked
+                WHERE results.result_id = ranked.result_id
+            """
+        
+        return change_version_controller.execute_update(('results',), query, params)
+    
+    def _rank_with_temp_tables(self, where: str, params: tuple, method: str,
+                               tie_breakers: Tuple[str, ...]) -> Tuple[bool, int]:
+        """
+        Assign ranks through temporary tables when window functions are unavailable
+        
+        A student's rank is 1 + the number of better students (or distinct
+        better scores for dense ranking) in the same department/semester.
+        """
+        keys = [f"k{i}" for i in range(len(tie_breakers))]
+        key_columns = ", ".join(f"COALESCE(r.{col}, 0) AS {key}" for col, key in zip(tie_breakers, keys))
+        
+        # Lexicographic "b beats a" over the tie-breaker keys
+        better = []
+        for i, key in enumerate(keys):
+            equal_prefix = [f"b.{prev} = a.{prev}" for prev in keys[:i]]
+            better.append("(" + " AND ".join(equal_prefix + [f"b.{key} > a.{key}"]) + ")")
+        better_condition = " OR ".join(better)
+        
+        if method == 'dense':
+            if config.USE_MYSQL:
+                count_expr = f"COUNT(DISTINCT {', '.join('b.' + key for key in keys)})"
+            else:
+                # SQLite has no multi-column COUNT(DISTINCT), so count a joined key
+                joined_key = " || '|' || ".join('b.' + key for key in keys)
+                count_expr = f"COUNT(DISTINCT {joined_key})"
+        else:
+            count_expr = "COUNT(b.result_id)"
+        
+        # MySQL cannot open the same temporary table twice in one query,
+        # so the self-join reads from a second copy
+        temp = "" if config.USE_MYSQL else "temp."
+        drop = "DROP TEMPORARY TABLE IF EXISTS" if config.USE_MYSQL else "DROP TABLE IF EXISTS"
+        
+        with db.transaction():
+            for table in ('rank_scores', 'rank_peers', 'rank_values'):
+                db.execute_update(f"{drop} {temp}{table}")
+            
+            select_scores = f"""
+                SELECT r.result_id, s.department_id, r.semester, {key_columns}
+                FROM results r
+                JOIN students s ON r.student_id = s.student_id
+                WHERE {where}
+            """
+            db.execute_update(f"CREATE TEMPORARY TABLE rank_scores AS {select_scores}", params)
+            db.execute_update(f"CREATE TEMPORARY TABLE rank_peers AS {select_scores}", params)
+            
+            db.execute_update(f"""
+                CREATE TEMPORARY TABLE rank_values AS
+                SELECT a.result_id, 1 + {count_expr} AS rank_value
+                FROM rank_scores a
+                LEFT JOIN rank_peers b
+                    ON b.department_id = a.department_id
+                    AND b.semester = a.semester
+                    AND ({better_condition})
+                GROUP BY a.result_id
+            """)
+            
+            if config.USE_MYSQL:
+                success, count = db.execute_update("""
+                    UPDATE results target
+                    JOIN rank_values v ON target.result_id = v.result_id
+                    SET target.`rank` = v.rank_value
+                """)
+            else:
+                db.execute_update("CREATE INDEX temp.idx_rank_values ON rank_values (result_id)")
+                success, count = db.execute_update("""
+                    UPDATE results
+                    SET `rank` = (SELECT v.rank_value FROM temp.rank_values v
+                                  WHERE v.result_id = results.result_id)
+                    WHERE result_id IN (SELECT result_id FROM temp.rank_values)
+                """)
+            
+            for table in ('rank_scores', 'rank_peers', 'rank_values'):
+                db.execute_update(f"{drop} {temp}{table}")
+            change_version_controller.bump('results')
         
-        # Update ranks
-        rank = 1
-        for result in results:
-            update_query = "UPDATE results SET rank = ? WHERE result_id = ?"
-            success, _ = db.execute_update(update_query, (rank, result['result_id']))
-            rank += 1
+        return success, count
     
     def get_topper_list(self, department_id: int, semester: int, limit: int = 10) -> List[dict]:
         """Get topper list for a department and semester"""
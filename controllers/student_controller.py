@@ -1,11 +1,40 @@
 """
 Student Controller - Handles student CRUD operations
 """
-from typing import List, Optional, Tuple
-from database.db_manager import db
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from database.db_manager import db, in_chunks
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.attendance_rollup_controller import attendance_rollup_controller
+from controllers.attendance_archive_controller import attendance_archive_controller
+from controllers.student_search_controller import student_search_controller
+from controllers.department_controller import department_controller
 from utils.security import validate_email, validate_phone
 from utils.validators import validate_roll_number, validate_name, validate_semester, validate_gender, validate_date
-import pandas as pd
+from controllers.change_version_controller import change_version_controller
+
+if TYPE_CHECKING:
+    import pandas as pd  # Imported on first use, it is slow to load
+
+# Columns written by the bulk importer (optional ones may be absent from the file)
+IMPORT_COLUMNS = ['roll_number', 'name', 'department_id', 'semester', 'gender', 'date_of_birth',
+                  'email', 'phone', 'address', 'registration_no', 'cnic', 'father_name',
+                  'father_cnic', 'guardian_phone']
+IMPORT_CHUNK_SIZE = 1000
+# Sort expressions for the paged student list (NULLs sort as empty so keyset comparisons work)
+STUDENT_SORT_KEYS = {
+    'roll_number': "LOWER(COALESCE(s.roll_number, ''))",
+    'name': "LOWER(COALESCE(s.name, ''))",
+    'department_name': "LOWER(COALESCE(d.department_name, ''))",
+    'semester': "COALESCE(s.semester, 0)",
+    'gender': "LOWER(COALESCE(s.gender, ''))",
+    'date_of_birth': "COALESCE(s.date_of_birth, '')",
+    'phone': "COALESCE(s.phone, '')",
+    'email': "LOWER(COALESCE(s.email, ''))",
+    'father_name': "LOWER(COALESCE(s.father_name, ''))",
+    'cnic': "COALESCE(s.cnic, '')"
+}
+# Stop counting matches beyond this; the page label then shows "N+"
+STUDENT_COUNT_CAP = 10000
 
 
 class StudentController:
@@ -13,6 +42,13 @@ class StudentController:
     
     def get_all_students(self, include_inactive: bool = False) -> List[dict]:
         """Get all students with department information"""
+        return db.execute_query(self._all_students_query(include_inactive)) or []
+    
+    def iter_all_students(self, include_inactive: bool = False) -> Iterator[dict]:
+        """Stream all students with department information (for exports of any size)"""
+        return db.iter_query(self._all_students_query(include_inactive))
+    
+    def _all_students_query(self, include_inactive: bool) -> str:
         query = """
             SELECT s.*, d.department_name, d.department_code
             FROM students s
@@ -20,10 +56,7 @@ class StudentController:
         """
         if not include_inactive:
             query += " WHERE s.is_active = 1"
-        query += " ORDER BY s.roll_number"
-        
-        result = db.execute_query(query)
-        return [dict(row) for row in result] if result else []
+        return query + " ORDER BY s.roll_number"
     
     def get_students_by_department(self, department_id: int, semester: Optional[int] = None) -> List[dict]:
         """Get students by department and optionally by semester"""
@@ -66,8 +99,13 @@ class StudentController:
         result = db.execute_query(query, (roll_number.upper(),))
         return dict(result[0]) if result and len(result) > 0 else None
     
-    def search_students(self, search_term: str) -> List[dict]:
+    def search_students(self, search_term: str, limit: Optional[int] = None) -> List[dict]:
         """Search students by name, roll number, cnic, email or department"""
+        # Ranked full-text search when the index is available
+        ranked = student_search_controller.search(search_term, limit)
+        if ranked is not None:
+            return ranked
+        
         query = """
             SELECT s.*, d.department_name, d.department_code
             FROM students s
@@ -82,9 +120,125 @@ class StudentController:
             ORDER BY s.roll_number
         """
         search_pattern = f"%{search_term}%"
-        result = db.execute_query(query, (search_pattern, search_pattern, search_pattern, search_pattern, search_pattern))
+        params = [search_pattern] * 5
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        result = db.execute_query(query, tuple(params))
         return [dict(row) for row in result] if result else []
     
+    def get_students_page(self, department_id: Optional[int] = None, semester: Optional[int] = None,
+                          gender: Optional[str] = None, search_term: Optional[str] = None,
+                          sort_by: str = 'name', descending: bool = False,
+                          after: Optional[tuple] = None, offset: int = 0,
+                          limit: Optional[int] = 25) -> Dict:
+        """
+        Get one page of active students with filters and sorting done in SQL
+        
+        Pages are addressed by keyset: pass the previous page's next_cursor as
+        `after` to continue from it. `offset` is only meant for jumping to a page
+        whose cursor is not known yet.
+        
+        Args:
+            department_id, semester, gender, search_term: Optional filters
+            sort_by: One of STUDENT_SORT_KEYS
+            descending: Sort direction
+            after: (sort_key, student_id) of the last row already shown
+            offset: Rows to skip when no cursor is given
+            limit: Page size (None returns every matching row)
+        
+        Returns:
+            Dict with rows, next_cursor (None on the last page) and has_more
+        """
+        if sort_by not in STUDENT_SORT_KEYS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+        
+        sort_expr = STUDENT_SORT_KEYS[sort_by]
+        where, params = self._student_filters(department_id, semester, gender, search_term)
+        
+        if after is not None:
+            cmp = '<' if descending else '>'
+            where += f" AND ({sort_expr} {cmp} ? OR ({sort_expr} = ? AND s.student_id {cmp} ?))"
+            params.extend([after[0], after[0], after[1]])
+        
+        direction = 'DESC' if descending else 'ASC'
+        query = f"""
+            SELECT s.*, d.department_name, d.department_code, {sort_expr} as sort_key
+            FROM students s
+            LEFT JOIN departments d ON s.department_id = d.department_id
+            WHERE {where}
+            ORDER BY sort_key {direction}, s.student_id {direction}
+        """
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit + 1, offset if after is None else 0])
+        
+        rows = [dict(row) for row in db.execute_query(query, tuple(params)) or []]
+        has_more = limit is not None and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = (rows[-1]['sort_key'], rows[-1]['student_id'])
+        for row in rows:
+            row.pop('sort_key', None)
+        
+        return {'rows': rows, 'next_cursor': next_cursor, 'has_more': has_more}
+    
+    def count_students(self, department_id: Optional[int] = None, semester: Optional[int] = None,
+                       gender: Optional[str] = None, search_term: Optional[str] = None,
+                       cap: int = STUDENT_COUNT_CAP) -> Tuple[int, bool]:
+        """
+        Count active students matching the filters, stopping at `cap` rows
+        
+        Returns:
+            Tuple of (count: int, exact: bool) - exact is False when the cap was hit
+        """
+        where, params = self._student_filters(department_id, semester, gender, search_term)
+        query = f"""
+            SELECT COUNT(*) as total FROM (
+                SELECT 1 FROM students s
+                LEFT JOIN departments d ON s.department_id = d.department_id
+                WHERE {where}
+                LIMIT ?
+            ) matched
+        """
+        params.append(cap + 1)
+        result = db.execute_query(query, tuple(params))
+        total = int(result[0]['total']) if result else 0
+        if total > cap:
+            return cap, False
+        return total, True
+    
+    def _student_filters(self, department_id: Optional[int], semester: Optional[int],
+                         gender: Optional[str], search_term: Optional[str]) -> Tuple[str, list]:
+        """WHERE clause and parameters shared by the paged student queries"""
+        where = "s.is_active = 1"
+        params = []
+        
+        if department_id:
+            where += " AND s.department_id = ?"
+            params.append(department_id)
+        if semester:
+            where += " AND s.semester = ?"
+            params.append(semester)
+        if gender and gender != 'All':
+            where += " AND s.gender = ?"
+            params.append(gender)
+        if search_term and search_term.strip():
+            indexed = student_search_controller.match_clause(search_term)
+            if indexed is not None:
+                where += f" AND s.student_id IN ({indexed[0]})"
+                params.extend(indexed[1])
+            else:
+                pattern = f"%{search_term.strip()}%"
+                where += " AND (s.name LIKE ? OR s.roll_number LIKE ? OR s.email LIKE ?)"
+                params.extend([pattern, pattern, pattern])
+        
+        return where, params
+    
     def create_student(self, roll_number: str, name: str, department_id: int, semester: int,
                       gender: str, date_of_birth: str, email: str = None, 
                       phone: str = None, address: str = None, registration_no: str = None,
@@ -134,8 +288,9 @@ class StudentController:
             email, phone, address, registration_no, cnic, father_name, father_cnic, guardian_phone
         )
         
-        success, row_id = db.execute_update(query, params)
+        success, row_id = change_version_controller.execute_update(('students',), query, params)
         if success:
+            student_search_controller.refresh_students([row_id])
             return True, "Student created successfully", row_id
         return False, "Failed to create student", None
     
@@ -193,14 +348,15 @@ class StudentController:
                 cnic = ?, father_name = ?, father_cnic = ?, guardian_phone = ?
             WHERE student_id = ?
         """
-        success, _ = db.execute_update(
-            query,
+        success, _ = change_version_controller.execute_update(
+            ('students',), query,
             (roll_number.upper(), name.strip(), department_id, semester, gender,
              date_of_birth, email, phone, address, registration_no, cnic,
              father_name, father_cnic, guardian_phone, student_id)
         )
         
         if success:
+            student_search_controller.refresh_students([student_id])
             return True, "Student updated successfully"
         else:
             return False, "Failed to update student"
@@ -223,14 +379,28 @@ class StudentController:
             # Delete results
             db.execute_update("DELETE FROM results WHERE student_id = %s", (student_id,))
             
+            # Delete GPA ledger rows
+            if gpa_ledger_controller.ensure_table():
+                db.execute_update("DELETE FROM gpa_ledger WHERE student_id = ?", (student_id,))
+            
+            # Drop the student from the search index
+            student_search_controller.remove_students([student_id])
+            
             # Delete attendance records if they exist
             db.execute_update("DELETE FROM student_attendance WHERE student_id = %s", (student_id,))
+            if attendance_rollup_controller.ensure_table():
+                db.execute_update("DELETE FROM attendance_rollup WHERE student_id = ?", (student_id,))
+            if attendance_archive_controller.ensure_table():
+                db.execute_update("DELETE FROM attendance_archive WHERE student_id = ?", (student_id,))
             
             # Delete user account if linked
             db.execute_update("DELETE FROM users WHERE student_id = %s", (student_id,))
             
-            # Delete the student
-            success, _ = db.execute_update("DELETE FROM students WHERE student_id = %s", (student_id,))
+            # Delete the student (other PCs drop their copies of every table touched above)
+            success, _ = change_version_controller.execute_update(
+                ('students', 'marks', 'results', 'users'),
+                "DELETE FROM students WHERE student_id = %s", (student_id,)
+            )
             
             if success:
                 return True, "Student and all related records deleted successfully"
@@ -242,7 +412,7 @@ class StudentController:
     def deactivate_student(self, student_id: int) -> Tuple[bool, str]:
         """Deactivate a student"""
         query = "UPDATE students SET is_active = 0 WHERE student_id = ?"
-        success, _ = db.execute_update(query, (student_id,))
+        success, _ = change_version_controller.execute_update(('students',), query, (student_id,))
         
         if success:
             return True, "Student deactivated successfully"
@@ -252,83 +422,233 @@ class StudentController:
     def activate_student(self, student_id: int) -> Tuple[bool, str]:
         """Activate a student"""
         query = "UPDATE students SET is_active = 1 WHERE student_id = ?"
-        success, _ = db.execute_update(query, (student_id,))
+        success, _ = change_version_controller.execute_update(('students',), query, (student_id,))
         
         if success:
             return True, "Student activated successfully"
         else:
             return False, "Failed to activate student"
     
-    def bulk_import_students(self, file_path: str) -> Tuple[bool, str, int]:
+    def bulk_import_students(self, file_path: str, dry_run: bool = False) -> Tuple[bool, str, int]:
         """
         Import students from CSV/Excel file
         
         Expected columns: roll_number, name, department_code, semester, gender, 
                          date_of_birth, email, phone, address
         
+        Args:
+            file_path: CSV or Excel file
+            dry_run: Only validate the file, do not insert anything
+        
         Returns:
             Tuple of (success: bool, message: str, imported_count: int)
+            (in dry-run mode the count is the number of rows that would be imported)
+        """
+        report = self.import_students_report(file_path, dry_run=dry_run)
+        if report['message']:
+            return False, report['message'], 0
+        
+        errors = [f"Row {item['row']}: {'; '.join(item['errors'])}" for item in report['errors']]
+        if dry_run:
+            error_msg = f"\n{len(errors)} rows have errors:\n" + "\n".join(errors[:10]) if errors else ""
+            return not errors, f"{report['valid']} of {report['total']} rows are ready to import.{error_msg}", report['valid']
+        
+        imported_count = report['imported']
+        if imported_count > 0:
+            error_msg = f"\n{len(errors)} errors occurred:\n" + "\n".join(errors[:5]) if errors else ""
+            return True, f"Imported {imported_count} students successfully.{error_msg}", imported_count
+        else:
+            return False, f"No students imported. Errors:\n" + "\n".join(errors[:10]), 0
+    
+    def import_students_report(self, file_path: str, dry_run: bool = False) -> Dict:
+        """
+        Validate and import a student file column by column
+        
+        Department codes are resolved with one merge, duplicate roll numbers with
+        one set lookup, and valid rows are inserted with chunked executemany in
+        a single transaction.
+        
+        Args:
+            file_path: CSV or Excel file
+            dry_run: Only validate the file, do not insert anything
+        
+        Returns:
+            Dict with total, valid, imported, dry_run, message (set when the whole
+            file is rejected) and errors: [{'row', 'roll_number', 'errors': [...]}]
         """
+        import pandas as pd
+        
+        report = {'total': 0, 'valid': 0, 'imported': 0, 'dry_run': dry_run,
+                  'message': None, 'errors': []}
         try:
-            # Read file
+            # Read everything as text so phone numbers keep their leading zeros
             if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
+                df = pd.read_csv(file_path, dtype=str)
             elif file_path.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, dtype=str)
             else:
-                return False, "Unsupported file format. Use CSV or Excel.", 0
-            
-            # Validate required columns
-            required_cols = ['roll_number', 'name', 'department_code', 'semester', 'gender', 'date_of_birth']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                return False, f"Missing required columns: {', '.join(missing_cols)}", 0
-            
-            imported_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Get department ID from code
-                    dept_result = db.execute_query(
-                        "SELECT department_id FROM departments WHERE department_code = ?",
-                        (str(row['department_code']).upper(),)
-                    )
-                    if not dept_result:
-                        errors.append(f"Row {index + 2}: Department code '{row['department_code']}' not found")
-                        continue
-                    
-                    department_id = dept_result[0]['department_id']
-                    
-                    # Create student
-                    success, msg, _ = self.create_student(
-                        roll_number=str(row['roll_number']),
-                        name=str(row['name']),
-                        department_id=department_id,
-                        semester=int(row['semester']),
-                        gender=str(row['gender']),
-                        date_of_birth=str(row['date_of_birth']),
-                        email=str(row.get('email', '')) if pd.notna(row.get('email')) else None,
-                        phone=str(row.get('phone', '')) if pd.notna(row.get('phone')) else None,
-                        address=str(row.get('address', '')) if pd.notna(row.get('address')) else None
-                    )
-                    
-                    if success:
-                        imported_count += 1
-                    else:
-                        errors.append(f"Row {index + 2}: {msg}")
-                
-                except Exception as e:
-                    errors.append(f"Row {index + 2}: {str(e)}")
-            
-            if imported_count > 0:
-                error_msg = f"\n{len(errors)} errors occurred:\n" + "\n".join(errors[:5]) if errors else ""
-                return True, f"Imported {imported_count} students successfully.{error_msg}", imported_count
-            else:
-                return False, f"No students imported. Errors:\n" + "\n".join(errors[:10]), 0
+                report['message'] = "Unsupported file format. Use CSV or Excel."
+                return report
+        except Exception as e:
+            report['message'] = f"Import failed: {str(e)}"
+            return report
+        
+        # Validate required columns
+        required_cols = ['roll_number', 'name', 'department_code', 'semester', 'gender', 'date_of_birth']
+        missing_cols = [col for col in required_cols if col not in df.columns]
+        if missing_cols:
+            report['message'] = f"Missing required columns: {', '.join(missing_cols)}"
+            return report
         
+        report['total'] = len(df)
+        if df.empty:
+            return report
+        
+        rows, errors = self._prepare_import_frame(df)
+        report['valid'] = len(rows)
+        report['errors'] = errors
+        
+        if dry_run or rows.empty:
+            return report
+        
+        query = f"""
+            INSERT INTO students ({', '.join(IMPORT_COLUMNS)})
+            VALUES ({', '.join(['?'] * len(IMPORT_COLUMNS))})
+        """
+        # NaN -> None so optional columns are stored as NULL
+        params = [
+            tuple(None if pd.isna(value) else value for value in record)
+            for record in rows[IMPORT_COLUMNS].itertuples(index=False, name=None)
+        ]
+        search_indexed = student_search_controller.ensure_index()
+        try:
+            with db.transaction():
+                for i in range(0, len(params), IMPORT_CHUNK_SIZE):
+                    db.execute_many(query, params[i:i + IMPORT_CHUNK_SIZE])
+                
+                if search_indexed:
+                    self._index_imported(rows['roll_number'].tolist())
+                change_version_controller.bump('students')
+            report['imported'] = len(params)
         except Exception as e:
-            return False, f"Import failed: {str(e)}", 0
+            report['message'] = f"Import failed: {str(e)}"
+        return report
+    
+    def _index_imported(self, roll_numbers: List[str]):
+        """Add freshly imported students to the search index"""
+        student_ids = []
+        for chunk, placeholders in in_chunks(roll_numbers):
+            rows = db.execute_query(
+                f"SELECT student_id FROM students WHERE roll_number IN ({placeholders})", chunk
+            ) or []
+            student_ids.extend(row['student_id'] for row in rows)
+        student_search_controller.refresh_students(student_ids)
+    
+    def _prepare_import_frame(self, df: 'pd.DataFrame') -> Tuple['pd.DataFrame', List[dict]]:
+        """Normalize and validate an import frame; returns (valid rows, per-row errors)"""
+        import pandas as pd
+        
+        df = df.copy()
+        df['_row'] = df.index + 2  # Spreadsheet row number (header is row 1)
+        df = df.drop(columns=['department_id'], errors='ignore')
+        for col in IMPORT_COLUMNS:
+            if col not in df.columns and col != 'department_id':
+                df[col] = None
+        
+        text_cols = ['roll_number', 'name', 'gender', 'email', 'phone', 'address', 'registration_no',
+                     'cnic', 'father_name', 'father_cnic', 'guardian_phone']
+        for col in text_cols:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str).str.strip())
+            df[col] = df[col].replace('', None)
+        
+        df['roll_number'] = df['roll_number'].str.upper()
+        df['gender'] = df['gender'].str.capitalize()
+        
+        # Resolve department codes with one merge
+        departments = pd.DataFrame(
+            department_controller.get_all_departments(include_inactive=True),
+            columns=['department_id', 'department_code']
+        )
+        departments['_code'] = departments['department_code'].astype(str).str.upper()
+        departments = departments.drop_duplicates('_code')
+        df['_code'] = df['department_code'].astype(str).str.strip().str.upper()
+        df = df.merge(departments[['_code', 'department_id']], on='_code', how='left')
+        
+        # Excel date cells read as text carry a midnight time
+        df['date_of_birth'] = df['date_of_birth'].str.replace(r'\s00:00:00$', '', regex=True)
+        semester = pd.to_numeric(df['semester'], errors='coerce')
+        dob = pd.to_datetime(df['date_of_birth'], format='%Y-%m-%d', errors='coerce')
+        
+        # Existing roll numbers in one query, duplicates inside the file by first occurrence
+        existing_rolls = {
+            str(row['roll_number']).upper()
+            for row in db.execute_query("SELECT roll_number FROM students") or []
+        }
+        
+        # Field checks use the same validators as create_student/update_student
+        checks = [
+            self._column_errors(df['roll_number'], validate_roll_number),
+            (df['roll_number'].isin(existing_rolls), "Roll number already exists"),
+            (df['roll_number'].notna() & df['roll_number'].duplicated(keep='first'),
+             "Duplicate roll number in file"),
+            self._column_errors(df['name'], validate_name),
+            (df['department_id'].isna(), "Department code not found"),
+            self._column_errors(semester, lambda value: validate_semester(value) if pd.notna(value)
+                                else (False, "Semester must be between 1 and 8")),
+            self._column_errors(df['gender'], validate_gender),
+            self._column_errors(df['date_of_birth'], lambda value: validate_date(value or '')),
+            self._column_errors(df['email'], lambda value: (validate_email(value), "Invalid email format"),
+                                optional=True),
+            self._column_errors(df['phone'], lambda value: (
+                validate_phone(value), "Invalid phone number format (must be 11 digits)"), optional=True),
+            self._column_errors(df['guardian_phone'], lambda value: (
+                validate_phone(value), "Invalid guardian phone number format (must be 11 digits)"), optional=True),
+        ]
+        df['date_of_birth'] = dob.dt.strftime('%Y-%m-%d')
+        
+        messages = pd.Series([[] for _ in range(len(df))], index=df.index)
+        for check in checks:
+            if isinstance(check, tuple):
+                mask, message = check
+                check = pd.Series(message, index=df.index).where(mask.fillna(True).astype(bool))
+            for idx, message in check.dropna().items():
+                messages[idx].append(message)
+        
+        failed = messages.str.len() > 0
+        errors = [
+            {'row': int(df.at[idx, '_row']),
+             'roll_number': None if pd.isna(df.at[idx, 'roll_number']) else df.at[idx, 'roll_number'],
+             'errors': messages[idx]}
+            for idx in df.index[failed]
+        ]
+        
+        valid = df[~failed].copy()
+        valid['department_id'] = valid['department_id'].astype(int)
+        valid['semester'] = semester[~failed].astype(int)
+        return valid, errors
+    
+    def _column_errors(self, values: 'pd.Series', validator, optional: bool = False) -> 'pd.Series':
+        """
+        Run a row validator once per distinct value of a column
+        
+        Args:
+            values: Column to check
+            validator: Returns a tuple whose first item is the verdict and last the message
+            optional: Skip empty cells instead of validating them
+        
+        Returns:
+            Series with the error message of each failing row (None where valid)
+        """
+        import pandas as pd
+        
+        verdicts = {}
+        for value in values.drop_duplicates():
+            value = None if pd.isna(value) else value
+            if value is None and optional:
+                continue
+            result = validator(value)
+            verdicts[value] = None if result[0] else result[-1]
+        return values.map(lambda value: verdicts.get(None if pd.isna(value) else value))
 
 
 # Global student controller instance
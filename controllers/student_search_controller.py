@@ -0,0 +1,221 @@
+"""
+Student Search Controller - Full-text index over the student search fields
+FTS5 with the trigram tokenizer on SQLite, a FULLTEXT index with the ngram
+parser on MySQL/TiDB; both match substrings, like the LIKE '%term%' search.
+Callers fall back to LIKE queries whenever the index is unavailable.
+"""
+import re
+from typing import List, Optional, Tuple
+from database.db_manager import db, in_chunks
+import config
+
+
+SQLITE_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS student_search USING fts5(
+        name, roll_number, email, cnic, department_name, tokenize='trigram'
+    )
+"""
+
+MYSQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS student_search (
+        student_id INT PRIMARY KEY,
+        name VARCHAR(100),
+        roll_number VARCHAR(50),
+        email VARCHAR(100),
+        cnic VARCHAR(15),
+        department_name VARCHAR(100),
+        FULLTEXT KEY ft_student_search (name, roll_number, email, cnic, department_name) WITH PARSER ngram,
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+SEARCH_COLUMNS = ['name', 'roll_number', 'email', 'cnic', 'department_name']
+
+# MySQL's ngram parser cannot match terms shorter than ngram_token_size (default 2)
+MYSQL_MIN_TERM_LENGTH = 2
+
+# SQLite's trigram tokenizer cannot match terms shorter than three characters
+SQLITE_MIN_TERM_LENGTH = 3
+
+
+class StudentSearchController:
+    """Maintains and queries the student_search index"""
+
+    def __init__(self):
+        self._available = None
+
+    def ensure_index(self) -> bool:
+        """
+        Create the index on first use and fill it if it is out of step with students
+        (call outside of db.transaction())
+
+        Returns:
+            bool: True if full-text search can be used
+        """
+        if self._available is not None:
+            return self._available
+
+        if not config.USE_MYSQL:
+            self._drop_word_index()
+        if not db.ensure_schema('student_search', SQLITE_SCHEMA, MYSQL_SCHEMA):
+            self._available = False
+            return False
+
+        indexed = db.execute_query("SELECT COUNT(*) as total FROM student_search")
+        students = db.execute_query("SELECT COUNT(*) as total FROM students")
+        if indexed is None or students is None:
+            self._available = False
+            return False
+
+        self._available = True
+        if indexed[0]['total'] != students[0]['total']:
+            self.rebuild_index()
+        return True
+
+    def match_clause(self, search_term: str) -> Optional[Tuple[str, list]]:
+        """
+        SQL condition selecting the student_ids that match a search term
+
+        Every word must appear somewhere in the indexed fields, as with LIKE
+        ("023" finds "CS-2023-001", "ali han" finds "Ali Khan").
+
+        Returns:
+            Tuple of (sql, params) for use as "s.student_id IN (sql)", or None to use LIKE
+        """
+        expression = self._match_expression(search_term)
+        if expression is None or not self.ensure_index():
+            return None
+
+        if config.USE_MYSQL:
+            sql = (f"SELECT student_id FROM student_search "
+                   f"WHERE MATCH({', '.join(SEARCH_COLUMNS)}) AGAINST (? IN BOOLEAN MODE)")
+        else:
+            sql = "SELECT rowid FROM student_search WHERE student_search MATCH ?"
+        return sql, [expression]
+
+    def search(self, search_term: str, limit: Optional[int] = None) -> Optional[List[dict]]:
+        """
+        Ranked search over active students
+
+        Returns:
+            List of student dicts (best match first), or None if the index cannot be used
+        """
+        expression = self._match_expression(search_term)
+        if expression is None or not self.ensure_index():
+            return None
+
+        if config.USE_MYSQL:
+            match = f"MATCH(f.{', f.'.join(SEARCH_COLUMNS)}) AGAINST (? IN BOOLEAN MODE)"
+            query = f"""
+                SELECT s.*, d.department_name, d.department_code, {match} as score
+                FROM student_search f
+                JOIN students s ON s.student_id = f.student_id
+                LEFT JOIN departments d ON s.department_id = d.department_id
+                WHERE {match} AND s.is_active = 1
+                ORDER BY score DESC, s.roll_number
+            """
+            params = [expression, expression]
+        else:
+            query = """
+                SELECT s.*, d.department_name, d.department_code
+                FROM student_search f
+                JOIN students s ON s.student_id = f.rowid
+                LEFT JOIN departments d ON s.department_id = d.department_id
+                WHERE student_search MATCH ? AND s.is_active = 1
+                ORDER BY f.rank, s.roll_number
+            """
+            params = [expression]
+
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        result = db.execute_query(query, tuple(params))
+        if result is None:
+            return None
+        rows = [dict(row) for row in result]
+        for row in rows:
+            row.pop('score', None)
+        return rows
+
+    def refresh_students(self, student_ids: List[int]):
+        """Re-index specific students (drops the ones that no longer exist)"""
+        if not student_ids or not self.ensure_index():
+            return
+
+        key = 'student_id' if config.USE_MYSQL else 'rowid'
+        student_ids = sorted(set(student_ids))
+        with db.transaction():
+            for chunk, placeholders in in_chunks(student_ids):
+                db.execute_update(f"DELETE FROM student_search WHERE {key} IN ({placeholders})", chunk)
+                db.execute_update(self._insert_select(key) + f" WHERE s.student_id IN ({placeholders})", chunk)
+
+    def refresh_department(self, department_id: int):
+        """Re-index every student of a department (after a rename)"""
+        if not self.ensure_index():
+            return
+
+        rows = db.execute_query("SELECT student_id FROM students WHERE department_id = ?", (department_id,))
+        self.refresh_students([row['student_id'] for row in rows or []])
+
+    def remove_students(self, student_ids: List[int]):
+        """Drop students from the index"""
+        if not student_ids or not self.ensure_index():
+            return
+
+        key = 'student_id' if config.USE_MYSQL else 'rowid'
+        for chunk, placeholders in in_chunks(sorted(set(student_ids))):
+            db.execute_update(f"DELETE FROM student_search WHERE {key} IN ({placeholders})", chunk)
+
+    def rebuild_index(self) -> bool:
+        """Rebuild the whole index from the students table"""
+        if self._available is None and not self.ensure_index():
+            return False
+        if not self._available:
+            return False
+
+        key = 'student_id' if config.USE_MYSQL else 'rowid'
+        try:
+            with db.transaction():
+                db.execute_update("DELETE FROM student_search")
+                db.execute_update(self._insert_select(key))
+            return True
+        except Exception as e:
+            print(f"✗ Search index rebuild error: {e}")
+            return False
+
+    def _drop_word_index(self):
+        """Drop an index built by the earlier word tokenizer; it only matched word prefixes"""
+        result = db.execute_query(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'student_search'"
+        )
+        if result and 'trigram' not in (result[0]['sql'] or ''):
+            db.execute_update("DROP TABLE student_search")
+
+    def _insert_select(self, key: str) -> str:
+        """INSERT ... SELECT copying student search fields into the index"""
+        return f"""
+            INSERT INTO student_search ({key}, {', '.join(SEARCH_COLUMNS)})
+            SELECT s.student_id, s.name, s.roll_number, s.email, s.cnic, d.department_name
+            FROM students s
+            LEFT JOIN departments d ON s.department_id = d.department_id
+        """
+
+    def _match_expression(self, search_term: str) -> Optional[str]:
+        """Turn user input into an FTS5 / boolean-mode query, or None if it cannot be indexed"""
+        if config.USE_MYSQL:
+            words = [re.sub(r'[^\w@.\-]', '', word) for word in (search_term or '').split()]
+            words = [word for word in words if re.search(r'\w', word)]
+            if not words or any(len(word) < MYSQL_MIN_TERM_LENGTH for word in words):
+                return None
+            return ' '.join(f'+"{word}"' for word in words)
+
+        # Trigram phrases match anywhere in a field; short terms go to LIKE instead
+        words = (search_term or '').split()
+        if not words or any(len(word) < SQLITE_MIN_TERM_LENGTH for word in words):
+            return None
+        return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+# Global instance
+student_search_controller = StudentSearchController()
@@ -3,7 +3,6 @@ Transcript Controller - Handles transcript data retrieval and PDF generation
 """
 from typing import Tuple, List, Optional
 from database.db_manager import db
-from utils.pdf_generator import pdf_generator
 import os
 
 
@@ -67,6 +66,60 @@ class TranscriptController:
             traceback.print_exc()
             return None, None
     
+    def get_transcript_data_batch(self, department_id: int, semester: Optional[int] = None) -> List[Tuple[dict, List[dict]]]:
+        """
+        Transcript data for every active student of a department in two queries
+
+        Args:
+            department_id: Department ID
+            semester: Only students currently in this semester (all if None)
+
+        Returns:
+            List of (student_data, marks_data) ordered by roll number,
+            students without marks are left out
+        """
+        where = "s.department_id = ? AND s.is_active = 1"
+        params = [department_id]
+        if semester is not None:
+            where += " AND s.semester = ?"
+            params.append(semester)
+
+        students = db.execute_query(f"""
+            SELECT s.*, d.department_name, d.department_code
+            FROM students s
+            LEFT JOIN departments d ON s.department_id = d.department_id
+            WHERE {where}
+            ORDER BY s.roll_number
+        """, tuple(params))
+        if not students:
+            return []
+
+        marks = db.execute_query(f"""
+            SELECT
+                m.student_id,
+                c.course_name,
+                c.course_code,
+                c.credits,
+                c.semester,
+                c.max_marks as total_marks,
+                m.marks_obtained as obtained_marks,
+                m.grade,
+                m.status
+            FROM marks m
+            JOIN courses c ON m.course_id = c.course_id
+            JOIN students s ON m.student_id = s.student_id
+            WHERE {where}
+            ORDER BY c.semester, c.course_name
+        """, tuple(params)) or []
+
+        marks_by_student = {}
+        for row in marks:
+            row = dict(row)
+            marks_by_student.setdefault(row.pop('student_id'), []).append(row)
+
+        return [(dict(student), marks_by_student[student['student_id']])
+                for student in students if student['student_id'] in marks_by_student]
+
     def generate_transcript_pdf(self, student_id: int, output_path: str, university_data: dict = None) -> Tuple[bool, str]:
         """
         Generate transcript PDF for a student
@@ -89,7 +142,8 @@ class TranscriptController:
             if not marks_data:
                 return False, "No marks data found for this student"
             
-            # Generate PDF
+            # Generate PDF (ReportLab is only loaded when a document is rendered)
+            from utils.pdf_generator import pdf_generator
             success = pdf_generator.generate_transcript(
                 student_data=student_data,
                 marks_data=marks_data,
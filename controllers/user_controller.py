@@ -3,6 +3,8 @@ User Controller - Manages user CRUD operations
 """
 from database.db_manager import DatabaseManager
 from utils.security import hash_password, verify_password
+from utils.reference_cache import ReferenceCache, Uncached
+from controllers.change_version_controller import change_version_controller
 
 
 class UserController:
@@ -10,6 +12,8 @@ class UserController:
     
     def __init__(self):
         self.db = DatabaseManager()
+        # User lists for combos and lookups, dropped whenever the users table is written
+        self._cache = ReferenceCache('users', tables=('users',))
     
     
     def get_all_users(self):
@@ -19,7 +23,7 @@ class UserController:
             FROM users
             ORDER BY created_at DESC
         """
-        return self.db.execute_query(query)
+        return self._cache.get(('all',), lambda: self._rows(query))
     
     def get_users_by_role(self, role):
         """Get all users with a specific role"""
@@ -29,20 +33,32 @@ class UserController:
             WHERE role = ? AND is_active = 1
             ORDER BY full_name
         """
-        return self.db.execute_query(query, (role,))
+        return self._cache.get(('role', role), lambda: self._rows(query, (role,)))
     
     
     def get_user_by_id(self, user_id):
         """Get user by ID"""
         query = "SELECT * FROM users WHERE user_id = ?"
-        results = self.db.execute_query(query, (user_id,))
-        return results[0] if results else None
+        return self._cache.get(('id', user_id), lambda: self._first(query, user_id))
     
     
     def get_user_by_username(self, username):
         """Get user by username"""
         query = "SELECT * FROM users WHERE username = ?"
-        results = self.db.execute_query(query, (username,))
+        return self._cache.get(('username', username), lambda: self._first(query, username))
+    
+    def cache_stats(self):
+        """Hit/miss metrics of the user lookup cache"""
+        return self._cache.stats()
+    
+    def _rows(self, query, params=()):
+        results = self.db.execute_query(query, params)
+        return Uncached(None) if results is None else results
+    
+    def _first(self, query, value):
+        results = self.db.execute_query(query, (value,))
+        if results is None:
+            return Uncached(None)
         return results[0] if results else None
     
     def create_user(self, username, password, full_name, role='Viewer', email=None, department_id=None, roll_number=None, assigned_subject_id=None):
@@ -79,13 +95,7 @@ class UserController:
             
             # Find student by roll number
             from controllers.student_controller import student_controller
-            students = student_controller.search_students(roll_number)
-            
-            matching_student = None
-            for student in students:
-                if student['roll_number'].lower() == roll_number.lower().strip():
-                    matching_student = student
-                    break
+            matching_student = student_controller.get_student_by_roll_number(roll_number.strip())
             
             if not matching_student:
                 return False, f"No student found with roll number: {roll_number}", None
@@ -113,7 +123,9 @@ class UserController:
         """
         
         try:
-            success, user_id = self.db.execute_update(query, (username, hashed_password, full_name, role, email, department_id, student_id, assigned_subject_id))
+            success, user_id = change_version_controller.execute_update(
+                ('users',), query, (username, hashed_password, full_name, role, email, department_id, student_id, assigned_subject_id)
+            )
             if success:
                 return True, "User created successfully", user_id
             else:
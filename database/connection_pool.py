@@ -0,0 +1,209 @@
+"""
+Connection Pool - Thread-aware pool of database connections
+Each thread checks out its own connection so background loaders, backups and
+report generation never share a cursor with the GUI thread.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Any
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the pool timeout"""
+    pass
+
+
+class PooledConnection:
+    """Bookkeeping wrapper around a raw DB-API connection"""
+
+    __slots__ = ('raw', 'created_at', 'last_used')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool that binds one connection to each thread that uses it.
+
+    A thread keeps its connection until it calls release() (or dies), so every
+    query issued from that thread reuses the same connection and transactions
+    stay on one session. Idle connections are health-checked before reuse.
+    """
+
+    def __init__(self, factory: Callable[[], Any], health_check: Callable[[Any], None],
+                 size: int = 5, timeout: float = 30.0, ping_interval: float = 60.0):
+        """
+        Args:
+            factory: Callable returning a new raw connection
+            health_check: Callable raising an exception if a connection is unusable
+            size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection before giving up
+            ping_interval: Connections idle for longer than this are health-checked
+        """
+        self._factory = factory
+        self._health_check = health_check
+        self._size = max(1, int(size))
+        self._timeout = timeout
+        self._ping_interval = ping_interval
+
+        self._lock = threading.Condition()
+        self._idle: List[PooledConnection] = []
+        self._owners: Dict[int, Tuple[threading.Thread, PooledConnection]] = {}
+        self._created = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def owns_connection(self) -> bool:
+        """Check if the calling thread currently holds a connection"""
+        with self._lock:
+            return threading.get_ident() in self._owners
+
+    def acquire(self):
+        """Return the calling thread's connection, checking one out if needed"""
+        ident = threading.get_ident()
+
+        with self._lock:
+            owned = self._owners.get(ident)
+
+        if owned is not None:
+            pooled = owned[1]
+            if time.monotonic() - pooled.last_used > self._ping_interval:
+                pooled = self._ensure_healthy(pooled)
+                with self._lock:
+                    self._owners[ident] = (threading.current_thread(), pooled)
+            pooled.last_used = time.monotonic()
+            return pooled.raw
+
+        pooled = self._checkout()
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            self._owners[ident] = (threading.current_thread(), pooled)
+        return pooled.raw
+
+    def release(self):
+        """Return the calling thread's connection to the pool"""
+        with self._lock:
+            owned = self._owners.pop(threading.get_ident(), None)
+
+        if owned is None:
+            return
+
+        pooled = owned[1]
+        try:
+            # Never hand over a connection with a half-finished transaction
+            pooled.raw.rollback()
+        except Exception:
+            self._discard(pooled)
+            return
+
+        with self._lock:
+            self._idle.append(pooled)
+            self._lock.notify()
+
+    def close_all(self):
+        """Close every connection, idle or checked out, and reset the pool"""
+        with self._lock:
+            connections = list(self._idle) + [pooled for _, pooled in self._owners.values()]
+            self._idle.clear()
+            self._owners.clear()
+            self._created = 0
+            self._lock.notify_all()
+
+        for pooled in connections:
+            self._close_raw(pooled)
+
+    def stats(self) -> Dict[str, int]:
+        """Get current pool usage"""
+        with self._lock:
+            return {
+                'size': self._size,
+                'open': self._created,
+                'idle': len(self._idle),
+                'in_use': len(self._owners)
+            }
+
+    def _checkout(self) -> PooledConnection:
+        """Take an idle connection or open a new one, waiting if the pool is exhausted"""
+        deadline = time.monotonic() + self._timeout
+        pooled = None
+
+        with self._lock:
+            while True:
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._created < self._size:
+                    self._created += 1
+                    break
+                if self._reclaim_dead_threads():
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self._timeout:.0f}s "
+                        f"(pool size {self._size})"
+                    )
+                self._lock.wait(remaining)
+
+        if pooled is None:
+            return self._open()
+
+        if time.monotonic() - pooled.last_used > self._ping_interval:
+            pooled = self._ensure_healthy(pooled)
+        return pooled
+
+    def _open(self) -> PooledConnection:
+        """Open a new connection for a slot already reserved in _created"""
+        try:
+            return PooledConnection(self._factory())
+        except Exception:
+            with self._lock:
+                self._created -= 1
+                self._lock.notify()
+            raise
+
+    def _ensure_healthy(self, pooled: PooledConnection) -> PooledConnection:
+        """Health-check a connection, replacing it with a fresh one if it is dead"""
+        try:
+            self._health_check(pooled.raw)
+            return pooled
+        except Exception:
+            print("⚠ Database connection lost, reconnecting...")
+            self._close_raw(pooled)
+            # The slot stays reserved for the replacement connection
+            return self._open()
+
+    def _reclaim_dead_threads(self) -> bool:
+        """Move connections held by finished threads back to the idle list (lock held)"""
+        reclaimed = False
+        for ident, (thread, pooled) in list(self._owners.items()):
+            if not thread.is_alive():
+                del self._owners[ident]
+                try:
+                    pooled.raw.rollback()
+                    self._idle.append(pooled)
+                except Exception:
+                    self._close_raw(pooled)
+                    self._created -= 1
+                reclaimed = True
+        return reclaimed
+
+    def _discard(self, pooled: PooledConnection):
+        """Drop a broken connection and free its slot"""
+        self._close_raw(pooled)
+        with self._lock:
+            self._created -= 1
+            self._lock.notify()
+
+    @staticmethod
+    def _close_raw(pooled: PooledConnection):
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
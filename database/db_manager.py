@@ -4,10 +4,17 @@ Supports both SQLite (default) and MySQL (configured via config.json)
 """
 import os
 import shutil
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Tuple, Any
+from decimal import Decimal
+from typing import Optional, List, Tuple, Any, Iterable, Iterator
 import config
+from database.connection_pool import ConnectionPool
+from database.query_monitor import QueryMonitor, QueryCounter
 from utils.resource_helper import resource_path
+from utils.reference_cache import invalidate_all
 
 # Import database drivers based on configuration
 if config.USE_MYSQL:
@@ -16,12 +23,44 @@ if config.USE_MYSQL:
 else:
     import sqlite3
 
+# Values per IN (...) list, well below driver/server parameter limits
+IN_LIST_SIZE = 500
+
+
+def in_chunks(values: Iterable, size: int = IN_LIST_SIZE) -> Iterator[Tuple[tuple, str]]:
+    """
+    Split values for WHERE column IN (...) queries
+    
+    Usage:
+        for chunk, placeholders in in_chunks(student_ids):
+            db.execute_query(f"SELECT ... WHERE student_id IN ({placeholders})", chunk)
+    
+    Yields:
+        (chunk, placeholders): a tuple of at most `size` values and the matching '?, ?, ...'
+    """
+    values = list(values)
+    for start in range(0, len(values), size):
+        chunk = tuple(values[start:start + size])
+        yield chunk, ', '.join(['?'] * len(chunk))
+
 
 class DatabaseManager:
     """Singleton Database Manager for SQLite and MySQL operations"""
     
     _instance = None
-    _connection = None
+    _pool = None
+    _connect_lock = threading.Lock()  # Only one thread creates the pool
+    _warm_up_thread = None
+    _local = threading.local()  # Per-thread transaction depth
+    _window_updates = None  # Cached capability probe, see supports_window_updates()
+    _ensured_schemas = set()  # Feature tables already created this process
+    query_monitor = QueryMonitor(
+        enabled=config.DB_QUERY_STATS_ENABLED,
+        slow_query_ms=config.DB_SLOW_QUERY_MS,
+        history_size=config.DB_QUERY_HISTORY_SIZE,
+        log_dir=os.path.join(os.path.dirname(config.DATABASE_PATH), 'logs'),
+        base_dir=config.BASE_DIR
+    )
     
     def __new__(cls):
         if cls._instance is None:
@@ -29,25 +68,51 @@ class DatabaseManager:
         return cls._instance
     
     def __init__(self):
-        """Initialize database connection"""
-        if self._connection is None:
+        """Initialize database connection pool (deferred to first use unless DB_CONNECT_MODE is 'eager')"""
+        if self._pool is None and config.DB_CONNECT_MODE == 'eager':
             self.connect()
     
     def connect(self):
-        """Establish database connection (MySQL or SQLite based on config)"""
+        """Create the connection pool (MySQL or SQLite based on config) and check out a first connection"""
+        with self._connect_lock:
+            if self._pool is None:
+                self._create_pool()
+        self._pool.acquire()
+    
+    def _create_pool(self):
+        """Open the pool and its first connection (caller holds _connect_lock)"""
         try:
             if config.USE_MYSQL:
-                self._connect_mysql()
+                factory, health_check = self._connect_mysql, self._ping_mysql
             else:
-                self._connect_sqlite()
+                factory, health_check = self._connect_sqlite, self._ping_sqlite
+            
+            pool = ConnectionPool(
+                factory,
+                health_check,
+                size=config.DB_POOL_SIZE,
+                timeout=config.DB_POOL_TIMEOUT,
+                ping_interval=config.DB_POOL_PING_INTERVAL
+            )
+            pool.acquire()
+            DatabaseManager._pool = pool
+            
+            if config.USE_MYSQL:
+                print(f"✓ MySQL connected: {config.MYSQL_USER}@{config.MYSQL_HOST}/{config.MYSQL_DATABASE}")
+                print("✓ Multi-PC support enabled")
+            else:
+                print(f"✓ SQLite connected: {config.DATABASE_PATH}")
+                print("✓ WAL mode + Performance optimizations enabled")
+            print(f"✓ Connection pool ready (size {config.DB_POOL_SIZE})")
         except Exception as e:
             print(f"✗ Database connection error: {e}")
+            DatabaseManager._pool = None
             raise
     
     def _connect_mysql(self):
-        """Connect to MySQL database"""
+        """Open a new MySQL connection"""
         try:
-            self._connection = pymysql.connect(
+            return pymysql.connect(
                 host=config.MYSQL_HOST,
                 user=config.MYSQL_USER,
                 password=config.MYSQL_PASSWORD,
@@ -57,8 +122,6 @@ class DatabaseManager:
                 cursorclass=pymysql.cursors.DictCursor,  # Return results as dictionaries
                 ssl={'ssl': True} if config.MYSQL_PORT == 4000 else None  # Enable SSL for TiDB
             )
-            print(f"✓ MySQL connected: {config.MYSQL_USER}@{config.MYSQL_HOST}/{config.MYSQL_DATABASE}")
-            print("✓ Multi-PC support enabled")
         except Exception as e:
             print(f"✗ MySQL connection error: {e}")
             print(f"  Host: {config.MYSQL_HOST}")
@@ -67,45 +130,145 @@ class DatabaseManager:
             raise
     
     def _connect_sqlite(self):
-        """Connect to SQLite database (fallback)"""
-        self._connection = sqlite3.connect(
+        """Open a new SQLite connection (fallback)"""
+        # check_same_thread=False only allows a pooled connection to be handed to
+        # another thread after release; it is never used by two threads at once
+        connection = sqlite3.connect(
             config.DATABASE_PATH,
             check_same_thread=False,
             timeout=30.0,
             isolation_level='DEFERRED'
         )
-        self._connection.row_factory = sqlite3.Row
+        connection.row_factory = sqlite3.Row
         
         # Enable Write-Ahead Logging (WAL) mode for better concurrency
-        self._connection.execute("PRAGMA journal_mode=WAL")
-        self._connection.execute("PRAGMA foreign_keys = ON")
-        self._connection.execute("PRAGMA busy_timeout = 30000")
-        self._connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA busy_timeout = 30000")
+        connection.execute("PRAGMA synchronous = NORMAL")
         
         # PERFORMANCE OPTIMIZATIONS
-        self._connection.execute("PRAGMA cache_size = -64000")  # 64MB cache
-        self._connection.execute("PRAGMA mmap_size = 268435456")  # 256MB memory-mapped I/O
-        self._connection.execute("PRAGMA temp_store = MEMORY")  # Store temp tables in RAM
-        self._connection.execute("PRAGMA page_size = 4096")  # Optimal page size
-        self._connection.execute("PRAGMA read_uncommitted = ON")  # Faster reads
+        connection.execute("PRAGMA cache_size = -64000")  # 64MB cache
+        connection.execute("PRAGMA mmap_size = 268435456")  # 256MB memory-mapped I/O
+        connection.execute("PRAGMA temp_store = MEMORY")  # Store temp tables in RAM
+        connection.execute("PRAGMA page_size = 4096")  # Optimal page size
+        connection.execute("PRAGMA read_uncommitted = ON")  # Faster reads
         
-        print(f"✓ SQLite connected: {config.DATABASE_PATH}")
-        print("✓ WAL mode + Performance optimizations enabled")
+        return connection
+    
+    @staticmethod
+    def _ping_mysql(connection):
+        """Health check for a pooled MySQL connection"""
+        connection.ping(reconnect=True)
+    
+    @staticmethod
+    def _ping_sqlite(connection):
+        """Health check for a pooled SQLite connection"""
+        connection.execute("SELECT 1").fetchone()
     
     def get_connection(self):
-        """Get the database connection, reconnecting if necessary"""
-        if self._connection is None:
+        """Get the calling thread's pooled connection, checking one out if necessary"""
+        if self._pool is None:
             self.connect()
+        return self._pool.acquire()
+    
+    def warm_up(self) -> threading.Thread:
+        """
+        Connect in a background thread (DB_CONNECT_MODE 'background')
         
-        # Check if connection is still alive (MySQL)
-        if config.USE_MYSQL:
-            try:
-                self._connection.ping(reconnect=True)
-            except:
-                print("⚠ MySQL connection lost, reconnecting...")
-                self.connect()
+        The pool and its first connection are opened while the UI starts;
+        the connection is left idle in the pool for the first query to
+        pick up. Errors are only printed here, the first real query
+        connects again and reports them.
+        
+        Returns:
+            The warm-up thread (join() it to wait for the connection)
+        """
+        if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+            DatabaseManager._warm_up_thread = threading.Thread(
+                target=self._warm_up, name='db-warm-up', daemon=True
+            )
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+    
+    def _warm_up(self):
+        try:
+            with self.connection_scope():
+                pass
+        except Exception as e:
+            print(f"⚠ Background database connect failed: {e}")
+    
+    def release_connection(self):
+        """Return the calling thread's connection to the pool (call when a worker thread is done)"""
+        if self._pool is not None:
+            self._pool.release()
+    
+    @contextmanager
+    def connection_scope(self):
+        """
+        Hold a pooled connection for the duration of a background task
+        
+        The connection is returned to the pool on exit unless the thread
+        already held one when the scope was entered.
+        """
+        already_owned = self._pool is not None and self._pool.owns_connection()
+        try:
+            yield self.get_connection()
+        finally:
+            if not already_owned:
+                self.release_connection()
+    
+    def close_connection(self):
+        """Close every pooled connection"""
+        if self._pool is not None:
+            self._pool.close_all()
+            DatabaseManager._pool = None
+    
+    def get_pool_stats(self) -> dict:
+        """Get connection pool usage (size, open, idle, in_use)"""
+        if self._pool is None:
+            return {'size': config.DB_POOL_SIZE, 'open': 0, 'idle': 0, 'in_use': 0}
+        return self._pool.stats()
+    
+    def get_query_stats(self, sort_by: str = 'total_ms', limit: Optional[int] = None) -> List[dict]:
+        """
+        Get timings aggregated per normalized statement (see QueryMonitor.stats)
         
-        return self._connection
+        Args:
+            sort_by: calls, total_ms, p95_ms, max_ms or rows (descending)
+            limit: Return only the top N statements
+        """
+        return self.query_monitor.stats(sort_by=sort_by, limit=limit)
+    
+    def get_recent_queries(self, limit: Optional[int] = None) -> List[dict]:
+        """Get the most recent statements from the ring buffer (newest last)"""
+        return self.query_monitor.recent(limit)
+    
+    def dump_query_stats(self, path: Optional[str] = None) -> str:
+        """Write query statistics and recent statements to a JSON file and return its path"""
+        if path is None:
+            log_dir = os.path.join(os.path.dirname(config.DATABASE_PATH), 'logs')
+            os.makedirs(log_dir, exist_ok=True)
+            path = os.path.join(log_dir, f"query_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        return self.query_monitor.dump(path)
+    
+    def reset_query_stats(self):
+        """Clear collected query statistics"""
+        self.query_monitor.reset()
+    
+    def count_queries(self, max_queries: Optional[int] = None, max_repeats: Optional[int] = None,
+                      label: Optional[str] = None, raise_on_exceed: bool = True) -> QueryCounter:
+        """
+        Context manager counting this thread's statements (see QueryCounter)
+        
+        Args:
+            max_queries: Most statements allowed in the block
+            max_repeats: Most times one normalized statement may run (N+1 guard)
+            label: Name of the logical operation for the report
+            raise_on_exceed: Raise QueryBudgetExceeded instead of printing the report
+        """
+        return QueryCounter(self.query_monitor, max_queries=max_queries, max_repeats=max_repeats,
+                            label=label, raise_on_exceed=raise_on_exceed)
     
     def _convert_placeholders(self, query: str) -> str:
         """Convert SQLite placeholders (?) to MySQL placeholders (%s) if needed"""
@@ -149,6 +312,37 @@ class DatabaseManager:
             traceback.print_exc()
             return False
     
+    def ensure_schema(self, name: str, sqlite_script: str, mysql_script: str) -> bool:
+        """
+        Create a feature's tables on first use
+        
+        Scripts must be idempotent (CREATE ... IF NOT EXISTS) and are run once
+        per process. Call outside of transaction(): MySQL commits implicitly on DDL.
+        
+        Args:
+            name: Feature key used to remember the schema was created
+            sqlite_script: Semicolon-separated statements for SQLite
+            mysql_script: Semicolon-separated statements for MySQL/TiDB
+        
+        Returns:
+            bool: True if the schema exists
+        """
+        if name in self._ensured_schemas:
+            return True
+        
+        script = mysql_script if config.USE_MYSQL else sqlite_script
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            for statement in [s.strip() for s in script.split(';') if s.strip()]:
+                cursor.execute(statement)
+            conn.commit()
+            self._ensured_schemas.add(name)
+            return True
+        except Exception as e:
+            print(f"✗ Schema creation error ({name}): {e}")
+            return False
+    
     def execute_query(self, query: str, params: tuple = ()) -> Optional[List[dict]]:
         """
         Execute a SELECT query and return results as list of dictionaries
@@ -160,6 +354,7 @@ class DatabaseManager:
         Returns:
             List of dictionaries or None on error
         """
+        started = time.perf_counter()
         try:
             query = self._convert_placeholders(query)
             conn = self.get_connection()
@@ -168,23 +363,15 @@ class DatabaseManager:
             
             if config.USE_MYSQL:
                 # PyMySQL with DictCursor returns dictionaries automatically
-                rows = cursor.fetchall()
-                # Convert Decimal to float for compatibility
-                result = []
-                for row in rows:
-                    row_dict = {}
-                    for col, val in row.items():
-                        # Convert Decimal to float
-                        if val is not None and type(val).__name__ == 'Decimal':
-                            row_dict[col] = float(val)
-                        else:
-                            row_dict[col] = val
-                    result.append(row_dict)
-                return result
+                result = [self._mysql_row(row) for row in cursor.fetchall()]
             else:
                 # SQLite with Row factory
-                return [dict(row) for row in cursor.fetchall()]
+                result = [dict(row) for row in cursor.fetchall()]
+            
+            self.query_monitor.record('query', query, time.perf_counter() - started, len(result))
+            return result
         except Exception as e:
+            self.query_monitor.record('query', query, time.perf_counter() - started, error=str(e))
             print(f"✗ Query execution error: {e}")
             print(f"  Query: {query}")
             print(f"  Params: {params}")
@@ -192,6 +379,86 @@ class DatabaseManager:
             traceback.print_exc()
             return None
     
+    def stream_query(self, query: str, params: tuple = (),
+                     chunk_size: Optional[int] = None) -> Iterator[List[dict]]:
+        """
+        Execute a SELECT query and yield its rows in chunks, without loading the whole result
+        
+        MySQL reads through an unbuffered server-side cursor (SSDictCursor) on a
+        dedicated connection, so other queries can run while the stream is open;
+        it does not see uncommitted changes of the calling thread's transaction.
+        SQLite reads the calling thread's connection with fetchmany(); do not
+        commit on that thread until the stream is exhausted or closed.
+        
+        Unlike execute_query, errors are raised. Close the generator (or use
+        contextlib.closing) when stopping early so the cursor is released.
+        
+        Args:
+            query: SQL query string (can use ? placeholders, will auto-convert for MySQL)
+            params: Query parameters
+            chunk_size: Rows fetched per round trip (default config.DB_STREAM_CHUNK_SIZE)
+        
+        Yields:
+            Lists of up to chunk_size row dictionaries
+        """
+        chunk_size = chunk_size or config.DB_STREAM_CHUNK_SIZE
+        query = self._convert_placeholders(query)
+        elapsed = 0.0
+        rows = 0
+        error = None
+        connection = cursor = None
+        started = time.perf_counter()
+        try:
+            if config.USE_MYSQL:
+                connection = self._connect_mysql()
+                cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+            else:
+                cursor = self.get_connection().cursor()
+            cursor.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(chunk_size)
+                if not batch:
+                    break
+                if config.USE_MYSQL:
+                    batch = [self._mysql_row(row) for row in batch]
+                else:
+                    batch = [dict(row) for row in batch]
+                rows += len(batch)
+                elapsed += time.perf_counter() - started
+                yield batch
+                started = time.perf_counter()
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            elapsed += time.perf_counter() - started
+            try:
+                if cursor is not None:
+                    cursor.close()
+                if connection is not None:
+                    connection.close()
+            finally:
+                # Time spent in the database only, not in the consumer
+                self.query_monitor.record('stream', query, elapsed, rows, error=error)
+    
+    def iter_query(self, query: str, params: tuple = (),
+                   chunk_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Execute a SELECT query and yield row dictionaries one at a time (see stream_query)
+        
+        Memory use depends on chunk_size, not on the number of rows.
+        """
+        for batch in self.stream_query(query, params, chunk_size):
+            yield from batch
+    
+    @staticmethod
+    def _mysql_row(row: dict) -> dict:
+        """Convert Decimal values to float for compatibility with SQLite results"""
+        for col, val in row.items():
+            if isinstance(val, Decimal):
+                row[col] = float(val)
+        return row
+    
     def execute_update(self, query: str, params: tuple = ()) -> Tuple[bool, int]:
         """
         Execute an INSERT, UPDATE, or DELETE query
@@ -203,12 +470,15 @@ class DatabaseManager:
         Returns:
             Tuple of (success: bool, last_row_id or rows_affected: int)
         """
+        started = time.perf_counter()
         try:
             query = self._convert_placeholders(query)
             conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(query, params)
-            conn.commit()
+            if not self.in_transaction():
+                conn.commit()
+            self.query_monitor.record('update', query, time.perf_counter() - started, max(cursor.rowcount, 0))
             
             # Return last row ID for INSERT, rows affected for UPDATE/DELETE
             if query.strip().upper().startswith('INSERT'):
@@ -219,11 +489,15 @@ class DatabaseManager:
             else:
                 return True, cursor.rowcount
         except Exception as e:
-            conn = self.get_connection()
-            conn.rollback()
+            self.query_monitor.record('update', query, time.perf_counter() - started, error=str(e))
             print(f"✗ Update execution error: {e}")
             print(f"  Query: {query}")
             print(f"  Params: {params}")
+            if self.in_transaction():
+                # Let transaction() roll back the whole unit of work
+                raise
+            conn = self.get_connection()
+            conn.rollback()
             import traceback
             traceback.print_exc()
             return False, 0
@@ -239,28 +513,142 @@ class DatabaseManager:
         Returns:
             Tuple of (success: bool, rows_affected: int)
         """
+        started = time.perf_counter()
         try:
             query = self._convert_placeholders(query)
             conn = self.get_connection()
             cursor = conn.cursor()
             cursor.executemany(query, params_list)
-            conn.commit()
+            if not self.in_transaction():
+                conn.commit()
+            self.query_monitor.record('many', query, time.perf_counter() - started, max(cursor.rowcount, 0))
             return True, cursor.rowcount
         except Exception as e:
+            self.query_monitor.record('many', query, time.perf_counter() - started, error=str(e))
+            print(f"✗ Bulk execution error: {e}")
+            if self.in_transaction():
+                # Let transaction() roll back the whole unit of work
+                raise
             conn = self.get_connection()
             conn.rollback()
-            print(f"✗ Bulk execution error: {e}")
             import traceback
             traceback.print_exc()
             return False, 0
     
+    def build_upsert(self, table: str, columns: List[str], key_columns: List[str],
+                     update_columns: Optional[List[str]] = None,
+                     extra_updates: Optional[List[str]] = None) -> str:
+        """
+        Build an INSERT that updates the existing row on a unique key conflict
+        
+        Args:
+            table: Table name
+            columns: Columns to insert (one ? placeholder each)
+            key_columns: Columns of the unique key that detects the conflict
+            update_columns: Columns to overwrite on conflict (defaults to all non-key columns)
+            extra_updates: Raw assignments applied on conflict, e.g. "updated_at = CURRENT_TIMESTAMP"
+        
+        Returns:
+            SQL string using ON DUPLICATE KEY UPDATE (MySQL) or ON CONFLICT (SQLite)
+        """
+        if update_columns is None:
+            update_columns = [col for col in columns if col not in key_columns]
+        
+        placeholders = ', '.join(['?'] * len(columns))
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        
+        if config.USE_MYSQL:
+            assignments = [f"{col} = VALUES({col})" for col in update_columns]
+            return f"{query} ON DUPLICATE KEY UPDATE {', '.join(assignments + (extra_updates or []))}"
+        
+        assignments = [f"{col} = excluded.{col}" for col in update_columns]
+        return (f"{query} ON CONFLICT ({', '.join(key_columns)}) "
+                f"DO UPDATE SET {', '.join(assignments + (extra_updates or []))}")
+    
+    def supports_window_updates(self) -> bool:
+        """
+        Check whether an UPDATE can be driven by a window-function subquery
+        
+        True on MySQL 8 / TiDB (multi-table UPDATE with RANK() OVER) and on
+        SQLite 3.33+ (UPDATE ... FROM). The probe runs once per process.
+        """
+        if self._window_updates is None:
+            if config.USE_MYSQL:
+                try:
+                    cursor = self.get_connection().cursor()
+                    cursor.execute("SELECT RANK() OVER (ORDER BY 1) AS probe")
+                    cursor.fetchall()
+                    DatabaseManager._window_updates = True
+                except Exception:
+                    DatabaseManager._window_updates = False
+            else:
+                DatabaseManager._window_updates = sqlite3.sqlite_version_info >= (3, 33, 0)
+        return self._window_updates
+    
+    def in_transaction(self) -> bool:
+        """Check if the calling thread is inside transaction()"""
+        return getattr(self._local, 'depth', 0) > 0
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run several execute_update/execute_many calls as one atomic unit
+        
+        Statements inside the block are not committed individually; the block
+        commits once on success and rolls back on any error (which is re-raised).
+        Nested blocks join the outermost transaction. Callbacks registered with
+        after_commit() run once the outermost block has committed.
+        """
+        if self.in_transaction():
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        
+        conn = self.get_connection()
+        self.begin_transaction()
+        self._local.depth = 1
+        self._local.after_commit = []
+        try:
+            yield
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            self._local.after_commit = []
+            raise
+        finally:
+            self._local.depth = 0
+        
+        callbacks, self._local.after_commit = self._local.after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"✗ After-commit callback failed: {e}")
+    
+    def after_commit(self, callback):
+        """
+        Run callback() once the calling thread's transaction commits
+        
+        Dropped if the transaction rolls back; runs at once outside of transaction().
+        Use it for side effects other threads can observe, such as cache
+        invalidation, which must not happen before the change is visible.
+        """
+        if self.in_transaction():
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+    
     def begin_transaction(self):
         """Begin a transaction"""
         conn = self.get_connection()
         if config.USE_MYSQL:
-            conn.start_transaction()
+            conn.begin()
         else:
-            conn.execute("BEGIN TRANSACTION")
+            if not conn.in_transaction:
+                conn.execute("BEGIN TRANSACTION")
     
     def commit(self):
         """Commit current transaction"""
@@ -388,6 +776,11 @@ class DatabaseManager:
             # Copy backup file to database location
             shutil.copy2(backup_path, config.DATABASE_PATH)
             
+            # The backup may predate feature tables, and cached lookups describe the old file
+            DatabaseManager._ensured_schemas.clear()
+            DatabaseManager._window_updates = None
+            invalidate_all()
+            
             # Reconnect
             self.connect()
             
@@ -0,0 +1,392 @@
+"""
+Query Monitor - Timing, row counts and call sites for every statement
+DatabaseManager reports each execute_* call here. Recent statements are kept
+in a ring buffer, timings are aggregated per normalized SQL, and statements
+slower than the threshold go to a rotating slow-query log. QueryCounter puts
+a statement budget on a block of code to catch N+1 query loops.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Durations kept per normalized statement for the percentiles
+DURATION_SAMPLES = 1000
+
+# Slow-query log rotation
+SLOW_LOG_MAX_BYTES = 2 * 1024 * 1024
+SLOW_LOG_BACKUPS = 5
+
+# Longest SQL text kept in the ring buffer and the slow log
+MAX_SQL_LENGTH = 2000
+
+# Frames from these files are skipped when looking for the caller
+_INTERNAL_FILES = ('query_monitor.py', 'db_manager.py', 'connection_pool.py', 'contextlib.py')
+
+# Frames from files under this directory name the screen that triggered a statement
+_UI_DIR = os.sep + 'ui' + os.sep
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Reduce a statement to its shape so calls can be grouped
+
+    Literals and placeholders become ?, placeholder lists of any length (even one) become
+    (?+), and whitespace is collapsed.
+    """
+    sql = query.replace('%s', '?')
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(?+)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class _StatementStats:
+    """Running totals for one normalized statement"""
+
+    __slots__ = ('calls', 'errors', 'rows', 'total_time', 'max_time', 'durations', 'call_sites', 'screens')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.durations = deque(maxlen=DURATION_SAMPLES)
+        self.call_sites: Dict[str, int] = {}
+        self.screens: Dict[str, int] = {}
+
+
+class QueryMonitor:
+    """Collects per-statement timings for DatabaseManager"""
+
+    def __init__(self, enabled: bool = True, slow_query_ms: float = 250.0,
+                 history_size: int = 1000, log_dir: Optional[str] = None, base_dir: Optional[str] = None):
+        """
+        Args:
+            enabled: Record statements at all
+            slow_query_ms: Statements taking at least this long are written to the slow log (0 disables)
+            history_size: Number of recent statements kept in the ring buffer
+            log_dir: Directory for slow_queries.log (created on the first slow query)
+            base_dir: Call-site paths are shown relative to this directory
+        """
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self._log_dir = log_dir
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=max(1, int(history_size)))
+        self._stats: Dict[str, _StatementStats] = {}
+        self._slow_logger = None
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def record(self, kind: str, query: str, duration: float, rows: int = 0, error: Optional[str] = None):
+        """
+        Record one executed statement
+
+        Args:
+            kind: 'query', 'update', 'many' or 'stream'
+            query: SQL as sent to the driver
+            duration: Wall time in seconds
+            rows: Rows returned (query/stream) or affected (update/many)
+            error: Error message if the statement failed
+        """
+        listeners = self._listeners
+        if not self.enabled and not listeners:
+            return
+
+        call_site, screen = self._call_site()
+        normalized = normalize_sql(query)
+        duration_ms = duration * 1000
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'kind': kind,
+            'sql': query.strip()[:MAX_SQL_LENGTH],
+            'normalized': normalized,
+            'duration_ms': round(duration_ms, 3),
+            'rows': rows,
+            'call_site': call_site,
+            'screen': screen,
+            'thread': threading.current_thread().name,
+            'error': error
+        }
+
+        for listener in listeners:
+            listener(entry)
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._recent.append(entry)
+            stats = self._stats.get(normalized)
+            if stats is None:
+                stats = self._stats[normalized] = _StatementStats()
+            stats.calls += 1
+            stats.rows += rows
+            stats.total_time += duration
+            stats.max_time = max(stats.max_time, duration)
+            stats.durations.append(duration)
+            stats.call_sites[call_site] = stats.call_sites.get(call_site, 0) + 1
+            if screen:
+                stats.screens[screen] = stats.screens.get(screen, 0) + 1
+            if error:
+                stats.errors += 1
+
+        if self.slow_query_ms and duration_ms >= self.slow_query_ms:
+            self._log_slow(entry)
+
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """Call listener(entry) for every statement, on the thread that ran it"""
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: Callable[[Dict], None]):
+        """Stop calling a listener added with add_listener()"""
+        with self._lock:
+            self._listeners = [item for item in self._listeners if item != listener]
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """Most recent statements, newest last"""
+        with self._lock:
+            entries = list(self._recent)
+        return entries[-limit:] if limit else entries
+
+    def stats(self, sort_by: str = 'total_ms', limit: Optional[int] = None) -> List[Dict]:
+        """
+        Aggregated statistics per normalized statement
+
+        Args:
+            sort_by: Field to sort by, descending (calls, total_ms, p95_ms, max_ms, rows)
+            limit: Return only the top N statements
+
+        Returns:
+            List of dicts with sql, calls, errors, rows, total_ms, avg_ms, p50_ms,
+            p95_ms, max_ms, call_sites and screens (name -> calls, busiest first)
+        """
+        with self._lock:
+            items = [(sql, stats.calls, stats.errors, stats.rows, stats.total_time, stats.max_time,
+                      sorted(stats.durations), dict(stats.call_sites), dict(stats.screens))
+                     for sql, stats in self._stats.items()]
+
+        report = []
+        for sql, calls, errors, rows, total, longest, durations, call_sites, screens in items:
+            report.append({
+                'sql': sql,
+                'calls': calls,
+                'errors': errors,
+                'rows': rows,
+                'total_ms': round(total * 1000, 3),
+                'avg_ms': round(total * 1000 / calls, 3),
+                'p50_ms': round(self._percentile(durations, 50) * 1000, 3),
+                'p95_ms': round(self._percentile(durations, 95) * 1000, 3),
+                'max_ms': round(longest * 1000, 3),
+                'call_sites': dict(sorted(call_sites.items(), key=lambda item: -item[1])),
+                'screens': dict(sorted(screens.items(), key=lambda item: -item[1]))
+            })
+
+        report.sort(key=lambda row: row.get(sort_by, 0), reverse=True)
+        return report[:limit] if limit else report
+
+    def dump(self, path: str, sort_by: str = 'total_ms') -> str:
+        """Write aggregated statistics and the ring buffer to a JSON file and return its path"""
+        payload = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'slow_query_ms': self.slow_query_ms,
+            'statements': self.stats(sort_by=sort_by),
+            'recent': self.recent()
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, default=str)
+        return path
+
+    def reset(self):
+        """Forget all recorded statements"""
+        with self._lock:
+            self._recent.clear()
+            self._stats.clear()
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percent: float) -> float:
+        """Nearest-rank percentile of an already sorted list"""
+        if not sorted_values:
+            return 0.0
+        rank = max(1, -(-len(sorted_values) * percent // 100))
+        return sorted_values[int(rank) - 1]
+
+    def _call_site(self) -> Tuple[str, Optional[str]]:
+        """
+        Find who issued the statement
+
+        Returns:
+            Tuple of (first frame outside the database layer as 'path:line Class.method',
+            nearest ui/ method on the stack as 'Class.method' or None)
+        """
+        frame = sys._getframe(2)
+        while frame is not None and os.path.basename(frame.f_code.co_filename) in _INTERNAL_FILES:
+            frame = frame.f_back
+        if frame is None:
+            return 'unknown', None
+
+        code = frame.f_code
+        path = code.co_filename
+        if self._base_dir and path.startswith(self._base_dir):
+            path = os.path.relpath(path, self._base_dir)
+        call_site = f"{path}:{frame.f_lineno} {getattr(code, 'co_qualname', code.co_name)}"
+
+        screen = None
+        while frame is not None:
+            if _UI_DIR in frame.f_code.co_filename:
+                screen = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+                break
+            frame = frame.f_back
+        return call_site, screen
+
+    def _log_slow(self, entry: Dict):
+        """Append a slow statement to the rotating slow-query log"""
+        try:
+            if self._slow_logger is None:
+                self._slow_logger = self._make_slow_logger()
+            self._slow_logger.warning(
+                "%.1f ms | rows=%s | %s | %s%s",
+                entry['duration_ms'], entry['rows'], entry['call_site'],
+                _WHITESPACE.sub(' ', entry['sql']),
+                f" | ERROR: {entry['error']}" if entry['error'] else ''
+            )
+        except Exception as e:
+            print(f"✗ Slow query log error: {e}")
+            self.slow_query_ms = 0
+
+    def _make_slow_logger(self) -> logging.Logger:
+        """Create the slow-query logger with its rotating file handler"""
+        log_dir = self._log_dir or os.path.join(os.getcwd(), 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+
+        # Standalone logger so each monitor writes to its own directory
+        logger = logging.Logger('database.slow_queries', logging.WARNING)
+        handler = RotatingFileHandler(os.path.join(log_dir, 'slow_queries.log'),
+                                      maxBytes=SLOW_LOG_MAX_BYTES, backupCount=SLOW_LOG_BACKUPS,
+                                      encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+        logger.addHandler(handler)
+        return logger
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more statements than its QueryCounter budget allows"""
+    pass
+
+
+class QueryCounter:
+    """
+    Count the statements run inside a with-block and flag repeated shapes
+
+    Usage:
+        with db.count_queries(max_queries=10, max_repeats=2, label="promote batch") as counter:
+            promotion_controller.bulk_promote_students(...)
+        print(counter.count)
+
+    Exceeding a budget raises QueryBudgetExceeded on exit (or only prints the
+    report when raise_on_exceed is False). Without budgets the counter just
+    collects statements for inspection.
+    """
+
+    def __init__(self, monitor: QueryMonitor, max_queries: Optional[int] = None,
+                 max_repeats: Optional[int] = None, label: Optional[str] = None,
+                 all_threads: bool = False, raise_on_exceed: bool = True):
+        """
+        Args:
+            monitor: QueryMonitor to listen to
+            max_queries: Most statements allowed in the block
+            max_repeats: Most times any one normalized statement may run (N+1 guard)
+            label: Name of the logical operation, used in the report
+            all_threads: Also count statements from other threads
+            raise_on_exceed: Raise QueryBudgetExceeded instead of printing the report
+        """
+        self.monitor = monitor
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.label = label or "block"
+        self.all_threads = all_threads
+        self.raise_on_exceed = raise_on_exceed
+        self.statements: List[Dict] = []
+        self._lock = threading.Lock()
+        self._thread_id = None
+
+    def __enter__(self) -> 'QueryCounter':
+        self._thread_id = threading.get_ident()
+        self.monitor.add_listener(self._on_statement)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.monitor.remove_listener(self._on_statement)
+        if exc_type is None:
+            self.check()
+        return False
+
+    @property
+    def count(self) -> int:
+        """Statements counted so far"""
+        return len(self.statements)
+
+    def shapes(self) -> List[Dict]:
+        """Counted statements grouped by normalized SQL, most frequent first"""
+        grouped: Dict[str, Dict] = {}
+        with self._lock:
+            statements = list(self.statements)
+        for entry in statements:
+            shape = grouped.setdefault(entry['normalized'], {'sql': entry['normalized'], 'calls': 0,
+                                                             'total_ms': 0.0, 'call_sites': {}})
+            shape['calls'] += 1
+            shape['total_ms'] = round(shape['total_ms'] + entry['duration_ms'], 3)
+            shape['call_sites'][entry['call_site']] = shape['call_sites'].get(entry['call_site'], 0) + 1
+        return sorted(grouped.values(), key=lambda shape: -shape['calls'])
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Dict]:
+        """Shapes that ran more than threshold times (default max_repeats, else once)"""
+        limit = threshold if threshold is not None else (self.max_repeats if self.max_repeats is not None else 1)
+        return [shape for shape in self.shapes() if shape['calls'] > limit]
+
+    def violations(self) -> List[str]:
+        """Budget violations as readable messages"""
+        problems = []
+        if self.max_queries is not None and self.count > self.max_queries:
+            problems.append(f"{self.count} statements (budget {self.max_queries})")
+        if self.max_repeats is not None:
+            for shape in self.repeated():
+                problems.append(f"{shape['calls']}x (budget {self.max_repeats}): {shape['sql'][:200]}")
+        return problems
+
+    def report(self, top: int = 10) -> str:
+        """Summary of the counted statements for test failures and debug sessions"""
+        lines = [f"Query budget report for {self.label}: {self.count} statements"]
+        for problem in self.violations():
+            lines.append(f"  ! {problem}")
+        for shape in self.shapes()[:top]:
+            site = next(iter(shape['call_sites']), 'unknown')
+            lines.append(f"  {shape['calls']:>5}x {shape['total_ms']:>9.1f} ms  {site}  {shape['sql'][:120]}")
+        return "\n".join(lines)
+
+    def check(self):
+        """Raise (or print) the report if a budget was exceeded"""
+        if not self.violations():
+            return
+        if self.raise_on_exceed:
+            raise QueryBudgetExceeded(self.report())
+        print(self.report())
+
+    def _on_statement(self, entry: Dict):
+        if not self.all_threads and threading.get_ident() != self._thread_id:
+            return
+        with self._lock:
+            self.statements.append(entry)
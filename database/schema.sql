@@ -194,3 +194,51 @@ CREATE TABLE IF NOT EXISTS audit_log (
     INDEX idx_audit_table (table_name)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+
+-- GPA Ledger Table (per-student, per-semester credit and grade-point totals)
+CREATE TABLE IF NOT EXISTS gpa_ledger (
+    student_id INT NOT NULL,
+    semester INT NOT NULL,
+    credits INT NOT NULL DEFAULT 0,
+    grade_points DECIMAL(12,4) NOT NULL DEFAULT 0,
+    cum_credits INT NOT NULL DEFAULT 0,
+    cum_grade_points DECIMAL(12,4) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id, semester),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+-- Attendance Rollup Table (per-student, per-course, per-month attendance counts; course_id 0 = no course)
+CREATE TABLE IF NOT EXISTS attendance_rollup (
+    student_id INT NOT NULL,
+    course_id INT NOT NULL DEFAULT 0,
+    month CHAR(7) NOT NULL,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    leave_count INT NOT NULL DEFAULT 0,
+    late_count INT NOT NULL DEFAULT 0,
+    total_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id, course_id, month),
+    INDEX idx_attendance_rollup_course (course_id, month),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+
+-- Attendance Archive Table (closed months packed per student/course; one status code per day in `days`)
+CREATE TABLE IF NOT EXISTS attendance_archive (
+    student_id INT NOT NULL,
+    course_id INT NOT NULL DEFAULT 0,
+    month CHAR(7) NOT NULL,
+    days CHAR(31) NOT NULL,
+    present_count SMALLINT NOT NULL DEFAULT 0,
+    absent_count SMALLINT NOT NULL DEFAULT 0,
+    leave_count SMALLINT NOT NULL DEFAULT 0,
+    late_count SMALLINT NOT NULL DEFAULT 0,
+    total_count SMALLINT NOT NULL DEFAULT 0,
+    remarks TEXT,
+    PRIMARY KEY (student_id, course_id, month),
+    INDEX idx_attendance_archive_month (month),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -9,42 +9,6 @@ from controllers.auth_controller import auth
 from utils.security import hash_password
 from resources.styles.main_style import MAIN_STYLESHEET
 import config
-import matplotlib.axes
-import matplotlib.transforms as mtransforms
-
-# Global monkeypatch to permanently fix 'box_aspect' and 'fig_aspect' must be positive error
-def patch_matplotlib():
-    try:
-        # 1. Patch shrunk_to_aspect in transforms
-        _original_shrunk_to_aspect = mtransforms.BboxBase.shrunk_to_aspect
-        def _safe_shrunk_to_aspect(self, box_aspect, container=None, fig_aspect=1.0):
-            try:
-                if box_aspect <= 0 or fig_aspect <= 0:
-                    return container if container is not None else self
-            except Exception:
-                return container if container is not None else self
-                
-            try:
-                return _original_shrunk_to_aspect(self, box_aspect, container, fig_aspect)
-            except (ValueError, Exception):
-                return container if container is not None else self
-        
-        mtransforms.BboxBase.shrunk_to_aspect = _safe_shrunk_to_aspect
-        
-        # 2. Patch apply_aspect in Axes as a double safety measure
-        _original_apply_aspect = matplotlib.axes.Axes.apply_aspect
-        def _safe_apply_aspect(self, position=None):
-            try:
-                return _original_apply_aspect(self, position)
-            except ValueError:
-                return
-        matplotlib.axes.Axes.apply_aspect = _safe_apply_aspect
-        print("✓ Matplotlib stability patches applied")
-    except Exception as e:
-        print(f"⚠ Could not apply Matplotlib patches: {e}")
-
-# Apply patches immediately
-patch_matplotlib()
 
 
 def initialize_database():
@@ -107,15 +71,9 @@ def initialize_database():
 
 def main():
     """Main application entry point"""
-    # Initialize database
-    initialize_database()
-    
-    # Start automatic backup service
-    try:
-        from utils.backup_service import backup_service
-        backup_service.start()
-    except Exception as e:
-        print(f"⚠ Backup service failed to start: {e}")
+    # Open the database connection while the window system starts up
+    if config.DB_CONNECT_MODE == 'background':
+        db.warm_up()
     
     # Create Qt application
     app = QApplication(sys.argv)
@@ -133,10 +91,28 @@ def main():
     from ui.login_window import LoginWindow
     login_window = LoginWindow()
     login_window.show()
+    app.processEvents()  # Paint the login window before waiting on the database
+    
+    # Initialize database
+    initialize_database()
+    
+    # Per-table change counters other PCs poll
+    from controllers.change_version_controller import change_version_controller
+    change_version_controller.ensure_table()
+    
+    # Start automatic backup service
+    try:
+        from utils.backup_service import backup_service
+        backup_service.start()
+    except Exception as e:
+        print(f"⚠ Backup service failed to start: {e}")
     
     # Run application
     sys.exit(app.exec_())
 
 
 if __name__ == "__main__":
+    # Batch PDF exports use worker processes; required for the frozen executable
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
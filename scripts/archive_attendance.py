@@ -0,0 +1,49 @@
+"""
+Archive Attendance
+Packs attendance of closed months into the compact attendance_archive table,
+or expands archived months back into student_attendance
+
+Usage:
+    python scripts/archive_attendance.py --through 2024-06
+    python scripts/archive_attendance.py --restore 2024-01 2024-06 --user 1
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.attendance_archive_controller import attendance_archive_controller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive or restore attendance of closed months")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--through', metavar='YYYY-MM',
+                       help="Archive every month up to and including this one")
+    group.add_argument('--restore', nargs=2, metavar=('FROM', 'THROUGH'),
+                       help="Restore archived months FROM..THROUGH (YYYY-MM)")
+    parser.add_argument('--user', type=int, default=1,
+                        help="User ID recorded as marked_by on restored rows (default 1)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Attendance " + ("Restore" if args.restore else "Archive"))
+    print("=" * 70)
+
+    if args.restore:
+        success, message, _ = attendance_archive_controller.restore_months(
+            args.restore[0], args.restore[1], args.user
+        )
+    else:
+        success, message, stats = attendance_archive_controller.archive_months(args.through)
+        if success and stats['records_kept']:
+            print(f"Duplicate records left live: {stats['records_kept']}")
+
+    print(f"{'✓' if success else '✗'} {message}")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
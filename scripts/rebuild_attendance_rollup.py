@@ -0,0 +1,53 @@
+"""
+Rebuild Attendance Rollup
+Recomputes the attendance_rollup table from student_attendance and reports any drift
+
+Usage:
+    python scripts/rebuild_attendance_rollup.py           # rebuild and report drift
+    python scripts/rebuild_attendance_rollup.py --verify  # only report drift
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.attendance_rollup_controller import attendance_rollup_controller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the attendance rollup from attendance records")
+    parser.add_argument('--verify', action='store_true',
+                        help="Compare the rollup against attendance records without rewriting it")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Attendance Rollup " + ("Verification" if args.verify else "Rebuild"))
+    print("=" * 70)
+
+    report = attendance_rollup_controller.rebuild_rollup(verify_only=args.verify)
+    if not report.get('success'):
+        print(f"✗ {report.get('message', 'Rollup rebuild failed')}")
+        return 1
+
+    print(f"Attendance records: {report['records']}")
+    print(f"Rollup rows: {report['rows']}")
+    print(f"Drifted rows: {report['drift_count']}")
+    for item in report['drift'][:50]:
+        print(f"  - student {item['student_id']}, course {item['course_id']}, "
+              f"{item['month']}: {item['issue']}")
+    if report['drift_count'] > 50:
+        print(f"  ... and {report['drift_count'] - 50} more")
+
+    if report['rebuilt']:
+        print("\n✓ Rollup rebuilt from attendance records")
+    elif report['drift_count']:
+        print("\n⚠ Rollup is out of date - run without --verify to rebuild")
+    else:
+        print("\n✓ Rollup matches attendance records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
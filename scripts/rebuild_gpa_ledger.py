@@ -0,0 +1,52 @@
+"""
+Rebuild GPA Ledger
+Recomputes the gpa_ledger table from marks and reports any drift
+
+Usage:
+    python scripts/rebuild_gpa_ledger.py           # rebuild and report drift
+    python scripts/rebuild_gpa_ledger.py --verify  # only report drift
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the GPA ledger from marks")
+    parser.add_argument('--verify', action='store_true',
+                        help="Compare the ledger against marks without rewriting it")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  GPA Ledger " + ("Verification" if args.verify else "Rebuild"))
+    print("=" * 70)
+
+    report = gpa_ledger_controller.rebuild_ledger(verify_only=args.verify)
+    if not report.get('success'):
+        print(f"✗ {report.get('message', 'Ledger rebuild failed')}")
+        return 1
+
+    print(f"Students: {report['students']}")
+    print(f"Ledger rows: {report['rows']}")
+    print(f"Drifted rows: {report['drift_count']}")
+    for item in report['drift'][:50]:
+        print(f"  - student {item['student_id']}, semester {item['semester']}: {item['issue']}")
+    if report['drift_count'] > 50:
+        print(f"  ... and {report['drift_count'] - 50} more")
+
+    if report['rebuilt']:
+        print("\n✓ Ledger rebuilt from marks")
+    elif report['drift_count']:
+        print("\n⚠ Ledger is out of date - run without --verify to rebuild")
+    else:
+        print("\n✓ Ledger matches marks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Shared pytest fixtures
+"""
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Size of the generated university used by tests that write (see synthetic_db)
+SYNTHETIC_SCALE = {'departments': 2, 'students': 120, 'courses_per_semester': 3,
+                   'attendance_days': 12, 'audit_logs': 200}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Put a statement budget on a block of controller code
+
+    Usage:
+        def test_promotion_is_batched(query_budget):
+            with query_budget(max_queries=20, max_repeats=2, label="bulk promote"):
+                promotion_controller.bulk_promote_students(...)
+
+    The block fails with QueryBudgetExceeded (an AssertionError) listing the
+    repeated statements and their call sites when a budget is exceeded.
+    """
+    # Imported here so collecting tests never opens a database connection
+    from database.db_manager import db
+
+    def budget(max_queries=None, max_repeats=None, label=None):
+        return db.count_queries(max_queries=max_queries, max_repeats=max_repeats, label=label)
+
+    return budget
+
+
+def _switch_database(path):
+    """Point the application at another SQLite file and forget per-database state"""
+    import config
+    from database.db_manager import db, DatabaseManager
+    from controllers.gpa_ledger_controller import gpa_ledger_controller
+    from controllers.attendance_rollup_controller import attendance_rollup_controller
+    from controllers.student_search_controller import student_search_controller
+    from controllers.dashboard_controller import dashboard_controller
+    from controllers.change_version_controller import change_version_controller
+    from utils.reference_cache import invalidate_all
+
+    db.close_connection()
+    config.DATABASE_PATH = path
+    DatabaseManager._ensured_schemas.clear()
+    DatabaseManager._window_updates = None
+    gpa_ledger_controller._checked = False
+    attendance_rollup_controller._checked = False
+    student_search_controller._available = None
+    change_version_controller._versions = None
+    invalidate_all()
+    dashboard_controller.invalidate()
+
+
+@contextmanager
+def _database_at(path):
+    import config
+    previous = config.DATABASE_PATH
+    _switch_database(path)
+    try:
+        yield path
+    finally:
+        _switch_database(previous)
+
+
+@pytest.fixture(scope="session")
+def synthetic_db_file(tmp_path_factory):
+    """A small seeded university (benchmarks.generator), generated once per session"""
+    import config
+    if config.USE_MYSQL:
+        pytest.skip("The synthetic university is generated into a SQLite file")
+
+    path = str(tmp_path_factory.mktemp("synthetic") / "university.db")
+    with _database_at(path):
+        from benchmarks.generator import UniversityGenerator
+        UniversityGenerator(seed=7, scale=SYNTHETIC_SCALE).generate(progress=lambda message: None)
+    return path
+
+
+@pytest.fixture(scope="module")
+def synthetic_db(synthetic_db_file, tmp_path_factory):
+    """
+    Run a test module against its own copy of the synthetic university
+
+    Tests may write freely; the configured database is never opened.
+    """
+    path = str(tmp_path_factory.mktemp("synthetic") / "university.db")
+    shutil.copy(synthetic_db_file, path)
+    with _database_at(path):
+        yield path
+
+
+@pytest.fixture
+def synthetic_copy(synthetic_db_file, tmp_path):
+    """
+    Open fresh copies of the synthetic university, one per block
+
+    Usage:
+        def test_bulk_matches_per_row(synthetic_copy):
+            with synthetic_copy():
+                ...  # old per-row path
+            with synthetic_copy():
+                ...  # new set-based path
+
+    Every copy starts from the same generated data, so the end states of two
+    code paths can be compared. The previous database is active again after
+    each block.
+    """
+    copies = []
+
+    @contextmanager
+    def copy():
+        path = str(tmp_path / f"copy{len(copies)}.db")
+        copies.append(path)
+        shutil.copy(synthetic_db_file, path)
+        with _database_at(path):
+            yield path
+
+    return copy
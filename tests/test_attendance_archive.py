@@ -0,0 +1,32 @@
+"""
+Attendance Archive Tests
+Checks controllers.attendance_archive_controller (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); attendance is archived.
+"""
+from datetime import date, timedelta
+from database.db_manager import db
+from controllers.attendance_archive_controller import attendance_archive_controller
+
+
+def live_attendance_count():
+    return db.execute_query("SELECT COUNT(*) AS total FROM student_attendance")[0]['total']
+
+
+def test_open_months_are_not_archived(synthetic_db):
+    today = date.today()
+    next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    before = live_attendance_count()
+
+    for month in (today.strftime('%Y-%m'), next_month.strftime('%Y-%m'), '2025-13', 'last month'):
+        success, _, stats = attendance_archive_controller.archive_months(month)
+        assert not success and stats['months'] == 0, month
+    assert live_attendance_count() == before
+
+
+def test_closed_months_are_archived(synthetic_db):
+    last_month = (date.today().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+
+    success, _, stats = attendance_archive_controller.archive_months(last_month)
+
+    assert success and stats['records_archived'] > 0
+    assert live_attendance_count() == stats['records_kept']
@@ -0,0 +1,187 @@
+"""
+Attendance Rollup Tests
+Checks the bulk attendance upsert against one mark_student_attendance call per
+row, and the rollup-backed readers in controllers.attendance_controller against
+counts taken straight from student_attendance (run with pytest).
+Runs on copies of a small generated university (synthetic_db, synthetic_copy); attendance is written.
+"""
+from collections import Counter
+from datetime import date, timedelta
+import pytest
+from database.db_manager import db
+from controllers.attendance_controller import attendance_controller, ATTENDANCE_STATUSES
+from controllers.attendance_rollup_controller import attendance_rollup_controller
+
+# Whole month, part of a month, across a month boundary, and one older month
+RANGES = [(date(2025, 12, 1), date(2025, 12, 31)), (date(2025, 12, 18), date(2025, 12, 24)),
+          (date(2025, 11, 20), date(2025, 12, 20)), (date(2025, 11, 1), date(2025, 11, 30))]
+
+
+def attendance_state():
+    rows = db.execute_query("""
+        SELECT student_id, course_id, attendance_date, status, marked_by, remarks
+        FROM student_attendance ORDER BY student_id, course_id, attendance_date
+    """)
+    rollup = db.execute_query("SELECT * FROM attendance_rollup ORDER BY student_id, course_id, month")
+    return ([dict(row) for row in rows],
+            [{key: row[key] for key in row.keys() if key != 'updated_at'} for row in rollup])
+
+
+def class_entries():
+    """A class that already has a register that day, students new to it, and two rejected rows"""
+    lesson = db.execute_query("""
+        SELECT course_id, attendance_date FROM student_attendance
+        GROUP BY course_id, attendance_date ORDER BY COUNT(*) DESC, course_id LIMIT 1
+    """)[0]
+    students = db.execute_query("SELECT student_id FROM students ORDER BY student_id LIMIT 41")
+    entries = [{'student_id': row['student_id'], 'status': ATTENDANCE_STATUSES[row['student_id'] % 4],
+                'remarks': 'late bus' if row['student_id'] % 6 == 0 else None} for row in students[:40]]
+    entries.append(dict(entries[0], status='Leave'))  # Repeated student: the later entry wins
+    entries.append({'student_id': students[40]['student_id'], 'status': 'Sick', 'remarks': None})
+    entries.append({'student_id': 999999, 'status': 'Present', 'remarks': None})
+    return lesson['course_id'], lesson['attendance_date'], entries
+
+
+def test_batch_upsert_matches_one_call_per_row(synthetic_copy):
+    with synthetic_copy():
+        course_id, attendance_date, entries = class_entries()
+        marked = [attendance_controller.mark_student_attendance(
+            entry['student_id'], course_id, attendance_date, entry['status'], 1, entry['remarks']
+        )[0] for entry in entries]
+        per_row = attendance_state()
+
+    with synthetic_copy():
+        success, _, outcomes = attendance_controller.mark_attendance_batch(course_id, attendance_date, entries, 1)
+        batch = attendance_state()
+        assert attendance_rollup_controller.rebuild_rollup(verify_only=True)['drift_count'] == 0
+
+    assert success and marked[-2:] == [False, False]
+    assert [o['outcome'] for o in outcomes][-2:] == ['error', 'error']
+    assert {o['outcome'] for o in outcomes} == {'inserted', 'updated', 'error'}
+    assert batch == per_row
+
+
+def counts_from_rows(start=None, end=None, student_id=None, course_id=None):
+    """Per-student status counts straight from student_attendance"""
+    rows = db.execute_query("SELECT student_id, course_id, attendance_date, status FROM student_attendance")
+    counts = {}
+    for row in rows:
+        day = str(row['attendance_date'])[:10]
+        if (start and day < start.isoformat()) or (end and day > end.isoformat()):
+            continue
+        if (student_id and row['student_id'] != student_id) or (course_id and row['course_id'] != course_id):
+            continue
+        counts.setdefault(row['student_id'], Counter())[row['status']] += 1
+    return counts
+
+
+def sample_classes():
+    """A few (student, course) pairs to check percentages for"""
+    return db.execute_query("""
+        SELECT DISTINCT student_id, course_id FROM student_attendance ORDER BY student_id, course_id LIMIT 8
+    """)
+
+
+def percentage(counter):
+    total = sum(counter.values())
+    return (counter['Present'] + counter['Late']) / total * 100 if total else 0.0
+
+
+def readers(classes):
+    """What the attendance screens show, read through the rollup"""
+    shown = {}
+    for start, end in RANGES:
+        shown[('report', start, end)] = {
+            row['student_id']: (row['total_days'], row['present'], row['absent'], row['leave'], row['late'],
+                                row['percentage'])
+            for row in attendance_controller.get_attendance_report(start_date=start, end_date=end)
+        }
+    for student in classes:
+        for start, end in RANGES + [(None, None)]:
+            shown[('percentage', student['student_id'], student['course_id'], start, end)] = \
+                attendance_controller.calculate_attendance_percentage(
+                    student['student_id'], student['course_id'], start, end
+                )
+    statistics = attendance_controller.get_attendance_statistics()
+    shown['statistics'] = {key: statistics[key] for key in
+                           ('total_records', 'present_count', 'absent_count', 'leave_count', 'late_count')}
+    shown['low'] = {row['student_id']: row['attendance_percentage']
+                    for row in attendance_controller.get_low_attendance_students(threshold=70)}
+    return shown
+
+
+def expected_readers(classes):
+    """The same screens computed from the raw attendance rows"""
+    active = {row['student_id'] for row in db.execute_query("SELECT student_id FROM students WHERE is_active = 1")}
+    expected = {}
+    for start, end in RANGES:
+        expected[('report', start, end)] = {
+            student_id: pytest.approx((sum(c.values()), c['Present'], c['Absent'], c['Leave'], c['Late'],
+                                       percentage(c)), abs=0.006)
+            for student_id, c in counts_from_rows(start, end).items() if student_id in active
+        }
+    for student in classes:
+        for start, end in RANGES + [(None, None)]:
+            counts = counts_from_rows(start, end, student['student_id'], student['course_id'])
+            expected[('percentage', student['student_id'], student['course_id'], start, end)] = pytest.approx(
+                percentage(counts.get(student['student_id'], Counter()))
+            )
+    everything = sum(counts_from_rows().values(), Counter())
+    expected['statistics'] = {'total_records': sum(everything.values()), 'present_count': everything['Present'],
+                              'absent_count': everything['Absent'], 'leave_count': everything['Leave'],
+                              'late_count': everything['Late']}
+    expected['low'] = {student_id: pytest.approx(percentage(c), abs=0.006)
+                       for student_id, c in counts_from_rows().items()
+                       if student_id in active and percentage(c) < 70}
+    return expected
+
+
+@pytest.fixture(scope="module")
+def two_months(synthetic_db):
+    """Add late-November classes (through the batch path, so the rollup is maintained incrementally)"""
+    classes = db.execute_query("""
+        SELECT course_id, student_id FROM student_attendance GROUP BY course_id, student_id
+    """)
+    by_course = {}
+    for row in classes:
+        by_course.setdefault(row['course_id'], []).append(row['student_id'])
+    for offset in range(8):
+        day = date(2025, 11, 20) + timedelta(days=offset)
+        for course_id, student_ids in by_course.items():
+            attendance_controller.mark_attendance_batch(course_id, day, [
+                {'student_id': student_id, 'status': ATTENDANCE_STATUSES[(student_id * 3 + offset) % 4]}
+                for student_id in student_ids
+            ], 1)
+    return synthetic_db
+
+
+def test_rollup_readers_match_the_raw_rows(two_months):
+    assert attendance_rollup_controller.rebuild_rollup(verify_only=True)['drift_count'] == 0
+    classes = sample_classes()
+    assert readers(classes) == expected_readers(classes)
+
+
+def student_records(classes):
+    """Per-day records as the student attendance screen lists them"""
+    students = {row['student_id']: row for row in classes}.values()
+    return {
+        (row['student_id'], start, end): sorted(
+            (str(record['attendance_date']), record['course_id'], record['status'], record['remarks'])
+            for record in attendance_controller.get_student_attendance(row['student_id'], start, end)
+        )
+        for row in students for start, end in RANGES + [(None, None)]
+    }
+
+
+def test_archived_months_read_the_same(two_months):
+    from controllers.attendance_archive_controller import attendance_archive_controller
+
+    classes = sample_classes()
+    before, records = readers(classes), student_records(classes)
+    assert all(before[('report', start, end)] for start, end in RANGES) and all(records.values())
+    success, _, stats = attendance_archive_controller.archive_months('2025-12')
+
+    assert success and stats['months'] == 2 and stats['records_kept'] == 0
+    assert db.execute_query("SELECT COUNT(*) AS total FROM student_attendance")[0]['total'] == 0
+    assert readers(classes) == before
+    assert student_records(classes) == records
@@ -0,0 +1,113 @@
+"""
+Batch Result Tests
+Checks generate_results_batch and calculate_ranks in controllers.result_controller
+against the per-student path they replace (run with pytest).
+Runs on fresh copies of a small generated university (synthetic_copy); results are written.
+"""
+import pytest
+from database.db_manager import db, DatabaseManager
+from controllers.result_controller import result_controller
+
+RESULT_COLUMNS = ('student_id', 'semester', 'total_marks', 'marks_obtained', 'percentage',
+                  'sgpa', 'cgpa', 'overall_grade', 'status')
+
+
+def stored_results():
+    rows = db.execute_query(f"SELECT {', '.join(RESULT_COLUMNS)} FROM results ORDER BY student_id, semester")
+    return [dict(row) for row in rows]
+
+
+def cohorts():
+    rows = db.execute_query("""
+        SELECT DISTINCT s.department_id, c.semester
+        FROM marks m
+        JOIN students s ON m.student_id = s.student_id
+        JOIN courses c ON m.course_id = c.course_id
+        WHERE s.is_active = 1
+        ORDER BY s.department_id, c.semester
+    """)
+    return [(row['department_id'], row['semester']) for row in rows]
+
+
+def generate_per_student(department_id, semester):
+    """The per-student loop ui/result_generation.py ran before the batch API"""
+    students = db.execute_query(
+        "SELECT student_id FROM students WHERE department_id = ? AND is_active = 1", (department_id,)
+    )
+    for student in students:
+        result_controller.generate_result(student['student_id'], semester)
+
+
+def ranks_in_python(method, tie_breakers):
+    """Rank each department/semester row by row, sharing a rank between equal scores"""
+    rows = db.execute_query(f"""
+        SELECT r.result_id, s.department_id, r.semester, {', '.join('r.' + col for col in tie_breakers)}
+        FROM results r
+        JOIN students s ON r.student_id = s.student_id
+    """)
+    groups = {}
+    for row in rows:
+        key = tuple(row[col] or 0 for col in tie_breakers)
+        groups.setdefault((row['department_id'], row['semester']), []).append((key, row['result_id']))
+
+    ranks = {}
+    for members in groups.values():
+        members.sort(reverse=True)
+        rank = distinct = 0
+        previous = None
+        for position, (key, result_id) in enumerate(members, start=1):
+            if key != previous:
+                distinct += 1
+                rank = position if method == 'competition' else distinct
+                previous = key
+            ranks[result_id] = rank
+    return ranks
+
+
+def stored_ranks():
+    return {row['result_id']: row['rank'] for row in db.execute_query("SELECT result_id, `rank` FROM results")}
+
+
+def test_batch_results_match_per_student_results(synthetic_copy):
+    with synthetic_copy():
+        for department_id, semester in cohorts():
+            generate_per_student(department_id, semester)
+        per_student = stored_results()
+
+    with synthetic_copy():
+        for department_id, semester in cohorts():
+            success, _, _ = result_controller.generate_results_batch(department_id, semester)
+            assert success, (department_id, semester)
+        batch = stored_results()
+
+    assert per_student
+    assert batch == pytest.approx(per_student)
+
+
+@pytest.mark.parametrize('method', ['competition', 'dense'])
+@pytest.mark.parametrize('tie_breakers', [('cgpa',), ('cgpa', 'percentage')])
+def test_ranks_with_ties_match_a_python_ranking(synthetic_copy, method, tie_breakers):
+    with synthetic_copy():
+        for department_id, semester in cohorts():
+            result_controller.generate_results_batch(department_id, semester)
+        # Coarse scores so most cohorts have ties
+        db.execute_update("UPDATE results SET cgpa = ROUND(cgpa, 0), percentage = ROUND(percentage / 10) * 10")
+        ties = db.execute_query("""
+            SELECT COUNT(*) AS total FROM (
+                SELECT s.department_id, r.semester, r.cgpa, r.percentage
+                FROM results r JOIN students s ON r.student_id = s.student_id
+                GROUP BY s.department_id, r.semester, r.cgpa, r.percentage
+                HAVING COUNT(*) > 1
+            ) tied
+        """)[0]['total']
+        assert ties > 0
+        expected = ranks_in_python(method, tie_breakers)
+
+        try:
+            for window in (True, False):
+                DatabaseManager._window_updates = window
+                db.execute_update("UPDATE results SET `rank` = NULL")
+                assert result_controller.calculate_ranks(method=method, tie_breakers=tie_breakers)[0]
+                assert stored_ranks() == expected, f"window={window}"
+        finally:
+            DatabaseManager._window_updates = None
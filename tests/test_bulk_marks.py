@@ -0,0 +1,63 @@
+"""
+Bulk Marks Tests
+Checks MarksController.bulk_enter_marks against one enter_marks call per row (run with pytest).
+Runs on fresh copies of a small generated university (synthetic_copy); marks are written.
+"""
+from database.db_manager import db
+from controllers.marks_controller import marks_controller
+
+
+def marks_batch():
+    """Updates, new marks, a repeated row and rows each validation rule rejects"""
+    existing = db.execute_query("""
+        SELECT m.student_id, m.course_id, c.max_marks FROM marks m
+        JOIN courses c ON m.course_id = c.course_id
+        ORDER BY m.mark_id LIMIT 20
+    """)
+    missing = db.execute_query("""
+        SELECT s.student_id, c.course_id, c.max_marks FROM students s
+        JOIN courses c ON c.department_id = s.department_id
+        WHERE NOT EXISTS (SELECT 1 FROM marks m WHERE m.student_id = s.student_id AND m.course_id = c.course_id)
+        ORDER BY s.student_id, c.course_id LIMIT 20
+    """)
+    batch = [{'student_id': row['student_id'], 'course_id': row['course_id'],
+              'marks_obtained': (number * 7) % (row['max_marks'] + 1)}
+             for number, row in enumerate(existing + missing)]
+    first = existing[0]
+    batch += [
+        {'student_id': first['student_id'], 'course_id': first['course_id'], 'marks_obtained': 12},
+        {'student_id': first['student_id'], 'course_id': first['course_id'], 'marks_obtained': -1},
+        {'student_id': first['student_id'], 'course_id': first['course_id'],
+         'marks_obtained': first['max_marks'] + 1},
+        {'student_id': first['student_id'], 'course_id': 999999, 'marks_obtained': 50},
+        {'student_id': 999999, 'course_id': first['course_id'], 'marks_obtained': 50},
+    ]
+    return batch
+
+
+def marks_state():
+    marks = db.execute_query("""
+        SELECT student_id, course_id, marks_obtained, grade, status, entered_by
+        FROM marks ORDER BY student_id, course_id
+    """)
+    ledger = db.execute_query("""
+        SELECT student_id, semester, credits, grade_points, cum_credits, cum_grade_points
+        FROM gpa_ledger ORDER BY student_id, semester
+    """)
+    return [dict(row) for row in marks], [dict(row) for row in ledger]
+
+
+def test_bulk_entry_matches_one_call_per_row(synthetic_copy):
+    with synthetic_copy():
+        batch = marks_batch()
+        outcomes = [marks_controller.enter_marks(row['student_id'], row['course_id'], row['marks_obtained'], 1)
+                    for row in batch]
+        per_row = marks_state()
+
+    with synthetic_copy():
+        success, _, count = marks_controller.bulk_enter_marks(batch, 1)
+        bulk = marks_state()
+
+    assert success
+    assert count == sum(1 for outcome in outcomes if outcome[0])
+    assert bulk == per_row
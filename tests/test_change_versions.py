@@ -0,0 +1,110 @@
+"""
+Change Version Tests
+Checks how controllers.change_version_controller tells other PCs' writes from its own (run with pytest).
+The version table is replaced by an in-memory dict; no tables are touched.
+"""
+from controllers.change_version_controller import ChangeVersionController
+from utils.reference_cache import ReferenceCache
+
+
+class FakeVersions(ChangeVersionController):
+    """Serves get_versions() from a dict shared by every 'PC'"""
+
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def get_versions(self):
+        return dict(self.table)
+
+    def write(self, name):
+        """What bump() records, without the database"""
+        self.table[name] = self.table.get(name, 0) + 1
+        self._own.setdefault(name, set()).add(self.table[name])
+        self.publish((name,), remote=False)
+
+
+def test_only_other_clients_changes_are_remote():
+    table = {'students': 3}
+    pc_a, pc_b = FakeVersions(table), FakeVersions(table)
+    events = []
+    pc_a.subscribe(lambda tables, remote: events.append((set(tables), remote)))
+
+    assert pc_a.poll() == set()  # First poll is the baseline
+    pc_a.write('students')
+    assert pc_a.poll() == set()
+
+    pc_b.write('students')
+    pc_b.write('courses')
+    pc_a.write('students')  # Own write between polls does not hide pc_b's
+    assert pc_a.poll() == {'students', 'courses'}
+    assert events == [({'students'}, False), ({'students'}, False),
+                      ({'students', 'courses'}, True)]
+
+
+def test_listeners_and_caches_only_see_their_tables():
+    cache = ReferenceCache('test-versions', tables=('t_versions',), ttl=60)
+    cache.get('k', lambda: 'rows')
+    controller = FakeVersions({})
+    seen = []
+    controller.subscribe(lambda tables, remote: seen.append(tables), tables=('t_versions',))
+
+    controller.publish(('t_other',), remote=True)
+    assert seen == [] and cache.stats()['size'] == 1
+
+    controller.publish(('t_versions',), remote=True)
+    assert seen == [frozenset({'t_versions'})] and cache.stats()['size'] == 0
+
+
+def test_listeners_run_after_commit_and_not_on_rollback(synthetic_db):
+    from database.db_manager import db
+
+    controller = ChangeVersionController()
+    events = []
+    controller.subscribe(lambda tables, remote: events.append(set(tables)))
+
+    with db.transaction():
+        controller.bump('t_commit')
+        assert events == []  # Other threads could still read the old rows
+    assert events == [{'t_commit'}]
+
+    before = controller.get_versions()
+    try:
+        with db.transaction():
+            controller.bump('t_commit')
+            raise RuntimeError("write failed")
+    except RuntimeError:
+        pass
+    assert events == [{'t_commit'}]
+    assert controller.get_versions() == before
+    assert controller._own['t_commit'] == {before['t_commit']}  # No phantom version
+
+
+def test_every_results_write_is_versioned(synthetic_db):
+    from database.db_manager import db
+    from controllers.result_controller import result_controller
+
+    controller = ChangeVersionController()
+    row = db.execute_query("""
+        SELECT m.student_id, c.semester FROM marks m JOIN courses c ON m.course_id = c.course_id
+        ORDER BY m.mark_id LIMIT 1
+    """)[0]
+
+    for write in (lambda: result_controller.generate_result(row['student_id'], row['semester']),
+                  lambda: result_controller.calculate_ranks(semester=row['semester'])):
+        before = controller.get_versions().get('results', 0)
+        write()
+        assert controller.get_versions().get('results', 0) > before
+
+
+def test_account_lock_and_unlock_are_versioned(synthetic_db):
+    from database.db_manager import db
+    from controllers.auth_controller import auth
+
+    controller = ChangeVersionController()
+    user_id = db.execute_query("SELECT MIN(user_id) AS user_id FROM users")[0]['user_id']
+
+    for write in (auth._lock_account, auth._reset_failed_attempts):
+        before = controller.get_versions().get('users', 0)
+        write(user_id)
+        assert controller.get_versions().get('users', 0) > before
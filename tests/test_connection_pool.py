@@ -0,0 +1,162 @@
+"""
+Test Script for the Database Connection Pool
+Runs against throwaway SQLite files, no live database needed
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+def print_header(title):
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def make_pool(size=2, timeout=0.5, ping_interval=60.0):
+    """Create a pool of SQLite connections on a temporary database file"""
+    db_path = os.path.join(tempfile.mkdtemp(), "pool_test.db")
+
+    def factory():
+        return sqlite3.connect(db_path, check_same_thread=False)
+
+    def health_check(connection):
+        connection.execute("SELECT 1").fetchone()
+
+    return ConnectionPool(factory, health_check, size=size, timeout=timeout,
+                          ping_interval=ping_interval)
+
+
+def test_same_thread_reuses_connection():
+    """A thread gets the same connection on every call"""
+    print_header("TEST 1: Per-thread Checkout")
+    pool = make_pool()
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is second
+    assert pool.stats()['in_use'] == 1
+    print("✓ Same connection returned to the same thread")
+
+
+def test_threads_get_separate_connections():
+    """Concurrent threads never share a connection"""
+    print_header("TEST 2: Separate Connections per Thread")
+    pool = make_pool(size=3)
+    seen = []
+    barrier = threading.Barrier(3)
+
+    def worker():
+        seen.append(pool.acquire())
+        barrier.wait()
+        pool.release()
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(conn) for conn in seen}) == 3
+    assert pool.stats()['idle'] == 3
+    print("✓ 3 threads used 3 distinct connections")
+
+
+def test_release_and_reuse():
+    """Released connections are handed to the next thread"""
+    print_header("TEST 3: Release and Reuse")
+    pool = make_pool(size=1)
+
+    conn = pool.acquire()
+    pool.release()
+
+    reused = []
+    thread = threading.Thread(target=lambda: (reused.append(pool.acquire()), pool.release()))
+    thread.start()
+    thread.join()
+
+    assert reused[0] is conn
+    assert pool.stats()['open'] == 1
+    print("✓ Connection recycled after release")
+
+
+def test_exhausted_pool_times_out():
+    """Callers wait for a free slot and fail after the timeout"""
+    print_header("TEST 4: Pool Exhaustion")
+    pool = make_pool(size=1, timeout=0.2)
+    pool.acquire()
+
+    errors = []
+    ready = threading.Event()
+
+    def blocked_worker():
+        try:
+            pool.acquire()
+        except PoolTimeoutError as e:
+            errors.append(e)
+        finally:
+            ready.set()
+
+    # Keep the worker alive while it waits so it cannot be reclaimed
+    thread = threading.Thread(target=blocked_worker)
+    thread.start()
+    ready.wait(2)
+    thread.join()
+
+    assert len(errors) == 1
+    print("✓ PoolTimeoutError raised when no connection is free")
+
+
+def test_dead_thread_connection_reclaimed():
+    """Connections held by finished threads are reclaimed"""
+    print_header("TEST 5: Reclaim from Finished Threads")
+    pool = make_pool(size=1)
+
+    thread = threading.Thread(target=pool.acquire)  # Never releases
+    thread.start()
+    thread.join()
+
+    conn = pool.acquire()
+    assert conn is not None
+    assert pool.stats()['open'] == 1
+    print("✓ Slot recovered from a thread that exited without releasing")
+
+
+def test_broken_connection_replaced():
+    """Health check replaces a dead connection"""
+    print_header("TEST 6: Health Check")
+    pool = make_pool(size=1, ping_interval=0.0)
+
+    conn = pool.acquire()
+    conn.close()
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    replacement.execute("SELECT 1")
+    assert pool.stats()['open'] == 1
+    print("✓ Closed connection replaced on next checkout")
+
+
+def run_all_tests():
+    tests = [
+        test_same_thread_reuses_connection,
+        test_threads_get_separate_connections,
+        test_release_and_reuse,
+        test_exhausted_pool_times_out,
+        test_dead_thread_connection_reclaimed,
+        test_broken_connection_replaced,
+    ]
+    for test in tests:
+        test()
+    print("\n🎉 All connection pool tests passed!")
+
+
+if __name__ == "__main__":
+    run_all_tests()
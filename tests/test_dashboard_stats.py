@@ -0,0 +1,66 @@
+"""
+Dashboard Statistics Tests
+Checks controllers.dashboard_controller against the list-and-count code the
+dashboards ran before (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); a few rows are deactivated.
+"""
+from datetime import date
+from database.db_manager import db
+from controllers.attendance_controller import attendance_controller
+from controllers.course_controller import course_controller
+from controllers.dashboard_controller import dashboard_controller
+from controllers.department_controller import department_controller
+from controllers.marks_controller import marks_controller
+from controllers.student_controller import student_controller
+from controllers.user_controller import user_controller
+
+
+def deactivate_a_few():
+    db.execute_update("UPDATE students SET is_active = 0 WHERE student_id % 9 = 0")
+    db.execute_update("UPDATE courses SET is_active = 0 WHERE course_id % 11 = 0")
+    db.execute_update("UPDATE users SET is_active = 0 WHERE user_id = (SELECT MAX(user_id) FROM users)")
+    course = db.execute_query("SELECT course_id FROM courses ORDER BY course_id LIMIT 1")[0]['course_id']
+    students = db.execute_query("SELECT student_id FROM students ORDER BY student_id LIMIT 25")
+    attendance_controller.mark_attendance_batch(
+        course, date.today(),
+        [{'student_id': row['student_id'], 'status': ('Present', 'Absent', 'Late', 'Leave')[row['student_id'] % 4]}
+         for row in students], 1
+    )
+
+
+def test_overview_matches_counting_the_lists(synthetic_db):
+    deactivate_a_few()
+    stats = dashboard_controller.get_overview_statistics(use_cache=False)
+
+    students = student_controller.get_all_students()
+    users = user_controller.get_all_users()
+    today = db.execute_query("SELECT status FROM student_attendance WHERE attendance_date = ?",
+                             (date.today().isoformat(),))
+    assert stats == {
+        'total_students': len(students),
+        'male_students': sum(1 for s in students if str(s.get('gender', '')).lower() == 'male'),
+        'female_students': sum(1 for s in students if str(s.get('gender', '')).lower() == 'female'),
+        'active_students': sum(1 for s in students if s.get('is_active', 1)),
+        'total_courses': len(course_controller.get_all_courses()),
+        'total_departments': len(department_controller.get_all_departments()),
+        'total_users': len(users),
+        'active_users': sum(1 for u in users if u.get('is_active', 1)),
+        'attendance_today': sum(1 for row in today if row['status'] in ('Present', 'Late')) / len(today) * 100,
+    }
+
+
+def test_department_and_student_tiles_match_the_lists(synthetic_db):
+    students = student_controller.get_all_students()
+    courses = course_controller.get_all_courses()
+    for department in department_controller.get_all_departments():
+        department_id = department['department_id']
+        assert dashboard_controller.get_department_statistics(department_id, use_cache=False) == {
+            'department_name': department['department_name'],
+            'total_students': sum(1 for s in students if s.get('department_id') == department_id),
+            'total_courses': sum(1 for c in courses if c.get('department_id') == department_id),
+        }
+
+    for student in students[:10]:
+        stats = dashboard_controller.get_student_statistics(student['student_id'], use_cache=False)
+        assert stats['student']['roll_number'] == student['roll_number']
+        assert stats['total_courses'] == len(marks_controller.get_student_marks(student['student_id']))
@@ -0,0 +1,54 @@
+"""
+GPA Ledger Tests
+Checks controllers.gpa_ledger_controller against CGPA recomputed from marks (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); marks are written.
+"""
+import config
+from database.db_manager import db
+from controllers.gpa_ledger_controller import gpa_ledger_controller
+from controllers.marks_controller import marks_controller
+from controllers.result_controller import result_controller
+
+
+def cgpa_from_marks(student_id, up_to_semester):
+    """CGPA the way result_controller computed it before the ledger: every mark, every time"""
+    points = credits = 0
+    for mark in marks_controller.get_student_marks(student_id):
+        if mark['semester'] <= up_to_semester:
+            points += config.GRADING_SCALE.get(mark['grade'], {}).get('points', 0) * mark['credits']
+            credits += mark['credits']
+    return round(points / credits, 2) if credits else None
+
+
+def assert_ledger_matches_marks():
+    students = db.execute_query("SELECT DISTINCT student_id FROM marks ORDER BY student_id")
+    for row in students:
+        for semester in (1, 4, 8):
+            expected = cgpa_from_marks(row['student_id'], semester)
+            success, cgpa, _ = result_controller.calculate_cgpa(row['student_id'], semester)
+            assert (cgpa if success else None) == expected, (row['student_id'], semester)
+    assert gpa_ledger_controller.rebuild_ledger(verify_only=True)['drift_count'] == 0
+
+
+def test_empty_ledger_is_backfilled_before_the_first_write(synthetic_db):
+    # An upgraded database: marks exist but the ledger table was just created
+    db.execute_update("DELETE FROM gpa_ledger")
+    gpa_ledger_controller._checked = False
+
+    mark = db.execute_query("SELECT student_id, course_id, marks_obtained FROM marks ORDER BY mark_id LIMIT 1")[0]
+    success, _, _ = marks_controller.enter_marks(
+        mark['student_id'], mark['course_id'], max(0, mark['marks_obtained'] - 30), 1
+    )
+
+    assert success
+    assert_ledger_matches_marks()
+
+
+def test_incremental_updates_match_a_recompute(synthetic_db):
+    marks = db.execute_query("SELECT mark_id, student_id, course_id FROM marks ORDER BY mark_id LIMIT 6")
+    for number, mark in enumerate(marks[:4]):
+        assert marks_controller.enter_marks(mark['student_id'], mark['course_id'], 35 + number * 15, 1)[0]
+    for mark in marks[4:]:
+        assert marks_controller.delete_marks(mark['mark_id'])[0]
+
+    assert_ledger_matches_marks()
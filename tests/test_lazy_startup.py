@@ -0,0 +1,53 @@
+"""
+Lazy Startup Tests
+Checks that importing the database layer and controllers stays cheap (run with pytest).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import config
+from database.db_manager import db
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str) -> str:
+    """Run code in a fresh interpreter from the project directory"""
+    result = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True,
+                            text=True, env=dict(os.environ, PYTHONPATH=BASE_DIR))
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_import_does_not_connect():
+    """Outside 'eager' mode no connection is opened at import"""
+    if config.DB_CONNECT_MODE == 'eager':
+        pytest.skip("connect_mode is 'eager' in config.json")
+    assert run_python(
+        "from database.db_manager import db; print(db.get_pool_stats()['open'])"
+    ) == '0'
+
+
+def test_controllers_defer_heavy_libraries():
+    """pandas, numpy, reportlab and openpyxl load on first use, not at import"""
+    loaded = run_python(
+        "import sys\n"
+        "import controllers.student_controller, controllers.transcript_controller\n"
+        "import controllers.ai_insights_controller, controllers.batch_print_controller\n"
+        "print(sorted({'pandas', 'numpy', 'reportlab', 'openpyxl'} & set(sys.modules)))"
+    )
+    assert loaded == '[]'
+
+
+def test_warm_up_leaves_idle_connection(synthetic_db):
+    """The background connect parks its connection in the pool for the next query"""
+    db.close_connection()
+    db.warm_up().join(timeout=30)
+
+    stats = db.get_pool_stats()
+    assert stats['open'] == 1
+    assert stats['idle'] == 1
+    assert db.execute_query("SELECT 1 AS one") == [{'one': 1}]
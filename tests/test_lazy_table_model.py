@@ -0,0 +1,144 @@
+"""
+Lazy Table Model Tests
+Checks block fetching, eviction and SQL-side sorting of ui.components.lazy_table_model (run with pytest).
+The page source is an in-memory list; workers hold connections to a synthetic_db copy, no tables are touched.
+"""
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from ui.components.lazy_table_model import LazyTableModel, TableColumn, PLACEHOLDER
+from utils.task_runner import task_runner
+
+ROWS = [{'row_id': n, 'name': f"Student {n:04d}"} for n in range(1, 96)]
+
+
+@pytest.fixture(scope="module")
+def app(synthetic_db):
+    # Database tasks check out a pooled connection, so keep them off the configured database
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def wait_until(condition, timeout=5.0):
+    """Process queued signals until condition() holds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the model"
+        QtCore.QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+
+class FakeSource:
+    """Keyset page source in the shape of student_controller.get_students_page"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = False
+
+    def fetch_page(self, sort_by='row_id', descending=False, after=None, offset=0, limit=10):
+        self.calls.append({'sort_by': sort_by, 'descending': descending, 'after': after, 'offset': offset})
+        if self.failing:
+            raise RuntimeError("database is down")
+        rows = sorted(ROWS, key=lambda row: row[sort_by], reverse=descending)
+        start = offset if after is None else next(i for i, row in enumerate(rows) if row['row_id'] == after) + 1
+        page = rows[start:start + limit + 1]
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {'rows': page, 'next_cursor': page[-1]['row_id'] if has_more else None, 'has_more': has_more}
+
+    def count_rows(self):
+        return len(ROWS), True
+
+
+def make_model(source, max_blocks=3):
+    columns = [TableColumn("ID", 'row_id', sort_key='row_id'), TableColumn("Name", 'name', sort_key='name')]
+    return LazyTableModel(columns, source.fetch_page, count_rows=source.count_rows,
+                          block_size=10, max_blocks=max_blocks)
+
+
+def load_all(model):
+    """Scroll to the end, one block at a time"""
+    while model.canFetchMore() or model._loading:
+        model.fetchMore()
+        QtCore.QCoreApplication.processEvents()
+        time.sleep(0.005)
+    wait_until(lambda: task_runner.stats()['active'] == 0)
+
+
+def test_rows_arrive_in_blocks(app):
+    source = FakeSource()
+    model = make_model(source, max_blocks=20)
+    model.set_query()
+
+    wait_until(lambda: model.rowCount() == 10 and model.total is not None)
+    assert model.total == 95
+    assert model.canFetchMore()
+
+    load_all(model)
+    assert model.rowCount() == 95
+    assert not model.canFetchMore()
+    assert model.data(model.index(94, 1)) == "Student 0095"
+    # Blocks after the first continue from the keyset cursor
+    assert [call['after'] for call in source.calls[:3]] == [None, 10, 20]
+
+
+def test_only_recent_blocks_stay_in_memory(app):
+    source = FakeSource()
+    model = make_model(source, max_blocks=3)
+    model.set_query()
+    wait_until(lambda: model.rowCount() == 10)
+    load_all(model)
+
+    assert model.cached_rows <= 30
+    assert model.row_at(0) is None
+
+    # Scrolling back fetches the dropped block again
+    assert model.data(model.index(0, 0)) == PLACEHOLDER
+    wait_until(lambda: model.row_at(0) is not None)
+    assert model.data(model.index(0, 0)) == "1"
+
+
+def test_sorting_happens_in_the_query(app):
+    source = FakeSource()
+    model = make_model(source)
+    model.set_query(sort_by='row_id', descending=False)
+    wait_until(lambda: model.rowCount() == 10)
+
+    model.sort(1, QtCore.Qt.DescendingOrder)
+    wait_until(lambda: model.rowCount() == 10 and model.row_at(0) is not None)
+
+    assert source.calls[-1]['sort_by'] == 'name'
+    assert source.calls[-1]['descending'] is True
+    assert model.data(model.index(0, 1)) == "Student 0095"
+
+    # Sorting by the order already shown does not query again
+    calls = len(source.calls)
+    model.sort(1, QtCore.Qt.DescendingOrder)
+    assert len(source.calls) == calls
+
+
+def test_failed_blocks_are_not_refetched_until_reload(app):
+    source = FakeSource()
+    model = make_model(source, max_blocks=3)
+    model.set_query()
+    wait_until(lambda: model.rowCount() == 10)
+    load_all(model)
+    errors = []
+    model.loadFailed.connect(errors.append)
+
+    source.failing = True
+    model.data(model.index(0, 0))
+    wait_until(lambda: errors)
+    calls = len(source.calls)
+
+    # Repaints show an empty cell instead of submitting the fetch again
+    assert model.data(model.index(0, 0)) is None
+    wait_until(lambda: task_runner.stats()['active'] == 0)
+    assert len(source.calls) == calls
+
+    source.failing = False
+    model.reload()
+    wait_until(lambda: model.rowCount() == 10 and model.row_at(0) is not None)
+    assert model.data(model.index(0, 0)) == "1"
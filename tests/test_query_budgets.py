@@ -0,0 +1,64 @@
+"""
+Query Budget Tests
+Guards the batched controller paths against N+1 regressions (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); feature tables are built in it.
+"""
+import math
+from datetime import date
+
+from controllers.ai_insights_controller import ai_insights_controller
+from controllers.attendance_controller import attendance_controller
+from controllers.dashboard_controller import dashboard_controller
+from controllers.student_controller import student_controller
+from database.db_manager import db, IN_LIST_SIZE
+
+
+def _active_student_chunks():
+    result = db.execute_query("SELECT COUNT(*) as total FROM students WHERE is_active = 1")
+    return max(1, math.ceil((result[0]['total'] if result else 0) / IN_LIST_SIZE))
+
+
+def test_risk_scores_are_batched(synthetic_db, query_budget):
+    """Scoring a whole cohort costs a fixed number of grouped queries"""
+    ai_insights_controller.calculate_risk_scores()  # Warm up feature tables
+    chunks = _active_student_chunks()
+
+    with query_budget(max_queries=8 + chunks, max_repeats=chunks, label="calculate_risk_scores"):
+        scored = ai_insights_controller.calculate_risk_scores()
+    assert scored
+
+
+def test_at_risk_list_does_not_score_per_student(synthetic_db, query_budget):
+    """The at-risk list reuses the cohort scorer instead of one score per student"""
+    ai_insights_controller.get_at_risk_students()
+    chunks = _active_student_chunks()
+
+    with query_budget(max_queries=8 + chunks, max_repeats=chunks, label="get_at_risk_students"):
+        at_risk = ai_insights_controller.get_at_risk_students()
+    assert at_risk
+
+
+def test_student_page_is_constant(synthetic_db, query_budget):
+    """One page of the student table is a single keyset query"""
+    with query_budget(max_queries=1, label="get_students_page"):
+        page = student_controller.get_students_page(limit=25)
+    assert len(page['rows']) == 25
+
+
+def test_dashboard_overview(synthetic_db, query_budget):
+    """Admin dashboard tiles come from three aggregate queries"""
+    with query_budget(max_queries=3, label="dashboard overview"):
+        stats = dashboard_controller.get_overview_statistics(use_cache=False)
+    assert stats['total_students'] and stats['total_courses'] and stats['total_users']
+
+
+def test_attendance_report_reads_rollup(synthetic_db, query_budget):
+    """Attendance reports are a single aggregate query"""
+    december = {'start_date': date(2025, 12, 1), 'end_date': date(2025, 12, 31)}  # The generated classes
+    attendance_controller.get_attendance_report(**december)  # Warm up feature tables
+
+    with query_budget(max_queries=1, max_repeats=1, label="attendance report"):
+        report = attendance_controller.get_attendance_report(**december)
+    with query_budget(max_queries=1, label="low attendance"):
+        low = attendance_controller.get_low_attendance_students(threshold=101)
+    assert report and low
@@ -0,0 +1,148 @@
+"""
+Test Script for Query Instrumentation
+Exercises QueryMonitor directly, no live database needed
+"""
+import os
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.query_monitor import QueryMonitor, QueryCounter, QueryBudgetExceeded, normalize_sql
+
+
+def print_header(title):
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def test_normalize_sql():
+    """Literals and placeholder lists collapse to one statement shape"""
+    print_header("TEST 1: SQL Normalization")
+    a = normalize_sql("SELECT * FROM students WHERE student_id IN (?, ?, ?) AND name = 'Ali'")
+    b = normalize_sql("SELECT *\n  FROM students WHERE student_id IN (%s,%s) AND name = 'O''Neil'")
+    assert a == b == "SELECT * FROM students WHERE student_id IN (?+) AND name = ?"
+    assert normalize_sql("SELECT 1 FROM idx_2") == "SELECT ? FROM idx_2"
+    print("✓ Statements with different literals group together")
+
+
+def test_aggregates_and_percentiles():
+    """Calls, rows and p50/p95 are aggregated per statement"""
+    print_header("TEST 2: Aggregated Statistics")
+    monitor = QueryMonitor(slow_query_ms=0)
+    for i in range(1, 101):
+        monitor.record('query', f"SELECT * FROM marks WHERE mark_id = {i}", i / 1000.0, rows=1)
+    monitor.record('update', "UPDATE marks SET grade = ?", 0.5, rows=3, error="locked")
+
+    stats = {row['sql']: row for row in monitor.stats()}
+    select = stats["SELECT * FROM marks WHERE mark_id = ?"]
+    assert select['calls'] == 100 and select['rows'] == 100
+    assert select['p50_ms'] == 50.0 and select['p95_ms'] == 95.0 and select['max_ms'] == 100.0
+    assert stats["UPDATE marks SET grade = ?"]['errors'] == 1
+    assert monitor.stats(sort_by='calls', limit=1)[0]['calls'] == 100
+    print("✓ p50 = 50 ms, p95 = 95 ms over 100 timed calls")
+
+
+def test_ring_buffer_and_call_site():
+    """Only the most recent statements are kept, each with its caller"""
+    print_header("TEST 3: Ring Buffer")
+    monitor = QueryMonitor(slow_query_ms=0, history_size=5)
+    for i in range(12):
+        monitor.record('query', f"SELECT {i}", 0.001)
+
+    recent = monitor.recent()
+    assert len(recent) == 5
+    assert recent[-1]['sql'] == "SELECT 11"
+    assert 'test_ring_buffer_and_call_site' in recent[-1]['call_site']
+    print("✓ Ring buffer holds the last 5 statements with call sites")
+
+
+def test_slow_query_log():
+    """Statements over the threshold are written to the slow log"""
+    print_header("TEST 4: Slow Query Log")
+    log_dir = tempfile.mkdtemp()
+    monitor = QueryMonitor(slow_query_ms=100, log_dir=log_dir)
+    monitor.record('query', "SELECT fast", 0.01)
+    monitor.record('query', "SELECT slow", 0.25, rows=7)
+    for handler in monitor._slow_logger.handlers:
+        handler.flush()
+
+    with open(os.path.join(log_dir, 'slow_queries.log'), encoding='utf-8') as f:
+        content = f.read()
+    assert "SELECT slow" in content and "rows=7" in content
+    assert "SELECT fast" not in content
+    print("✓ Only the slow statement was logged")
+
+
+def test_query_counter_flags_repeated_shapes():
+    """A statement run once per item trips the repeat budget"""
+    print_header("TEST 5: N+1 Detection")
+    monitor = QueryMonitor(enabled=False)
+
+    with QueryCounter(monitor, max_queries=20, max_repeats=3, raise_on_exceed=False) as counter:
+        monitor.record('query', "SELECT * FROM students WHERE department_id = 1", 0.001)
+        for student_id in range(1, 6):
+            monitor.record('query', f"SELECT * FROM marks WHERE student_id = {student_id}", 0.001)
+
+    assert counter.count == 6
+    repeated = counter.repeated()
+    assert len(repeated) == 1 and repeated[0]['calls'] == 5
+    assert repeated[0]['sql'] == "SELECT * FROM marks WHERE student_id = ?"
+
+    try:
+        with QueryCounter(monitor, max_repeats=3, label="per-student loop"):
+            for student_id in range(1, 6):
+                monitor.record('query', f"SELECT * FROM marks WHERE student_id = {student_id}", 0.001)
+    except QueryBudgetExceeded as e:
+        assert "per-student loop" in str(e) and "5x" in str(e)
+    else:
+        raise AssertionError("budget was not enforced")
+
+    monitor.record('query', "SELECT 1", 0.001)
+    assert counter.count == 6
+    print("✓ Repeated statement flagged; counting stops when the block exits")
+
+
+def test_query_counter_total_budget():
+    """The total statement budget is enforced and other threads are ignored"""
+    print_header("TEST 6: Statement Budget")
+    import threading
+    monitor = QueryMonitor(enabled=False)
+
+    with QueryCounter(monitor, max_queries=2) as counter:
+        monitor.record('query', "SELECT 1", 0.001)
+        worker = threading.Thread(target=monitor.record, args=('query', "SELECT 2", 0.001))
+        worker.start()
+        worker.join()
+        monitor.record('query', "SELECT 3", 0.001)
+    assert counter.count == 2
+
+    try:
+        with QueryCounter(monitor, max_queries=2):
+            for i in range(3):
+                monitor.record('query', f"SELECT {i}", 0.001)
+    except QueryBudgetExceeded as e:
+        assert "3 statements (budget 2)" in str(e)
+    else:
+        raise AssertionError("budget was not enforced")
+    print("✓ Budget of 2 statements enforced for the current thread")
+
+
+def run_all_tests():
+    tests = [
+        test_normalize_sql,
+        test_aggregates_and_percentiles,
+        test_ring_buffer_and_call_site,
+        test_slow_query_log,
+        test_query_counter_flags_repeated_shapes,
+        test_query_counter_total_budget,
+    ]
+    for test in tests:
+        test()
+    print("\n🎉 All query monitor tests passed!")
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,124 @@
+"""
+Reference Cache Tests
+Checks utils.reference_cache expiry, LRU eviction and table invalidation (run with pytest).
+Controller checks run on a generated copy of a small university (synthetic_db).
+"""
+import time
+
+from database.db_manager import db
+from utils.reference_cache import ReferenceCache, Uncached, invalidate_tables, cache_stats
+
+
+class Loader:
+    """Counts how often the cache falls through to the 'database'"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value=None):
+        self.calls += 1
+        return [{'value': value}]
+
+
+def test_hits_are_served_from_memory():
+    cache = ReferenceCache('test-hits', tables=('t_hits',), ttl=60, max_entries=10)
+    load = Loader()
+
+    first = cache.get('k', lambda: load('a'))
+    first[0]['value'] = 'changed by caller'
+    second = cache.get('k', lambda: load('a'))
+
+    assert load.calls == 1
+    assert second == [{'value': 'a'}]  # Callers get copies
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = ReferenceCache('test-ttl', tables=('t_ttl',), ttl=0.05, max_entries=10)
+    load = Loader()
+
+    cache.get('k', load)
+    time.sleep(0.06)
+    cache.get('k', load)
+
+    assert load.calls == 2
+    assert cache.stats()['expirations'] == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = ReferenceCache('test-lru', tables=('t_lru',), ttl=60, max_entries=2)
+    load = Loader()
+
+    cache.get('a', load)
+    cache.get('b', load)
+    cache.get('a', load)  # 'b' is now least recently used
+    cache.get('c', load)
+    cache.get('a', load)
+    cache.get('b', load)
+
+    assert load.calls == 4  # a, b, c, then b again
+    assert cache.stats()['evictions'] == 2
+
+
+def test_writes_invalidate_dependent_caches():
+    courses = ReferenceCache('test-courses', tables=('t_courses', 't_departments'), ttl=60)
+    users = ReferenceCache('test-users', tables=('t_users',), ttl=60)
+    load = Loader()
+    courses.get('k', load)
+    users.get('k', load)
+
+    invalidate_tables('t_departments')
+
+    assert courses.stats()['size'] == 0
+    assert users.stats()['size'] == 1
+    assert 'test-courses' in cache_stats()
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = ReferenceCache('test-race', tables=('t_race',), ttl=60)
+
+    def stale_load():
+        invalidate_tables('t_race')  # A write lands while the row is being read
+        return 'stale'
+
+    assert cache.get('k', stale_load) == 'stale'
+    assert cache.stats()['size'] == 0
+
+
+def test_failed_loads_are_not_cached():
+    cache = ReferenceCache('test-failures', tables=('t_failures',), ttl=60)
+    load = Loader()
+
+    def failing_load():
+        load()
+        return Uncached([])  # What a loader returns when execute_query gave None
+
+    assert cache.get('k', failing_load) == []
+    assert cache.get('k', failing_load) == []
+    assert load.calls == 2
+    assert cache.stats()['size'] == 0
+    assert cache.stats()['failures'] == 2
+
+
+def test_controller_lookups_skip_the_database(synthetic_db):
+    from controllers.department_controller import department_controller
+
+    department_controller.get_all_departments()
+    with db.count_queries(raise_on_exceed=False) as counter:
+        for _ in range(5):
+            department_controller.get_all_departments()
+
+    assert counter.count == 0
+
+
+def test_restoring_a_backup_drops_cached_lookups(synthetic_db, tmp_path):
+    from controllers.department_controller import department_controller
+
+    backup = str(tmp_path / "backup.db")
+    assert db.backup_database(backup)[0]
+    department_controller.get_all_departments()
+    assert department_controller.cache_stats()['size'] > 0
+
+    assert db.restore_database(backup)
+    assert department_controller.cache_stats()['size'] == 0
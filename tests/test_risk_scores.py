@@ -0,0 +1,105 @@
+"""
+Risk Score Tests
+Checks the cohort scoring in controllers.ai_insights_controller against the
+per-student queries it replaces (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); results and submissions are written.
+"""
+import pytest
+from database.db_manager import db
+from controllers.ai_insights_controller import ai_insights_controller
+from controllers.result_controller import result_controller
+
+
+def bucket(value, limits, risks):
+    """First risk whose limit the value is below (0 when above every limit)"""
+    for limit, risk in zip(limits, risks):
+        if value < limit:
+            return risk
+    return 0.0
+
+
+def flat(factors):
+    """Factor dict as {'cgpa.value': ...} (pytest.approx does not compare nested dicts)"""
+    return {f"{name}.{key}": value for name, factor in factors.items() for key, value in factor.items()}
+
+
+def risk_per_student(student_id):
+    """calculate_risk_score as it was: four queries per student"""
+    latest = db.execute_query(
+        "SELECT cgpa FROM results WHERE student_id = ? ORDER BY generated_at DESC LIMIT 1", (student_id,)
+    )
+    cgpa = latest[0]['cgpa'] if latest and latest[0]['cgpa'] else 0.0
+
+    attendance = db.execute_query("""
+        SELECT COUNT(*) as total, SUM(CASE WHEN status IN ('Present', 'Late') THEN 1 ELSE 0 END) as present
+        FROM student_attendance WHERE student_id = ?
+    """, (student_id,))[0]
+    attendance_pct = attendance['present'] / attendance['total'] * 100 if attendance['total'] else 0.0
+
+    f_count = db.execute_query(
+        "SELECT COUNT(*) as f_count FROM marks WHERE student_id = ? AND grade = 'F'", (student_id,)
+    )[0]['f_count']
+
+    submissions = db.execute_query("""
+        SELECT COUNT(*) as total, SUM(CASE WHEN status IN ('Submitted', 'Graded') THEN 1 ELSE 0 END) as submitted
+        FROM assignment_submissions WHERE student_id = ?
+    """, (student_id,))[0]
+    submission_rate = submissions['submitted'] / submissions['total'] * 100 if submissions['total'] else 0.0
+
+    factors = {
+        'cgpa': {'value': cgpa, 'risk': bucket(cgpa, (2.0, 2.5, 3.0), (40.0, 30.0, 15.0)), 'weight': 40},
+        'attendance': {'value': attendance_pct,
+                       'risk': bucket(attendance_pct, (60, 75, 85), (30.0, 20.0, 10.0)), 'weight': 30},
+        'failing_grades': {'value': f_count, 'weight': 20,
+                           'risk': 20.0 if f_count >= 3 else 15.0 if f_count >= 2 else 10.0 if f_count else 0.0},
+        'assignment_submission': {'value': submission_rate,
+                                  'risk': bucket(submission_rate, (50, 75), (10.0, 5.0)), 'weight': 10},
+    }
+    return sum(factor['risk'] for factor in factors.values()), factors
+
+
+@pytest.fixture(scope="module")
+def scored_university(synthetic_db):
+    """Results for every cohort (latest semester generated last) and some assignment submissions"""
+    cohorts = db.execute_query("""
+        SELECT DISTINCT s.department_id, c.semester FROM marks m
+        JOIN students s ON m.student_id = s.student_id JOIN courses c ON m.course_id = c.course_id
+        ORDER BY c.semester
+    """)
+    for cohort in cohorts:
+        result_controller.generate_results_batch(cohort['department_id'], cohort['semester'])
+    db.execute_update("UPDATE results SET generated_at = DATETIME('2026-01-01', '+' || semester || ' days')")
+
+    course = db.execute_query("SELECT course_id FROM courses ORDER BY course_id LIMIT 1")[0]['course_id']
+    for number in range(3):
+        _, assignment_id = db.execute_update(
+            "INSERT INTO assignments (course_id, title, max_marks) VALUES (?, ?, 10)", (course, f"Task {number}")
+        )
+        students = db.execute_query("SELECT student_id FROM students ORDER BY student_id LIMIT 30")
+        statuses = ('Submitted', 'Pending', 'Graded', 'Late')
+        db.execute_many(
+            "INSERT INTO assignment_submissions (assignment_id, student_id, status) VALUES (?, ?, ?)",
+            [(assignment_id, row['student_id'], statuses[(row['student_id'] + number) % 4]) for row in students]
+        )
+    return synthetic_db
+
+
+def test_cohort_scores_match_per_student_scores(scored_university):
+    scored = ai_insights_controller.calculate_risk_scores()
+    assert len(scored) == db.execute_query("SELECT COUNT(*) AS total FROM students WHERE is_active = 1")[0]['total']
+
+    levels = set()
+    for student in scored:
+        risk_score, factors = risk_per_student(student['student_id'])
+        assert student['risk_score'] == pytest.approx(risk_score), student['student_id']
+        assert flat(student['factors']) == pytest.approx(flat(factors)), student['student_id']
+        levels.add(student['risk_level'])
+    assert len(levels) > 1
+
+
+def test_single_student_score_matches(scored_university):
+    student_id = db.execute_query("SELECT student_id FROM students ORDER BY student_id LIMIT 1")[0]['student_id']
+    risk_score, factors = ai_insights_controller.calculate_risk_score(student_id)
+    expected_score, expected_factors = risk_per_student(student_id)
+    assert risk_score == pytest.approx(expected_score)
+    assert flat(factors) == pytest.approx(flat(expected_factors))
@@ -0,0 +1,51 @@
+"""
+Streaming Cursor Tests
+Checks db.stream_query / db.iter_query (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); rows come from a recursive CTE.
+"""
+import pytest
+
+from database.db_manager import db
+
+SEQUENCE = """
+    WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+    SELECT n, n * 2 AS double_n FROM seq
+"""
+
+
+def test_stream_yields_bounded_chunks(synthetic_db):
+    """Rows arrive in chunk_size batches, in order"""
+    chunks = list(db.stream_query(SEQUENCE, (2500,), chunk_size=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert chunks[0][0] == {'n': 1, 'double_n': 2}
+    assert chunks[-1][-1]['n'] == 2500
+
+
+def test_iter_query_matches_execute_query(synthetic_db):
+    """iter_query yields the same row dictionaries as execute_query"""
+    assert list(db.iter_query(SEQUENCE, (300,), chunk_size=64)) == db.execute_query(SEQUENCE, (300,))
+
+
+def test_stream_is_one_statement(synthetic_db):
+    """The whole stream is recorded once, with its row count"""
+    with db.count_queries(raise_on_exceed=False) as counter:
+        total = sum(1 for _ in db.iter_query(SEQUENCE, (1200,), chunk_size=100))
+
+    assert total == 1200
+    assert counter.count == 1
+
+
+def test_closing_early_releases_cursor(synthetic_db):
+    """Abandoning a stream leaves the connection usable"""
+    rows = db.iter_query(SEQUENCE, (5000,), chunk_size=10)
+    assert next(rows)['n'] == 1
+    rows.close()
+
+    assert db.execute_query("SELECT 1 AS one") == [{'one': 1}]
+
+
+def test_errors_are_raised(synthetic_db):
+    """Unlike execute_query, a failing stream raises"""
+    with pytest.raises(Exception):
+        list(db.iter_query("SELECT * FROM no_such_table_for_streaming"))
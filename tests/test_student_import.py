@@ -0,0 +1,121 @@
+"""
+Student Import Tests
+Checks the columnar bulk import in controllers.student_controller (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); students are imported.
+"""
+import csv
+from database.db_manager import db
+from controllers.student_controller import student_controller
+from utils.validators import validate_date, validate_gender, validate_name, validate_roll_number
+
+IMPORT_HEADER = ['roll_number', 'name', 'department_code', 'semester', 'gender', 'date_of_birth',
+                 'email', 'phone', 'guardian_phone']
+
+
+def write_import_file(path, rows):
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(IMPORT_HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def department_code():
+    return db.execute_query("SELECT department_code FROM departments ORDER BY department_id LIMIT 1")[0]['department_code']
+
+
+def test_import_errors_match_the_form_validators(synthetic_db, tmp_path):
+    code = department_code()
+    existing = db.execute_query("SELECT roll_number FROM students LIMIT 1")[0]['roll_number']
+    rows = [
+        ['IMP-0001', 'Sara Ahmed', code, '3', 'Female', '2004-05-17', 'sara@example.com', '0300-1234567', ''],
+        ['IM', 'Sara Ahmed', code, '3', 'Female', '2004-05-17', '', '', ''],
+        ['IMP-0003', 'Sara 4', code, '3', 'Female', '2004-05-17', '', '', ''],
+        ['IMP-0004', 'Sara Ahmed', code, '3', 'female-ish', '2004-05-17', '', '', ''],
+        ['IMP-0005', 'Sara Ahmed', code, '3', 'Female', '17/05/2004', '', '', ''],
+        ['IMP-0006', 'Sara Ahmed', code, '3', 'Female', '2099-01-01', '', '', ''],
+        ['IMP-0007', 'Sara Ahmed', code, '9', 'Female', '2004-05-17', 'not-an-email', '12345', '0300'],
+        [existing, 'Sara Ahmed', 'NOPE', '3', 'Female', '2004-05-17', '', '', ''],
+    ]
+    report = student_controller.import_students_report(write_import_file(tmp_path / 'students.csv', rows),
+                                                       dry_run=True)
+
+    assert (report['total'], report['valid'], report['imported']) == (8, 1, 0)
+    errors = {item['row']: item['errors'] for item in report['errors']}
+    assert errors == {
+        3: [validate_roll_number('IM')[1]],
+        4: [validate_name('Sara 4')[1]],
+        5: [validate_gender('female-ish')[1]],
+        6: [validate_date('17/05/2004')[2]],  # Day-first dates are not guessed
+        7: [validate_date('2099-01-01')[2]],
+        8: ["Semester must be between 1 and 8", "Invalid email format",
+            "Invalid phone number format (must be 11 digits)",
+            "Invalid guardian phone number format (must be 11 digits)"],
+        9: ["Roll number already exists", "Department code not found"],
+    }
+
+
+def test_import_stores_iso_dates(synthetic_db, tmp_path):
+    rows = [['IMP-0101', 'Omar Farooq', department_code(), '1', 'male', '2005-03-01 00:00:00', '', '', '']]
+
+    success, _, count = student_controller.bulk_import_students(write_import_file(tmp_path / 'one.csv', rows))
+
+    assert success and count == 1
+    student = student_controller.get_student_by_roll_number('IMP-0101')
+    assert (student['gender'], str(student['date_of_birth'])) == ('Male', '2005-03-01')
+
+
+def import_per_row(path):
+    """The importer before the columnar rewrite: a department lookup and create_student per row"""
+    imported = set()
+    with open(path, newline='') as handle:
+        for row in csv.DictReader(handle):
+            department = db.execute_query("SELECT department_id FROM departments WHERE department_code = ?",
+                                          (row['department_code'].upper(),))
+            if not department:
+                continue
+            success, _, _ = student_controller.create_student(
+                roll_number=row['roll_number'], name=row['name'], department_id=department[0]['department_id'],
+                semester=int(row['semester']), gender=row['gender'], date_of_birth=row['date_of_birth'],
+                email=row['email'] or None, phone=row['phone'] or None,
+                guardian_phone=row['guardian_phone'] or None
+            )
+            if success:
+                imported.add(row['roll_number'].upper())
+    return imported
+
+
+def imported_students():
+    rows = db.execute_query("""
+        SELECT roll_number, name, department_id, semester, gender, date_of_birth, email, phone, guardian_phone
+        FROM students WHERE roll_number LIKE 'EQ-%'
+    """)
+    return {row['roll_number']: dict(row) for row in rows}
+
+
+def test_dry_run_and_import_match_the_per_row_importer(synthetic_copy, tmp_path):
+    # Only the rules create_student enforces, so both importers can be compared
+    code = department_code().lower()
+    rows = []
+    for number in range(40):
+        rows.append([f"eq-{number:04d}", f"Student {'ABCDEFGHIJ'[number % 10]}", code, str(1 + number % 8),
+                     ('Male', 'Female')[number % 2], '2004-05-17',
+                     f"s{number}@example.com" if number % 3 else 'broken@', '0300-1234567' if number % 4 else '123',
+                     '' if number % 5 else '03001234567'])
+    rows += [rows[0], ['eq-0100', 'Name 9', code, '2', 'Male', '2004-05-17', '', '', ''],
+             ['eq-0101', 'Valid Name', 'NOPE', '2', 'Male', '2004-05-17', '', '', '']]
+    path = write_import_file(tmp_path / 'equivalence.csv', rows)
+
+    with synthetic_copy():
+        accepted = import_per_row(path)
+        per_row = imported_students()
+
+    with synthetic_copy():
+        report = student_controller.import_students_report(path, dry_run=True)
+        assert imported_students() == {}
+        success, _, count = student_controller.bulk_import_students(path)
+        columnar = imported_students()
+
+    assert 0 < len(accepted) < len(rows)
+    assert success and report['valid'] == count == len(accepted)
+    assert columnar == per_row
@@ -0,0 +1,68 @@
+"""
+Student Paging Tests
+Checks keyset paging in StudentController.get_students_page against sorting the
+full student list (run with pytest).
+Runs on a generated copy of a small university (synthetic_db); some phones are cleared and names repeated.
+"""
+import pytest
+from database.db_manager import db
+from controllers.student_controller import student_controller, STUDENT_SORT_KEYS
+
+CASE_INSENSITIVE = {'roll_number', 'name', 'department_name', 'gender', 'email', 'father_name'}
+
+
+def walk_pages(limit, **filters):
+    """Every row, fetched page by page through next_cursor"""
+    rows = []
+    after = None
+    while True:
+        page = student_controller.get_students_page(after=after, limit=limit, **filters)
+        rows.extend(page['rows'])
+        assert len(page['rows']) <= limit
+        if not page['has_more']:
+            return rows
+        after = page['next_cursor']
+
+
+def sorted_in_python(sort_by, descending, department_id=None):
+    """The old way: load every active student and sort the list"""
+    students = [s for s in student_controller.get_all_students()
+                if department_id is None or s['department_id'] == department_id]
+
+    def key(student):
+        value = student.get(sort_by)
+        if sort_by == 'semester':
+            return value or 0, student['student_id']
+        value = str(value or '')
+        return (value.lower() if sort_by in CASE_INSENSITIVE else value), student['student_id']
+    return sorted(students, key=key, reverse=descending)
+
+
+@pytest.fixture(scope="module")
+def students_with_gaps(synthetic_db):
+    # NULLs and duplicate sort values exercise the (sort_key, student_id) cursor
+    db.execute_update("UPDATE students SET phone = NULL WHERE student_id % 7 = 0")
+    db.execute_update("UPDATE students SET name = 'Same Name' WHERE student_id % 5 = 0")
+    db.execute_update("UPDATE students SET is_active = 0 WHERE student_id % 13 = 0")
+    return synthetic_db
+
+
+@pytest.mark.parametrize('sort_by', sorted(STUDENT_SORT_KEYS))
+@pytest.mark.parametrize('descending', [False, True])
+def test_keyset_pages_match_the_sorted_list(students_with_gaps, sort_by, descending):
+    expected = [s['student_id'] for s in sorted_in_python(sort_by, descending)]
+
+    full = student_controller.get_students_page(sort_by=sort_by, descending=descending, limit=None)['rows']
+    paged = walk_pages(7, sort_by=sort_by, descending=descending)
+
+    assert [s['student_id'] for s in full] == expected
+    assert [s['student_id'] for s in paged] == expected
+
+
+def test_filtered_pages_match_the_filtered_list(students_with_gaps):
+    department_id = db.execute_query("SELECT MIN(department_id) AS id FROM departments")[0]['id']
+    expected = [s['student_id'] for s in sorted_in_python('name', False, department_id)]
+
+    paged = walk_pages(5, department_id=department_id, sort_by='name')
+
+    assert [s['student_id'] for s in paged] == expected
@@ -0,0 +1,64 @@
+"""
+Student Search Tests
+Checks controllers.student_search_controller against the LIKE search it replaces (run with pytest).
+Runs on a generated copy of a small university (synthetic_db).
+"""
+from database.db_manager import db
+from controllers.student_controller import student_controller
+from controllers.student_search_controller import student_search_controller
+
+
+def like_search(term):
+    """Student ids the LIKE '%term%' query finds (the search before the index)"""
+    pattern = f"%{term}%"
+    rows = db.execute_query("""
+        SELECT s.student_id
+        FROM students s
+        LEFT JOIN departments d ON s.department_id = d.department_id
+        WHERE s.is_active = 1 AND (
+            s.name LIKE ? OR s.roll_number LIKE ? OR s.email LIKE ? OR
+            s.cnic LIKE ? OR d.department_name LIKE ?
+        )
+    """, (pattern,) * 5)
+    return {row['student_id'] for row in rows}
+
+
+def sample_terms():
+    student = db.execute_query("SELECT * FROM students WHERE is_active = 1 ORDER BY student_id LIMIT 1")[0]
+    surname = student['name'].split()[-1]
+    return [
+        student['name'],
+        surname[1:4],                     # Middle of a word
+        student['roll_number'][-5:-1],    # Middle of a roll number
+        student['roll_number'].lower(),
+        student['email'].split('@')[0][2:],
+        student['cnic'][6:12],
+    ]
+
+
+def test_index_finds_every_substring_like_does(synthetic_db):
+    assert student_search_controller.ensure_index()
+    for term in sample_terms():
+        expected = like_search(term)
+        assert expected, term
+        assert student_search_controller.search(term) is not None, term
+        assert {row['student_id'] for row in student_controller.search_students(term)} == expected, term
+        page = student_controller.get_students_page(search_term=term, limit=None)['rows']
+        assert {row['student_id'] for row in page} == expected, term
+
+
+def test_short_terms_fall_back_to_like(synthetic_db):
+    assert student_search_controller.search('a') is None
+    found = {row['student_id'] for row in student_controller.search_students('a')}
+    assert found == like_search('a')
+
+
+def test_word_index_from_an_older_version_is_replaced(synthetic_db):
+    db.execute_update("DROP TABLE IF EXISTS student_search")
+    db.execute_update("CREATE VIRTUAL TABLE student_search USING fts5(name, roll_number, email, cnic, department_name)")
+    db._ensured_schemas.discard('student_search')
+    student_search_controller._available = None
+
+    term = sample_terms()[1]
+    assert student_search_controller.ensure_index()
+    assert {row['student_id'] for row in student_controller.search_students(term)} == like_search(term)
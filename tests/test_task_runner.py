@@ -0,0 +1,118 @@
+"""
+Task Runner Tests
+Checks utils.task_runner coalescing, cancellation and the database cap (run with pytest).
+Database workers hold connections to a generated copy of a small university (synthetic_db).
+"""
+import threading
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from utils.task_runner import TaskRunner
+
+
+@pytest.fixture(scope="module")
+def app(synthetic_db):
+    # Database tasks check out a pooled connection, so keep them off the configured database
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def wait_until(condition, timeout=5.0):
+    """Process queued signals until condition() holds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for tasks"
+        QtCore.QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+
+def test_result_arrives_on_submitting_thread(app):
+    runner = TaskRunner(db_workers=2)
+    results = []
+    runner.submit(lambda a, b: a + b, 2, 3, uses_db=False,
+                  on_result=lambda value: results.append((value, threading.current_thread())))
+
+    wait_until(lambda: results)
+    assert results == [(5, threading.main_thread())]
+
+
+def test_same_key_runs_once(app):
+    """Five clicks on Refresh run the task once and notify every caller"""
+    runner = TaskRunner(db_workers=2)
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def refresh():
+        calls.append(1)
+        release.wait(5)
+        return 'stats'
+
+    for _ in range(5):
+        runner.submit(refresh, key='refresh', uses_db=False, on_result=results.append)
+    release.set()
+
+    wait_until(lambda: len(results) == 5)
+    assert len(calls) == 1
+    assert not runner.is_running('refresh')
+
+
+def test_supersede_drops_stale_result(app):
+    runner = TaskRunner(db_workers=2)
+    release = threading.Event()
+    results = []
+    cancelled = []
+
+    def load(value):
+        release.wait(5)
+        return value
+
+    runner.submit(load, 'old', key='page', uses_db=False,
+                  on_result=results.append, on_cancelled=lambda: cancelled.append('old'))
+    runner.submit(load, 'new', key='page', supersede=True, uses_db=False, on_result=results.append)
+    release.set()
+
+    wait_until(lambda: results and cancelled)
+    assert results == ['new']
+
+
+def test_errors_and_progress(app):
+    runner = TaskRunner(db_workers=2)
+    progress = []
+    errors = []
+
+    def export(progress_callback=None, cancel_event=None):
+        progress_callback(1, 2, 'a.pdf')
+        progress_callback(2, 2, 'b.pdf')
+        raise ValueError("disk full")
+
+    runner.submit(export, uses_db=False, with_progress=True,
+                  on_progress=lambda *args: progress.append(args), on_error=errors.append)
+
+    wait_until(lambda: errors)
+    assert progress == [(1, 2, 'a.pdf'), (2, 2, 'b.pdf')]
+    assert errors == ['disk full']
+
+
+def test_database_tasks_are_capped(app):
+    runner = TaskRunner(db_workers=2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+    finished = []
+
+    def query():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    for _ in range(6):
+        runner.submit(query, on_finished=lambda: finished.append(1))
+
+    wait_until(lambda: len(finished) == 6)
+    assert max(peak) == 2
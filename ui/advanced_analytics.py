@@ -4,11 +4,25 @@ Interactive charts and reports using Matplotlib
 """
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
+import utils.chart_generator  # Qt5Agg backend and Matplotlib stability patches
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 from controllers.analytics_controller import analytics_controller
 from controllers.department_controller import department_controller
+from utils.task_runner import task_runner
+
+
+def load_analytics(dept_id):
+    """Everything the charts need, fetched on a task_runner worker"""
+    return {
+        'summary': analytics_controller.get_dashboard_summary(),
+        'pass_fail': analytics_controller.get_pass_fail_rates(dept_id) or {},
+        'distribution': analytics_controller.get_student_distribution_by_department() or [],
+        'grades': analytics_controller.get_grade_distribution(dept_id) or [],
+        'trends': analytics_controller.get_performance_trends(dept_id) or [],
+        'attendance': analytics_controller.get_attendance_statistics(dept_id) or [],
+    }
 
 class AdvancedAnalyticsPage(QWidget):
     """Page for advanced analytics and visualization"""
@@ -155,22 +169,26 @@ class AdvancedAnalyticsPage(QWidget):
         return card
 
     def refresh_charts(self):
-        """Refresh all charts with current filter"""
+        """Refresh all charts with current filter (queries run in the background)"""
         dept_id = self.dept_combo.currentData()
-        
+        task_runner.submit(load_analytics, dept_id, key=f"analytics-{dept_id}",
+                           on_result=self._draw_charts,
+                           on_error=lambda msg: print(f"Analytics refresh failed: {msg}"))
+    
+    def _draw_charts(self, data):
+        """Draw the summary cards and charts from load_analytics()"""
         # Update Summary Cards
-        summary = analytics_controller.get_dashboard_summary()
+        summary = data['summary']
         if summary:
             self.total_students_card.value_label.setText(str(summary.get('students', {}).get('total', 0)))
             avg_cgpa = summary.get('performance', {}).get('avg_cgpa')
             self.avg_cgpa_card.value_label.setText(f"{avg_cgpa:.2f}" if avg_cgpa else "0.00")
             
-            pf_rates = analytics_controller.get_pass_fail_rates(dept_id)
-            pass_rate = pf_rates.get('pass_rate', 0) if pf_rates else 0
+            pass_rate = data['pass_fail'].get('pass_rate', 0)
             self.pass_rate_card.value_label.setText(f"{pass_rate}%")
 
         # 1. Gender Distribution
-        dist = analytics_controller.get_student_distribution_by_department() or []
+        dist = data['distribution']
         male = sum(d.get('male_count', 0) or 0 for d in dist)
         female = sum(d.get('female_count', 0) or 0 for d in dist)
         
@@ -183,7 +201,7 @@ class AdvancedAnalyticsPage(QWidget):
         self.gender_canvas.draw()
         
         # 2. Pass/Fail Rates
-        pf = analytics_controller.get_pass_fail_rates(dept_id) or {}
+        pf = data['pass_fail']
         passed = pf.get('passed', 0) or 0
         failed = pf.get('failed', 0) or 0
         
@@ -196,7 +214,7 @@ class AdvancedAnalyticsPage(QWidget):
         self.pass_fail_canvas.draw()
         
         # 3. Grade Distribution
-        grades = analytics_controller.get_grade_distribution(dept_id) or []
+        grades = data['grades']
         labels = [g['grade'] for g in grades] if grades else []
         counts = [g['count'] for g in grades] if grades else []
         
@@ -211,7 +229,7 @@ class AdvancedAnalyticsPage(QWidget):
         self.grade_canvas.draw()
         
         # 4. Trends
-        trends = analytics_controller.get_performance_trends(dept_id) or []
+        trends = data['trends']
         
         self.trend_canvas.axes.clear()
         if trends:
@@ -227,7 +245,7 @@ class AdvancedAnalyticsPage(QWidget):
         self.trend_canvas.draw()
         
         # 5. Attendance
-        att = analytics_controller.get_attendance_statistics(dept_id) or []
+        att = data['attendance']
         
         self.attendance_canvas.axes.clear()
         if att:
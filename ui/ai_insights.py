@@ -7,6 +7,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from controllers.ai_insights_controller import ai_insights_controller
 from controllers.department_controller import department_controller
+from utils.task_runner import task_runner
 
 class AIInsightsPage(QWidget):
     """AI Insights Interface"""
@@ -116,11 +117,19 @@ class AIInsightsPage(QWidget):
         dept_id = self.department_combo.currentData()
         threshold = self.threshold_spin.value()
         
-        # Get at-risk students
-        at_risk = ai_insights_controller.get_at_risk_students(
-            department_id=dept_id,
-            risk_threshold=threshold
+        # Score the cohort in the background; repeated clicks join the run in flight
+        task_runner.submit(
+            ai_insights_controller.get_at_risk_students,
+            department_id=dept_id, risk_threshold=threshold,
+            key=f"at-risk-{dept_id}-{threshold}",
+            on_result=self._on_data_loaded,
+            on_error=lambda msg: QMessageBox.warning(self, "Error", f"Failed to score students: {msg}")
         )
+    
+    def _on_data_loaded(self, at_risk):
+        """Show the at-risk students"""
+        # Keep the cohort scores so the details dialog does not rescore the student
+        self.risk_by_student = {s['student_id']: (s['risk_score'], s['factors']) for s in at_risk}
         
         # Update summary cards
         critical = len([s for s in at_risk if s['risk_level'] == 'Critical'])
@@ -166,14 +175,17 @@ class AIInsightsPage(QWidget):
     
     def show_details(self, student_id):
         """Show detailed analysis for a student"""
-        # Calculate risk score and get factors
-        risk_score, factors = ai_insights_controller.calculate_risk_score(student_id)
+        # Risk score and factors from the last cohort scoring
+        risk = getattr(self, 'risk_by_student', {}).get(student_id)
+        if risk is None:
+            risk = ai_insights_controller.calculate_risk_score(student_id)
+        risk_score, factors = risk
         
         # Get recommendations
-        recommendations = ai_insights_controller.get_intervention_recommendations(student_id)
+        recommendations = ai_insights_controller.get_intervention_recommendations(student_id, risk=risk)
         
         # Get prediction
-        prediction = ai_insights_controller.get_performance_prediction(student_id)
+        prediction = ai_insights_controller.get_performance_prediction(student_id, risk=risk)
         
         # Create dialog
         dialog = QDialog(self)
@@ -5,6 +5,8 @@ Handles data archiving and restoration
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt, QDate
 from controllers.archive_controller import archive_controller
+from utils.task_runner import task_runner
+from ui.components.lazy_table_model import LazyTableModel, TableColumn
 
 class ArchiveManagerPage(QWidget):
     """Page for managing data archives"""
@@ -118,12 +120,30 @@ class ArchiveManagerPage(QWidget):
         
         layout.addLayout(filter_layout)
         
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(5)
-        self.data_table.setHorizontalHeaderLabels(["Roll No", "Name", "Department", "Original Semester", "Archive Date"])
+        # Rows are fetched in blocks as the table scrolls
+        self.data_model = LazyTableModel(
+            [TableColumn("Roll No", 'roll_number'),
+             TableColumn("Name", 'name'),
+             TableColumn("Department", 'department_name'),
+             TableColumn("Original Semester", 'semester'),
+             TableColumn("Archive Date", 'archived_date')],
+            archive_controller.get_archived_students_page,
+            count_rows=archive_controller.count_archived_students,
+            parent=self
+        )
+        self.data_table = QTableView()
+        self.data_table.setModel(self.data_model)
+        self.data_table.setSelectionBehavior(QTableView.SelectRows)
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.data_table)
         
+        self.data_count_label = QLabel("")
+        self.data_model.countChanged.connect(
+            lambda total, exact: self.data_count_label.setText(f"{total} archived students")
+        )
+        layout.addWidget(self.data_count_label)
+        
         return widget
 
     def load_stats(self):
@@ -181,15 +201,7 @@ class ArchiveManagerPage(QWidget):
         if not year:
             return
             
-        students = archive_controller.get_archived_students(academic_year=year) or []
-        self.data_table.setRowCount(len(students))
-        
-        for row, stu in enumerate(students):
-            self.data_table.setItem(row, 0, QTableWidgetItem(stu.get('roll_number', '')))
-            self.data_table.setItem(row, 1, QTableWidgetItem(stu.get('name', '')))
-            self.data_table.setItem(row, 2, QTableWidgetItem(stu.get('department_name', '') or ''))
-            self.data_table.setItem(row, 3, QTableWidgetItem(str(stu.get('semester', ''))))
-            self.data_table.setItem(row, 4, QTableWidgetItem(str(stu.get('archived_date', ''))))
+        self.data_model.set_query(academic_year=year)
 
     def show_create_archive_dialog(self):
         """Show dialog to create new archive"""
@@ -200,13 +212,21 @@ class ArchiveManagerPage(QWidget):
                                          QMessageBox.Yes | QMessageBox.No)
             
             if confirm == QMessageBox.Yes:
-                success, msg, stats = archive_controller.archive_academic_year(year, self.user_id)
-                if success:
-                    QMessageBox.information(self, "Success", f"{msg}\n\nDetails:\nStudents: {stats['students_archived']}\nMarks: {stats['marks_archived']}")
-                    self.load_archives()
-                    self.load_stats()
-                else:
-                    QMessageBox.warning(self, "Error", msg)
+                task_runner.submit(
+                    archive_controller.archive_academic_year, year, self.user_id,
+                    key=f"archive-{year}",
+                    on_result=self._on_archive_created,
+                    on_error=lambda msg: QMessageBox.warning(self, "Error", msg)
+                )
+    
+    def _on_archive_created(self, outcome):
+        success, msg, stats = outcome
+        if success:
+            QMessageBox.information(self, "Success", f"{msg}\n\nDetails:\nStudents: {stats['students_archived']}\nMarks: {stats['marks_archived']}")
+            self.load_archives()
+            self.load_stats()
+        else:
+            QMessageBox.warning(self, "Error", msg)
 
     def restore_archive(self, metadata_id):
         """Restore an archive"""
@@ -214,11 +234,19 @@ class ArchiveManagerPage(QWidget):
                                      "Restoring data is a complex operation. Are you sure you want to proceed?",
                                      QMessageBox.Yes | QMessageBox.No)
         if confirm == QMessageBox.Yes:
-            success, msg = archive_controller.restore_archived_data(metadata_id)
-            if success:
-                QMessageBox.information(self, "Success", msg)
-            else:
-                QMessageBox.warning(self, "Error", msg)
+            task_runner.submit(
+                archive_controller.restore_archived_data, metadata_id,
+                key=f"archive-restore-{metadata_id}",
+                on_result=self._on_archive_restored,
+                on_error=lambda msg: QMessageBox.warning(self, "Error", msg)
+            )
+    
+    def _on_archive_restored(self, outcome):
+        success, msg = outcome
+        if success:
+            QMessageBox.information(self, "Success", msg)
+        else:
+            QMessageBox.warning(self, "Error", msg)
 
     def delete_archive(self, metadata_id):
         """Delete an archive"""
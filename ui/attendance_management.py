@@ -196,26 +196,18 @@ class AttendanceManagement(QWidget):
             QMessageBox.warning(self, "Error", "Please select a course")
             return
         
-        success_count = 0
-        error_count = 0
-        
+        entries = []
         for row in range(self.table.rowCount()):
             student_id = self.table.item(row, 0).data(Qt.UserRole)
             status_combo = self.table.cellWidget(row, 4)
-            status = status_combo.currentText()
-            
-            success, message = attendance_controller.mark_student_attendance(
-                student_id=student_id,
-                course_id=course_id,
-                attendance_date=attendance_date,
-                status=status,
-                marked_by=self.current_user_id
-            )
-            
-            if success:
-                success_count += 1
-            else:
-                error_count += 1
+            entries.append({'student_id': student_id, 'status': status_combo.currentText()})
+        
+        # One transaction for the whole class
+        _, _, outcomes = attendance_controller.mark_attendance_batch(
+            course_id, attendance_date, entries, self.current_user_id
+        )
+        error_count = sum(1 for outcome in outcomes if outcome['outcome'] == 'error')
+        success_count = len(outcomes) - error_count
         
         QMessageBox.information(
             self, 
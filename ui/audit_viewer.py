@@ -6,8 +6,11 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt, QDate
 from controllers.audit_controller import audit_controller
 from controllers.user_controller import user_controller
+from ui.components.lazy_table_model import LazyTableModel, TableColumn
 import json
 
+ACTION_COLORS = {'DELETE': 'red', 'CREATE': 'green', 'UPDATE': 'blue'}
+
 class AuditViewerPage(QWidget):
     """Page for viewing system audit logs"""
     
@@ -81,15 +84,44 @@ class AuditViewerPage(QWidget):
         
         layout.addWidget(filter_frame)
         
-        # Logs Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(["Time", "User", "Action", "Table", "Description", "IP Address", "Details"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Logs Table - rows are fetched in blocks as the table scrolls, sorted in SQL
+        self.model = LazyTableModel(
+            [TableColumn("Time", 'timestamp', sort_key='timestamp'),
+             TableColumn("User", 'username', sort_key='username'),
+             TableColumn("Action", 'action_type', sort_key='action_type',
+                         color=lambda action: ACTION_COLORS.get(action)),
+             TableColumn("Table", 'table_name', sort_key='table_name', format=lambda name: name or "-"),
+             TableColumn("Description", 'action_description'),
+             TableColumn("IP Address", 'ip_address', format=lambda ip: ip or "-")],
+            audit_controller.get_audit_logs_page,
+            count_rows=audit_controller.count_audit_logs,
+            parent=self
+        )
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
+        self.table.doubleClicked.connect(lambda index: self.show_selected_details())
         layout.addWidget(self.table)
         
+        footer_layout = QHBoxLayout()
+        self.count_label = QLabel("")
+        self.model.countChanged.connect(self.update_count_label)
+        footer_layout.addWidget(self.count_label)
+        footer_layout.addStretch()
+        
+        details_btn = QPushButton("View Details")
+        details_btn.setStyleSheet("background-color: #95a5a6; color: white; padding: 5px 15px;")
+        details_btn.clicked.connect(self.show_selected_details)
+        footer_layout.addWidget(details_btn)
+        layout.addLayout(footer_layout)
+        
         self.load_logs()
+        self.table.setSortingEnabled(True)  # After load_logs, so the initial sort is not a second query
         
     def load_users(self):
         """Load users into combo box"""
@@ -115,34 +147,24 @@ class AuditViewerPage(QWidget):
             start = self.start_date.date().toPyDate()
             end = self.end_date.date().toPyDate()
             
-            logs = audit_controller.get_audit_logs(user_id, action, table_name, start, end)
-            self.table.setRowCount(len(logs))
-            
-            for row, log in enumerate(logs):
-                self.table.setItem(row, 0, QTableWidgetItem(str(log['timestamp'])))
-                self.table.setItem(row, 1, QTableWidgetItem(log['username']))
-                
-                action_item = QTableWidgetItem(log['action_type'])
-                if log['action_type'] == 'DELETE':
-                    action_item.setForeground(Qt.red)
-                elif log['action_type'] == 'CREATE':
-                    action_item.setForeground(Qt.green)
-                elif log['action_type'] == 'UPDATE':
-                    action_item.setForeground(Qt.blue)
-                self.table.setItem(row, 2, action_item)
-                
-                self.table.setItem(row, 3, QTableWidgetItem(log['table_name'] or "-"))
-                self.table.setItem(row, 4, QTableWidgetItem(log['action_description']))
-                self.table.setItem(row, 5, QTableWidgetItem(log['ip_address'] or "-"))
-                
-                btn = QPushButton("View Details")
-                btn.setStyleSheet("background-color: #95a5a6; color: white; padding: 5px;")
-                btn.clicked.connect(lambda checked, l=log: self.show_log_details(l))
-                self.table.setCellWidget(row, 6, btn)
+            self.model.set_query(user_id=user_id, action_type=action, table_name=table_name,
+                                 start_date=start, end_date=end,
+                                 **self.model.sort_query(self.table.horizontalHeader()))
                 
         except Exception as e:
             print(f"Error loading logs: {e}")
 
+    def update_count_label(self, total, exact):
+        """Show how many logs match the filters"""
+        self.count_label.setText(f"{total}{'' if exact else '+'} matching log entries")
+
+    def show_selected_details(self):
+        """Show details of the selected log entry"""
+        index = self.table.currentIndex()
+        log = self.model.row_at(index.row()) if index.isValid() else None
+        if log:
+            self.show_log_details(log)
+
     def show_log_details(self, log):
         """Show full details of a log entry"""
         dialog = QDialog(self)
@@ -5,6 +5,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from database.db_manager import db
+from utils.task_runner import task_runner
 from datetime import datetime
 import os
 
@@ -78,19 +79,26 @@ class BackupRestorePage(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            success, backup_path = db.backup_database()
-            
-            if success:
-                QMessageBox.information(
-                    self, "Success",
-                    f"Backup created successfully!\n\nLocation: {backup_path}"
-                )
-                self.load_backup_history()
-            else:
-                QMessageBox.critical(
-                    self, "Error",
-                    f"Failed to create backup:\n{backup_path}"
-                )
+            # The backup runs in the background; a second click joins it
+            task_runner.submit(
+                db.backup_database, key='database-backup',
+                on_result=self._on_backup_finished,
+                on_error=lambda msg: self._on_backup_finished((False, msg))
+            )
+    
+    def _on_backup_finished(self, outcome):
+        success, backup_path = outcome
+        if success:
+            QMessageBox.information(
+                self, "Success",
+                f"Backup created successfully!\n\nLocation: {backup_path}"
+            )
+            self.load_backup_history()
+        else:
+            QMessageBox.critical(
+                self, "Error",
+                f"Failed to create backup:\n{backup_path}"
+            )
     
     def restore_backup(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -3,5 +3,6 @@ UI Components Package
 """
 from .modern_card import ModernCard
 from .stats_card import StatsCard
+from .lazy_table_model import LazyTableModel, TableColumn
 
-__all__ = ['ModernCard', 'StatsCard']
+__all__ = ['ModernCard', 'StatsCard', 'LazyTableModel', 'TableColumn']
@@ -0,0 +1,285 @@
+"""
+Lazy Table Model
+QAbstractTableModel for large tables: rows are fetched from the database in
+blocks as the view scrolls (canFetchMore / fetchMore), sorting and filtering
+are done in SQL, and only the most recently viewed blocks are kept in memory.
+Blocks that were dropped are fetched again when they scroll back into view;
+a block whose fetch failed stays empty until reload().
+
+Usage:
+    model = LazyTableModel(
+        [TableColumn("Roll Number", 'roll_number', sort_key='roll_number'),
+         TableColumn("Name", 'name', sort_key='name')],
+        student_controller.get_students_page,
+        count_rows=student_controller.count_students
+    )
+    view.setModel(model)
+    model.set_query(department_id=3, sort_by='name')
+"""
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, List, Optional
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
+from utils.task_runner import task_runner
+
+TableColumn = namedtuple('TableColumn', ['title', 'key', 'sort_key', 'format', 'color'])
+TableColumn.__new__.__defaults__ = (None, None, None)
+TableColumn.__doc__ = """
+Column of a LazyTableModel
+
+title: Header text
+key: Row dictionary key
+sort_key: Value passed as sort_by when the header is clicked (None = not sortable)
+format: Optional callable(value) -> str for display
+color: Optional callable(value) -> colour name for the text
+"""
+
+BLOCK_SIZE = 200  # Rows per database fetch
+MAX_BLOCKS = 20  # Blocks kept in memory (BLOCK_SIZE * MAX_BLOCKS rows)
+PLACEHOLDER = "…"  # Shown while a dropped block is fetched again
+
+
+class LazyTableModel(QAbstractTableModel):
+    """
+    Table model backed by a paged controller query
+
+    fetch_page is called on a task_runner worker as
+    fetch_page(after=cursor, offset=row, limit=BLOCK_SIZE, **query) and must
+    return {'rows': [dict], 'next_cursor': cursor or None, 'has_more': bool}
+    (the shape of student_controller.get_students_page). Keyset sources use
+    `after` and ignore `offset` when a cursor is given; offset sources ignore
+    `after`.
+    """
+
+    countChanged = pyqtSignal(int, bool)  # (matching rows, exact)
+    loadingChanged = pyqtSignal(bool)
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, columns: List[TableColumn], fetch_page: Callable,
+                 count_rows: Optional[Callable] = None, block_size: int = BLOCK_SIZE,
+                 max_blocks: int = MAX_BLOCKS, row_background: Optional[Callable] = None, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.fetch_page = fetch_page
+        self.count_rows = count_rows
+        self.block_size = block_size
+        self.max_blocks = max(2, max_blocks)
+        self.row_background = row_background  # Optional callable(row) -> colour name
+        self.query: Dict = {}
+        self.total = None  # Set by count_rows
+        self.total_exact = True
+        self._generation = 0  # Bumped on reset; results of older fetches are dropped
+        self._clear()
+        self._has_more = False  # Nothing is fetched until set_query / reload
+
+    def _clear(self):
+        self._blocks = OrderedDict()  # Block number -> rows, least recently used first
+        self._cursors = {0: None}  # Block number -> keyset cursor of the row before it
+        self._rows = 0
+        self._has_more = True
+        self._loading = False
+        self._refetching = set()
+        self._failed = set()  # Blocks whose fetch raised; not retried until reload()
+
+    # ========== QUERY ==========
+
+    def set_query(self, **query):
+        """Replace filters/sorting (keyword arguments for fetch_page) and reload from the top"""
+        self.query = query
+        self.reload()
+
+    def update_query(self, **changes):
+        """Change some filters or the sort order and reload"""
+        self.query = dict(self.query, **changes)
+        self.reload()
+
+    def reload(self):
+        """Drop every cached row and fetch the first block again"""
+        self._generation += 1
+        self.beginResetModel()
+        self._clear()
+        self.endResetModel()
+        self.total = None
+        self.total_exact = True
+
+        if self.count_rows is not None:
+            generation = self._generation
+            filters = {k: v for k, v in self.query.items() if k not in ('sort_by', 'descending')}
+            task_runner.submit(self.count_rows, **filters,
+                               on_result=lambda result: self._on_count(generation, result))
+        self.fetchMore(QModelIndex())
+
+    def set_columns(self, columns: List[TableColumn]):
+        """Replace the columns (call set_query afterwards to load rows for them)"""
+        self.beginResetModel()
+        self.columns = list(columns)
+        self.endResetModel()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """Sorting is done in SQL; called by the view when a header is clicked"""
+        if not 0 <= column < len(self.columns) or self.columns[column].sort_key is None:
+            return
+        changes = {'sort_by': self.columns[column].sort_key, 'descending': order == Qt.DescendingOrder}
+        if all(self.query.get(key) == value for key, value in changes.items()):
+            return  # Already in this order (e.g. when the view enables sorting)
+        self.update_query(**changes)
+
+    def sort_query(self, header) -> Dict:
+        """sort_by / descending for the column a QHeaderView's sort indicator is on"""
+        column = header.sortIndicatorSection()
+        if not 0 <= column < len(self.columns) or self.columns[column].sort_key is None:
+            return {}
+        return {'sort_by': self.columns[column].sort_key,
+                'descending': header.sortIndicatorOrder() == Qt.DescendingOrder}
+
+    def row_at(self, row: int) -> Optional[dict]:
+        """Row dictionary, or None if it is not in memory"""
+        block = self._blocks.get(row // self.block_size)
+        if block is None:
+            return None
+        offset = row % self.block_size
+        return block[offset] if offset < len(block) else None
+
+    @property
+    def loaded_rows(self) -> int:
+        """Rows the view knows about so far"""
+        return self._rows
+
+    @property
+    def cached_rows(self) -> int:
+        """Rows currently held in memory"""
+        return sum(len(rows) for rows in self._blocks.values())
+
+    # ========== QAbstractTableModel ==========
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.columns):
+            return self.columns[section].title
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole, Qt.BackgroundRole,
+                                               Qt.ForegroundRole, Qt.UserRole):
+            return None
+
+        block_number = index.row() // self.block_size
+        block = self._blocks.get(block_number)
+        if block is None:
+            if block_number in self._failed:
+                return None
+            self._refetch(block_number)
+            return PLACEHOLDER if role == Qt.DisplayRole else None
+        self._blocks.move_to_end(block_number)
+
+        offset = index.row() % self.block_size
+        if offset >= len(block):
+            return None
+        row = block[offset]
+        column = self.columns[index.column()]
+        value = row.get(column.key)
+
+        if role == Qt.UserRole:
+            return row
+        if role == Qt.BackgroundRole:
+            colour = self.row_background(row) if self.row_background else None
+            return QBrush(QColor(colour)) if colour else None
+        if role == Qt.ForegroundRole:
+            colour = column.color(value) if column.color else None
+            return QBrush(QColor(colour)) if colour else None
+        if value is None:
+            return ""
+        return column.format(value) if column.format else str(value)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Fetch the next block in the background; rows are appended when it arrives"""
+        if not self.canFetchMore(parent):
+            return
+        block_number = self._rows // self.block_size
+        if block_number in self._failed:
+            return
+        self._loading = True
+        self.loadingChanged.emit(True)
+        self._submit(block_number, self._on_block_appended)
+
+    # ========== LOADING ==========
+
+    def _submit(self, block_number: int, handler: Callable):
+        generation = self._generation
+        task_runner.submit(
+            self.fetch_page,
+            after=self._cursors.get(block_number), offset=block_number * self.block_size,
+            limit=self.block_size, **self.query,
+            on_result=lambda page: handler(generation, block_number, page),
+            on_error=lambda message: self._on_error(generation, block_number, message)
+        )
+
+    def _on_block_appended(self, generation: int, block_number: int, page: dict):
+        if generation != self._generation:
+            return
+        rows = page.get('rows') or []
+        self._loading = False
+        self._has_more = bool(page.get('has_more')) and len(rows) == self.block_size
+        if page.get('next_cursor') is not None:
+            self._cursors[block_number + 1] = page['next_cursor']
+
+        if rows:
+            self.beginInsertRows(QModelIndex(), self._rows, self._rows + len(rows) - 1)
+            self._store(block_number, rows)
+            self._rows += len(rows)
+            self.endInsertRows()
+        if not self._has_more and (self.total != self._rows or not self.total_exact):
+            # Every row is loaded, so the count is known even past count_rows' cap
+            self.total, self.total_exact = self._rows, True
+            self.countChanged.emit(self.total, self.total_exact)
+        self.loadingChanged.emit(False)
+
+    def _refetch(self, block_number: int):
+        """Fetch a block that was dropped from memory"""
+        if block_number in self._refetching:
+            return
+        self._refetching.add(block_number)
+        self._submit(block_number, self._on_block_refetched)
+
+    def _on_block_refetched(self, generation: int, block_number: int, page: dict):
+        if generation != self._generation:
+            return
+        self._refetching.discard(block_number)
+        first = block_number * self.block_size
+        rows = (page.get('rows') or [])[:max(0, self._rows - first)]
+        if not rows:
+            return
+        self._store(block_number, rows)
+        self.dataChanged.emit(self.index(first, 0),
+                              self.index(first + len(rows) - 1, len(self.columns) - 1))
+
+    def _store(self, block_number: int, rows: List[dict]):
+        self._blocks[block_number] = rows
+        self._blocks.move_to_end(block_number)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+    def _on_count(self, generation: int, result):
+        if generation != self._generation or (self.total_exact and self.total is not None):
+            return
+        self.total, self.total_exact = result
+        self.countChanged.emit(self.total, self.total_exact)
+
+    def _on_error(self, generation: int, block_number: int, message: str):
+        if generation != self._generation:
+            return
+        self._refetching.discard(block_number)
+        self._failed.add(block_number)
+        if self._loading:
+            self._loading = False
+            self._has_more = False
+            self.loadingChanged.emit(False)
+        self.loadFailed.emit(message)
@@ -8,6 +8,8 @@ from controllers.department_controller import department_controller
 
 
 class CourseManagementPage(QWidget):
+    WATCHED_TABLES = ('courses', 'departments')
+    
     def __init__(self, parent=None, department_id=None):
         super().__init__(parent)
         self.courses_data = []
@@ -60,6 +62,10 @@ class CourseManagementPage(QWidget):
         
         self.load_courses()
     
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_courses()
+    
     def load_courses(self):
         """Load all courses into table"""
         if self.department_id:
@@ -4,11 +4,8 @@ Modern Animated Dashboard - With Animations, Glassmorphism, and Interactive Feat
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt, QSize, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont, QPainter, QColor, QPen, QLinearGradient
-from controllers.student_controller import student_controller
-from controllers.department_controller import department_controller
-from controllers.course_controller import course_controller
-from controllers.user_controller import user_controller
-from controllers.attendance_controller import attendance_controller
+from controllers.dashboard_controller import dashboard_controller
+from utils.task_runner import task_runner
 from datetime import datetime, date, timedelta
 from utils.animation_utils import (
     AnimatedCounter, FadeInEffect, SlideInEffect, PulseEffect,
@@ -20,6 +17,8 @@ from utils.animation_utils import (
 class ModernAnimatedDashboard(QWidget):
     """Modern Dashboard with animations and enhanced visuals"""
     
+    WATCHED_TABLES = ('students', 'courses', 'departments', 'users')
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #0F172A;")  # Dark modern background
@@ -814,37 +813,42 @@ class ModernAnimatedDashboard(QWidget):
         for card in self.animatable_cards:
             FadeInEffect.apply(card, duration=400)
         
-        QTimer.singleShot(100, self.load_statistics)
+        QTimer.singleShot(100, lambda: self.load_statistics(use_cache=False))
+    
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_statistics()
+    
+    def load_statistics(self, use_cache=True):
+        """Load statistics in the background and display them with animations"""
+        # Repeated refreshes join the load already in flight
+        task_runner.submit(
+            dashboard_controller.get_overview_statistics, use_cache=use_cache,
+            key='dashboard-overview',
+            on_result=lambda stats: self._on_statistics_loaded(stats or {}),
+            on_error=lambda msg: self.status_info.setText(f"Error loading statistics: {msg}")
+        )
     
-    def load_statistics(self):
-        """Load and display statistics with animations"""
+    def _on_statistics_loaded(self, stats):
+        """Update the cards once the statistics have been loaded"""
         try:
-            # Get counts
-            students = student_controller.get_all_students()
-            departments = department_controller.get_all_departments()
-            courses = course_controller.get_all_courses()
-            users = user_controller.get_all_users()
-            
-            # Get today's attendance
-            today = date.today()
-            attendance_stats = attendance_controller.get_attendance_statistics(today, today)
-            attendance_percentage = attendance_stats.get('average_percentage', 0) if attendance_stats else 0
+            total_students = stats.get('total_students', 0)
+            male_students = stats.get('male_students', 0)
+            female_students = stats.get('female_students', 0)
+            active_students = stats.get('active_students', 0)
+            attendance_percentage = stats.get('attendance_today', 0)
             
             # Animate counters for main stats
             if "Total Students" in self.counters:
-                self.counters["Total Students"].animate_to(len(students))
+                self.counters["Total Students"].animate_to(total_students)
             if "Total Courses" in self.counters:
-                self.counters["Total Courses"].animate_to(len(courses))
+                self.counters["Total Courses"].animate_to(stats.get('total_courses', 0))
             if "Departments" in self.counters:
-                self.counters["Departments"].animate_to(len(departments))
+                self.counters["Departments"].animate_to(stats.get('total_departments', 0))
             if "Active Users" in self.counters:
-                self.counters["Active Users"].animate_to(len(users))
+                self.counters["Active Users"].animate_to(stats.get('total_users', 0))
             
             # Update summary cards (Gender, Active, Attendance)
-            active_students = sum(1 for s in students if s.get('is_active', 1))
-            male_students = sum(1 for s in students if str(s.get('gender', '')).lower() == 'male')
-            female_students = sum(1 for s in students if str(s.get('gender', '')).lower() == 'female')
-            
             if "Male Students" in self.counters:
                 self.counters["Male Students"].animate_to(male_students)
             if "Female Students" in self.counters:
@@ -867,8 +871,7 @@ class ModernAnimatedDashboard(QWidget):
                     card.trend_label.setText(f"\u2191 {random.randint(2, 15)}%")
             
             # Update system status
-            active_users = sum(1 for u in users if u.get('is_active', 1))
-            status_text = f"M: {male_students} | F: {female_students} | Active: {active_students} | Overall Students: {len(students)}"
+            status_text = f"M: {male_students} | F: {female_students} | Active: {active_students} | Overall Students: {total_students}"
             self.status_info.setText(status_text)
             
         except Exception as e:
@@ -7,6 +7,8 @@ from controllers.department_controller import department_controller
 
 
 class DepartmentManagementPage(QWidget):
+    WATCHED_TABLES = ('departments',)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.departments_data = []
@@ -58,6 +60,10 @@ class DepartmentManagementPage(QWidget):
         
         self.load_departments()
     
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_departments()
+    
     def load_departments(self):
         """Load all departments into table"""
         from controllers.student_controller import student_controller
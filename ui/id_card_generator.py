@@ -8,7 +8,6 @@ from PyQt5.QtGui import QPixmap, QImage, QPainter, QColor, QFont
 from controllers.id_card_controller import id_card_controller
 from controllers.student_controller import student_controller
 from controllers.user_controller import user_controller
-import qrcode
 from io import BytesIO
 
 class IDCardGeneratorPage(QWidget):
@@ -176,6 +175,7 @@ class IDCardGeneratorPage(QWidget):
         
         # QR Code
         qr_content = f"{name}-{role}" # Simple content for preview
+        import qrcode
         qr = qrcode.QRCode(box_size=4, border=1)
         qr.add_data(qr_content)
         qr.make(fit=True)
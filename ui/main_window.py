@@ -146,6 +146,13 @@ class MainWindow(QMainWindow):
         
         main_layout.addWidget(self.tabs)
         
+        # Reload pages whose tables changed, here or on another PC
+        from utils.change_watcher import change_watcher
+        self._stale_pages = set()
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        change_watcher.tablesChanged.connect(self.on_tables_changed)
+        change_watcher.start()
+        
         # Status bar
         self.statusBar().setStyleSheet(f"""
             QStatusBar {{
@@ -236,6 +243,28 @@ class MainWindow(QMainWindow):
         
         return header
     
+    def on_tables_changed(self, tables, remote):
+        """
+        Reload the visible page if another PC changed one of its WATCHED_TABLES;
+        other affected pages are reloaded when their tab is opened
+        """
+        for index in range(self.tabs.count()):
+            page = self.tabs.widget(index)
+            if not tables & set(getattr(page, 'WATCHED_TABLES', ())):
+                continue
+            if index != self.tabs.currentIndex():
+                self._stale_pages.add(page)
+            elif remote:
+                # Local writes already reload the page that made them
+                page.refresh_on_change()
+    
+    def on_tab_changed(self, index):
+        """Reload a page that went stale while hidden"""
+        page = self.tabs.widget(index)
+        if page in self._stale_pages:
+            self._stale_pages.discard(page)
+            page.refresh_on_change()
+    
     def handle_logout(self):
         """Handle logout"""
         reply = QMessageBox.question(
@@ -246,6 +275,8 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            from utils.change_watcher import change_watcher
+            change_watcher.tablesChanged.disconnect(self.on_tables_changed)
             auth.logout()
             self.close()
             
@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
 from controllers.report_controller import report_controller
 from controllers.department_controller import department_controller
+from ui.components.lazy_table_model import LazyTableModel, TableColumn
 import os
 
 class ReportBuilderPage(QWidget):
@@ -74,8 +75,13 @@ class ReportBuilderPage(QWidget):
         layout.addWidget(config_group)
         
         # Preview Area
-        layout.addWidget(QLabel("Data Preview (First 50 records):"))
-        self.preview_table = QTableWidget()
+        # Rows are fetched in blocks as the preview scrolls
+        layout.addWidget(QLabel("Data Preview:"))
+        self.preview_model = LazyTableModel([], report_controller.get_report_page, parent=self)
+        self.preview_model.loadFailed.connect(lambda message: print(f"✗ Error loading report preview: {message}"))
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
+        self.preview_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         layout.addWidget(self.preview_table)
         
         # Initial Load
@@ -92,26 +98,24 @@ class ReportBuilderPage(QWidget):
             else:
                 self.dept_combo.addItem(d['department_name'], d['department_id'])
 
-    def load_preview(self):
-        """Load data preview"""
+    def report_rows(self):
+        """Headers and a row generator for the selected report, streamed from the database"""
         report_type = self.type_combo.currentText()
         dept_id = self.dept_combo.currentData()
         
         if report_type == "Student Performance Report":
-            headers, data = report_controller.get_student_performance_data(dept_id)
+            return report_controller.PERFORMANCE_HEADERS, report_controller.iter_student_performance_data(dept_id)
+        return report_controller.ATTENDANCE_HEADERS, report_controller.iter_attendance_data(dept_id)
+
+    def load_preview(self):
+        """Load data preview (rows are read as the table scrolls)"""
+        if self.type_combo.currentText() == "Student Performance Report":
+            report, headers = 'performance', report_controller.PERFORMANCE_HEADERS
         else:
-            headers, data = report_controller.get_attendance_data(dept_id)
-            
-        self.preview_table.setColumnCount(len(headers))
-        self.preview_table.setHorizontalHeaderLabels(headers)
-        self.preview_table.setRowCount(min(len(data), 50))
-        
-        for row, row_data in enumerate(data[:50]):
-            for col, val in enumerate(row_data):
-                self.preview_table.setItem(row, col, QTableWidgetItem(str(val)))
-                
-        self.current_headers = headers
-        self.current_data = data
+            report, headers = 'attendance', report_controller.ATTENDANCE_HEADERS
+        
+        self.preview_model.set_columns([TableColumn(header, header) for header in headers])
+        self.preview_model.set_query(report=report, department_id=self.dept_combo.currentData())
 
     def generate_report(self):
         """Generate and save report"""
@@ -122,18 +126,23 @@ class ReportBuilderPage(QWidget):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{report_type.replace(' ', '_')}_{timestamp}"
         
+        headers, rows = self.report_rows()
         if "Excel" in fmt:
             filename += ".xlsx"
             success, path = report_controller.generate_excel_report(
                 f"{report_type} - {dept_name}",
-                self.current_headers,
-                self.current_data,
+                headers,
+                rows,
                 filename
             )
         else:
             filename += ".pdf"
-            html = self.generate_html_content(report_type, dept_name)
-            success, path = report_controller.generate_pdf_report(html, filename)
+            try:
+                html = self.generate_html_content(report_type, dept_name, headers, rows)
+            except Exception as e:
+                success, path = False, f"Error loading report data: {str(e)}"
+            else:
+                success, path = report_controller.generate_pdf_report(html, filename)
             
         if success:
             QMessageBox.information(self, "Success", f"Report generated successfully:\n{path}")
@@ -141,7 +150,7 @@ class ReportBuilderPage(QWidget):
         else:
             QMessageBox.warning(self, "Error", path)
 
-    def generate_html_content(self, title, subtitle):
+    def generate_html_content(self, title, subtitle, headers, rows):
         """Generate HTML for PDF report"""
         html = f"""
         <html>
@@ -164,7 +173,7 @@ class ReportBuilderPage(QWidget):
                     <tr>
         """
         
-        for h in self.current_headers:
+        for h in headers:
             html += f"<th>{h}</th>"
             
         html += """
@@ -173,11 +182,10 @@ class ReportBuilderPage(QWidget):
                 <tbody>
         """
         
-        for row in self.current_data:
-            html += "<tr>"
-            for cell in row:
-                html += f"<td>{cell}</td>"
-            html += "</tr>"
+        html += "".join(
+            "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>"
+            for row in rows
+        )
             
         html += """
                 </tbody>
@@ -7,7 +7,21 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from controllers.result_controller import result_controller
 from controllers.department_controller import department_controller
-from utils.excel_exporter import excel_exporter
+from utils.task_runner import task_runner
+
+
+def load_report(dept_id, semester):
+    """Pass/fail statistics and the top ten (runs on a task_runner worker)"""
+    stats = result_controller.get_pass_fail_statistics(dept_id, semester)
+    toppers = result_controller.get_topper_list(dept_id, semester, 10) if dept_id and semester else None
+    return stats, toppers
+
+
+def export_toppers(dept_id, semester, file_path):
+    """Write the top 100 to Excel (runs on a task_runner worker)"""
+    from utils.excel_exporter import excel_exporter
+    toppers = result_controller.get_topper_list(dept_id, semester, 100)
+    return excel_exporter.export_results_report(toppers, file_path)
 
 
 class ReportsPage(QWidget):
@@ -105,8 +119,14 @@ class ReportsPage(QWidget):
         dept_id = self.dept_combo.currentData()
         semester = self.semester_combo.currentData()
         
-        # Get statistics
-        stats = result_controller.get_pass_fail_statistics(dept_id, semester)
+        # Repeated clicks join the load already in flight
+        task_runner.submit(load_report, dept_id, semester,
+                           key=f"report-{dept_id}-{semester}",
+                           on_result=self._on_report_loaded,
+                           on_error=lambda msg: QMessageBox.warning(self, "Error", msg))
+    
+    def _on_report_loaded(self, report):
+        stats, toppers = report
         
         self.total_label.setText(str(stats['total']))
         self.passed_label.setText(str(stats['passed']))
@@ -114,8 +134,7 @@ class ReportsPage(QWidget):
         self.pass_rate_label.setText(f"{stats['pass_percentage']}%")
         
         # Get topper list
-        if dept_id and semester:
-            toppers = result_controller.get_topper_list(dept_id, semester, 10)
+        if toppers is not None:
             self.display_toppers(toppers)
         else:
             self.topper_table.setRowCount(0)
@@ -139,18 +158,22 @@ class ReportsPage(QWidget):
             QMessageBox.warning(self, "Error", "Please select department and semester")
             return
         
-        toppers = result_controller.get_topper_list(dept_id, semester, 100)
-        
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Save Report", "report.xlsx", "Excel Files (*.xlsx)"
         )
         
         if file_path:
-            success = excel_exporter.export_results_report(toppers, file_path)
-            if success:
-                QMessageBox.information(self, "Success", f"Report saved to {file_path}")
-            else:
-                QMessageBox.warning(self, "Error", "Failed to export report")
+            task_runner.submit(
+                export_toppers, dept_id, semester, file_path,
+                on_result=lambda success: self._on_report_exported(success, file_path),
+                on_error=lambda msg: QMessageBox.warning(self, "Error", f"Failed to export report: {msg}")
+            )
+    
+    def _on_report_exported(self, success, file_path):
+        if success:
+            QMessageBox.information(self, "Success", f"Report saved to {file_path}")
+        else:
+            QMessageBox.warning(self, "Error", "Failed to export report")
     
     def export_pdf_report(self):
         """Export report to PDF"""
@@ -3,13 +3,22 @@ Result Generation Page
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
                              QComboBox, QTableWidget, QTableWidgetItem, QMessageBox,
-                             QFileDialog, QDialog, QGroupBox, QFormLayout)
+                             QFileDialog, QDialog, QGroupBox, QFormLayout, QProgressDialog)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from controllers.result_controller import result_controller
+from controllers.batch_print_controller import batch_print_controller
 from controllers.student_controller import student_controller
-from utils.pdf_generator import pdf_generator
-from utils.excel_exporter import excel_exporter
+from controllers.department_controller import department_controller
+from utils.task_runner import task_runner
+
+
+def generate_and_rank(department_id, semester):
+    """Generate a department/semester's results and rank them (runs on a task_runner worker)"""
+    success, msg, summary = result_controller.generate_results_batch(department_id, semester)
+    if success:
+        result_controller.calculate_ranks(department_id, semester)
+    return success, msg
 
 
 class ResultGenerationPage(QWidget):
@@ -44,6 +53,40 @@ class ResultGenerationPage(QWidget):
         
         layout.addLayout(select_layout)
         
+        # Batch generation for a whole department/semester
+        batch_layout = QHBoxLayout()
+        batch_layout.addWidget(QLabel("Department:"))
+        self.batch_dept_combo = QComboBox()
+        for dept in department_controller.get_all_departments():
+            if self.teacher_department_id and dept['department_id'] != self.teacher_department_id:
+                continue
+            self.batch_dept_combo.addItem(dept['department_name'], dept['department_id'])
+        batch_layout.addWidget(self.batch_dept_combo)
+        
+        batch_layout.addWidget(QLabel("Semester:"))
+        self.batch_semester_combo = QComboBox()
+        for sem in range(1, 9):
+            self.batch_semester_combo.addItem(f"Semester {sem}", sem)
+        batch_layout.addWidget(self.batch_semester_combo)
+        
+        batch_btn = QPushButton("📚 Generate All Results")
+        batch_btn.setToolTip("Generate results for every student of the department in this semester")
+        batch_btn.clicked.connect(self.generate_batch_results)
+        batch_layout.addWidget(batch_btn)
+        
+        batch_pdf_btn = QPushButton("🖨 Print Marksheets")
+        batch_pdf_btn.setToolTip("Export marksheets for the whole department/semester to a folder or ZIP")
+        batch_pdf_btn.clicked.connect(lambda: self.export_batch_pdfs('marksheet'))
+        batch_layout.addWidget(batch_pdf_btn)
+        
+        batch_transcript_btn = QPushButton("📜 Print Transcripts")
+        batch_transcript_btn.setToolTip("Export transcripts for the students currently in this semester")
+        batch_transcript_btn.clicked.connect(lambda: self.export_batch_pdfs('transcript'))
+        batch_layout.addWidget(batch_transcript_btn)
+        batch_layout.addStretch()
+        
+        layout.addLayout(batch_layout)
+        
         # Result display
         self.result_group = QGroupBox("Result Details")
         result_layout = QFormLayout(self.result_group)
@@ -108,17 +151,24 @@ class ResultGenerationPage(QWidget):
         layout.addLayout(action_layout)
         
         self.current_result = None
+        self.batch_task = None
+        self.batch_progress = None
     
     def load_students(self):
-        """Load/Reload students into dropdown"""
-        self.student_combo.clear()
+        """Load/Reload students into dropdown (in the background)"""
         if self.teacher_department_id:
             # Teacher - only their department students
-            students = student_controller.get_students_by_department(self.teacher_department_id)
+            task_runner.submit(student_controller.get_students_by_department, self.teacher_department_id,
+                               key=f"result-students-{self.teacher_department_id}",
+                               on_result=self._on_students_loaded)
         else:
             # Admin - all students
-            students = student_controller.get_all_students()
-        for student in students:
+            task_runner.submit(student_controller.get_all_students, key="result-students-all",
+                               on_result=self._on_students_loaded)
+    
+    def _on_students_loaded(self, students):
+        self.student_combo.clear()
+        for student in students or []:
             self.student_combo.addItem(
                 f"{student['roll_number']} - {student['name']} (Sem {student['semester']})",
                 (student['student_id'], student['semester'])
@@ -130,14 +180,107 @@ class ResultGenerationPage(QWidget):
             return
         
         student_id, semester = data
-        success, result_data, msg = result_controller.generate_result(student_id, semester)
-        
+        task_runner.submit(result_controller.generate_result, student_id, semester,
+                           key=f"result-{student_id}-{semester}",
+                           on_result=self._on_result_generated,
+                           on_error=lambda msg: QMessageBox.warning(self, "Error", msg))
+    
+    def _on_result_generated(self, outcome):
+        success, result_data, msg = outcome
         if success:
             self.current_result = result_data
             self.display_result(result_data)
         else:
             QMessageBox.warning(self, "Error", msg)
     
+    def generate_batch_results(self):
+        """Generate results for the selected department and semester"""
+        department_id = self.batch_dept_combo.currentData()
+        semester = self.batch_semester_combo.currentData()
+        if not department_id:
+            QMessageBox.warning(self, "No Selection", "Please select a department first")
+            return
+        
+        task_runner.submit(generate_and_rank, department_id, semester,
+                           key=f"results-batch-{department_id}-{semester}",
+                           on_result=self._on_batch_results,
+                           on_error=lambda msg: QMessageBox.warning(self, "Error", msg))
+    
+    def _on_batch_results(self, outcome):
+        success, msg = outcome
+        if success:
+            QMessageBox.information(self, "Results Generated", msg)
+        else:
+            QMessageBox.warning(self, "Error", msg)
+    
+    def export_batch_pdfs(self, kind):
+        """Export marksheets/transcripts for the selected department and semester in the background"""
+        department_id = self.batch_dept_combo.currentData()
+        semester = self.batch_semester_combo.currentData()
+        if not department_id:
+            QMessageBox.warning(self, "No Selection", "Please select a department first")
+            return
+        if self.batch_task is not None and not self.batch_task.done:
+            QMessageBox.information(self, "Export Running", "A batch export is already running")
+            return
+        
+        from ui.university_details_dialog import UniversityDetailsDialog
+        dialog = UniversityDetailsDialog(self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        university_data = dialog.get_university_data()
+        
+        choice = QMessageBox.question(
+            self, "Output", "Save the PDFs into a single ZIP archive?\n\nChoose No to save them into a folder.",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+        )
+        if choice == QMessageBox.Cancel:
+            return
+        default_name = f"{kind}s_{self.batch_dept_combo.currentText()}_sem{semester}".replace(' ', '_')
+        if choice == QMessageBox.Yes:
+            output_path, _ = QFileDialog.getSaveFileName(self, "Save ZIP", f"{default_name}.zip",
+                                                         "ZIP Archives (*.zip)")
+            if output_path and not output_path.lower().endswith('.zip'):
+                output_path += '.zip'
+        else:
+            output_path = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        if not output_path:
+            return
+        
+        self.batch_progress = QProgressDialog(f"Preparing {kind}s...", "Cancel", 0, 0, self)
+        self.batch_progress.setWindowTitle(f"Printing {kind.title()}s")
+        self.batch_progress.setWindowModality(Qt.WindowModal)
+        self.batch_progress.setMinimumDuration(0)
+        
+        export = (batch_print_controller.export_marksheets if kind == 'marksheet'
+                  else batch_print_controller.export_transcripts)
+        self.batch_task = task_runner.submit(
+            export, department_id, semester, output_path, university_data,
+            with_progress=True,
+            on_progress=self.on_batch_progress,
+            on_result=lambda outcome: self.on_batch_finished(outcome[0], outcome[1]),
+            on_error=lambda msg: self.on_batch_finished(False, msg),
+            on_cancelled=lambda: self.on_batch_finished(False, f"Export of {kind}s cancelled")
+        )
+        self.batch_progress.canceled.connect(self.batch_task.cancel)
+    
+    def on_batch_progress(self, done, total, file_name):
+        if self.batch_progress is None:
+            return
+        self.batch_progress.setMaximum(total)
+        self.batch_progress.setValue(done)
+        self.batch_progress.setLabelText(f"{done} of {total}: {file_name}")
+    
+    def on_batch_finished(self, success, message):
+        if self.batch_progress is not None:
+            self.batch_progress.canceled.disconnect()
+            self.batch_progress.close()
+            self.batch_progress = None
+        if success:
+            QMessageBox.information(self, "Export Complete", message)
+        else:
+            QMessageBox.warning(self, "Export", message)
+    
     def display_result(self, result_data):
         student = result_data['student']
         
@@ -190,6 +333,7 @@ class ResultGenerationPage(QWidget):
         )
         
         if file_path:
+            from utils.pdf_generator import pdf_generator
             success = pdf_generator.generate_marksheet(self.current_result, file_path, university_data)
             if success:
                 QMessageBox.information(self, "Success", f"Marksheet saved to {file_path}")
@@ -240,6 +384,7 @@ class ResultGenerationPage(QWidget):
         )
         
         if file_path:
+            from utils.excel_exporter import excel_exporter
             success = excel_exporter.export_detailed_marksheet(self.current_result, file_path)
             if success:
                 QMessageBox.information(self, "Success", f"Excel saved to {file_path}")
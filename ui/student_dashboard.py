@@ -4,13 +4,15 @@ Student Dashboard - Personalized view for student users
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-from controllers.student_controller import student_controller
-from controllers.result_controller import result_controller
+from controllers.dashboard_controller import dashboard_controller
+from utils.task_runner import task_runner
 
 
 class StudentDashboard(QWidget):
     """Personalized dashboard showing only student's own data"""
     
+    WATCHED_TABLES = ('students', 'marks')
+    
     def __init__(self, parent=None, student_id=None):
         super().__init__(parent)
         self.student_id = student_id
@@ -58,7 +60,7 @@ class StudentDashboard(QWidget):
         
         refresh_btn = QPushButton("🔄 Refresh")
         refresh_btn.setMinimumHeight(50)
-        refresh_btn.clicked.connect(self.load_data)
+        refresh_btn.clicked.connect(lambda: self.load_data(use_cache=False))
         actions_layout.addWidget(refresh_btn)
         
         actions_group.setLayout(actions_layout)
@@ -66,16 +68,27 @@ class StudentDashboard(QWidget):
         
         layout.addStretch()
     
-    def load_data(self):
-        """Load student's own data"""
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_data()
+    
+    def load_data(self, use_cache=True):
+        """Load student's own data in the background"""
         if not self.student_id:
             self.info_label.setText("❌ No student ID found")
             return
         
+        task_runner.submit(
+            dashboard_controller.get_student_statistics, self.student_id, use_cache=use_cache,
+            key=f"student-stats-{self.student_id}",
+            on_result=lambda stats: self._on_data_loaded(stats or {}),
+            on_error=lambda msg: QMessageBox.warning(self, "Error", f"Failed to load data: {msg}")
+        )
+    
+    def _on_data_loaded(self, stats):
+        """Show the student's profile and academic stats"""
         try:
-            # Get student info
-            students = student_controller.get_all_students()
-            student = next((s for s in students if s['student_id'] == self.student_id), None)
+            student = stats.get('student')
             
             if student:
                 info_text = f"""
@@ -89,11 +102,10 @@ class StudentDashboard(QWidget):
             else:
                 self.info_label.setText("❌ Student information not found")
             
-            # Get academic stats
-            results = result_controller.get_student_results(self.student_id)
+            # Academic stats
+            total_courses = stats.get('total_courses', 0)
             
-            if results:
-                total_courses = len(results)
+            if student and total_courses:
                 stats_text = f"""
 <b>Total Courses:</b> {total_courses}<br>
 <b>Semester:</b> {student['semester']}<br>
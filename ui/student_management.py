@@ -1,74 +1,57 @@
 """
-Student Management Page - Enhanced CRUD with Pagination, Filters, and Stats
+Student Management Page - Enhanced CRUD with a Virtualized Table, Filters, and Stats
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QTableWidget, QTableWidgetItem, QLineEdit, QDialog,
+                             QTableView, QLineEdit, QDialog,
                              QFormLayout, QComboBox, QDateEdit, QMessageBox, QFileDialog,
-                             QApplication, QProgressBar, QFrame, QHeaderView, QSpinBox,
+                             QApplication, QProgressBar, QFrame, QHeaderView,
                              QGroupBox, QGridLayout)
-from PyQt5.QtCore import Qt, QDate, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QColor, QBrush
+from PyQt5.QtCore import Qt, QDate, QTimer
+from PyQt5.QtGui import QFont
 from controllers.student_controller import student_controller
 from controllers.department_controller import department_controller
+from utils.task_runner import task_runner
+from ui.components.lazy_table_model import LazyTableModel, TableColumn
 
-
-class StudentLoaderThread(QThread):
-    """Background thread for loading students without blocking UI"""
-    finished = pyqtSignal(list)
-    error = pyqtSignal(str)
-    
-    def __init__(self, department_id=None, semester=None, gender=None, search_term=None):
-        super().__init__()
-        self.department_id = department_id
-        self.semester = semester
-        self.gender = gender
-        self.search_term = search_term
-    
-    def run(self):
-        try:
-            if self.search_term:
-                students = student_controller.search_students(self.search_term)
-            elif self.department_id:
-                students = student_controller.get_students_by_department(self.department_id)
-            else:
-                students = student_controller.get_all_students()
-            
-            # Apply additional filters in memory
-            students = students or []
-            if self.semester and self.semester > 0:
-                students = [s for s in students if s.get('semester') == self.semester]
-            if self.gender and self.gender != 'All':
-                students = [s for s in students if s.get('gender') == self.gender]
-            
-            self.finished.emit(students)
-        except Exception as e:
-            self.error.emit(str(e))
+GENDER_ROW_COLORS = {'Male': "#F0F9FF", 'Female': "#FDF2F8"}
 
 
 class StudentManagementPage(QWidget):
-    """Enhanced student management with pagination, filters, stats"""
-    
-    # Constants
-    ROWS_PER_PAGE = 25
+    """Enhanced student management with a virtualized table, filters, stats"""
+    
+    WATCHED_TABLES = ('students', 'departments')
+    
+    COLUMNS = [
+        TableColumn("Roll Number", 'roll_number', sort_key='roll_number'),
+        TableColumn("Name", 'name', sort_key='name'),
+        TableColumn("Department", 'department_name', sort_key='department_name'),
+        TableColumn("Semester", 'semester', sort_key='semester'),
+        TableColumn("Gender", 'gender', sort_key='gender'),
+        TableColumn("DOB", 'date_of_birth', sort_key='date_of_birth'),
+        TableColumn("Phone", 'phone', sort_key='phone'),
+        TableColumn("Email", 'email', sort_key='email'),
+        TableColumn("Father Name", 'father_name', sort_key='father_name'),
+        TableColumn("CNIC", 'cnic', sort_key='cnic'),
+    ]
     
     def __init__(self, parent=None, department_id=None):
         super().__init__(parent)
-        self.all_students = []  # All loaded students
-        self.filtered_students = []  # After filters applied
-        self.students_data = []  # Current page data
         self.department_id = department_id
-        self.loader_thread = None
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self._do_search)
         
-        # Pagination state
-        self.current_page = 1
-        self.total_pages = 1
-        
-        # Sorting state
-        self.sort_column = 1  # Name column
-        self.sort_order = Qt.AscendingOrder
+        # Rows are fetched from the database in blocks as the table scrolls
+        self.model = LazyTableModel(
+            self.COLUMNS, student_controller.get_students_page,
+            count_rows=student_controller.count_students,
+            row_background=lambda student: GENDER_ROW_COLORS.get(student.get('gender')),
+            parent=self
+        )
+        self.model.countChanged.connect(lambda total, exact: self.update_footer())
+        self.model.rowsInserted.connect(lambda *args: self.update_footer())
+        self.model.loadingChanged.connect(self._on_loading_changed)
+        self.model.loadFailed.connect(self._on_load_error)
         
         self.init_ui()
     
@@ -94,8 +77,8 @@ class StudentManagementPage(QWidget):
         # ========== TABLE ==========
         self.create_table(layout)
         
-        # ========== PAGINATION ==========
-        self.create_pagination_section(layout)
+        # ========== FOOTER ==========
+        self.create_footer_section(layout)
         
         # Load students asynchronously
         QTimer.singleShot(100, self.load_students)
@@ -380,34 +363,30 @@ class StudentManagementPage(QWidget):
     
     def create_table(self, layout):
         """Create the student table with sortable headers"""
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "Roll Number", "Name", "Department", "Semester", "Gender",
-            "DOB", "Phone", "Email", "Father Name", "CNIC"
-        ])
-        
-        # Enable sorting
-        self.table.setSortingEnabled(True)
-        self.table.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        
+        # Sorting is done in SQL by the model; clicking a header reloads from the top
+        self.table.horizontalHeader().setSortIndicatorShown(True)
+        self.table.horizontalHeader().setSortIndicator(1, Qt.AscendingOrder)  # Name column
         
         # Styling
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #E5E7EB;
                 border-radius: 8px;
                 gridline-color: #F3F4F6;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #F3F4F6;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #DBEAFE;
                 color: #1E40AF;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #F0F9FF;
             }
             QHeaderView::section {
@@ -424,121 +403,68 @@ class StudentManagementPage(QWidget):
         """)
         
         self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.ExtendedSelection)
         self.table.setAlternatingRowColors(True)
         self.table.verticalHeader().setVisible(False)
+        # Fixed row heights, so the view never measures rows it is not showing
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
-        # Set column widths
+        # Set column widths (Interactive: ResizeToContents would read every row)
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # Roll
+        header.setSectionResizeMode(QHeaderView.Interactive)
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # Name
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Dept
+        header.resizeSection(0, 130)  # Roll
+        header.resizeSection(2, 180)  # Dept
         
         layout.addWidget(self.table)
     
-    def create_pagination_section(self, layout):
-        """Create pagination controls"""
-        pagination_frame = QFrame()
-        pagination_frame.setStyleSheet("""
+    def create_footer_section(self, layout):
+        """Create the row count footer"""
+        footer_frame = QFrame()
+        footer_frame.setStyleSheet("""
             QFrame {
                 background-color: #F8FAFC;
                 border-radius: 8px;
                 padding: 8px;
             }
         """)
-        pagination_layout = QHBoxLayout(pagination_frame)
-        pagination_layout.setContentsMargins(16, 8, 16, 8)
-        
-        # Rows per page
-        pagination_layout.addWidget(QLabel("Rows per page:"))
-        self.rows_per_page_combo = QComboBox()
-        self.rows_per_page_combo.addItems(["25", "50", "100", "200"])
-        self.rows_per_page_combo.currentTextChanged.connect(self.on_rows_per_page_changed)
-        pagination_layout.addWidget(self.rows_per_page_combo)
-        
-        pagination_layout.addStretch()
-        
-        # Page info
-        self.page_info_label = QLabel("Page 1 of 1")
-        self.page_info_label.setStyleSheet("font-weight: bold; color: #374151;")
-        pagination_layout.addWidget(self.page_info_label)
-        
-        pagination_layout.addStretch()
-        
-        # Navigation buttons
-        self.first_page_btn = QPushButton("⏮️ First")
-        self.first_page_btn.setStyleSheet(self.get_pagination_btn_style())
-        self.first_page_btn.clicked.connect(lambda: self.go_to_page(1))
-        pagination_layout.addWidget(self.first_page_btn)
-        
-        self.prev_page_btn = QPushButton("◀️ Prev")
-        self.prev_page_btn.setStyleSheet(self.get_pagination_btn_style())
-        self.prev_page_btn.clicked.connect(lambda: self.go_to_page(self.current_page - 1))
-        pagination_layout.addWidget(self.prev_page_btn)
-        
-        # Page input
-        self.page_input = QSpinBox()
-        self.page_input.setMinimum(1)
-        self.page_input.setMaximum(1)
-        self.page_input.setStyleSheet("padding: 4px 8px; min-width: 60px;")
-        self.page_input.valueChanged.connect(self.on_page_input_changed)
-        pagination_layout.addWidget(self.page_input)
-        
-        self.next_page_btn = QPushButton("Next ▶️")
-        self.next_page_btn.setStyleSheet(self.get_pagination_btn_style())
-        self.next_page_btn.clicked.connect(lambda: self.go_to_page(self.current_page + 1))
-        pagination_layout.addWidget(self.next_page_btn)
-        
-        self.last_page_btn = QPushButton("Last ⏭️")
-        self.last_page_btn.setStyleSheet(self.get_pagination_btn_style())
-        self.last_page_btn.clicked.connect(lambda: self.go_to_page(self.total_pages))
-        pagination_layout.addWidget(self.last_page_btn)
-        
-        layout.addWidget(pagination_frame)
-    
-    def get_pagination_btn_style(self):
-        return """
-            QPushButton {
-                background-color: white;
-                border: 1px solid #D1D5DB;
-                border-radius: 6px;
-                padding: 6px 12px;
-                color: #374151;
-            }
-            QPushButton:hover {
-                background-color: #F3F4F6;
-                border-color: #9CA3AF;
-            }
-            QPushButton:disabled {
-                background-color: #F9FAFB;
-                color: #D1D5DB;
-            }
-        """
+        footer_layout = QHBoxLayout(footer_frame)
+        footer_layout.setContentsMargins(16, 8, 16, 8)
+        
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("font-weight: bold; color: #374151;")
+        footer_layout.addWidget(self.count_label)
+        footer_layout.addStretch()
+        
+        layout.addWidget(footer_frame)
     
     # ========== DATA LOADING ==========
     
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_students()
+    
     def load_students(self):
-        """Load all students (async)"""
-        self.loading_label.setText("⏳ Loading...")
-        
-        if self.loader_thread and self.loader_thread.isRunning():
-            self.loader_thread.terminate()
-            self.loader_thread.wait()
-        
+        """Reload students from the top with the current filters and sort order (async)"""
+        self.model.set_query(**self._current_filters(),
+                             **self.model.sort_query(self.table.horizontalHeader()))
+        # Header clicks sort through the model once the first query is set
+        self.table.setSortingEnabled(True)
+    
+    def _current_filters(self):
+        """Filters from the filter bar, passed straight to the SQL query"""
         dept_id = self.dept_filter.currentData() if hasattr(self, 'dept_filter') else self.department_id
-        
-        self.loader_thread = StudentLoaderThread(dept_id)
-        self.loader_thread.finished.connect(self._on_students_loaded)
-        self.loader_thread.error.connect(self._on_load_error)
-        self.loader_thread.start()
+        return {
+            'department_id': dept_id,
+            'semester': self.sem_filter.currentData() or None,
+            'gender': self.gender_filter.currentText(),
+            'search_term': self.search_input.text().strip() or None
+        }
     
-    def _on_students_loaded(self, students):
-        """Handle async load completion"""
-        self.loading_label.setText("")
-        self.all_students = students
-        self.all_students = students
-        self.apply_filters()
+    def _on_loading_changed(self, loading):
+        """Show the loading indicator while a block is fetched"""
+        self.loading_label.setText("⏳ Loading..." if loading else "")
     
     def _on_load_error(self, error):
         """Handle async load error"""
@@ -547,35 +473,7 @@ class StudentManagementPage(QWidget):
     
     def apply_filters(self):
         """Apply all filters and refresh display"""
-        students = self.all_students.copy()
-        
-        # Department filter
-        dept_id = self.dept_filter.currentData()
-        if dept_id:
-            students = [s for s in students if s.get('department_id') == dept_id]
-        
-        # Semester filter
-        semester = self.sem_filter.currentData()
-        if semester and semester > 0:
-            students = [s for s in students if s.get('semester') == semester]
-        
-        # Gender filter
-        gender = self.gender_filter.currentText()
-        if gender != "All":
-            students = [s for s in students if s.get('gender') == gender]
-        
-        # Search filter
-        search_term = self.search_input.text().strip().lower()
-        if search_term:
-            students = [s for s in students if 
-                        search_term in s.get('name', '').lower() or
-                        search_term in s.get('roll_number', '').lower() or
-                        search_term in (s.get('email', '') or '').lower()]
-        
-        self.filtered_students = students
-        self.current_page = 1
-        self.update_pagination()
-        self.display_current_page()
+        self.load_students()
     
     def search_students(self):
         """Debounced search"""
@@ -588,113 +486,36 @@ class StudentManagementPage(QWidget):
     
     def clear_filters(self):
         """Clear all filters"""
+        for widget in (self.search_input, self.dept_filter, self.sem_filter, self.gender_filter):
+            widget.blockSignals(True)
         self.search_input.clear()
         self.dept_filter.setCurrentIndex(0)
         self.sem_filter.setCurrentIndex(0)
         self.gender_filter.setCurrentIndex(0)
+        for widget in (self.search_input, self.dept_filter, self.sem_filter, self.gender_filter):
+            widget.blockSignals(False)
         self.apply_filters()
     
-    # ========== PAGINATION ==========
-    
-    def update_pagination(self):
-        """Update pagination state"""
-        rows_per_page = int(self.rows_per_page_combo.currentText())
-        total_students = len(self.filtered_students)
-        self.total_pages = max(1, (total_students + rows_per_page - 1) // rows_per_page)
-        
-        self.page_input.setMaximum(self.total_pages)
-        self.page_input.setValue(self.current_page)
-        
-        self.page_info_label.setText(f"Page {self.current_page} of {self.total_pages} ({total_students} students)")
-        
-        # Update button states
-        self.first_page_btn.setEnabled(self.current_page > 1)
-        self.prev_page_btn.setEnabled(self.current_page > 1)
-        self.next_page_btn.setEnabled(self.current_page < self.total_pages)
-        self.last_page_btn.setEnabled(self.current_page < self.total_pages)
-    
-    def go_to_page(self, page):
-        """Go to a specific page"""
-        if 1 <= page <= self.total_pages:
-            self.current_page = page
-            self.update_pagination()
-            self.display_current_page()
-    
-    def on_page_input_changed(self, value):
-        """Handle page input change"""
-        self.go_to_page(value)
-    
-    def on_rows_per_page_changed(self):
-        """Handle rows per page change"""
-        self.current_page = 1
-        self.update_pagination()
-        self.display_current_page()
-    
-    def on_header_clicked(self, logical_index):
-        """Handle column header click for sorting"""
-        if self.sort_column == logical_index:
-            self.sort_order = Qt.DescendingOrder if self.sort_order == Qt.AscendingOrder else Qt.AscendingOrder
-        else:
-            self.sort_column = logical_index
-            self.sort_order = Qt.AscendingOrder
-        
-        self.sort_students()
-        self.display_current_page()
-    
-    def sort_students(self):
-        """Sort filtered students by current column"""
-        column_keys = ['roll_number', 'name', 'department_name', 'semester', 'gender',
-                       'date_of_birth', 'phone', 'email', 'father_name', 'cnic']
-        
-        if 0 <= self.sort_column < len(column_keys):
-            key = column_keys[self.sort_column]
-            reverse = self.sort_order == Qt.DescendingOrder
-            self.filtered_students.sort(key=lambda x: str(x.get(key, '') or '').lower(), reverse=reverse)
-    
-    # ========== DISPLAY ==========
-    
-    def display_current_page(self):
-        """Display current page of students"""
-        rows_per_page = int(self.rows_per_page_combo.currentText())
-        start_idx = (self.current_page - 1) * rows_per_page
-        end_idx = start_idx + rows_per_page
-        
-        self.students_data = self.filtered_students[start_idx:end_idx]
-        
-        self.table.setUpdatesEnabled(False)
-        self.table.setSortingEnabled(False)
-        self.table.clearContents()
-        self.table.setRowCount(len(self.students_data))
-        
-        for row, student in enumerate(self.students_data):
-            self.table.setItem(row, 0, QTableWidgetItem(student.get('roll_number', '')))
-            self.table.setItem(row, 1, QTableWidgetItem(student.get('name', '')))
-            self.table.setItem(row, 2, QTableWidgetItem(student.get('department_name', '') or ''))
-            self.table.setItem(row, 3, QTableWidgetItem(str(student.get('semester', ''))))
-            self.table.setItem(row, 4, QTableWidgetItem(student.get('gender', '') or ''))
-            
-            dob = student.get('date_of_birth', '')
-            self.table.setItem(row, 5, QTableWidgetItem(str(dob) if dob else ''))
-            
-            self.table.setItem(row, 6, QTableWidgetItem(student.get('phone', '') or ''))
-            self.table.setItem(row, 7, QTableWidgetItem(student.get('email', '') or ''))
-            self.table.setItem(row, 8, QTableWidgetItem(student.get('father_name', '') or ''))
-            self.table.setItem(row, 9, QTableWidgetItem(student.get('cnic', '') or ''))
-            
-            # Row highlighting based on gender
-            if student.get('gender') == 'Male':
-                for col in range(10):
-                    item = self.table.item(row, col)
-                    if item:
-                        item.setBackground(QBrush(QColor("#F0F9FF")))
-            elif student.get('gender') == 'Female':
-                for col in range(10):
-                    item = self.table.item(row, col)
-                    if item:
-                        item.setBackground(QBrush(QColor("#FDF2F8")))
-        
-        self.table.setSortingEnabled(True)
-        self.table.setUpdatesEnabled(True)
+    def update_footer(self):
+        """Show how many of the matching students have been loaded"""
+        if self.model.total is None:
+            self.count_label.setText(f"Showing {self.model.loaded_rows} students")
+            return
+        total = self.model.total if self.model.total_exact else max(self.model.total, self.model.loaded_rows)
+        suffix = "" if self.model.total_exact else "+"
+        self.count_label.setText(f"Showing {self.model.loaded_rows} of {total}{suffix} students")
+    
+    def _fetch_all_filtered(self):
+        """Every student matching the current filters, in the current sort order (for exports)"""
+        return student_controller.get_students_page(
+            limit=None, **self._current_filters(),
+            **self.model.sort_query(self.table.horizontalHeader())
+        )['rows']
+    
+    def _selected_students(self):
+        """Row dictionaries of the selected students that are in memory"""
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        return [student for student in map(self.model.row_at, rows) if student]
     
     # stats update logic removed
     
@@ -708,32 +529,28 @@ class StudentManagementPage(QWidget):
     
     def edit_student_from_selection(self):
         """Edit selected student"""
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        selected = self._selected_students()
+        if not selected:
             QMessageBox.warning(self, "No Selection", "Please select a student to edit")
             return
         
-        if len(selected_rows) > 1:
+        if len(selected) > 1:
             QMessageBox.warning(self, "Multiple Selection", "Please select only one student to edit")
             return
         
-        row = selected_rows[0].row()
-        if row < 0 or row >= len(self.students_data):
-            return
-        
-        student = self.students_data[row]
+        student = selected[0]
         dialog = StudentDialog(self, student)
         if dialog.exec_():
             self.load_students()
     
     def delete_student_from_selection(self):
         """Delete selected student(s)"""
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        selected = self._selected_students()
+        if not selected:
             QMessageBox.warning(self, "No Selection", "Please select student(s) to delete")
             return
         
-        count = len(selected_rows)
+        count = len(selected)
         reply = QMessageBox.question(
             self, 'Confirm Delete',
             f"Delete {count} student(s)?\n\nThis will also delete all related marks and results.",
@@ -742,20 +559,17 @@ class StudentManagementPage(QWidget):
         
         if reply == QMessageBox.Yes:
             success_count = 0
-            for index in selected_rows:
-                row = index.row()
-                if 0 <= row < len(self.students_data):
-                    student = self.students_data[row]
-                    success, _ = student_controller.delete_student(student['student_id'])
-                    if success:
-                        success_count += 1
+            for student in selected:
+                success, _ = student_controller.delete_student(student['student_id'])
+                if success:
+                    success_count += 1
             
             QMessageBox.information(self, "Success", f"Deleted {success_count} student(s)")
             self.load_students()
     
     def export_to_excel(self):
         """Export filtered students to Excel"""
-        if not self.filtered_students:
+        if not self.model.rowCount():
             QMessageBox.warning(self, "No Data", "No students to export")
             return
         
@@ -766,18 +580,19 @@ class StudentManagementPage(QWidget):
         if file_path:
             try:
                 import pandas as pd
-                df = pd.DataFrame(self.filtered_students)
+                students = self._fetch_all_filtered()
+                df = pd.DataFrame(students)
                 columns_to_export = ['roll_number', 'name', 'department_name', 'semester',
                                       'gender', 'date_of_birth', 'phone', 'email', 'father_name', 'cnic']
                 df = df[[c for c in columns_to_export if c in df.columns]]
                 df.to_excel(file_path, index=False)
-                QMessageBox.information(self, "Success", f"Exported {len(self.filtered_students)} students to Excel")
+                QMessageBox.information(self, "Success", f"Exported {len(students)} students to Excel")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Export failed: {str(e)}")
     
     def export_to_pdf(self):
         """Export filtered students to PDF"""
-        if not self.filtered_students:
+        if not self.model.rowCount():
             QMessageBox.warning(self, "No Data", "No students to export")
             return
         
@@ -800,7 +615,11 @@ class StudentManagementPage(QWidget):
                 
                 # Table data
                 data = [['Roll No', 'Name', 'Department', 'Semester', 'Gender', 'Phone']]
-                for s in self.filtered_students[:200]:  # Limit to 200 for PDF
+                students = student_controller.get_students_page(
+                    limit=200, **self._current_filters(),
+                    **self.model.sort_query(self.table.horizontalHeader())
+                )['rows']
+                for s in students:  # Limit to 200 for PDF
                     data.append([
                         s.get('roll_number', ''),
                         s.get('name', ''),
@@ -831,17 +650,15 @@ class StudentManagementPage(QWidget):
     
     def export_transcript(self):
         """Export transcript for selected student"""
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        selected = self._selected_students()
+        if not selected:
             QMessageBox.warning(self, "No Selection", "Please select a student")
             return
         
-        row = selected_rows[0].row()
-        if 0 <= row < len(self.students_data):
-            student = self.students_data[row]
-            from ui.transcript_export import TranscriptExportDialog
-            dialog = TranscriptExportDialog(student['student_id'], student['name'], self)
-            dialog.exec_()
+        student = selected[0]
+        from ui.transcript_export import TranscriptExportDialog
+        dialog = TranscriptExportDialog(student['student_id'], student['name'], self)
+        dialog.exec_()
     
     def import_students(self):
         """Import students from file"""
@@ -850,12 +667,48 @@ class StudentManagementPage(QWidget):
         )
         
         if file_path:
-            success, msg, count = student_controller.bulk_import_students(file_path)
-            if success:
-                QMessageBox.information(self, "Success", msg)
-                self.load_students()
-            else:
-                QMessageBox.warning(self, "Error", msg)
+            # Validate the whole file first so the user can decide on partial imports
+            self.loading_label.setText("⏳ Checking file...")
+            task_runner.submit(
+                student_controller.bulk_import_students, file_path, dry_run=True,
+                on_result=lambda result: self._on_import_checked(file_path, result),
+                on_error=self._on_import_error
+            )
+    
+    def _on_import_checked(self, file_path, result):
+        """Ask about partial imports, then import in the background"""
+        self.loading_label.setText("")
+        valid_ok, check_msg, valid_count = result
+        if not valid_ok:
+            if valid_count == 0:
+                QMessageBox.warning(self, "Error", check_msg)
+                return
+            reply = QMessageBox.question(
+                self, "Import Students",
+                f"{check_msg}\n\nImport the {valid_count} valid rows and skip the rest?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+        
+        self.loading_label.setText("⏳ Importing...")
+        task_runner.submit(
+            student_controller.bulk_import_students, file_path,
+            on_result=self._on_import_finished, on_error=self._on_import_error
+        )
+    
+    def _on_import_finished(self, result):
+        self.loading_label.setText("")
+        success, msg, count = result
+        if success:
+            QMessageBox.information(self, "Success", msg)
+            self.load_students()
+        else:
+            QMessageBox.warning(self, "Error", msg)
+    
+    def _on_import_error(self, error):
+        self.loading_label.setText("")
+        QMessageBox.warning(self, "Error", f"Import failed: {error}")
 
 
 class StudentDialog(QDialog):
@@ -6,6 +6,21 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
 from controllers.promotion_controller import promotion_controller
 from controllers.department_controller import department_controller
+from database.db_manager import db
+from utils.task_runner import task_runner
+
+
+def check_class_eligibility(dept_id, semester):
+    """(student, eligible, message) for every active student of a class (runs on a task_runner worker)"""
+    students = db.execute_query(
+        "SELECT student_id, roll_number, name FROM students WHERE department_id = ? AND semester = ? AND is_active = 1",
+        (dept_id, semester)
+    ) or []
+    results = []
+    for student in students:
+        eligible, message, details = promotion_controller.check_promotion_eligibility(student['student_id'], semester)
+        results.append((student, eligible, message))
+    return results
 
 class StudentPromotionPage(QWidget):
     """Page for promoting students to next semester"""
@@ -124,47 +139,41 @@ class StudentPromotionPage(QWidget):
         dept_id = self.dept_combo.currentData()
         semester = int(self.sem_combo.currentText())
         
-        # This is a bit tricky because the controller has bulk_promote but not bulk_check
-        # So we'll use bulk_promote logic but without committing, or just iterate students
-        # For now, let's just use the bulk_promote method but catch the result without doing it? 
-        # No, that would promote them. We need to iterate.
-        
-        try:
-            # Get students directly (need to import student_controller or use db)
-            from database.db_manager import db
-            students_query = "SELECT student_id, roll_number, name FROM students WHERE department_id = ? AND semester = ? AND is_active = 1"
-            students = db.execute_query(students_query, (dept_id, semester))
-            
-            self.results_table.setRowCount(0)
-            eligible_count = 0
+        # Eligibility is checked per student, so run the whole class in the background
+        task_runner.submit(
+            check_class_eligibility, dept_id, semester,
+            key=f"promotion-check-{dept_id}-{semester}",
+            on_result=lambda results: self._show_eligibility(results, semester),
+            on_error=lambda msg: QMessageBox.warning(self, "Error", f"Failed to check eligibility: {msg}")
+        )
+    
+    def _show_eligibility(self, results, semester):
+        """Fill the results table from check_class_eligibility()"""
+        self.results_table.setRowCount(0)
+        eligible_count = 0
+        
+        for row, (student, eligible, message) in enumerate(results):
+            self.results_table.insertRow(row)
+            self.results_table.setItem(row, 0, QTableWidgetItem(student['roll_number']))
+            self.results_table.setItem(row, 1, QTableWidgetItem(student['name']))
             
-            for row, student in enumerate(students):
-                self.results_table.insertRow(row)
-                self.results_table.setItem(row, 0, QTableWidgetItem(student['roll_number']))
-                self.results_table.setItem(row, 1, QTableWidgetItem(student['name']))
-                
-                eligible, message, details = promotion_controller.check_promotion_eligibility(student['student_id'], semester)
-                
-                status_item = QTableWidgetItem("Eligible" if eligible else "Not Eligible")
-                status_item.setForeground(Qt.green if eligible else Qt.red)
-                self.results_table.setItem(row, 2, status_item)
-                
-                self.results_table.setItem(row, 3, QTableWidgetItem(message))
-                
-                if eligible:
-                    eligible_count += 1
-                    btn = QPushButton("Promote")
-                    btn.setStyleSheet("background-color: #2ecc71; color: white;")
-                    btn.clicked.connect(lambda checked, s=student: self.promote_single(s, semester))
-                    self.results_table.setCellWidget(row, 4, btn)
-                else:
-                    self.results_table.setItem(row, 4, QTableWidgetItem("-"))
+            status_item = QTableWidgetItem("Eligible" if eligible else "Not Eligible")
+            status_item.setForeground(Qt.green if eligible else Qt.red)
+            self.results_table.setItem(row, 2, status_item)
             
-            self.promote_all_btn.setEnabled(eligible_count > 0)
-            QMessageBox.information(self, "Check Complete", f"Found {eligible_count} eligible students out of {len(students)}")
+            self.results_table.setItem(row, 3, QTableWidgetItem(message))
             
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to check eligibility: {str(e)}")
+            if eligible:
+                eligible_count += 1
+                btn = QPushButton("Promote")
+                btn.setStyleSheet("background-color: #2ecc71; color: white;")
+                btn.clicked.connect(lambda checked, s=student: self.promote_single(s, semester))
+                self.results_table.setCellWidget(row, 4, btn)
+            else:
+                self.results_table.setItem(row, 4, QTableWidgetItem("-"))
+        
+        self.promote_all_btn.setEnabled(eligible_count > 0)
+        QMessageBox.information(self, "Check Complete", f"Found {eligible_count} eligible students out of {len(results)}")
 
     def promote_single(self, student, semester):
         """Promote a single student"""
@@ -190,12 +199,22 @@ class StudentPromotionPage(QWidget):
                                      QMessageBox.Yes | QMessageBox.No)
         
         if confirm == QMessageBox.Yes:
-            success, message, summary = promotion_controller.bulk_promote_students(dept_id, semester, self.user_id)
-            if success:
-                QMessageBox.information(self, "Success", message)
-                self.check_eligibility() # Refresh
-            else:
-                QMessageBox.warning(self, "Error", message)
+            self.promote_all_btn.setEnabled(False)
+            task_runner.submit(
+                promotion_controller.bulk_promote_students, dept_id, semester, self.user_id,
+                key=f"promotion-bulk-{dept_id}-{semester}",
+                on_result=self._on_bulk_promoted,
+                on_error=lambda msg: self._on_bulk_promoted((False, msg, None))
+            )
+    
+    def _on_bulk_promoted(self, outcome):
+        success, message, summary = outcome
+        if success:
+            QMessageBox.information(self, "Success", message)
+            self.check_eligibility() # Refresh
+        else:
+            self.promote_all_btn.setEnabled(True)
+            QMessageBox.warning(self, "Error", message)
 
     def load_history(self):
         """Load promotion history"""
@@ -4,13 +4,16 @@ Teacher Dashboard - Department-filtered view for teachers
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-from controllers.student_controller import student_controller
 from controllers.course_controller import course_controller
+from controllers.dashboard_controller import dashboard_controller
+from utils.task_runner import task_runner
 
 
 class TeacherDashboard(QWidget):
     """Dashboard showing only teacher's department data"""
     
+    WATCHED_TABLES = ('students', 'courses', 'departments')
+    
     def __init__(self, parent=None, department_id=None):
         super().__init__(parent)
         self.department_id = department_id
@@ -60,7 +63,7 @@ class TeacherDashboard(QWidget):
         
         refresh_btn = QPushButton("🔄 Refresh")
         refresh_btn.setMinimumHeight(50)
-        refresh_btn.clicked.connect(self.load_data)
+        refresh_btn.clicked.connect(lambda: self.load_data(use_cache=False))
         actions_layout.addWidget(refresh_btn)
         
         actions_group.setLayout(actions_layout)
@@ -94,24 +97,32 @@ class TeacherDashboard(QWidget):
         card.value_label = value_label
         return card
     
-    def load_data(self):
-        """Load department-specific data"""
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_data()
+    
+    def load_data(self, use_cache=True):
+        """Load department-specific data in the background"""
         if not self.department_id:
             self.info_label.setText("❌ No department assigned")
             return
         
+        task_runner.submit(
+            dashboard_controller.get_department_statistics, self.department_id, use_cache=use_cache,
+            key=f"department-stats-{self.department_id}",
+            on_result=lambda stats: self._on_data_loaded(stats or {}),
+            on_error=lambda msg: QMessageBox.warning(self, "Error", f"Failed to load data: {msg}")
+        )
+    
+    def _on_data_loaded(self, stats):
+        """Show the department statistics"""
         try:
-            # Get students in department
-            all_students = student_controller.get_all_students()
-            dept_students = [s for s in all_students if s.get('department_id') == self.department_id]
-            
-            # Get courses in department
-            all_courses = course_controller.get_all_courses()
-            dept_courses = [c for c in all_courses if c.get('department_id') == self.department_id]
+            total_students = stats.get('total_students', 0)
+            total_courses = stats.get('total_courses', 0)
             
             # Update cards
-            self.students_card.value_label.setText(str(len(dept_students)))
-            self.courses_card.value_label.setText(str(len(dept_courses)))
+            self.students_card.value_label.setText(str(total_students))
+            self.courses_card.value_label.setText(str(total_courses))
             
             # Get current user info for assigned subject
             from controllers.auth_controller import auth
@@ -124,13 +135,13 @@ class TeacherDashboard(QWidget):
                     assigned_subject_name = f"{subject['course_code']} - {subject['course_name']}"
             
             # Update info
-            if dept_students:
-                dept_name = dept_students[0].get('department_name', 'Unknown')
+            if total_students:
+                dept_name = stats.get('department_name') or 'Unknown'
                 info_text = f"""
 <b>Department:</b> {dept_name}<br>
 <b>Assigned Subject:</b> {assigned_subject_name}<br>
-<b>Total Students:</b> {len(dept_students)}<br>
-<b>Total Courses:</b> {len(dept_courses)}<br>
+<b>Total Students:</b> {total_students}<br>
+<b>Total Courses:</b> {total_courses}<br>
 <i>You can only view and manage data from your department</i>
                 """
                 self.info_label.setText(info_text.strip())
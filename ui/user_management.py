@@ -12,6 +12,8 @@ from controllers.user_controller import user_controller
 class UserManagementPage(QWidget):
     """User management interface (Admin only)"""
     
+    WATCHED_TABLES = ('users',)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.init_ui()
@@ -79,6 +81,10 @@ class UserManagementPage(QWidget):
         
         layout.addLayout(action_layout)
     
+    def refresh_on_change(self):
+        """Reload after one of WATCHED_TABLES changed"""
+        self.load_users()
+    
     def load_users(self):
         """Load users into table with filtering"""
         selected_role = self.role_filter.currentText()
@@ -46,7 +46,8 @@ class BackupService:
     def perform_backup(self):
         """Perform a backup"""
         try:
-            success, backup_path = db.backup_database()
+            with db.connection_scope():
+                success, backup_path = db.backup_database()
             if success:
                 print(f"✓ Auto-backup completed: {backup_path}")
                 self.cleanup_old_backups()
@@ -64,7 +65,8 @@ class BackupService:
             import config
             backup_path = os.path.join(config.BACKUP_DIR, "daily", backup_filename)
             
-            success, path = db.backup_database(backup_path)
+            with db.connection_scope():
+                success, path = db.backup_database(backup_path)
             if success:
                 print(f"✓ Daily backup completed: {path}")
         except Exception as e:
@@ -0,0 +1,52 @@
+"""
+Change Watcher - Brings change_versions notifications to the GUI thread
+Polls change_version_controller every CHANGE_POLL_INTERVAL seconds on a
+task_runner worker (one small query) and re-emits every change, local or
+from another PC, as a Qt signal so pages can reload only what went stale.
+
+Usage:
+    change_watcher.tablesChanged.connect(self.on_tables_changed)  # (tables: frozenset, remote: bool)
+    change_watcher.start()
+"""
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from controllers.change_version_controller import change_version_controller
+from utils.task_runner import task_runner
+import config
+
+
+class ChangeWatcher(QObject):
+    """Timer-driven poller of the change_versions table"""
+
+    tablesChanged = pyqtSignal(object, bool)  # (frozenset of table names, changed by another PC)
+
+    def __init__(self, interval: float = None, parent=None):
+        super().__init__(parent)
+        self.interval = config.CHANGE_POLL_INTERVAL if interval is None else interval
+        self._timer = None
+        # Emitting from a worker thread is queued to the GUI thread by Qt
+        change_version_controller.subscribe(self.tablesChanged.emit)
+
+    def start(self):
+        """Record the current versions and start polling (no-op if the interval is 0)"""
+        if self.interval <= 0:
+            return
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.timeout.connect(self.poll_now)
+        if not self._timer.isActive():
+            self._timer.start(int(self.interval * 1000))
+            self.poll_now()
+
+    def stop(self):
+        """Stop polling"""
+        if self._timer is not None:
+            self._timer.stop()
+
+    def poll_now(self):
+        """Poll in the background; overlapping polls join the one in flight"""
+        task_runner.submit(change_version_controller.poll, key='change-versions',
+                           on_error=lambda message: print(f"✗ Change poll failed: {message}"))
+
+
+# Global instance
+change_watcher = ChangeWatcher()
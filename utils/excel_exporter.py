@@ -1,44 +1,110 @@
 """
 Excel Exporter - Export data to Excel files
+
+List exports are streamed through an openpyxl write-only workbook: rows are
+pulled from any iterable (a list, a generator, a database cursor) and
+written straight to disk, so memory stays flat however many rows there are.
+Column widths are estimated from the first rows instead of scanning every cell.
 """
-import pandas as pd
+from itertools import chain, islice
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Sequence
 import config
 
+# Rows buffered to estimate column widths before streaming the rest
+WIDTH_SAMPLE_ROWS = 1000
+MAX_COLUMN_WIDTH = 50
+
+# Blue header row used by the list exports
+HEADER_STYLE = {
+    'font': Font(bold=True, color="FFFFFF"),
+    'fill': PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid"),
+    'alignment': Alignment(horizontal='center', vertical='center'),
+}
+
 
 class ExcelExporter:
     """Export data to Excel files"""
     
-    def export_student_list(self, students: List[dict], output_path: str) -> bool:
+    def write_table(self, output_path: str, sheet_name: str, headers: Sequence[str],
+                    rows: Iterable[Sequence], title: Optional[str] = None,
+                    header_style: Optional[Dict] = None, title_style: Optional[Dict] = None,
+                    max_width: Optional[int] = MAX_COLUMN_WIDTH) -> int:
+        """
+        Stream a table into a new workbook
+        
+        Args:
+            output_path: .xlsx file to write
+            sheet_name: Worksheet title
+            headers: Column headers
+            rows: Iterable of row sequences; consumed once, never held in full
+            title: Optional title row merged across all columns
+            header_style / title_style: Cell attributes (font, fill, alignment, border)
+            max_width: Upper bound for estimated column widths (None = no limit)
+        
+        Returns:
+            int: Number of data rows written
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(sheet_name)
+        
+        rows = iter(rows)
+        sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+        for col, width in enumerate(self._estimate_widths(headers, sample, max_width), 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        
+        if title:
+            ws.append([self._styled_cell(ws, title, title_style)])
+            ws.merged_cells.add(f"A1:{get_column_letter(len(headers))}1")
+        ws.append([self._styled_cell(ws, header, header_style or HEADER_STYLE) for header in headers])
+        
+        count = 0
+        for row in chain(sample, rows):
+            ws.append(row)
+            count += 1
+        
+        wb.save(output_path)
+        return count
+    
+    @staticmethod
+    def _styled_cell(ws, value, style: Optional[Dict]) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        for attribute, setting in (style or {}).items():
+            setattr(cell, attribute, setting)
+        return cell
+    
+    @staticmethod
+    def _estimate_widths(headers: Sequence[str], sample: List[Sequence],
+                         max_width: Optional[int]) -> List[float]:
+        """Widest header/sample value per column, plus padding"""
+        widths = [len(str(header)) for header in headers]
+        for row in sample:
+            for col, value in enumerate(row[:len(widths)]):
+                if value is not None:
+                    widths[col] = max(widths[col], len(str(value)))
+        return [min(width + 2, max_width) if max_width else width + 2 for width in widths]
+    
+    def export_student_list(self, students: Iterable[dict], output_path: str) -> bool:
         """Export student list to Excel"""
         try:
-            # Prepare data
-            data = []
-            for student in students:
-                data.append({
-                    'Roll Number': student['roll_number'],
-                    'Name': student['name'],
-                    'Department': student.get('department_name', ''),
-                    'Semester': student['semester'],
-                    'Gender': student.get('gender', ''),
-                    'Date of Birth': student.get('date_of_birth', ''),
-                    'Email': student.get('email', ''),
-                    'Phone': student.get('phone', '')
-                })
-            
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
-            # Write to Excel
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Students', index=False)
-                
-                # Format the worksheet
-                worksheet = writer.sheets['Students']
-                self._format_worksheet(worksheet)
+            headers = ['Roll Number', 'Name', 'Department', 'Semester', 'Gender',
+                       'Date of Birth', 'Email', 'Phone']
+            rows = ((
+                student['roll_number'],
+                student['name'],
+                student.get('department_name', ''),
+                student['semester'],
+                student.get('gender', ''),
+                student.get('date_of_birth', ''),
+                student.get('email', ''),
+                student.get('phone', '')
+            ) for student in students)
+            
+            self.write_table(output_path, 'Students', headers, rows)
             
             print(f"✓ Student list exported: {output_path}")
             return True
@@ -47,34 +113,24 @@ class ExcelExporter:
             print(f"✗ Excel export error: {e}")
             return False
     
-    def export_marks_report(self, marks: List[dict], output_path: str, 
+    def export_marks_report(self, marks: Iterable[dict], output_path: str, 
                            title: str = "Marks Report") -> bool:
         """Export marks report to Excel"""
         try:
-            # Prepare data
-            data = []
-            for mark in marks:
-                data.append({
-                    'Roll Number': mark.get('roll_number', ''),
-                    'Student Name': mark.get('student_name', ''),
-                    'Course Code': mark.get('course_code', ''),
-                    'Course Name': mark.get('course_name', ''),
-                    'Max Marks': mark['max_marks'],
-                    'Marks Obtained': mark['marks_obtained'],
-                    'Grade': mark['grade'],
-                    'Status': mark['status']
-                })
-            
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
-            # Write to Excel
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Marks', index=False)
-                
-                # Format the worksheet
-                worksheet = writer.sheets['Marks']
-                self._format_worksheet(worksheet)
+            headers = ['Roll Number', 'Student Name', 'Course Code', 'Course Name',
+                       'Max Marks', 'Marks Obtained', 'Grade', 'Status']
+            rows = ((
+                mark.get('roll_number', ''),
+                mark.get('student_name', ''),
+                mark.get('course_code', ''),
+                mark.get('course_name', ''),
+                mark['max_marks'],
+                mark['marks_obtained'],
+                mark['grade'],
+                mark['status']
+            ) for mark in marks)
+            
+            self.write_table(output_path, 'Marks', headers, rows)
             
             print(f"✓ Marks report exported: {output_path}")
             return True
@@ -83,37 +139,27 @@ class ExcelExporter:
             print(f"✗ Excel export error: {e}")
             return False
     
-    def export_results_report(self, results: List[dict], output_path: str) -> bool:
+    def export_results_report(self, results: Iterable[dict], output_path: str) -> bool:
         """Export results report to Excel"""
         try:
-            # Prepare data
-            data = []
-            for result in results:
-                data.append({
-                    'Roll Number': result.get('roll_number', ''),
-                    'Student Name': result.get('student_name', ''),
-                    'Department': result.get('department_name', ''),
-                    'Semester': result['semester'],
-                    'Total Marks': result['total_marks'],
-                    'Marks Obtained': result['marks_obtained'],
-                    'Percentage': f"{result['percentage']}%",
-                    'SGPA': result['sgpa'],
-                    'CGPA': result['cgpa'],
-                    'Grade': result['overall_grade'],
-                    'Status': result['status'],
-                    'Rank': result.get('rank', '')
-                })
-            
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
-            # Write to Excel
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Results', index=False)
-                
-                # Format the worksheet
-                worksheet = writer.sheets['Results']
-                self._format_worksheet(worksheet)
+            headers = ['Roll Number', 'Student Name', 'Department', 'Semester', 'Total Marks',
+                       'Marks Obtained', 'Percentage', 'SGPA', 'CGPA', 'Grade', 'Status', 'Rank']
+            rows = ((
+                result.get('roll_number', ''),
+                result.get('student_name', ''),
+                result.get('department_name', ''),
+                result['semester'],
+                result['total_marks'],
+                result['marks_obtained'],
+                f"{result['percentage']}%",
+                result['sgpa'],
+                result['cgpa'],
+                result['overall_grade'],
+                result['status'],
+                result.get('rank', '')
+            ) for result in results)
+            
+            self.write_table(output_path, 'Results', headers, rows)
             
             print(f"✓ Results report exported: {output_path}")
             return True
@@ -223,27 +269,6 @@ class ExcelExporter:
         except Exception as e:
             print(f"✗ Excel export error: {e}")
             return False
-    
-    def _format_worksheet(self, worksheet):
-        """Apply formatting to worksheet"""
-        # Header row formatting
-        for cell in worksheet[1]:
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(cell.value)
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
 
 
 # Global Excel exporter instance
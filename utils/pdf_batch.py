@@ -0,0 +1,192 @@
+"""
+PDF Batch Exporter - Renders many marksheets/transcripts across worker processes
+ReportLab rendering is CPU-bound, so documents are fanned out over a
+ProcessPoolExecutor and finished PDFs are streamed into a folder or ZIP file.
+
+Workers only import this module and utils.pdf_generator (no database, no Qt),
+so they start quickly under the Windows "spawn" start method.
+"""
+import io
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Documents queued per worker; keeps memory bounded and cancellation prompt
+QUEUE_PER_WORKER = 2
+
+DOCUMENT_KINDS = ('marksheet', 'transcript')
+
+
+def safe_filename(name: str) -> str:
+    """Strip characters that are not valid in Windows/ZIP file names"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(name)).strip('._') or 'document'
+
+
+def render_document(kind: str, payload, university_data: Optional[dict] = None,
+                    output_path: Optional[str] = None) -> Optional[bytes]:
+    """
+    Render one document (runs inside a worker process)
+
+    Args:
+        kind: 'marksheet' (payload = result_data) or 'transcript' (payload = (student_data, marks_data))
+        payload: Document data as returned by the batch data queries
+        university_data: Optional university details for the header
+        output_path: Write the PDF here; if None the PDF bytes are returned
+
+    Returns:
+        PDF bytes when output_path is None, else None
+    """
+    from utils.pdf_generator import pdf_generator
+
+    target = output_path or io.BytesIO()
+    if kind == 'marksheet':
+        success = pdf_generator.generate_marksheet(payload, target, university_data)
+    else:
+        student_data, marks_data = payload
+        success = pdf_generator.generate_transcript(student_data, marks_data, target, university_data)
+
+    if not success:
+        raise RuntimeError(f"{kind.title()} rendering failed")
+    return None if output_path else target.getvalue()
+
+
+class PDFBatchExporter:
+    """Fans document rendering out over processes and collects the PDFs"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+
+    def export(self, kind: str, jobs: List[Tuple[str, object]], output_path: str,
+               university_data: Optional[dict] = None,
+               progress_callback: Optional[Callable[[int, int, str], None]] = None,
+               cancel_event=None) -> Dict:
+        """
+        Render every job and write it to a folder or ZIP archive
+
+        Folder output is written by the workers directly; ZIP output is sent
+        back as bytes and appended as each document finishes. A cancelled ZIP
+        export removes the partial archive, a cancelled folder export keeps
+        the documents already written.
+
+        Args:
+            kind: 'marksheet' or 'transcript'
+            jobs: List of (file name without extension, payload)
+            output_path: Folder, or a path ending in .zip
+            university_data: Optional university details for the header
+            progress_callback: Called as (done, total, file_name) after each document
+            cancel_event: threading.Event (or anything with is_set()) to stop early
+
+        Returns:
+            Dict with success, written, failed (list of (file_name, error)),
+            cancelled, output and seconds
+        """
+        if kind not in DOCUMENT_KINDS:
+            raise ValueError(f"Unknown document kind: {kind}")
+
+        started = time.perf_counter()
+        to_zip = output_path.lower().endswith('.zip')
+        if to_zip:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            archive = zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED)
+        else:
+            os.makedirs(output_path, exist_ok=True)
+            archive = None
+
+        names = self._unique_names(name for name, _ in jobs)
+        pending = [(names[i], payload) for i, (_, payload) in enumerate(jobs)]
+        total = len(pending)
+        summary = {'success': False, 'written': 0, 'failed': [], 'cancelled': False,
+                   'output': output_path, 'seconds': 0.0}
+
+        def finished(file_name: str, pdf: Optional[bytes], error: Optional[str]):
+            if error:
+                summary['failed'].append((file_name, error))
+            else:
+                if archive is not None:
+                    archive.writestr(file_name, pdf)
+                summary['written'] += 1
+            if progress_callback:
+                progress_callback(summary['written'] + len(summary['failed']), total, file_name)
+
+        def target(file_name: str) -> Optional[str]:
+            return None if to_zip else os.path.join(output_path, file_name)
+
+        try:
+            if self.max_workers == 1 or total < 2:
+                for file_name, payload in pending:
+                    if cancel_event is not None and cancel_event.is_set():
+                        summary['cancelled'] = True
+                        break
+                    try:
+                        finished(file_name, render_document(kind, payload, university_data, target(file_name)), None)
+                    except Exception as e:
+                        finished(file_name, None, str(e))
+            else:
+                summary['cancelled'] = self._run_pool(kind, pending, university_data, target, finished, cancel_event)
+        finally:
+            if archive is not None:
+                archive.close()
+                if summary['cancelled']:
+                    os.remove(output_path)
+
+        summary['success'] = not summary['cancelled'] and not summary['failed']
+        summary['seconds'] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def _run_pool(self, kind, pending, university_data, target, finished, cancel_event) -> bool:
+        """Keep a bounded number of documents in flight; returns True if cancelled"""
+        workers = min(self.max_workers, len(pending))
+        queue = iter(pending)
+        in_flight = {}
+        cancelled = False
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def submit_next() -> bool:
+                item = next(queue, None)
+                if item is None:
+                    return False
+                file_name, payload = item
+                future = pool.submit(render_document, kind, payload, university_data, target(file_name))
+                in_flight[future] = file_name
+                return True
+
+            for _ in range(workers * QUEUE_PER_WORKER):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(list(in_flight), timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_name = in_flight.pop(future)
+                    try:
+                        finished(file_name, future.result(), None)
+                    except Exception as e:
+                        finished(file_name, None, str(e))
+                    if not cancelled:
+                        submit_next()
+
+                if not cancelled and cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    for future in list(in_flight):
+                        if future.cancel():
+                            in_flight.pop(future)
+        return cancelled
+
+    @staticmethod
+    def _unique_names(names) -> List[str]:
+        """file_name.pdf for each job, numbering duplicates"""
+        seen = {}
+        result = []
+        for name in names:
+            base = safe_filename(name)
+            count = seen.get(base, 0)
+            seen[base] = count + 1
+            result.append(f"{base}.pdf" if count == 0 else f"{base}_{count + 1}.pdf")
+        return result
+
+
+# Global instance
+pdf_batch_exporter = PDFBatchExporter()
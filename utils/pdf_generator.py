@@ -1,12 +1,18 @@
 """
 PDF Generator - Creates professional marksheets
+
+The parts that are identical in every document (paragraph styles, the logo
+image) are built once per process and reused; each document only lays out
+its own student tables. The logo is embedded once per PDF and drawn by the
+header and by a watermark form XObject that every page references.
 """
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
@@ -14,6 +20,48 @@ from datetime import datetime
 import config
 import os
 
+# Tried in order; the first logo file that exists is used
+LOGO_FILES = ('uob_logo_final.png', 'uob_logo_new.jpg', 'uob_logo.png')
+
+WATERMARK_FORM = 'uobWatermark'
+
+
+class LogoImage:
+    """
+    Logo decoded once per process
+
+    canvas.drawImage with a file path re-reads and decodes the file for every
+    PDF. A shared ImageReader keeps the decoded pixels; drawImage still embeds
+    the image once per document and reuses it for the header and the watermark.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader = ImageReader(path)
+        self._reader.getRGBData()  # Decode once, not per document
+        self.width, self.height = self._reader.getSize()
+
+    def draw(self, canvas_obj, x, y, width, height, preserve_aspect_ratio=False):
+        """Same placement as canvas.drawImage(path, x, y, width, height, ...)"""
+        canvas_obj.drawImage(self._reader, x, y, width, height,
+                             preserveAspectRatio=preserve_aspect_ratio, mask='auto')
+
+
+class LogoFlowable(Flowable):
+    """Platypus flowable drawing the shared logo stretched to width x height"""
+
+    def __init__(self, logo: LogoImage, width: float, height: float):
+        Flowable.__init__(self)
+        self.logo = logo
+        self.width = width
+        self.height = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.logo.draw(self.canv, 0, 0, self.width, self.height)
+
 
 class PDFGenerator:
     """Generates PDF marksheets"""
@@ -21,6 +69,12 @@ class PDFGenerator:
     # Class-level font registration (only done once)
     _fonts_registered = False
     _fonts_available = False
+
+    # Static document parts, built on first use
+    _sample_styles = None
+    _style_cache = {}
+    _logo = None
+    _logo_resolved = False
     
     def __init__(self):
         self._register_fonts()
@@ -57,7 +111,135 @@ class PDFGenerator:
     def fonts_registered(self):
         """Check if fonts are available"""
         return PDFGenerator._fonts_available
-    
+
+    @classmethod
+    def _get_logo(cls):
+        """University logo (LogoImage), or None if no logo file exists"""
+        if not cls._logo_resolved:
+            from utils.resource_helper import resource_path
+
+            cls._logo_resolved = True
+            for file_name in LOGO_FILES:
+                logo_path = resource_path(os.path.join('resources', 'images', file_name))
+                if os.path.exists(logo_path):
+                    try:
+                        cls._logo = LogoImage(logo_path)
+                    except Exception as e:
+                        print(f"Warning: Could not load logo {logo_path}: {e}")
+                    break
+        return cls._logo
+
+    @classmethod
+    def _get_styles(cls, kind: str) -> dict:
+        """Paragraph styles and font names for 'marksheet' or 'transcript' (cached)"""
+        key = (kind, cls._fonts_available)
+        if key in cls._style_cache:
+            return cls._style_cache[key]
+
+        if cls._sample_styles is None:
+            cls._sample_styles = getSampleStyleSheet()
+        styles = cls._sample_styles
+
+        if kind == 'marksheet':
+            result = {
+                'normal': styles['Normal'],
+                'title': ParagraphStyle(
+                    'CustomTitle',
+                    parent=styles['Heading1'],
+                    fontSize=24,
+                    textColor=colors.HexColor('#2C3E50'),
+                    spaceAfter=6,
+                    alignment=TA_CENTER,
+                    fontName='Helvetica-Bold'
+                ),
+                'contact': ParagraphStyle(
+                    'Contact',
+                    parent=styles['Normal'],
+                    fontSize=9,
+                    textColor=colors.HexColor('#7F8C8D'),
+                    alignment=TA_CENTER,
+                    spaceAfter=12
+                ),
+                'subtitle': ParagraphStyle(
+                    'Subtitle',
+                    parent=styles['Normal'],
+                    fontSize=12,
+                    textColor=colors.HexColor('#7F8C8D'),
+                    alignment=TA_CENTER,
+                    spaceAfter=20
+                ),
+            }
+        else:
+            fonts = cls._fonts_available
+            # General Text: Times New Roman
+            text_font = 'TimesNewRoman' if fonts else 'Times-Roman'
+            text_bold_font = 'TimesNewRoman-Bold' if fonts else 'Times-Bold'
+            result = {
+                'text_font': text_font,
+                'text_bold_font': text_bold_font,
+                # University Name: Bookman Old Style, 12
+                'uni_name': ParagraphStyle(
+                    'UniName',
+                    parent=styles['Normal'],
+                    fontSize=12,
+                    alignment=TA_CENTER,
+                    fontName='Bookman' if fonts else 'Helvetica-Bold',
+                    spaceAfter=2
+                ),
+                # Subtitle: Bookman Old Style, 12, Italic
+                'subtitle': ParagraphStyle(
+                    'Subtitle',
+                    parent=styles['Normal'],
+                    fontSize=12,
+                    alignment=TA_CENTER,
+                    fontName='Bookman-Italic' if fonts else 'Helvetica-Oblique',
+                    spaceAfter=6
+                ),
+                # Transcript Title: Goudy Old Style, 14, Bold, Double Underline (simulated with <u>)
+                'title': ParagraphStyle(
+                    'TranscriptTitle',
+                    parent=styles['Heading1'],
+                    fontSize=14,
+                    textColor=colors.black,
+                    alignment=TA_CENTER,
+                    spaceAfter=12,
+                    fontName='Goudy-Bold' if fonts else 'Helvetica-Bold'
+                ),
+                'normal': ParagraphStyle(
+                    'CustomNormal',
+                    parent=styles['Normal'],
+                    fontName=text_font,
+                    fontSize=10
+                ),
+                # Semester Heading: Middle of table with underline
+                'semester': ParagraphStyle(
+                    'SemesterHeading',
+                    parent=styles['Heading2'],
+                    fontName=text_bold_font,
+                    fontSize=12,
+                    alignment=TA_CENTER,
+                    spaceAfter=6
+                ),
+                # Signature - Times New Roman, size 11, right-aligned
+                'signature': ParagraphStyle(
+                    'Signature',
+                    parent=styles['Normal'],
+                    fontName=text_bold_font,
+                    fontSize=11,
+                    alignment=TA_RIGHT
+                ),
+                'signature_detail': ParagraphStyle(
+                    'SignatureDetail',
+                    parent=styles['Normal'],
+                    fontName=text_font,
+                    fontSize=11,
+                    alignment=TA_RIGHT
+                ),
+            }
+
+        cls._style_cache[key] = result
+        return result
+
     def generate_marksheet(self, result_data: dict, output_path: str, university_data: dict = None) -> bool:
         """
         Generate a professional marksheet PDF
@@ -83,23 +265,13 @@ class PDFGenerator:
             
             # Container for PDF elements
             elements = []
-            styles = getSampleStyleSheet()
+            styles = self._get_styles('marksheet')
             
             # Get university name from custom data or config
             university_name = university_data.get('name', config.UNIVERSITY_NAME) if university_data else config.UNIVERSITY_NAME
             
             # University header
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#2C3E50'),
-                spaceAfter=6,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-            
-            university_title = Paragraph(university_name, title_style)
+            university_title = Paragraph(university_name, styles['title'])
             elements.append(university_title)
             
             # Add university contact info if provided
@@ -115,29 +287,12 @@ class PDFGenerator:
                     contact_parts.append(university_data['website'])
                 
                 if contact_parts:
-                    contact_style = ParagraphStyle(
-                        'Contact',
-                        parent=styles['Normal'],
-                        fontSize=9,
-                        textColor=colors.HexColor('#7F8C8D'),
-                        alignment=TA_CENTER,
-                        spaceAfter=12
-                    )
                     contact_text = " | ".join(contact_parts)
-                    contact = Paragraph(contact_text, contact_style)
+                    contact = Paragraph(contact_text, styles['contact'])
                     elements.append(contact)
             
             # Subtitle
-            subtitle_style = ParagraphStyle(
-                'Subtitle',
-                parent=styles['Normal'],
-                fontSize=12,
-                textColor=colors.HexColor('#7F8C8D'),
-                alignment=TA_CENTER,
-                spaceAfter=20
-            )
-            
-            subtitle = Paragraph("Academic Transcript / Marksheet", subtitle_style)
+            subtitle = Paragraph("Academic Transcript / Marksheet", styles['subtitle'])
             elements.append(subtitle)
             elements.append(Spacer(1, 0.3*inch))
             
@@ -253,7 +408,7 @@ class PDFGenerator:
             # Footer
             elements.append(Spacer(1, 0.3*inch))
             footer_text = f"Generated on: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}"
-            footer = Paragraph(footer_text, styles['Normal'])
+            footer = Paragraph(footer_text, styles['normal'])
             elements.append(footer)
             
             # Build PDF
@@ -269,39 +424,35 @@ class PDFGenerator:
             return False
     
     def _draw_watermark(self, canvas_obj, doc):
-        """Draw watermark logo on page"""
-        if not self.watermark_logo_path or not os.path.exists(self.watermark_logo_path):
+        """Draw watermark logo on page (a form XObject defined once per document)"""
+        logo = self._get_logo()
+        if not logo:
             return
         
         try:
-            # Save canvas state
-            canvas_obj.saveState()
-            
-            # Get page dimensions
-            page_width, page_height = A4
-            
-            # Calculate watermark size (140% of original)
-            watermark_width = 3 * inch * 1.4  # Original size * 140%
-            watermark_height = 3 * inch * 1.4
-            
-            # Center position
-            x = (page_width - watermark_width) / 2
-            y = (page_height - watermark_height) / 2
+            if not canvas_obj.hasForm(WATERMARK_FORM):
+                canvas_obj.beginForm(WATERMARK_FORM)
+                
+                # Get page dimensions
+                page_width, page_height = A4
+                
+                # Calculate watermark size (140% of original)
+                watermark_width = 3 * inch * 1.4  # Original size * 140%
+                watermark_height = 3 * inch * 1.4
+                
+                # Center position
+                x = (page_width - watermark_width) / 2
+                y = (page_height - watermark_height) / 2
+                
+                # Draw the image
+                logo.draw(canvas_obj, x, y, watermark_width, watermark_height, preserve_aspect_ratio=True)
+                canvas_obj.endForm()
             
-            # Set opacity to 15%
+            # Opacity 15%, set on the page: ReportLab forms carry no ExtGState
+            # resources, the form inherits it from the page's graphics state
+            canvas_obj.saveState()
             canvas_obj.setFillAlpha(0.15)
-            
-            # Draw the image
-            canvas_obj.drawImage(
-                self.watermark_logo_path,
-                x, y,
-                width=watermark_width,
-                height=watermark_height,
-                preserveAspectRatio=True,
-                mask='auto'
-            )
-            
-            # Restore canvas state
+            canvas_obj.doForm(WATERMARK_FORM)
             canvas_obj.restoreState()
         except Exception as e:
             print(f"Warning: Could not draw watermark: {e}")
@@ -330,78 +481,16 @@ class PDFGenerator:
             )
             
             elements = []
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            # University Name: Bookman Old Style, 12
-            uni_name_font = 'Bookman' if self.fonts_registered else 'Helvetica-Bold'
-            uni_name_style = ParagraphStyle(
-                'UniName',
-                parent=styles['Normal'],
-                fontSize=12,
-                alignment=TA_CENTER,
-                fontName=uni_name_font,
-                spaceAfter=2
-            )
-
-            # Subtitle: Bookman Old Style, 12, Italic
-            subtitle_font = 'Bookman-Italic' if self.fonts_registered else 'Helvetica-Oblique'
-            subtitle_style = ParagraphStyle(
-                'Subtitle',
-                parent=styles['Normal'],
-                fontSize=12,
-                alignment=TA_CENTER,
-                fontName=subtitle_font,
-                spaceAfter=6
-            )
-            
-            # Transcript Title: Goudy Old Style, 14, Bold, Double Underline (simulated with <u>)
-            title_font = 'Goudy-Bold' if self.fonts_registered else 'Helvetica-Bold'
-            title_style = ParagraphStyle(
-                'TranscriptTitle',
-                parent=styles['Heading1'],
-                fontSize=14,
-                textColor=colors.black,
-                alignment=TA_CENTER,
-                spaceAfter=12,
-                fontName=title_font
-            )
-            
-            # General Text: Times New Roman
-            text_font = 'TimesNewRoman' if self.fonts_registered else 'Times-Roman'
-            text_bold_font = 'TimesNewRoman-Bold' if self.fonts_registered else 'Times-Bold'
-            
-            normal_style = ParagraphStyle(
-                'CustomNormal',
-                parent=styles['Normal'],
-                fontName=text_font,
-                fontSize=10
-            )
-            
-            # Semester Heading: Middle of table with underline
-            semester_style = ParagraphStyle(
-                'SemesterHeading',
-                parent=styles['Heading2'],
-                fontName=text_bold_font,
-                fontSize=12,
-                alignment=TA_CENTER,
-                spaceAfter=6
-            )
+            styles = self._get_styles('transcript')
+            text_font = styles['text_font']
+            text_bold_font = styles['text_bold_font']
             
             # Header
             # Header Table
-            # Try final logo first, then new, then old
-            from utils.resource_helper import resource_path
-            
-            logo_path = resource_path(os.path.join('resources', 'images', 'uob_logo_final.png'))
-            if not os.path.exists(logo_path):
-                 logo_path = resource_path(os.path.join('resources', 'images', 'uob_logo_new.jpg'))
-            if not os.path.exists(logo_path):
-                 logo_path = resource_path(os.path.join('resources', 'images', 'uob_logo.png'))
-            
+            logo_image = self._get_logo()
             logo = None
-            if os.path.exists(logo_path):
-                logo = Image(logo_path, width=1.2*inch, height=1.2*inch)
+            if logo_image:
+                logo = LogoFlowable(logo_image, 1.2*inch, 1.2*inch)
             
             # Define university details
             university_name = "UNIVERSITY OF BALOCHISTAN, QUETTA"
@@ -409,9 +498,9 @@ class PDFGenerator:
             
             # Text content for right column
             header_text = []
-            header_text.append(Paragraph(university_name, uni_name_style))
-            header_text.append(Paragraph(f"Sub-Campus {sub_campus}", subtitle_style))
-            header_text.append(Paragraph("Office of the Examination", subtitle_style))
+            header_text.append(Paragraph(university_name, styles['uni_name']))
+            header_text.append(Paragraph(f"Sub-Campus {sub_campus}", styles['subtitle']))
+            header_text.append(Paragraph("Office of the Examination", styles['subtitle']))
             
             # Create header table
             if logo:
@@ -448,7 +537,7 @@ class PDFGenerator:
             elements.append(Spacer(1, 0.1*inch))
             
             # Title below header
-            elements.append(Paragraph("<u><b>STUDENT TRANSCRIPT</b></u>", title_style))
+            elements.append(Paragraph("<u><b>STUDENT TRANSCRIPT</b></u>", styles['title']))
             elements.append(Spacer(1, 0.2*inch))
             
             # Student Information
@@ -476,7 +565,7 @@ class PDFGenerator:
             
             # Department
             dept_text = f"<b>Department:</b> {student_data.get('department_name', '')} (Morning)"
-            elements.append(Paragraph(dept_text, normal_style))
+            elements.append(Paragraph(dept_text, styles['normal']))
             elements.append(Spacer(1, 0.15*inch))
             
             # Group marks by semester
@@ -491,7 +580,7 @@ class PDFGenerator:
             for semester in sorted(semesters.keys()):
                 # Semester heading
                 ordinal = self._get_ordinal(semester)
-                sem_heading = Paragraph(f"<u>{ordinal} Semester</u>", semester_style)
+                sem_heading = Paragraph(f"<u>{ordinal} Semester</u>", styles['semester'])
                 elements.append(sem_heading)
                 elements.append(Spacer(1, 0.1*inch))
                 
@@ -567,39 +656,13 @@ class PDFGenerator:
             # Add signature section at the end
             elements.append(Spacer(1, 0.5*inch))
             
-            # Signature style - Times New Roman, size 11, right-aligned
-            from reportlab.lib.enums import TA_RIGHT
-            
-            signature_style = ParagraphStyle(
-                'Signature',
-                parent=styles['Normal'],
-                fontName=text_bold_font,
-                fontSize=11,
-                alignment=TA_RIGHT
-            )
-            
-            signature_detail_style = ParagraphStyle(
-                'SignatureDetail',
-                parent=styles['Normal'],
-                fontName=text_font,
-                fontSize=11,
-                alignment=TA_RIGHT
-            )
-            
             # Add signature text
-            elements.append(Paragraph("<b>Assistant Director Examination</b>", signature_style))
-            elements.append(Paragraph("University of Balochistan", signature_detail_style))
-            elements.append(Paragraph("Sub Campus Kharan", signature_detail_style))
-            
-            # Set watermark logo path
-            logo_path = resource_path(os.path.join('resources', 'images', 'uob_logo_final.png'))
-            if not os.path.exists(logo_path):
-                 logo_path = resource_path(os.path.join('resources', 'images', 'uob_logo_new.jpg'))
-            if not os.path.exists(logo_path):
-                 logo_path = resource_path(os.path.join('resources', 'images', 'uob_logo.png'))
-            
-            if os.path.exists(logo_path):
-                self.watermark_logo_path = logo_path
+            elements.append(Paragraph("<b>Assistant Director Examination</b>", styles['signature']))
+            elements.append(Paragraph("University of Balochistan", styles['signature_detail']))
+            elements.append(Paragraph("Sub Campus Kharan", styles['signature_detail']))
+            
+            if logo_image:
+                self.watermark_logo_path = logo_image.path
             
             # Build PDF with watermark
             doc.build(elements, onFirstPage=self._draw_watermark, onLaterPages=self._draw_watermark)
@@ -0,0 +1,161 @@
+"""
+Reference Data Cache
+Read-through cache for lookup rows that rarely change (departments, courses,
+users). Entries expire after REFERENCE_CACHE_TTL seconds and the least
+recently used ones are dropped beyond REFERENCE_CACHE_SIZE. Each cache lists
+the tables its rows come from; writes to one of those tables call
+invalidate_tables() so the next read goes back to the database. Loaders
+return Uncached(value) when the query failed, so an error is not served
+from memory until the entry expires.
+
+Usage:
+    self._cache = ReferenceCache('courses', tables=('courses', 'departments'))
+
+    def get_course_by_id(self, course_id):
+        return self._cache.get(('id', course_id), lambda: self._load_course(course_id))
+
+    def _load_course(self, course_id):
+        result = db.execute_query("SELECT * FROM courses WHERE course_id = ?", (course_id,))
+        if result is None:
+            return Uncached(None)  # Query failed - try again on the next call
+        return result[0] if result else None
+
+    invalidate_tables('courses')  # after a successful write
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional
+import config
+
+_caches: Dict[str, 'ReferenceCache'] = {}
+_caches_lock = threading.Lock()
+
+
+def _copy(value):
+    """Copy rows so callers can modify what they get without touching the cache"""
+    if isinstance(value, list):
+        return [dict(row) if isinstance(row, dict) else row for row in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+class Uncached:
+    """Loader result handed to the caller without being stored (e.g. after a query error)"""
+
+    def __init__(self, value=None):
+        self.value = value
+
+
+class ReferenceCache:
+    """TTL + LRU read-through cache for one controller's lookups"""
+
+    def __init__(self, name: str, tables: Iterable[str] = (), ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.name = name
+        self.tables = frozenset(tables or (name,))
+        self.ttl = config.REFERENCE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max(1, config.REFERENCE_CACHE_SIZE if max_entries is None else max_entries)
+        self._entries = OrderedDict()  # key -> (loaded_at, value), least recently used first
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped on invalidate; loads that started earlier are not stored
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._failures = 0
+
+        with _caches_lock:
+            _caches[name] = self
+
+    def get(self, key: Hashable, loader: Callable):
+        """Return the cached value for key, calling loader() on a miss"""
+        if self.ttl <= 0:
+            value = loader()
+            return value.value if isinstance(value, Uncached) else value
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return _copy(entry[1])
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            generation = self._generation
+
+        value = loader()
+        if isinstance(value, Uncached):
+            with self._lock:
+                self._failures += 1
+            return value.value
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return _copy(value)
+
+    def invalidate(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'tables': sorted(self.tables),
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'failures': self._failures,
+            }
+
+    def reset_stats(self):
+        """Zero the counters (entries are kept)"""
+        with self._lock:
+            self._hits = self._misses = self._evictions = self._expirations = 0
+            self._invalidations = self._failures = 0
+
+
+def invalidate_tables(*tables: str):
+    """Invalidate every cache holding rows from any of these tables"""
+    changed = set(tables)
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        if cache.tables & changed:
+            cache.invalidate()
+
+
+def invalidate_all():
+    """Invalidate every reference cache"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.invalidate()
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Metrics of every reference cache, by name"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
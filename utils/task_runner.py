@@ -0,0 +1,223 @@
+"""
+Task Runner - Runs controller calls off the GUI thread
+Pages submit work to a shared QThreadPool and get the outcome back as Qt
+signals on the GUI thread. Database tasks hold a pooled connection for
+their whole run, so at most DB_POOL_SIZE - DB_POOL_RESERVE of them run at
+once; the reserved connections stay free for the GUI thread, the backup
+scheduler and the startup warm-up. Other tasks use a separate pool.
+
+Usage:
+    task_runner.submit(result_controller.get_topper_list, dept_id, semester, 10,
+                       key='toppers', on_result=self.show_toppers, on_error=self.show_error)
+"""
+import threading
+import traceback
+from typing import Callable, Dict, Optional
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from database.db_manager import db
+import config
+
+
+class TaskSignals(QObject):
+    """Signals of one task; delivered on the thread that submitted it"""
+    result = pyqtSignal(object)         # Return value of the task
+    error = pyqtSignal(str)             # Exception message
+    progress = pyqtSignal(int, int, str)  # (done, total, message)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()             # Always last, after result / error / cancelled
+
+
+class TaskHandle:
+    """A submitted task; returned by TaskRunner.submit"""
+
+    def __init__(self, runner: 'TaskRunner', key: Optional[str]):
+        self.key = key
+        self.signals = TaskSignals()
+        self.cancel_event = threading.Event()
+        self.started = False
+        self.done = False
+        self._runner = runner
+        self._lock = threading.Lock()
+        self._closed = False  # Outcome is being emitted, too late to join
+
+    def cancel(self):
+        """Drop the result; tasks submitted with_progress also see cancel_event and can stop early"""
+        self.cancel_event.set()
+        self._runner._take(self)
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def report_progress(self, done: int, total: int, message: str = ""):
+        """progress_callback handed to controllers (callable from the worker thread)"""
+        if not self.cancel_event.is_set():
+            self.signals.progress.emit(int(done), int(total), str(message))
+
+    def _join(self, connect: Callable) -> bool:
+        """Connect more slots unless the outcome is already on its way"""
+        with self._lock:
+            if self._closed or self.is_cancelled():
+                return False
+            connect(self)
+            return True
+
+    def _close(self):
+        with self._lock:
+            self._closed = True
+
+
+class _Task(QRunnable):
+    """QRunnable wrapping a controller call"""
+
+    def __init__(self, handle: TaskHandle, fn: Callable, args: tuple, kwargs: dict, uses_db: bool):
+        super().__init__()
+        self.setAutoDelete(False)  # The runner keeps the Python object alive until finished
+        self.handle = handle
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.uses_db = uses_db
+
+    def run(self):
+        handle = self.handle
+        handle.started = True
+        signals = handle.signals
+        try:
+            if handle.is_cancelled():
+                handle._close()
+                signals.cancelled.emit()
+                return
+
+            if self.uses_db:
+                # Use a pooled connection of our own and hand it back when done
+                with db.connection_scope():
+                    value = self.fn(*self.args, **self.kwargs)
+            else:
+                value = self.fn(*self.args, **self.kwargs)
+
+            handle._close()
+            if handle.is_cancelled():
+                signals.cancelled.emit()
+            else:
+                signals.result.emit(value)
+        except Exception as e:
+            traceback.print_exc()
+            handle._close()
+            if handle.is_cancelled():
+                signals.cancelled.emit()
+            else:
+                signals.error.emit(str(e))
+        finally:
+            signals.finished.emit()
+
+
+class TaskRunner(QObject):
+    """Shared background task pool with coalescing and a cap on database tasks"""
+
+    def __init__(self, db_workers: Optional[int] = None):
+        super().__init__()
+        self.db_pool = QThreadPool()
+        self.db_pool.setMaxThreadCount(db_workers or max(1, config.DB_POOL_SIZE - config.DB_POOL_RESERVE))
+        self.cpu_pool = QThreadPool.globalInstance()
+        self._active: Dict[TaskHandle, _Task] = {}
+        self._by_key: Dict[str, TaskHandle] = {}
+
+    def submit(self, fn: Callable, *args, key: Optional[str] = None, supersede: bool = False,
+               uses_db: bool = True, with_progress: bool = False,
+               on_result: Optional[Callable] = None, on_error: Optional[Callable] = None,
+               on_progress: Optional[Callable] = None, on_cancelled: Optional[Callable] = None,
+               on_finished: Optional[Callable] = None, **kwargs) -> TaskHandle:
+        """
+        Run fn(*args, **kwargs) on a worker thread (call from the GUI thread)
+
+        Args:
+            fn: Controller method or any callable
+            key: Coalescing key. While a task with the same key is queued or
+                running, a new submit joins it instead of running fn again
+                (five clicks on Refresh run one query)
+            supersede: With a key, cancel the existing task and start a new
+                one instead of joining it (use when the arguments changed,
+                e.g. new filters); the old task's result is dropped
+            uses_db: Hold a pooled connection and count against the database cap
+            with_progress: Pass progress_callback=(done, total, message) and
+                cancel_event=threading.Event keyword arguments to fn
+            on_result / on_error / on_progress / on_cancelled / on_finished:
+                Optional slots connected to the task's signals
+
+        Returns:
+            TaskHandle (signals, cancel())
+        """
+        def connect(handle):
+            signals = handle.signals
+            for signal, slot in ((signals.result, on_result), (signals.error, on_error),
+                                 (signals.progress, on_progress), (signals.cancelled, on_cancelled),
+                                 (signals.finished, on_finished)):
+                if slot is not None:
+                    signal.connect(slot)
+
+        existing = self._by_key.get(key) if key is not None else None
+        if existing is not None:
+            if supersede:
+                existing.cancel()
+            elif existing._join(connect):
+                return existing
+
+        handle = TaskHandle(self, key)
+        connect(handle)
+        handle.signals.finished.connect(lambda h=handle: self._finished(h))
+
+        if with_progress:
+            kwargs = dict(kwargs, progress_callback=handle.report_progress, cancel_event=handle.cancel_event)
+        task = _Task(handle, fn, args, kwargs, uses_db)
+        self._active[handle] = task
+        if key is not None:
+            self._by_key[key] = handle
+        (self.db_pool if uses_db else self.cpu_pool).start(task)
+        return handle
+
+    def is_running(self, key: str) -> bool:
+        """Whether a task with this key is queued or running"""
+        handle = self._by_key.get(key)
+        return handle is not None and not handle.done
+
+    def cancel(self, key: str):
+        """Cancel the queued or running task with this key"""
+        handle = self._by_key.get(key)
+        if handle is not None:
+            handle.cancel()
+
+    def stats(self) -> dict:
+        """Tasks queued or running, and the worker caps"""
+        return {
+            'active': len(self._active),
+            'db_workers': self.db_pool.maxThreadCount(),
+            'db_running': self.db_pool.activeThreadCount(),
+            'cpu_workers': self.cpu_pool.maxThreadCount(),
+        }
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Block until every task has finished (application shutdown)"""
+        return self.db_pool.waitForDone(msecs) and self.cpu_pool.waitForDone(msecs)
+
+    def _take(self, handle: TaskHandle):
+        """Remove a cancelled task that has not started yet from its queue"""
+        if handle.key is not None and self._by_key.get(handle.key) is handle:
+            del self._by_key[handle.key]
+        task = self._active.get(handle)
+        if task is None or handle.started:
+            return
+        pool = self.db_pool if task.uses_db else self.cpu_pool
+        if pool.tryTake(task):
+            handle._close()
+            handle.signals.cancelled.emit()
+            handle.signals.finished.emit()
+
+    def _finished(self, handle: TaskHandle):
+        handle.done = True
+        self._active.pop(handle, None)
+        if handle.key is not None and self._by_key.get(handle.key) is handle:
+            del self._by_key[handle.key]
+
+
+# Global instance
+task_runner = TaskRunner()